@@ -0,0 +1,80 @@
+"""Benchmark du protocole Whisper worker: chemin WAV (fichier) vs trame PCM (pipe).
+
+Usage:
+  python bench_whisper.py                 Modele reel (WHISPER_MODEL, CUDA)
+  python bench_whisper.py --dry           Cout du protocole seul (pas d'inference)
+  python bench_whisper.py --dry -n 50 -s 8 --wav enregistrement.wav
+
+Mesure par requete: ecriture du WAV temporaire + relecture/decodage par le
+worker (mode wav) contre envoi direct des int16 sur stdin (mode pcm).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def load_audio(path: str | None, seconds: float, rate: int) -> np.ndarray:
+    if path:
+        with wave.open(path, "rb") as wf:
+            return np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2")
+    # Signal synthetique: voyelle bruitee (le VAD du modele reel la garde)
+    t = np.arange(int(seconds * rate)) / rate
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * np.random.default_rng(0).standard_normal(t.size)
+    return (signal * 32767).astype("<i2")
+
+
+def run(worker, audio: np.ndarray, n: int) -> list[float]:
+    timings = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        worker.transcribe_audio(audio)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry", action="store_true", help="worker sans modele (WHISPER_DRY_RUN=1)")
+    parser.add_argument("-n", type=int, default=20, help="requetes par mode")
+    parser.add_argument("-s", "--seconds", type=float, default=5.0, help="duree de l'audio synthetique")
+    parser.add_argument("--wav", help="fichier WAV 16 kHz mono a utiliser")
+    parser.add_argument("--python", default=sys.executable, help="interpreteur du worker")
+    args = parser.parse_args()
+
+    if args.dry:
+        os.environ["WHISPER_DRY_RUN"] = "1"
+    from src.voice import SAMPLE_RATE, WhisperWorker
+
+    audio = load_audio(args.wav, args.seconds, SAMPLE_RATE)
+    print(f"Audio: {len(audio) / SAMPLE_RATE:.1f}s ({audio.nbytes / 1024:.0f} Ko) | {args.n} requetes par mode"
+          f"{' | dry-run' if args.dry else ''}")
+
+    results = {}
+    for protocol in ("wav", "pcm"):
+        worker = WhisperWorker(python=Path(args.python), protocol=protocol)
+        if not worker.start():
+            print(f"[ERREUR] worker non demarre ({args.python})")
+            return
+        run(worker, audio, 2)  # Chauffe (cache disque, allocations, CUDA)
+        results[protocol] = run(worker, audio, args.n)
+        worker.stop()
+
+    print(f"\n  {'mode':<6} {'moy':>9} {'p50':>9} {'min':>9} {'max':>9}")
+    for protocol, t in results.items():
+        print(f"  {protocol:<6} {statistics.mean(t):>7.2f}ms {statistics.median(t):>7.2f}ms"
+              f" {min(t):>7.2f}ms {max(t):>7.2f}ms")
+    gain = statistics.median(results["wav"]) - statistics.median(results["pcm"])
+    print(f"\n  PCM economise {gain:.2f}ms par requete (p50) par rapport au fichier WAV")
+
+
+if __name__ == "__main__":
+    main()
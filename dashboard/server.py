@@ -1,7 +1,12 @@
 """JARVIS Dashboard Server — Cluster monitoring en temps reel.
 
-Serveur HTTP Python (stdlib only, zero dependance externe).
+Serveur HTTP Python (stdlib) + moniteur cluster partage.
 Sert le dashboard HTML + proxy les appels API vers M1/M2/OL1.
+Etat cluster lu dans le moniteur partage (src/cluster_monitor.py): sondes
+concurrentes en arriere-plan, connexions keep-alive.
+
+Metriques Prometheus de tous les processus JARVIS sur /metrics
+(fichiers data/metrics/*.json exportes par src/metrics.py).
 
 Usage: uv run python dashboard/server.py
 URL:   http://127.0.0.1:8080
@@ -10,15 +15,17 @@ URL:   http://127.0.0.1:8080
 import http.server
 import json
 import os
-import threading
-import time
-import urllib.request
-import urllib.error
+import sys
 from pathlib import Path
 
 PORT = 8080
 DASHBOARD_DIR = Path(__file__).parent
 
+sys.path.insert(0, str(DASHBOARD_DIR.parent))
+from src.cluster_monitor import get_monitor  # noqa: E402
+from src.config import config  # noqa: E402
+from src.metrics import REGISTRY, process_snapshots, render_prometheus  # noqa: E402
+
 # Config cluster — IP directes, PAS localhost
 AGENTS = {
     "M1": {
@@ -47,83 +54,46 @@ AGENTS = {
     },
 }
 
-# Cache des resultats (mis a jour en background)
-_cluster_state = {"agents": {}, "last_update": 0}
-_state_lock = threading.Lock()
+_monitor = get_monitor()
 
 
-def _check_lm_studio(name: str, agent: dict) -> dict:
-    """Check un noeud LM Studio."""
-    result = {
-        "name": name, "status": "offline", "models": [],
-        "model_count": 0, "latency_ms": 0,
+def _agent_entry(name: str, agent: dict, health) -> dict:
+    """Entree JSON d'un agent a partir du snapshot du moniteur."""
+    online = bool(health and health.online)
+    models = health.loaded if online else []
+    return {
+        "name": name, "status": "online" if online else "offline",
+        "models": models, "model_count": len(models),
+        "latency_ms": health.latency_ms if online else 0,
         "type": agent["type"], "role": agent["role"],
         "default_model": agent["model"],
         "gpus": agent["gpus"], "vram_gb": agent["vram_gb"],
     }
-    try:
-        start = time.time()
-        req = urllib.request.Request(
-            f"{agent['url']}/api/v1/models",
-            headers={"Authorization": f"Bearer {agent['api_key']}"},
-        )
-        with urllib.request.urlopen(req, timeout=3) as resp:
-            data = json.loads(resp.read())
-            latency = int((time.time() - start) * 1000)
-            models = [m.get("key", "?") for m in data.get("models", []) if m.get("loaded_instances")]
-            result.update({
-                "status": "online",
-                "models": models,
-                "model_count": len(models),
-                "latency_ms": latency,
-            })
-    except Exception:
-        pass
-    return result
-
-
-def _check_ollama(name: str, agent: dict) -> dict:
-    """Check un noeud Ollama."""
-    result = {
-        "name": name, "status": "offline", "models": [],
-        "model_count": 0, "latency_ms": 0,
-        "type": agent["type"], "role": agent["role"],
-        "default_model": agent["model"],
-        "gpus": agent["gpus"], "vram_gb": agent["vram_gb"],
+
+
+def _cluster_state() -> dict:
+    """Etat cluster courant (snapshot partage, aucune sonde ici)."""
+    snap = _monitor.latest()
+    if snap is None:
+        return {"agents": {}, "last_update": 0}
+    return {
+        "agents": {name: _agent_entry(name, agent, snap.nodes.get(name)) for name, agent in AGENTS.items()},
+        "last_update": snap.timestamp,
+        "version": snap.version,
     }
-    try:
-        start = time.time()
-        req = urllib.request.Request(f"{agent['url']}/api/tags")
-        with urllib.request.urlopen(req, timeout=3) as resp:
-            data = json.loads(resp.read())
-            latency = int((time.time() - start) * 1000)
-            models = [m.get("name", "?") for m in data.get("models", [])]
-            result.update({
-                "status": "online",
-                "models": models,
-                "model_count": len(models),
-                "latency_ms": latency,
-            })
-    except Exception:
-        pass
-    return result
-
-
-def _update_cluster_state():
-    """Background thread: poll tous les agents toutes les 5s."""
-    while True:
-        agents = {}
-        for name, agent in AGENTS.items():
-            if agent["type"] == "ollama":
-                agents[name] = _check_ollama(name, agent)
-            else:
-                agents[name] = _check_lm_studio(name, agent)
-
-        with _state_lock:
-            _cluster_state["agents"] = agents
-            _cluster_state["last_update"] = time.time()
-
-        time.sleep(5)
+
+
+def _metrics_text() -> str:
+    """Texte Prometheus: etat des noeuds + metriques de chaque processus JARVIS."""
+    snap = _monitor.latest()
+    if snap is not None:
+        up = REGISTRY.gauge("jarvis_node_up", "Noeud en ligne (sonde du moniteur)")
+        probe = REGISTRY.gauge("jarvis_node_probe_latency_ms", "Latence de la derniere sonde")
+        for h in snap.nodes.values():
+            up.set(1 if h.online else 0, node=h.name)
+            if h.online:
+                probe.set(h.latency_ms, node=h.name)
+    return render_prometheus(process_snapshots())
 
 
 class DashboardHandler(http.server.SimpleHTTPRequestHandler):
@@ -135,6 +105,8 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         if self.path == "/api/cluster":
             self._send_json()
+        elif self.path == "/metrics":
+            self._send_metrics()
         elif self.path == "/" or self.path == "":
             self.path = "/index.html"
             super().do_GET()
@@ -142,29 +114,40 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
             super().do_GET()
 
     def _send_json(self):
-        with _state_lock:
-            data = json.dumps(_cluster_state, ensure_ascii=False)
+        data = json.dumps(_cluster_state(), ensure_ascii=False)
         self.send_response(200)
         self.send_header("Content-Type", "application/json; charset=utf-8")
         self.send_header("Access-Control-Allow-Origin", "*")
         self.end_headers()
         self.wfile.write(data.encode("utf-8"))
 
+    def _send_metrics(self):
+        data = _metrics_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
     def log_message(self, format, *args):
         pass  # Silencieux
 
 
 def main():
-    # Lancer le polling en background
-    t = threading.Thread(target=_update_cluster_state, daemon=True)
-    t.start()
+    # Cles API du dashboard -> noeuds du config (si pas definies par l'env)
+    for name, agent in AGENTS.items():
+        node = config.get_node(name) or config.get_ollama_node(name)
+        if node and agent["api_key"] and not node.api_key:
+            node.api_key = agent["api_key"]
 
-    # Premier poll immediat
-    time.sleep(1)
+    # Moniteur cluster partage: sondes concurrentes en arriere-plan
+    _monitor.start_thread()
+    _monitor.wait_first(timeout=5)
 
     server = http.server.HTTPServer(("127.0.0.1", PORT), DashboardHandler)
     print(f"JARVIS Dashboard: http://127.0.0.1:{PORT}")
     print(f"API Cluster:      http://127.0.0.1:{PORT}/api/cluster")
+    print(f"Metriques:        http://127.0.0.1:{PORT}/metrics")
     print("Ctrl+C pour arreter")
     try:
         server.serve_forever()
@@ -1,4 +1,9 @@
-"""Generate ultra-compact command reference for M1 system prompt (~3KB)."""
+"""Generate ultra-compact command reference for M1 system prompt (~3KB).
+
+Since src/prompt_retrieval.py, M1 only receives the top-k relevant entries per
+query; this full reference is the fallback (JARVIS_KNOWLEDGE_RETRIEVAL=false)
+and the baseline for the tokens-saved stats.
+"""
 from src.commands import COMMANDS
 from src.config import SCRIPTS, config
 
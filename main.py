@@ -51,8 +51,14 @@ async def _run_ollama_mode() -> None:
 async def main() -> None:
     args = sys.argv[1:]
 
+    # Processus longs: metriques exportees pour le dashboard (data/metrics/)
+    if not args or args[0] in ("-i", "--interactive", "-c", "--commander", "-v", "--voice",
+                               "--vocal", "-k", "--keyboard", "--hybrid"):
+        from src.metrics import REGISTRY
+        REGISTRY.enable_export()
+
     # Auto-startup: ensure cluster models are loaded (skip for --help, --ollama, and quick queries)
-    if not args or args[0] not in ("-h", "--help", "-o", "--ollama"):
+    if not args or args[0] not in ("-h", "--help", "-o", "--ollama", "-t", "--trace"):
         report = await ensure_cluster_ready()
         print_startup_report(report)
 
@@ -66,6 +72,11 @@ async def main() -> None:
         await run_hybrid()
     elif args[0] in ("-o", "--ollama"):
         await _run_ollama_mode()
+    elif args[0] in ("-t", "--trace"):
+        from src.tracing import format_trace_report, load_traces, trace_report
+        # python main.py -t [report] [N]: N dernieres traces (defaut: config)
+        window = next((int(a) for a in args[1:] if a.isdigit()), None)
+        print(format_trace_report(trace_report(load_traces(window))))
     elif args[0] in ("-s", "--status"):
         await run_once("Utilise lm_cluster_status et rapporte le statut du cluster.")
     elif args[0] in ("-h", "--help"):
@@ -81,6 +92,7 @@ async def main() -> None:
             "  python main.py -o                Mode Ollama cloud (gratuit, web + sub-agents)\n"
             "  python main.py -o glm-5:cloud    Ollama avec modele specifique\n"
             "  python main.py -s                Statut du cluster\n"
+            "  python main.py -t [N]            Rapport de traces vocales (latence par etape)\n"
             '  python main.py "<prompt>"        Requete unique (IAs)\n'
             "  python main.py -h                Aide"
         )
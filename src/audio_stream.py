@@ -0,0 +1,406 @@
+"""JARVIS Audio Stream — Ring-buffered capture, energy VAD, incremental STT.
+
+Flow:
+  capture permanente (AlwaysOnCapture): micro ouvert en continu -> anneau
+  preallouee; PTT presse -> fenetre = derniers capture_preroll_ms + audio
+  live jusqu'a la relache (plus de premiere syllabe coupee)
+  source (micro sounddevice, fichier WAV ou tableau simule) -> feed(bloc int16)
+  -> RingBuffer preallouee (le callback audio ne fait qu'une copie)
+  -> thread STT: trames de 30 ms -> EnergyVAD -> segments de parole
+     - pause >= vad_silence_ms: segment ferme, transcrit pendant que
+       l'utilisateur continue de parler
+     - toutes les stream_partial_interval s d'audio: hypothese du segment
+       ouvert -> on_partial(texte partiel)
+  -> finish() (relache PTT / fin du WAV): seul le dernier segment reste
+     a transcrire -> texte final
+
+Optimizations:
+- La latence STT ne s'ajoute plus au temps de parole: a la relache, les
+  segments deja fermes sont transcrits, il ne reste que la fin
+- Callback audio minimal (ecriture dans l'anneau + reveil du thread),
+  le VAD et Whisper tournent hors du thread audio
+- Intervalle des partiels en temps audio (pas horloge). En direct, un
+  partiel est saute si l'analyse a du retard (skip_behind); les rejeux
+  desactivent ce saut: un WAV injecte plus vite que le temps reel produit
+  les memes partiels (tests)
+- Capture permanente: le callback audio ecrit une vue du bloc dans
+  l'anneau, aucune allocation par callback (ni copie de bloc, ni liste,
+  ni concatenation a la relache)
+"""
+
+from __future__ import annotations
+
+import contextvars
+import math
+import threading
+import time
+import wave
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from src.config import config
+
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30          # Trame d'analyse VAD
+SEGMENT_PAD_MS = 150   # Marge gardee avant/apres la parole detectee
+
+
+class RingBuffer:
+    """Fixed-size int16 ring addressed by absolute sample positions."""
+
+    def __init__(self, capacity: int):
+        self.buf = np.zeros(capacity, dtype=np.int16)
+        self.capacity = capacity
+        self.total = 0  # Echantillons ecrits depuis le debut
+
+    def write(self, samples: np.ndarray) -> None:
+        n = len(samples)
+        if n >= self.capacity:
+            samples = samples[-self.capacity:]
+            self.total += n - self.capacity
+            n = self.capacity
+        i = self.total % self.capacity
+        first = min(n, self.capacity - i)
+        self.buf[i:i + first] = samples[:first]
+        if first < n:
+            self.buf[:n - first] = samples[first:]
+        self.total += n
+
+    def oldest(self) -> int:
+        return max(0, self.total - self.capacity)
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Copy of samples [start, end) (clamped to what is still held)."""
+        start = max(start, self.oldest())
+        end = min(end, self.total)
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+        i, n = start % self.capacity, end - start
+        if i + n <= self.capacity:
+            return self.buf[i:i + n].copy()
+        return np.concatenate((self.buf[i:], self.buf[:i + n - self.capacity]))
+
+    def latest(self, n: int) -> np.ndarray:
+        return self.read(self.total - n, self.total)
+
+
+class EnergyVAD:
+    """RMS energy gate over an adaptive noise floor (dBFS)."""
+
+    def __init__(self, margin_db: float | None = None, min_db: float = -50.0):
+        self.margin_db = config.vad_margin_db if margin_db is None else margin_db
+        self.min_db = min_db
+        self.noise_db = -70.0
+
+    @staticmethod
+    def level_db(frame: np.ndarray) -> float:
+        if not len(frame):
+            return -120.0
+        x = frame.astype(np.float32)
+        rms = math.sqrt(float(np.dot(x, x)) / len(x))
+        return 20 * math.log10(rms / 32768 + 1e-9)
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        db = self.level_db(frame)
+        speech = db > max(self.noise_db + self.margin_db, self.min_db)
+        if not speech:
+            # Plancher de bruit suivi lentement, seulement hors parole
+            self.noise_db = max(0.95 * self.noise_db + 0.05 * db, -90.0)
+        return speech
+
+
+@dataclass
+class StreamStats:
+    segments: int = 0
+    partials: int = 0
+    audio_s: float = 0.0
+    stt_ms: float = 0.0         # Temps Whisper cumule (segments + partiels)
+    finish_ms: float = 0.0      # Fin de parole -> texte final
+    texts: list[str] = field(default_factory=list)
+
+
+class StreamingTranscriber:
+    """Segments a live int16 stream with VAD and transcribes while it arrives.
+
+    `transcribe(samples_int16) -> str | None` is any STT backend (the
+    Whisper worker in production, a fake in tests). `feed()` is safe to
+    call from an audio callback; everything else runs on one STT thread.
+    `skip_behind=False` keeps every partial even when analysis lags (replays).
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[np.ndarray], str | None],
+        on_partial: Callable[[str], None] | None = None,
+        rate: int = SAMPLE_RATE,
+        ring_s: float | None = None,
+        silence_ms: float | None = None,
+        partial_interval: float | None = None,
+        min_speech_ms: float = 250.0,
+        skip_behind: bool = True,
+    ):
+        self.transcribe = transcribe
+        self.on_partial = on_partial
+        self.rate = rate
+        self.ring = RingBuffer(int(rate * (ring_s or config.stream_ring_s)))
+        self.vad = EnergyVAD()
+        self.frame = rate * FRAME_MS // 1000
+        self.pad = rate * SEGMENT_PAD_MS // 1000
+        self.silence = int(rate * (silence_ms or config.vad_silence_ms) / 1000)
+        self.partial_every = int(rate * (partial_interval or config.stream_partial_interval))
+        self.min_speech = int(rate * min_speech_ms / 1000)
+        self.skip_behind = skip_behind  # Direct: pas de partiel si l'analyse a du retard
+        self.stats = StreamStats()
+
+        self._pos = 0                  # Prochain echantillon a analyser
+        self._seg_start: int | None = None
+        self._last_speech = 0
+        self._last_partial = 0
+        self._committed_end = 0        # Fin du dernier segment transcrit
+        self._wake = threading.Event()
+        self._closing = False
+        # Contexte copie: les spans Whisper s'attachent a la trace de l'enonce
+        ctx = contextvars.copy_context()
+        self._thread = threading.Thread(target=ctx.run, args=(self._run,),
+                                        name="jarvis-stream-stt", daemon=True)
+        self._thread.start()
+
+    # ── Cote audio ──────────────────────────────────────────────────────
+
+    def feed(self, samples: np.ndarray) -> None:
+        self.ring.write(samples)
+        self._wake.set()
+
+    # ── Cote STT ────────────────────────────────────────────────────────
+
+    @property
+    def text(self) -> str:
+        return " ".join(t for t in self.stats.texts if t)
+
+    def _stt(self, start: int, end: int) -> str:
+        audio = self.ring.read(start, end)
+        if not len(audio):
+            return ""
+        t0 = time.perf_counter()
+        try:
+            text = self.transcribe(audio) or ""
+        except Exception:
+            text = ""
+        self.stats.stt_ms += (time.perf_counter() - t0) * 1000
+        return text.strip()
+
+    def _close_segment(self, end: int) -> None:
+        start, self._seg_start = self._seg_start, None
+        if start is None or self._last_speech - start < self.min_speech:
+            return
+        self._committed_end = end
+        self.stats.segments += 1
+        self.stats.texts.append(self._stt(start, end))
+
+    def _analyze(self) -> None:
+        while self.ring.total - self._pos >= self.frame:
+            frame = self.ring.read(self._pos, self._pos + self.frame)
+            end = self._pos + self.frame
+            if self.vad.is_speech(frame):
+                if self._seg_start is None:
+                    self._seg_start = max(self._pos - self.pad, self._committed_end, self.ring.oldest())
+                    self._last_partial = self._pos
+                self._last_speech = end
+            elif self._seg_start is not None and end - self._last_speech >= self.silence:
+                self._close_segment(min(self._last_speech + self.pad, end))
+            self._pos = end
+
+            behind = self.skip_behind and self.ring.total - self._pos > 4 * self.frame
+            if (self._seg_start is not None and not behind and self.on_partial
+                    and self._pos - self._last_partial >= self.partial_every):
+                self._last_partial = self._pos
+                hypothesis = self._stt(self._seg_start, self._pos)
+                self.stats.partials += 1
+                self.on_partial(" ".join(t for t in (self.text, hypothesis) if t))
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(0.05)
+            self._wake.clear()
+            self._analyze()
+            if self._closing:
+                break
+        if self._seg_start is not None:
+            self._close_segment(self.ring.total)
+
+    def finish(self, timeout: float | None = None) -> str:
+        """End of stream: transcribe the open segment and return the full text."""
+        t0 = time.perf_counter()
+        self._closing = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self.stats.finish_ms = (time.perf_counter() - t0) * 1000
+        self.stats.audio_s = self.ring.total / self.rate
+        return self.text
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SOURCES — micro (sounddevice) ou fichier WAV, meme interface
+# ═══════════════════════════════════════════════════════════════════════════
+
+class ArraySource:
+    """Simulated microphone: delivers an int16 array in blocks.
+
+    With `hold`, silence blocks keep coming after the array until stop(),
+    like a live input stream (always-on capture tests).
+    """
+
+    def __init__(self, audio: np.ndarray, block: int = 1024, realtime: bool = False, hold: bool = False):
+        self.audio = np.ascontiguousarray(audio, dtype=np.int16)
+        self.block = block
+        self.realtime = realtime
+        self.hold = hold
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self, callback: Callable[[np.ndarray], None]) -> None:
+        def _run():
+            period = self.block / SAMPLE_RATE
+            next_t = time.perf_counter()
+            for i in range(0, len(self.audio), self.block):
+                if self._stop.is_set():
+                    return
+                callback(self.audio[i:i + self.block])  # Vue, pas de copie
+                if self.realtime:
+                    next_t += period
+                    time.sleep(max(0.0, next_t - time.perf_counter()))
+            silence = np.zeros(self.block, dtype=np.int16)
+            while self.hold and not self._stop.is_set():
+                callback(silence)
+                next_t += period
+                self._stop.wait(max(0.0, next_t - time.perf_counter()))
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=_run, name="jarvis-array-source", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> None:
+        if self._thread:
+            self._thread.join(timeout)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.wait()
+
+
+class WavSource(ArraySource):
+    """Feeds a 16 kHz mono WAV in blocks, like the microphone callback."""
+
+    def __init__(self, path: str | Path, block: int = 1024, realtime: bool = False):
+        with wave.open(str(path), "rb") as wf:
+            if wf.getframerate() != SAMPLE_RATE or wf.getsampwidth() != 2:
+                raise ValueError(f"{path}: attendu 16 kHz int16 ({wf.getframerate()} Hz)")
+            audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2")
+            if wf.getnchannels() > 1:
+                audio = audio[::wf.getnchannels()]
+        super().__init__(audio, block, realtime)
+
+
+class MicSource:
+    """sounddevice input stream delivering int16 mono blocks."""
+
+    def __init__(self, device: int | None, block: int = 1024):
+        self.device = device
+        self.block = block
+        self._stream = None
+
+    def start(self, callback: Callable[[np.ndarray], None]) -> None:
+        import sounddevice as sd
+
+        def audio_callback(indata, frame_count, time_info, status):
+            callback(indata[:, 0])
+
+        self._stream = sd.InputStream(device=self.device, samplerate=SAMPLE_RATE, channels=1,
+                                      dtype="int16", callback=audio_callback, blocksize=self.block)
+        self._stream.start()
+
+    def stop(self) -> None:
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CAPTURE PERMANENTE — preroll pour le push-to-talk
+# ═══════════════════════════════════════════════════════════════════════════
+
+class AlwaysOnCapture:
+    """A source kept running into a preallocated ring; PTT takes a window of it.
+
+    The source callback is the ring's write() itself: each block lands in
+    the preallocated buffer without any per-callback allocation. A
+    recording starts `preroll_ms` before the moment it is requested.
+    """
+
+    def __init__(self, source, ring_s: float | None = None, preroll_ms: float | None = None,
+                 rate: int = SAMPLE_RATE):
+        self.source = source
+        self.rate = rate
+        self.ring = RingBuffer(int(rate * (ring_s or config.capture_ring_s)))
+        ms = config.capture_preroll_ms if preroll_ms is None else preroll_ms
+        self.preroll = int(rate * ms / 1000)
+        self.running = False
+
+    def start(self) -> bool:
+        if self.running:
+            return True
+        try:
+            self.source.start(self.ring.write)
+        except Exception as e:
+            print(f"  [CAPTURE] Source indisponible: {e}", flush=True)
+            return False
+        self.running = True
+        return True
+
+    def stop(self) -> None:
+        if self.running:
+            self.running = False
+            self.source.stop()
+
+    @property
+    def position(self) -> int:
+        """Absolute index of the next sample to be captured."""
+        return self.ring.total
+
+    def mark(self) -> int:
+        """Start position of a recording requested now (preroll included)."""
+        return max(self.ring.total - self.preroll, self.ring.oldest())
+
+    def read(self, start: int, end: int | None = None) -> np.ndarray:
+        return self.ring.read(start, self.ring.total if end is None else end)
+
+    def record(self, stop: threading.Event, max_duration: float) -> np.ndarray:
+        """Preroll + live audio until `stop` is set (or max_duration)."""
+        start = self.mark()
+        limit = self.ring.capacity / self.rate - (self.ring.total - start) / self.rate - 1.0
+        stop.wait(min(max_duration, max(limit, 0.0)))
+        return self.read(start)
+
+
+def transcribe_wav_stream(
+    path: str | Path,
+    transcribe: Callable[[np.ndarray], str | None],
+    on_partial: Callable[[str], None] | None = None,
+    realtime: bool = False,
+) -> tuple[str, StreamStats]:
+    """Run a WAV file through the streaming pipeline (tests, replays).
+
+    Partials depend only on the audio, not on the injection speed: the
+    lag-based skip is only kept for `realtime` replays, like a live mic.
+    """
+    transcriber = StreamingTranscriber(transcribe, on_partial=on_partial, skip_behind=realtime)
+    source = WavSource(path, realtime=realtime)
+    source.start(transcriber.feed)
+    source.wait()
+    text = transcriber.finish()
+    return text, transcriber.stats
@@ -0,0 +1,271 @@
+"""JARVIS Batch Query — Bulk inference across the cluster with resume.
+
+Flow:
+  prompts (liste ou JSONL/texte lu en flux) -> file bornee
+  -> workers = somme des slots paralleles des noeuds (M1 x4, M2 x2, OL1...)
+  -> chaque requete prend un slot libre sur le noeud le moins charge
+     (echec -> nouvel essai sur un autre noeud)
+  -> chaque resultat est ajoute au JSONL de sortie des qu'il arrive
+  -> relance: les ids deja "ok" dans la sortie sont sautes (reprise)
+
+Optimizations:
+- Concurrence calee sur les slots de chaque noeud: pas de file d'attente
+  cote serveur, un noeud rapide traite naturellement plus de prompts
+- Noeuds hors ligne (moniteur) ou circuit ouvert exclus avant l'envoi
+- Entree en flux: un JSONL de 100k lignes n'est jamais charge en memoire
+- Le fichier de sortie EST le checkpoint: aucune ecriture supplementaire
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+from src.config import config
+
+
+BATCH_DIR = Path(__file__).resolve().parent.parent / "data" / "batch"
+
+
+@dataclass
+class BatchItem:
+    id: str
+    prompt: str
+    system: str | None = None
+    model: str | None = None
+    tried: set[str] = field(default_factory=set)
+
+
+@dataclass
+class BatchReport:
+    output: str
+    total: int = 0
+    done: int = 0
+    resumed: int = 0
+    failed: int = 0
+    elapsed_s: float = 0.0
+    per_node: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Prompts per second (this run only)."""
+        return self.done / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+def iter_prompts(source: Iterable[Any] | str | Path) -> Iterator[BatchItem]:
+    """Items from a list (str or {"id","prompt","system","model"}) or a file.
+
+    Files: .jsonl (one object or string per line) or plain text (one prompt
+    per line). Lines are read lazily. Missing ids default to the position.
+    """
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        with path.open(encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                line = line.strip()
+                if not line:
+                    continue
+                if path.suffix == ".jsonl":
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                else:
+                    entry = line
+                item = _item(i, entry)
+                if item:
+                    yield item
+        return
+    for i, entry in enumerate(source):
+        item = _item(i, entry)
+        if item:
+            yield item
+
+
+def _item(index: int, entry: Any) -> BatchItem | None:
+    if isinstance(entry, str):
+        return BatchItem(str(index), entry) if entry.strip() else None
+    if isinstance(entry, dict) and entry.get("prompt"):
+        return BatchItem(
+            str(entry.get("id", index)), entry["prompt"],
+            system=entry.get("system"), model=entry.get("model"),
+        )
+    return None
+
+
+def completed_ids(output: Path) -> set[str]:
+    """Ids already answered successfully in a previous run of `output`.
+
+    A partial last line (run killed mid-write) is cut so appends stay valid.
+    """
+    done: set[str] = set()
+    if not output.exists():
+        return done
+    with output.open("rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+    with output.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if row.get("ok"):
+                done.add(str(row["id"]))
+    return done
+
+
+class _SlotPool:
+    """Per-node concurrency slots; hands out the least loaded node."""
+
+    def __init__(self, slots: dict[str, int]):
+        self.slots = slots
+        self.busy = {n: 0 for n in slots}
+        self._cond = asyncio.Condition()
+
+    def _pick(self, exclude: set[str]) -> str | None:
+        from src.circuit_breaker import is_available
+        free = [n for n in self.slots
+                if n not in exclude and self.busy[n] < self.slots[n] and is_available(n)]
+        if not free:
+            return None
+        return min(free, key=lambda n: self.busy[n] / self.slots[n])
+
+    def usable(self, exclude: set[str]) -> bool:
+        return any(n not in exclude for n in self.slots)
+
+    async def acquire(self, exclude: set[str]) -> str:
+        async with self._cond:
+            while True:
+                node = self._pick(exclude)
+                if node:
+                    self.busy[node] += 1
+                    return node
+                try:
+                    # Reveil sur liberation d'un slot, ou periodique (circuit ferme)
+                    await asyncio.wait_for(self._cond.wait(), 1.0)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, node: str) -> None:
+        async with self._cond:
+            self.busy[node] -= 1
+            self._cond.notify_all()
+
+
+async def _default_chat(node: str, item: BatchItem, max_tokens: int | None,
+                        temperature: float | None, timeout: float | None) -> str:
+    from src.tools import _node_chat
+    return await _node_chat(node, item.prompt, system=item.system, model=item.model,
+                            max_tokens=max_tokens, temperature=temperature, timeout=timeout)
+
+
+async def batch_query(
+    source: Iterable[Any] | str | Path,
+    output: str | Path | None = None,
+    nodes: list[str] | None = None,
+    resume: bool = True,
+    max_tokens: int | None = None,
+    temperature: float | None = None,
+    timeout: float | None = None,
+    chat: Callable[..., Any] | None = None,
+    on_result: Callable[[dict], None] | None = None,
+) -> BatchReport:
+    """Run every prompt of `source` across the cluster, streaming results to JSONL.
+
+    `output` defaults to data/batch/batch_<timestamp>.jsonl. With resume,
+    ids already answered in `output` are skipped and new rows are appended.
+    `chat(node, item, max_tokens, temperature, timeout)` is injectable (tests).
+    """
+    from src.cluster_monitor import get_monitor
+
+    chat = chat or _default_chat
+    out = Path(output) if output else BATCH_DIR / f"batch_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    skip = completed_ids(out) if resume else set()
+
+    names = nodes or [n.name for n in config.lm_nodes] + [n.name for n in config.ollama_nodes]
+    try:
+        snap = await get_monitor().snapshot()
+        online = [n for n in names if n in snap.nodes and snap.nodes[n].online]
+        names = online or names
+    except Exception:
+        pass
+    slots = {}
+    for n in names:
+        node = config.get_node(n) or config.get_ollama_node(n)
+        if node:
+            slots[n] = max(node.parallel, 1)
+    if not slots:
+        raise ValueError(f"Aucun noeud utilisable: {', '.join(names)}")
+
+    pool = _SlotPool(slots)
+    report = BatchReport(str(out), per_node={n: 0 for n in slots})
+    queue: asyncio.Queue = asyncio.Queue(maxsize=sum(slots.values()) * 2)
+    t0 = time.monotonic()
+
+    with out.open("w" if not resume else "a", encoding="utf-8") as sink:
+        def _write(row: dict) -> None:
+            sink.write(json.dumps(row, ensure_ascii=False) + "\n")
+            sink.flush()
+            if on_result:
+                on_result(row)
+
+        async def _feed() -> None:
+            for item in iter_prompts(source):
+                report.total += 1
+                if item.id in skip:
+                    report.resumed += 1
+                    continue
+                await queue.put(item)
+            for _ in range(sum(slots.values())):
+                await queue.put(None)
+
+        async def _worker() -> None:
+            while (item := await queue.get()) is not None:
+                row = {"id": item.id, "prompt": item.prompt}
+                while True:
+                    node = await pool.acquire(item.tried)
+                    item.tried.add(node)
+                    started = time.monotonic()
+                    try:
+                        content = await chat(node, item, max_tokens, temperature, timeout)
+                        row.pop("error", None)
+                        row.update(ok=True, node=node, output=content)
+                    except Exception as e:
+                        row.update(ok=False, node=node, error=str(e)[:300] or type(e).__name__)
+                    finally:
+                        await pool.release(node)
+                    row["latency_ms"] = int((time.monotonic() - started) * 1000)
+                    if row["ok"] or not pool.usable(item.tried):
+                        break
+                row["attempts"] = len(item.tried)
+                if row["ok"]:
+                    report.done += 1
+                    report.per_node[row["node"]] += 1
+                else:
+                    report.failed += 1
+                _write(row)
+
+        await asyncio.gather(_feed(), *(_worker() for _ in range(sum(slots.values()))))
+
+    report.elapsed_s = time.monotonic() - t0
+    return report
+
+
+def format_batch_report(report: BatchReport) -> str:
+    """Summary of a batch run."""
+    nodes = ", ".join(f"{n}={c}" for n, c in report.per_node.items())
+    lines = [
+        f"Lot: {report.done}/{report.total - report.resumed} reussis"
+        f"{f', {report.failed} echecs' if report.failed else ''}"
+        f"{f', {report.resumed} deja faits (reprise)' if report.resumed else ''}",
+        f"  Duree: {report.elapsed_s:.1f}s ({report.throughput:.2f} prompts/s) | {nodes}",
+        f"  Sortie: {report.output}",
+    ]
+    return "\n".join(lines)
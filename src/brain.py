@@ -263,6 +263,7 @@ async def cluster_suggest_skill(context: str, node_url: str = "http://10.5.0.2:1
     Uses M1 (deep analysis) for best results.
     """
     import httpx
+    from src.cluster_client import shared_client
 
     prompt = (
         "Tu es JARVIS, un assistant IA autonome. "
@@ -279,7 +280,7 @@ async def cluster_suggest_skill(context: str, node_url: str = "http://10.5.0.2:1
     )
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
+        async with shared_client(timeout=30) as client:
             resp = await client.post(
                 f"{node_url}/api/v1/chat",
                 json={
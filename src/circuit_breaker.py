@@ -0,0 +1,228 @@
+"""JARVIS Circuit Breaker — Per-node fail-fast routing (closed/open/half-open).
+
+Flow:
+  call site -> allow(node)? -> requete -> record_success / record_failure
+  N echecs consecutifs -> OPEN (echec immediat, route suivante)
+  OPEN + recovery_timeout -> HALF_OPEN (une seule requete d'essai ou sonde)
+  essai OK -> CLOSED | essai KO -> OPEN
+  essai annule ou perdu (pas de verdict) -> release_trial / trial_timeout
+
+Optimizations:
+- Un disjoncteur par noeud (M1, M2, OL1), partage par tous les appels
+- Les noeuds morts ne coutent plus retry + backoff a chaque requete
+- Sondes half-open en arriere-plan (tache asyncio unique, lancee au premier trip)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from src.config import config
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised when a request targets a node whose circuit is open."""
+
+    def __init__(self, node: str):
+        super().__init__(f"Circuit ouvert pour {node} — echec immediat")
+        self.node = node
+
+
+@dataclass
+class CircuitBreaker:
+    node: str
+    failure_threshold: int = 3
+    recovery_timeout: float = 15.0
+    trial_timeout: float = 60.0     # Essai half-open sans verdict: expire apres N s
+    state: str = CLOSED
+    failures: int = 0               # Echecs consecutifs
+    opened_at: float = 0.0
+    last_error: str = ""
+    trips: int = 0                  # Nombre de passages en OPEN
+    rejected: int = 0               # Requetes refusees (fail fast)
+    _trial_inflight: bool = False
+    _trial_at: float = 0.0
+
+    def trial_pending(self) -> bool:
+        """True while a half-open trial is in flight and not yet expired."""
+        return self._trial_inflight and time.monotonic() - self._trial_at < self.trial_timeout
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent to this node now."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self.state = HALF_OPEN
+            self._trial_inflight = False
+        if self.state == HALF_OPEN and not self.trial_pending():
+            self._trial_inflight = True
+            self._trial_at = time.monotonic()
+            return True
+        self.rejected += 1
+        return False
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial that ended without a verdict (cancelled)."""
+        if self.state == HALF_OPEN:
+            self._trial_inflight = False
+
+    def probe_ok(self) -> None:
+        """Health probe answered: end an OPEN cooldown early (next request is the trial).
+
+        A probe is not a request: it never closes the circuit nor resets
+        the failure count (the node may list its models yet fail on /chat).
+        """
+        if self.state == OPEN:
+            self.state = HALF_OPEN
+            self._trial_inflight = False
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self._trial_inflight = False
+
+    def record_failure(self, error: str = "") -> None:
+        self.failures += 1
+        self.last_error = error[:120]
+        self._trial_inflight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            _ensure_probe_task()
+
+    def summary(self) -> str:
+        """Short human-readable state for status displays."""
+        if self.state == CLOSED:
+            return "ferme"
+        if self.state == HALF_OPEN:
+            return "semi-ouvert (essai)"
+        remaining = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+        return f"OUVERT ({self.failures} echecs, essai dans {remaining:.0f}s)"
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REGISTRY — One breaker per node, keyed by node name
+# ═══════════════════════════════════════════════════════════════════════════
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_PROBE_TASK: asyncio.Task | None = None
+
+
+def get_breaker(node: str) -> CircuitBreaker:
+    """Get or create the breaker for a node."""
+    if node not in _BREAKERS:
+        _BREAKERS[node] = CircuitBreaker(
+            node,
+            failure_threshold=config.breaker_failure_threshold,
+            recovery_timeout=config.breaker_recovery_timeout,
+            trial_timeout=config.breaker_trial_timeout,
+        )
+    return _BREAKERS[node]
+
+
+def node_for_url(url: str) -> str | None:
+    """Map a request URL to its cluster node name (M1, M2, OL1)."""
+    for n in config.lm_nodes:
+        if url.startswith(n.url):
+            return n.name
+    for n in config.ollama_nodes:
+        if url.startswith(n.url):
+            return n.name
+    return None
+
+
+def is_available(node: str) -> bool:
+    """Non-consuming check: False while the node's circuit is open."""
+    b = _BREAKERS.get(node)
+    if b is None or b.state == CLOSED:
+        return True
+    if b.state == OPEN:
+        return time.monotonic() - b.opened_at >= b.recovery_timeout
+    return not b.trial_pending()
+
+
+def breaker_states() -> dict[str, dict]:
+    """Snapshot of every known node's breaker (for status/dashboard)."""
+    names = [n.name for n in config.lm_nodes] + [n.name for n in config.ollama_nodes]
+    out = {}
+    for name in names:
+        b = get_breaker(name)
+        out[name] = {
+            "state": b.state,
+            "failures": b.failures,
+            "trips": b.trips,
+            "rejected": b.rejected,
+            "last_error": b.last_error,
+            "summary": b.summary(),
+        }
+    return out
+
+
+def is_breaker_failure(exc: BaseException) -> bool:
+    """Return True if an exception means the node itself is unhealthy.
+
+    Connection errors, timeouts and 5xx count; 4xx (model missing, bad
+    request) are caller errors and leave the circuit closed.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, (httpx.TransportError, httpx.TimeoutException, ConnectionError, OSError))
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# HALF-OPEN PROBES — Background task restoring recovered nodes
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _probe_url(node: str) -> str | None:
+    lm = config.get_node(node)
+    if lm:
+        return f"{lm.url}/api/v1/models"
+    ol = config.get_ollama_node(node)
+    if ol:
+        return f"{ol.url}/api/tags"
+    return None
+
+
+async def _probe_loop() -> None:
+    """Probe open circuits until all are closed, then exit."""
+    async with httpx.AsyncClient(timeout=config.health_timeout) as client:
+        while any(b.state != CLOSED for b in _BREAKERS.values()):
+            await asyncio.sleep(config.breaker_probe_interval)
+            for b in list(_BREAKERS.values()):
+                if b.state == CLOSED or not is_available(b.node) or not b.allow():
+                    continue
+                url = _probe_url(b.node)
+                if not url:
+                    b.record_success()
+                    continue
+                try:
+                    r = await client.get(url)
+                    r.raise_for_status()
+                    b.record_success()
+                except Exception as e:
+                    b.record_failure(f"sonde: {e}")
+
+
+def _ensure_probe_task() -> None:
+    """Start the probe loop if an event loop is running and none is active."""
+    global _PROBE_TASK
+    if _PROBE_TASK is not None and not _PROBE_TASK.done():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # Pas de boucle (appel sync) — l'essai half-open se fera a la prochaine requete
+    _PROBE_TASK = loop.create_task(_probe_loop())
@@ -0,0 +1,227 @@
+"""JARVIS Cluster Client — Shared pooled HTTP clients for every cluster call.
+
+Flow:
+  appelant -> shared_client(timeout) / shared_sync_client(timeout)
+  -> client httpx unique (keep-alive, HTTP/2 si h2 installe)
+  -> auth par noeud (Bearer api_key de M1/M2/OL1, selon l'URL)
+  -> compteurs de reutilisation (requetes vs nouvelles connexions TCP)
+
+Optimizations:
+- Une seule poignee de main TCP par noeud: les connexions restent ouvertes
+- Client async par boucle d'evenements (asyncio.run successifs: dashboard, systray)
+- Client sync thread-safe pour les chemins bloquants (dashboard/server.py, trading)
+- Le timeout reste par appel: `async with shared_client(timeout=5) as c` remplace
+  `async with httpx.AsyncClient(timeout=5) as c` sans fermer le pool
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Iterator
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.config import config
+
+
+try:
+    import h2  # noqa: F401 — requis par httpx pour HTTP/2
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=300)
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=config.connect_timeout, read=config.inference_timeout, write=10.0, pool=5.0,
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# NODES — Base URLs and auth per cluster node
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _node(name: str):
+    return config.get_node(name) or config.get_ollama_node(name)
+
+
+def url_for(node: str, path: str = "") -> str:
+    """Absolute URL of `path` on a cluster node (M1, M2, OL1)."""
+    n = _node(node)
+    if n is None:
+        raise ValueError(f"Noeud inconnu: {node}")
+    return f"{n.url}{path}"
+
+
+def node_headers(url: str) -> dict[str, str]:
+    """Auth headers for the node serving `url` (empty if none configured)."""
+    for n in list(config.lm_nodes) + list(config.ollama_nodes):
+        if url.startswith(n.url):
+            return {"Authorization": f"Bearer {n.api_key}"} if n.api_key else {}
+    return {}
+
+
+class _NodeAuth(httpx.Auth):
+    """Attach the node's bearer token to every request sent to it."""
+
+    def auth_flow(self, request: httpx.Request):
+        if "Authorization" not in request.headers:
+            request.headers.update(node_headers(str(request.url)))
+        yield request
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REUSE STATS — requests vs new TCP connections, per host
+# ═══════════════════════════════════════════════════════════════════════════
+
+_STATS: dict[str, dict[str, int]] = {}
+
+
+def _host_stats(request: httpx.Request) -> dict[str, int]:
+    host = urlsplit(str(request.url)).netloc
+    return _STATS.setdefault(host, {"requests": 0, "connections": 0})
+
+
+def _sync_trace(request: httpx.Request):
+    def trace(event: str, info: dict) -> None:
+        if event == "connection.connect_tcp.complete":
+            _host_stats(request)["connections"] += 1
+    return trace
+
+
+def _async_trace(request: httpx.Request):
+    async def trace(event: str, info: dict) -> None:
+        if event == "connection.connect_tcp.complete":
+            _host_stats(request)["connections"] += 1
+    return trace
+
+
+def _on_sync_request(request: httpx.Request) -> None:
+    _host_stats(request)["requests"] += 1
+    request.extensions["trace"] = _sync_trace(request)
+
+
+async def _on_async_request(request: httpx.Request) -> None:
+    _host_stats(request)["requests"] += 1
+    request.extensions["trace"] = _async_trace(request)
+
+
+def reuse_stats() -> dict[str, dict[str, Any]]:
+    """Per host: requests, new connections and connection reuse ratio."""
+    out = {}
+    for host, st in _STATS.items():
+        reused = max(st["requests"] - st["connections"], 0)
+        out[host] = {**st, "reused": reused, "reuse_rate": round(reused / max(st["requests"], 1), 3)}
+    return out
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CLIENTS
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Un client par boucle: le pool httpx est lie a la boucle qui l'a cree
+_ASYNC_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+_STALE_CLIENTS: list[httpx.AsyncClient] = []  # Clients de boucles disparues, a fermer
+_SYNC_CLIENT: httpx.Client | None = None
+_SYNC_LOCK = threading.Lock()
+
+
+async def get_async_client() -> httpx.AsyncClient:
+    """Shared async client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        await _close_stale_clients()
+        client = _ASYNC_CLIENTS[loop] = httpx.AsyncClient(
+            timeout=_timeout(), limits=_limits(), http2=HTTP2,
+            auth=_NodeAuth(), event_hooks={"request": [_on_async_request]},
+        )
+        weakref.finalize(loop, _STALE_CLIENTS.append, client)
+    return client
+
+
+async def _close_stale_clients() -> None:
+    """Close the clients of finished loops (asyncio.run successifs)."""
+    for loop, client in list(_ASYNC_CLIENTS.items()):
+        if loop.is_closed():
+            del _ASYNC_CLIENTS[loop]
+            _STALE_CLIENTS.append(client)
+    while _STALE_CLIENTS:
+        client = _STALE_CLIENTS.pop()
+        if client.is_closed:
+            continue
+        try:
+            await client.aclose()
+        except Exception:
+            pass  # Sockets deja detruites avec leur boucle
+
+
+def get_sync_client() -> httpx.Client:
+    """Shared blocking client (thread-safe)."""
+    global _SYNC_CLIENT
+    if _SYNC_CLIENT is None or _SYNC_CLIENT.is_closed:
+        with _SYNC_LOCK:
+            if _SYNC_CLIENT is None or _SYNC_CLIENT.is_closed:
+                _SYNC_CLIENT = httpx.Client(
+                    timeout=_timeout(), limits=_limits(), http2=HTTP2,
+                    auth=_NodeAuth(), event_hooks={"request": [_on_sync_request]},
+                )
+    return _SYNC_CLIENT
+
+
+class _AsyncSession:
+    """Shared client view with a default per-call timeout."""
+
+    def __init__(self, client: httpx.AsyncClient, timeout: float | None):
+        self._client = client
+        self._timeout = timeout
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if self._timeout is not None:
+            kwargs.setdefault("timeout", self._timeout)
+        return await self._client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+
+class _SyncSession:
+    def __init__(self, client: httpx.Client, timeout: float | None):
+        self._client = client
+        self._timeout = timeout
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if self._timeout is not None:
+            kwargs.setdefault("timeout", self._timeout)
+        return self._client.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+
+@asynccontextmanager
+async def shared_client(timeout: float | None = None) -> AsyncIterator[_AsyncSession]:
+    """`async with shared_client(timeout=5) as c:` — pooled, never closed on exit."""
+    yield _AsyncSession(await get_async_client(), timeout)
+
+
+@contextmanager
+def shared_sync_client(timeout: float | None = None) -> Iterator[_SyncSession]:
+    """`with shared_sync_client(timeout=3) as c:` — pooled, never closed on exit."""
+    yield _SyncSession(get_sync_client(), timeout)
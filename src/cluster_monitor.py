@@ -0,0 +1,262 @@
+"""JARVIS Cluster Monitor — One background health service for every consumer.
+
+Flow:
+  boucle asyncio (toutes les N s) -> sondes concurrentes M1/M2/OL1
+  (une echeance par noeud) -> snapshot versionne (modeles, latence, erreurs)
+  -> disjoncteurs mis a jour -> lecteurs: latest() | snapshot(max_age) | subscribe()
+
+Optimizations:
+- Une seule sonde par noeud et par intervalle, quel que soit le nombre de
+  consommateurs (outils MCP, dashboard TUI, serveur web, systray)
+- Sondes en parallele: le tour complet dure le temps du noeud le plus lent,
+  borne par l'echeance (un noeud mort ne bloque pas les autres)
+- Pool HTTP dedie et minuscule: les sondes ne prennent jamais une connexion
+  du pool d'inference
+- Rafraichissements simultanes fusionnes (une seule requete en vol)
+- Mode thread pour les consommateurs synchrones (dashboard/server.py, systray)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from src.config import config
+
+
+@dataclass
+class NodeHealth:
+    name: str
+    kind: str                  # "lmstudio" | "ollama"
+    url: str
+    role: str
+    online: bool = False
+    loaded: list[str] = field(default_factory=list)     # Modeles charges (LM Studio) / installes (Ollama)
+    available: list[str] = field(default_factory=list)  # Catalogue complet du noeud
+    latency_ms: int = -1
+    error: str = ""
+    checked_at: float = 0.0
+
+
+@dataclass
+class ClusterSnapshot:
+    version: int
+    timestamp: float
+    nodes: dict[str, NodeHealth]
+
+    @property
+    def age_s(self) -> float:
+        return time.time() - self.timestamp
+
+    @property
+    def online(self) -> int:
+        return sum(1 for n in self.nodes.values() if n.online)
+
+    @property
+    def total_models(self) -> int:
+        return sum(len(n.loaded) for n in self.nodes.values() if n.online)
+
+
+def _targets() -> list[tuple[str, str, str, str]]:
+    out = [(n.name, "lmstudio", n.url, n.role) for n in config.lm_nodes]
+    out += [(n.name, "ollama", n.url, n.role) for n in config.ollama_nodes]
+    return out
+
+
+async def _probe(client: httpx.AsyncClient, name: str, kind: str, url: str, role: str,
+                 deadline: float) -> NodeHealth:
+    """Probe one node within `deadline` seconds (never raises)."""
+    health = NodeHealth(name, kind, url, role, checked_at=time.time())
+    path = "/api/v1/models" if kind == "lmstudio" else "/api/tags"
+    t0 = time.monotonic()
+    try:
+        r = await asyncio.wait_for(client.get(f"{url}{path}", timeout=deadline), deadline)
+        r.raise_for_status()
+        models = r.json().get("models", [])
+        if kind == "lmstudio":
+            health.available = [m["key"] for m in models if "key" in m]
+            health.loaded = [m["key"] for m in models if m.get("loaded_instances")]
+        else:
+            health.available = health.loaded = [m["name"] for m in models if "name" in m]
+        health.online = True
+        health.latency_ms = int((time.monotonic() - t0) * 1000)
+    except asyncio.TimeoutError:
+        health.error = f"echeance {deadline:.1f}s depassee"
+    except Exception as e:
+        health.error = str(e)[:120] or type(e).__name__
+    return health
+
+
+class ClusterMonitor:
+    """Periodic concurrent health probes with a shared versioned snapshot."""
+
+    def __init__(self, interval: float | None = None, deadline: float | None = None):
+        self.interval = interval or config.cluster_monitor_interval
+        self.deadline = deadline or config.health_timeout
+        self._snapshot: ClusterSnapshot | None = None
+        self._ready = threading.Event()
+        self._subscribers: list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._inflight: asyncio.Future | None = None
+        self._inflight_loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self.probes = 0
+
+    # ── Probing ─────────────────────────────────────────────────────────
+
+    def _probe_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            from src.cluster_client import _NodeAuth
+            n = max(len(_targets()), 1)
+            self._client = httpx.AsyncClient(
+                timeout=self.deadline, auth=_NodeAuth(),
+                limits=httpx.Limits(max_connections=n, max_keepalive_connections=n),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def refresh(self) -> ClusterSnapshot:
+        """Probe every node now (concurrent refreshes share one round)."""
+        loop = asyncio.get_running_loop()
+        if self._inflight is not None and not self._inflight.done() and self._inflight_loop is loop:
+            return await asyncio.shield(self._inflight)
+        self._inflight = loop.create_task(self._round())
+        self._inflight_loop = loop
+        return await asyncio.shield(self._inflight)
+
+    async def _round(self) -> ClusterSnapshot:
+        from src.circuit_breaker import get_breaker
+
+        client = self._probe_client()
+        results = await asyncio.gather(*(
+            _probe(client, name, kind, url, role, self.deadline)
+            for name, kind, url, role in _targets()
+        ))
+        self.probes += len(results)
+        for h in results:
+            breaker = get_breaker(h.name)
+            if h.online:
+                breaker.probe_ok()  # Jamais CLOSED sur une sonde: seul un vrai appel le decide
+            else:
+                breaker.record_failure(h.error)
+        version = (self._snapshot.version + 1) if self._snapshot else 1
+        snap = ClusterSnapshot(version, time.time(), {h.name: h for h in results})
+        self._publish(snap)
+        return snap
+
+    def _publish(self, snap: ClusterSnapshot) -> None:
+        self._snapshot = snap
+        self._ready.set()
+        for loop, queue in list(self._subscribers):
+            try:
+                loop.call_soon_threadsafe(_offer, queue, snap)
+            except RuntimeError:
+                self._subscribers.remove((loop, queue))  # Boucle fermee
+
+    # ── Lifecycle ───────────────────────────────────────────────────────
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                pass
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> bool:
+        """Start the periodic loop on the running event loop (idempotent)."""
+        if self.running:
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._task = loop.create_task(self._loop())
+        return True
+
+    def start_thread(self) -> None:
+        """Run the monitor in its own daemon thread (synchronous consumers)."""
+        if self.running:
+            return
+
+        def _run():
+            asyncio.run(self._loop())
+
+        self._thread = threading.Thread(target=_run, name="cluster-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return bool((self._task and not self._task.done())
+                    or (self._thread and self._thread.is_alive()))
+
+    # ── Read API ────────────────────────────────────────────────────────
+
+    def latest(self) -> ClusterSnapshot | None:
+        """Most recent snapshot (non-blocking), None before the first round."""
+        return self._snapshot
+
+    async def snapshot(self, max_age: float | None = None) -> ClusterSnapshot:
+        """Latest snapshot if younger than max_age, else a fresh round.
+
+        Also starts the periodic loop, so later calls are served from memory.
+        """
+        self.start()
+        snap = self._snapshot
+        limit = self.interval * 2 if max_age is None else max_age
+        if snap is not None and snap.age_s <= limit:
+            return snap
+        return await self.refresh()
+
+    def wait_first(self, timeout: float = 5.0) -> ClusterSnapshot | None:
+        """Block until the first snapshot (thread mode, sync callers)."""
+        self._ready.wait(timeout)
+        return self._snapshot
+
+    async def subscribe(self):
+        """Async iterator of snapshots; slow consumers only see the newest one."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        entry = (loop, queue)
+        self._subscribers.append(entry)
+        try:
+            if self._snapshot:
+                _offer(queue, self._snapshot)
+            while True:
+                yield await queue.get()
+        finally:
+            if entry in self._subscribers:
+                self._subscribers.remove(entry)
+
+
+def _offer(queue: asyncio.Queue, snap: Any) -> None:
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(snap)
+
+
+_MONITOR: ClusterMonitor | None = None
+
+
+def get_monitor() -> ClusterMonitor:
+    """Process-wide cluster monitor."""
+    global _MONITOR
+    if _MONITOR is None:
+        _MONITOR = ClusterMonitor()
+    return _MONITOR
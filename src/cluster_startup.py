@@ -13,14 +13,16 @@ Guarantees optimal state on M1 + M2 + Ollama at every JARVIS launch:
 from __future__ import annotations
 
 import asyncio
+import json
 import re
 import subprocess
 import sys
 import time
-from typing import Any
-
-import httpx
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable
 
+from src.cluster_client import shared_client
 from src.config import config
 
 LMS_CLI = r"C:\Users\franc\.lmstudio\bin\lms.exe"
@@ -178,7 +180,7 @@ async def _warmup_model(url: str, model: str, timeout: float = 15.0) -> dict[str
     """
     try:
         t0 = time.monotonic()
-        async with httpx.AsyncClient(timeout=timeout) as c:
+        async with shared_client(timeout=timeout) as c:
             r = await c.post(f"{url}/api/v1/chat", json={
                 "model": model,
                 "input": WARMUP_PROMPT,
@@ -202,7 +204,7 @@ async def _warmup_ollama(url: str, model: str, timeout: float = 10.0) -> dict[st
     """Warmup an Ollama model."""
     try:
         t0 = time.monotonic()
-        async with httpx.AsyncClient(timeout=timeout) as c:
+        async with shared_client(timeout=timeout) as c:
             r = await c.post(f"{url}/api/chat", json={
                 "model": model,
                 "messages": [{"role": "user", "content": WARMUP_PROMPT}],
@@ -221,41 +223,35 @@ async def _warmup_ollama(url: str, model: str, timeout: float = 10.0) -> dict[st
 # ═══════════════════════════════════════════════════════════════════════════
 
 def _get_gpu_stats() -> list[dict[str, Any]]:
-    """Get GPU VRAM usage + temperature via nvidia-smi."""
+    """Get GPU VRAM usage + temperature via a one-shot nvidia-smi call.
+
+    Boot/CLI only — request paths read the background sampler instead
+    (src/gpu_telemetry.py).
+    """
+    from src.gpu_telemetry import SMI_QUERY, parse_smi_line
     try:
         r = subprocess.run(
-            ["nvidia-smi", "--query-gpu=index,name,memory.used,memory.total,utilization.gpu,temperature.gpu",
-             "--format=csv,noheader,nounits"],
+            ["nvidia-smi", f"--query-gpu={SMI_QUERY}", "--format=csv,noheader,nounits"],
             capture_output=True, timeout=10, encoding="utf-8", errors="replace",
         )
-        gpus = []
-        for line in r.stdout.strip().splitlines():
-            parts = [p.strip() for p in line.split(",")]
-            if len(parts) >= 6:
-                temp = int(parts[5]) if parts[5].isdigit() else -1
-                gpus.append({
-                    "index": int(parts[0]),
-                    "name": parts[1],
-                    "vram_used_mb": int(parts[2]),
-                    "vram_total_mb": int(parts[3]),
-                    "gpu_util": int(parts[4]),
-                    "temp_c": temp,
-                    "vram_free_mb": int(parts[3]) - int(parts[2]),
-                    "vram_pct": round(int(parts[2]) / max(int(parts[3]), 1) * 100, 1),
-                })
-        return gpus
+        return [g for g in (parse_smi_line(line) for line in r.stdout.strip().splitlines()) if g]
     except Exception:
         return []
 
 
-def check_thermal_status() -> dict[str, Any]:
+def check_thermal_status(gpus: list[dict[str, Any]] | None = None) -> dict[str, Any]:
     """Verifie l'etat thermique des GPU pour le routage commandant.
 
+    Lit le dernier snapshot du sampler GPU (aucun processus lance ici).
+    Un snapshot absent ou perime donne status="unknown".
+
     Returns:
         {"ok": bool, "max_temp": int, "status": "normal"|"warning"|"critical",
          "hot_gpus": [...], "recommendation": str}
     """
-    gpus = _get_gpu_stats()
+    if gpus is None:
+        from src.gpu_telemetry import get_telemetry
+        gpus = get_telemetry().gpus(max_age=config.gpu_telemetry_max_age)
     if not gpus:
         return {"ok": True, "max_temp": -1, "status": "unknown", "hot_gpus": [], "recommendation": ""}
 
@@ -303,7 +299,7 @@ async def _check_ollama() -> dict[str, Any]:
     if not ol:
         return {"ok": False, "error": "OL1 non configure"}
     try:
-        async with httpx.AsyncClient(timeout=5) as c:
+        async with shared_client(timeout=5) as c:
             r = await c.get(f"{ol.url}/api/tags")
             r.raise_for_status()
             models = [m["name"] for m in r.json().get("models", [])]
@@ -328,7 +324,7 @@ async def _check_m2() -> dict[str, Any]:
     if not m2:
         return {"ok": False, "error": "M2 non configure"}
     try:
-        async with httpx.AsyncClient(timeout=5) as c:
+        async with shared_client(timeout=5) as c:
             r = await c.get(f"{m2.url}/api/v1/models")
             r.raise_for_status()
             models = [m["key"] for m in r.json().get("models", []) if m.get("loaded_instances")]
@@ -347,6 +343,106 @@ async def _check_m2() -> dict[str, Any]:
 # Main Startup Sequence
 # ═══════════════════════════════════════════════════════════════════════════
 
+# ═══════════════════════════════════════════════════════════════════════════
+# Boot Graph — steps with dependencies, run concurrently when independent
+# ═══════════════════════════════════════════════════════════════════════════
+
+TIMELINE_FILE = Path(__file__).resolve().parent.parent / "data" / "startup_timeline.json"
+
+
+@dataclass
+class BootStep:
+    name: str
+    fn: Callable[[], Awaitable[bool | None]]
+    deps: tuple[str, ...] = ()
+    requires_ok: bool = True   # False: attend les deps meme si elles echouent
+    status: str = "pending"    # ok | failed | skipped
+    start: float = 0.0
+    end: float = 0.0
+    error: str = ""
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+async def run_boot_graph(steps: list[BootStep]) -> dict[str, BootStep]:
+    """Run steps as soon as their dependencies are done (steps in topological order).
+
+    A step returning False (or raising) is "failed"; dependents that
+    require_ok are then "skipped".
+    """
+    by_name = {st.name: st for st in steps}
+    tasks: dict[str, asyncio.Task] = {}
+    t0 = time.monotonic()
+
+    async def _run(step: BootStep) -> None:
+        for dep in step.deps:
+            await tasks[dep]
+        step.start = time.monotonic() - t0
+        if step.requires_ok and any(by_name[d].status != "ok" for d in step.deps):
+            step.status = "skipped"
+            step.end = step.start
+            return
+        try:
+            ok = await step.fn()
+            step.status = "failed" if ok is False else "ok"
+        except Exception as e:
+            step.status = "failed"
+            step.error = str(e)
+        step.end = time.monotonic() - t0
+
+    for step in steps:
+        tasks[step.name] = asyncio.create_task(_run(step))
+    await asyncio.gather(*tasks.values())
+    return by_name
+
+
+def critical_path(steps: dict[str, BootStep]) -> list[str]:
+    """Chain of steps that determined the total boot time."""
+    if not steps:
+        return []
+    path = [max(steps.values(), key=lambda st: st.end).name]
+    while steps[path[-1]].deps:
+        path.append(max(steps[path[-1]].deps, key=lambda d: steps[d].end))
+    return path[::-1]
+
+
+def boot_timeline(steps: dict[str, BootStep]) -> dict[str, Any]:
+    """Timeline report: per-step start/duration, critical path, parallel gain."""
+    total = max((st.end for st in steps.values()), default=0.0)
+    sequential = sum(st.duration for st in steps.values())
+    return {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "total_ms": int(total * 1000),
+        "sequential_ms": int(sequential * 1000),
+        "critical_path": critical_path(steps),
+        "steps": [
+            {
+                "name": st.name, "deps": list(st.deps), "status": st.status,
+                "start_ms": int(st.start * 1000), "duration_ms": int(st.duration * 1000),
+                **({"error": st.error} if st.error else {}),
+            }
+            for st in steps.values()
+        ],
+    }
+
+
+def format_timeline(timeline: dict[str, Any]) -> str:
+    """Text Gantt of the boot timeline (critical path marked with *)."""
+    total = max(timeline["total_ms"], 1)
+    crit = set(timeline["critical_path"])
+    lines = [f"Demarrage: {timeline['total_ms']}ms (sequentiel: {timeline['sequential_ms']}ms)"]
+    for st in timeline["steps"]:
+        a = int(st["start_ms"] / total * 30)
+        b = max(int((st["start_ms"] + st["duration_ms"]) / total * 30), a + 1)
+        bar = "." * a + "#" * (b - a) + "." * (30 - b)
+        mark = "*" if st["name"] in crit else " "
+        lines.append(f" {mark}{st['name']:15s} [{bar}] {st['duration_ms']:6d}ms {st['status']}")
+    lines.append(f"Chemin critique: {' -> '.join(timeline['critical_path'])}")
+    return "\n".join(lines)
+
+
 async def ensure_cluster_ready(
     warmup: bool = True,
     benchmark: bool = True,
@@ -354,16 +450,14 @@ async def ensure_cluster_ready(
 ) -> dict[str, Any]:
     """Ensure the cluster is in optimal state. Returns detailed status report.
 
-    Sequence:
-    1. Auto-start LM Studio server if not running
-    2. Unload blacklisted models from M1
-    3. Load required models on M1 (with retry)
-    4. Warmup M1 model (pre-fill KV cache)
-    5. Check M2 connectivity and models
-    6. Warmup M2 if available
-    7. Verify Ollama readiness + warmup
-    8. Collect GPU stats
-    9. Benchmark latency for routing
+    Boot graph (independent branches run concurrently, lms calls in threads):
+      server -> m1_unload -> m1_load -> m1_warmup ----------.
+                                   `-> gpu (stats, thermal) |-> final
+      m2_check -> m2_warmup --------------------------------|
+      ollama_check -> ollama_warmup ------------------------'
+
+    The timeline (durations + critical path) is in report["timeline"] and
+    data/startup_timeline.json.
     """
     report: dict[str, Any] = {"timestamp": time.strftime("%H:%M:%S")}
 
@@ -372,158 +466,215 @@ async def ensure_cluster_ready(
         print("  JARVIS Cluster Startup — Optimization Sequence")
         print("=" * 55)
 
-    # ── Step 1: Ensure LM Studio server is running ────────────────────
-    if not _lms_server_status():
+    # ── M1: LM Studio server ──────────────────────────────────────────
+    async def step_server() -> bool:
+        if await asyncio.to_thread(_lms_server_status):
+            report["server_start"] = "deja actif"
+            if verbose:
+                _log("Serveur LM Studio actif", "OK")
+            return True
         _log("LM Studio server arrete — demarrage...")
-        ok = _lms_server_start()
+        ok = await asyncio.to_thread(_lms_server_start)
         report["server_start"] = "OK" if ok else "ECHEC"
-        if ok:
-            _log("Serveur demarre sur port 1234", "OK")
-            await asyncio.sleep(2)  # Wait for server to be ready
-        else:
+        if not ok:
             _log("Impossible de demarrer le serveur!", "ERREUR")
             report["fatal"] = "server_start_failed"
-            return report
-    else:
-        report["server_start"] = "deja actif"
+            return False
+        _log("Serveur demarre sur port 1234", "OK")
+        await asyncio.sleep(2)  # Wait for server to be ready
+        return True
+
+    # ── M1: unload blacklisted models ─────────────────────────────────
+    async def step_m1_unload() -> bool:
+        loaded = await asyncio.to_thread(_lms_ps_ids)
+        report["m1_initial"] = loaded.copy()
         if verbose:
-            _log("Serveur LM Studio actif", "OK")
-
-    # ── Step 2: Check currently loaded models ─────────────────────────
-    loaded = _lms_ps_ids()
-    report["m1_initial"] = loaded.copy()
-    if verbose:
-        _log(f"M1 modeles charges: {', '.join(loaded) if loaded else 'aucun'}")
-
-    # ── Step 3: Unload blacklisted models ─────────────────────────────
-    unloaded = []
-    for model_id in loaded:
-        if model_id in M1_BLACKLIST:
-            ok = _lms_unload(model_id)
-            unloaded.append(model_id)
-            if verbose:
-                _log(f"Unload {model_id}: {'OK' if ok else 'ECHEC'}")
-    report["m1_unloaded"] = unloaded
-
-    # ── Step 4: Load required models with retry ───────────────────────
-    loaded_after = _lms_ps_ids()
-    loaded_bases = {m.split(":")[0] if ":" in m and m.split(":")[-1].isdigit() else m for m in loaded_after}
-
-    for model, opts in M1_REQUIRED.items():
-        if model in loaded_bases:
-            report[f"load_{model}"] = "deja charge"
-            if verbose:
-                _log(f"{model}: deja charge", "OK")
-            continue
-
-        # Try loading with retry (max 2 attempts)
-        for attempt in range(2):
-            if verbose:
-                _log(f"Chargement {model} (tentative {attempt + 1})...")
-            ok = _lms_load(model, **opts)
-            if ok:
-                report[f"load_{model}"] = "OK"
+            _log(f"M1 modeles charges: {', '.join(loaded) if loaded else 'aucun'}")
+        unloaded = []
+        for model_id in loaded:
+            if model_id in M1_BLACKLIST:
+                ok = await asyncio.to_thread(_lms_unload, model_id)
+                unloaded.append(model_id)
                 if verbose:
-                    _log(f"{model}: charge (GPU={opts['gpu']}, ctx={opts['context']}, parallel={opts['parallel']})", "OK")
-                break
-            if attempt == 0:
-                await asyncio.sleep(3)  # Wait before retry
-        else:
-            report[f"load_{model}"] = "ECHEC (2 tentatives)"
-            _log(f"{model}: ECHEC apres 2 tentatives", "ERREUR")
+                    _log(f"Unload {model_id}: {'OK' if ok else 'ECHEC'}")
+        report["m1_unloaded"] = unloaded
+        return True
+
+    # ── M1: load required models with retry ───────────────────────────
+    async def step_m1_load() -> bool:
+        loaded_after = await asyncio.to_thread(_lms_ps_ids)
+        loaded_bases = {m.split(":")[0] if ":" in m and m.split(":")[-1].isdigit() else m for m in loaded_after}
+        all_ok = True
+        for model, opts in M1_REQUIRED.items():
+            if model in loaded_bases:
+                report[f"load_{model}"] = "deja charge"
+                if verbose:
+                    _log(f"{model}: deja charge", "OK")
+                continue
 
-    # ── Step 5: Warmup M1 ─────────────────────────────────────────────
-    if warmup:
-        m1 = config.get_node("M1")
-        if m1:
-            for model in M1_REQUIRED:
+            # Try loading with retry (max 2 attempts)
+            for attempt in range(2):
                 if verbose:
-                    _log(f"Warmup {model}...")
-                bench = await _warmup_model(m1.url, model)
-                report[f"warmup_{model}"] = bench
-                if bench["ok"] and verbose:
-                    _log(f"Warmup OK — {bench['latency_ms']}ms, {bench['tokens_per_sec']} tok/s", "OK")
-                elif not bench["ok"] and verbose:
-                    _log(f"Warmup ECHEC: {bench.get('error', '?')}", "WARN")
-
-    # ── Step 6: Check M2 ──────────────────────────────────────────────
-    m2_status = await _check_m2()
-    report["m2"] = m2_status
-    if verbose:
-        if m2_status["ok"]:
-            _log(f"M2: ONLINE ({m2_status['count']} modeles) — coder={'OUI' if m2_status['has_coder'] else 'NON'}", "OK")
-        else:
-            _log(f"M2: OFFLINE ({m2_status.get('error', '')})", "WARN")
+                    _log(f"Chargement {model} (tentative {attempt + 1})...")
+                ok = await asyncio.to_thread(_lms_load, model, **opts)
+                if ok:
+                    report[f"load_{model}"] = "OK"
+                    if verbose:
+                        _log(f"{model}: charge (GPU={opts['gpu']}, ctx={opts['context']}, parallel={opts['parallel']})", "OK")
+                    break
+                if attempt == 0:
+                    await asyncio.sleep(3)  # Wait before retry
+            else:
+                report[f"load_{model}"] = "ECHEC (2 tentatives)"
+                _log(f"{model}: ECHEC apres 2 tentatives", "ERREUR")
+                all_ok = False
+        return all_ok
 
-    # Warmup M2 if available
-    if warmup and m2_status["ok"]:
-        m2_node = config.get_node("M2")
-        if m2_node:
-            bench = await _warmup_model(m2_node.url, m2_node.default_model)
-            report["warmup_m2"] = bench
+    # ── M1: warmup (pre-fill KV cache) ────────────────────────────────
+    async def step_m1_warmup() -> bool:
+        m1 = config.get_node("M1")
+        if not m1:
+            return False
+        results = await asyncio.gather(*(_warmup_model(m1.url, model) for model in M1_REQUIRED))
+        for model, bench in zip(M1_REQUIRED, results):
+            report[f"warmup_{model}"] = bench
             if bench["ok"] and verbose:
-                _log(f"M2 warmup: {bench['latency_ms']}ms, {bench['tokens_per_sec']} tok/s", "OK")
+                _log(f"Warmup {model} OK — {bench['latency_ms']}ms, {bench['tokens_per_sec']} tok/s", "OK")
+            elif not bench["ok"] and verbose:
+                _log(f"Warmup {model} ECHEC: {bench.get('error', '?')}", "WARN")
+        return all(b["ok"] for b in results)
+
+    # ── M2: check + warmup ────────────────────────────────────────────
+    async def step_m2_check() -> bool:
+        m2_status = await _check_m2()
+        report["m2"] = m2_status
+        if verbose:
+            if m2_status["ok"]:
+                _log(f"M2: ONLINE ({m2_status['count']} modeles) — coder={'OUI' if m2_status['has_coder'] else 'NON'}", "OK")
+            else:
+                _log(f"M2: OFFLINE ({m2_status.get('error', '')})", "WARN")
+        return m2_status["ok"]
 
-    # ── Step 7: Check Ollama ──────────────────────────────────────────
-    ollama_status = await _check_ollama()
-    report["ollama"] = ollama_status
-    if verbose:
-        if ollama_status["ok"]:
-            _log(f"Ollama: {ollama_status['count']} modeles — correction={'OUI' if ollama_status['has_correction_model'] else 'NON'}", "OK")
-        else:
-            _log(f"Ollama: OFFLINE ({ollama_status.get('error', '')})", "WARN")
+    async def step_m2_warmup() -> bool:
+        m2_node = config.get_node("M2")
+        if not m2_node:
+            return False
+        bench = await _warmup_model(m2_node.url, m2_node.default_model)
+        report["warmup_m2"] = bench
+        if bench["ok"] and verbose:
+            _log(f"M2 warmup: {bench['latency_ms']}ms, {bench['tokens_per_sec']} tok/s", "OK")
+        return bench["ok"]
+
+    # ── Ollama: check + warmup ────────────────────────────────────────
+    async def step_ollama_check() -> bool:
+        ollama_status = await _check_ollama()
+        report["ollama"] = ollama_status
+        if verbose:
+            if ollama_status["ok"]:
+                _log(f"Ollama: {ollama_status['count']} modeles — correction={'OUI' if ollama_status['has_correction_model'] else 'NON'}", "OK")
+            else:
+                _log(f"Ollama: OFFLINE ({ollama_status.get('error', '')})", "WARN")
+        return ollama_status["ok"]
 
-    # Warmup Ollama correction model
-    if warmup and ollama_status["ok"] and ollama_status.get("has_correction_model"):
+    async def step_ollama_warmup() -> bool:
         ol = config.get_ollama_node("OL1")
-        if ol:
-            bench = await _warmup_ollama(ol.url, "qwen3:1.7b")
-            report["warmup_ollama"] = bench
-            if bench["ok"] and verbose:
-                _log(f"Ollama warmup: {bench['latency_ms']}ms", "OK")
-
-    # ── Step 8: GPU stats + thermal check ──────────────────────────────
-    gpus = _get_gpu_stats()
-    report["gpus"] = gpus
-    if verbose and gpus:
-        total_used = sum(g["vram_used_mb"] for g in gpus)
-        total_avail = sum(g["vram_total_mb"] for g in gpus)
-        _log(f"VRAM: {total_used}MB / {total_avail}MB ({round(total_used/max(total_avail,1)*100)}%)")
-        for g in gpus:
-            bar = "#" * int(g["vram_pct"] / 5) + "." * (20 - int(g["vram_pct"] / 5))
-            temp_str = f" {g['temp_c']}C" if g.get("temp_c", -1) >= 0 else ""
-            _log(f"  GPU{g['index']} {g['name'][:20]:20s} [{bar}] {g['vram_used_mb']}MB/{g['vram_total_mb']}MB ({g['vram_pct']}%){temp_str}")
-
-    # Thermal status
-    thermal = check_thermal_status()
-    report["thermal"] = thermal
-    if verbose and thermal["status"] != "unknown":
-        if thermal["status"] == "critical":
-            _log(f"THERMAL CRITIQUE: {thermal['max_temp']}C — {thermal['recommendation']}", "ERREUR")
-        elif thermal["status"] == "warning":
-            _log(f"THERMAL WARNING: {thermal['max_temp']}C — {thermal['recommendation']}", "WARN")
-        else:
-            _log(f"Thermal: {thermal['max_temp']}C (normal)", "OK")
-
-    # ── Step 9: Final state ───────────────────────────────────────────
-    final = _lms_ps()
-    report["m1_final"] = final
+        if not ol or not report["ollama"].get("has_correction_model"):
+            return None  # Rien a prechauffer
+        bench = await _warmup_ollama(ol.url, "qwen3:1.7b")
+        report["warmup_ollama"] = bench
+        if bench["ok"] and verbose:
+            _log(f"Ollama warmup: {bench['latency_ms']}ms", "OK")
+        return bench["ok"]
+
+    # ── GPU stats + thermal check (apres chargement M1) ───────────────
+    async def step_gpu() -> bool:
+        # Demarre le sampler en arriere-plan (reutilise ensuite par le routage)
+        from src.gpu_telemetry import get_telemetry
+        snap = await asyncio.to_thread(get_telemetry().wait_first, 3.0)
+        gpus = snap.gpus if snap else await asyncio.to_thread(_get_gpu_stats)
+        report["gpus"] = gpus
+        if verbose and gpus:
+            total_used = sum(g["vram_used_mb"] for g in gpus)
+            total_avail = sum(g["vram_total_mb"] for g in gpus)
+            _log(f"VRAM: {total_used}MB / {total_avail}MB ({round(total_used/max(total_avail,1)*100)}%)")
+            for g in gpus:
+                bar = "#" * int(g["vram_pct"] / 5) + "." * (20 - int(g["vram_pct"] / 5))
+                temp_str = f" {g['temp_c']}C" if g.get("temp_c", -1) >= 0 else ""
+                _log(f"  GPU{g['index']} {g['name'][:20]:20s} [{bar}] {g['vram_used_mb']}MB/{g['vram_total_mb']}MB ({g['vram_pct']}%){temp_str}")
+
+        # Thermal status
+        thermal = check_thermal_status(gpus)
+        report["thermal"] = thermal
+        if verbose and thermal["status"] != "unknown":
+            if thermal["status"] == "critical":
+                _log(f"THERMAL CRITIQUE: {thermal['max_temp']}C — {thermal['recommendation']}", "ERREUR")
+            elif thermal["status"] == "warning":
+                _log(f"THERMAL WARNING: {thermal['max_temp']}C — {thermal['recommendation']}", "WARN")
+            else:
+                _log(f"Thermal: {thermal['max_temp']}C (normal)", "OK")
+        return bool(gpus)
+
+    # ── Final state ───────────────────────────────────────────────────
+    async def step_final() -> bool:
+        report["m1_final"] = await asyncio.to_thread(_lms_ps)
+        return True
+
+    steps = [
+        BootStep("server", step_server),
+        BootStep("m1_unload", step_m1_unload, ("server",)),
+        BootStep("m1_load", step_m1_load, ("m1_unload",)),
+        BootStep("m2_check", step_m2_check),
+        BootStep("ollama_check", step_ollama_check),
+    ]
+    if warmup:
+        steps += [
+            BootStep("m1_warmup", step_m1_warmup, ("m1_load",)),
+            BootStep("m2_warmup", step_m2_warmup, ("m2_check",)),
+            BootStep("ollama_warmup", step_ollama_warmup, ("ollama_check",)),
+        ]
+    steps.append(BootStep("gpu", step_gpu, ("m1_load",), requires_ok=False))
+    steps.append(BootStep(
+        "final", step_final, tuple(st.name for st in steps if st.name != "server"), requires_ok=False,
+    ))
+    done = await run_boot_graph(steps)
+
+    timeline = boot_timeline(done)
+    report["timeline"] = timeline
+    try:
+        TIMELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        TIMELINE_FILE.write_text(json.dumps(timeline, indent=2, ensure_ascii=False), encoding="utf-8")
+    except OSError:
+        pass
+
+    # Keep-warm: part des modeles prechauffes au boot, prend le relais ensuite
+    from src.keep_warm import get_keep_warm
+    keep_warm = get_keep_warm()
+    for model in M1_REQUIRED:
+        if report.get(f"warmup_{model}", {}).get("ok"):
+            keep_warm.mark_warm("M1", model)
+    m2_node = config.get_node("M2")
+    if m2_node and report.get("warmup_m2", {}).get("ok"):
+        keep_warm.mark_warm("M2", m2_node.default_model)
+    if report.get("warmup_ollama", {}).get("ok"):
+        keep_warm.mark_warm("OL1", "qwen3:1.7b")
+    if config.keep_warm_enabled:
+        keep_warm.start()
+
+    final = report.get("m1_final", [])
+    m2_ok = report.get("m2", {}).get("ok", False)
+    ol_ok = report.get("ollama", {}).get("ok", False)
+    m1_ok = any(m.get("id") == "qwen/qwen3-30b-a3b-2507" for m in final)
 
     if verbose:
+        print("=" * 55)
+        print(format_timeline(timeline))
         print("=" * 55)
         # Summary line
-        m1_ok = any(m.get("id") == "qwen/qwen3-30b-a3b-2507" for m in final)
-        m2_ok = m2_status["ok"]
-        ol_ok = ollama_status["ok"]
         status = "OPTIMAL" if (m1_ok and m2_ok and ol_ok) else "PARTIEL" if m1_ok else "DEGRADE"
         _log(f"Cluster: {status} | M1={'OK' if m1_ok else 'KO'} M2={'OK' if m2_ok else 'KO'} OL={'OK' if ol_ok else 'KO'}", status)
         print("=" * 55)
 
-    report["status"] = "OPTIMAL" if all([
-        any(m.get("id") == "qwen/qwen3-30b-a3b-2507" for m in final),
-        m2_status["ok"],
-        ollama_status["ok"],
-    ]) else "PARTIEL"
+    report["status"] = "OPTIMAL" if all([m1_ok, m2_ok, ol_ok]) else "PARTIEL"
 
     return report
 
@@ -541,27 +692,36 @@ async def load_model_on_demand(
 ) -> dict[str, Any]:
     """Load a model on-demand (e.g., qwen3-coder-30b for coding tasks).
 
-    If unload_others=True, unloads all other models first to free VRAM.
+    Placement goes through the VRAM scheduler (src/model_placement.py): it
+    evicts the least valuable on-demand models only if VRAM is short.
+    If unload_others=True, unloads all other models first (legacy behaviour).
     """
+    from src.model_placement import get_scheduler
+
     if model not in M1_AVAILABLE and model not in M1_REQUIRED:
         return {"ok": False, "error": f"Modele non disponible: {model}"}
 
-    loaded = _lms_ps_ids()
+    sched = get_scheduler()
+    loaded = await asyncio.to_thread(sched.backend.loaded)
     if model in loaded:
+        sched.record_use(model)
         return {"ok": True, "status": "deja charge"}
 
     if unload_others:
         for m in loaded:
-            _lms_unload(m)
+            await asyncio.to_thread(sched.backend.unload, m)
         await asyncio.sleep(2)
 
-    ok = _lms_load(model, gpu, context, parallel)
+    plan, results = await sched.ensure(model, gpu=gpu, context=context, parallel=parallel)
+    if not plan.feasible:
+        return {"ok": False, "status": "; ".join(plan.reasons), "plan": plan}
+    ok = results.get(f"load:{model}", False)
     if ok:
         m1 = config.get_node("M1")
         if m1:
             bench = await _warmup_model(m1.url, model)
-            return {"ok": True, "status": "charge + warmup", "bench": bench}
-    return {"ok": ok, "status": "charge" if ok else "echec"}
+            return {"ok": True, "status": "charge + warmup", "bench": bench, "plan": plan}
+    return {"ok": ok, "status": "charge" if ok else "echec", "plan": plan}
 
 
 async def switch_to_coder_mode() -> dict[str, Any]:
@@ -585,39 +745,30 @@ async def switch_to_dev_mode() -> dict[str, Any]:
 # ═══════════════════════════════════════════════════════════════════════════
 
 async def quick_health_check() -> dict[str, str]:
-    """Fast health check (no warmup, no GPU stats). For periodic use."""
+    """Fast health check (no warmup, no GPU stats). For periodic use.
+
+    Served from the shared cluster monitor snapshot (src/cluster_monitor.py).
+    """
+    from src.cluster_monitor import get_monitor
+    snap = await get_monitor().snapshot()
     status = {}
 
     # M1
-    try:
-        async with httpx.AsyncClient(timeout=3) as c:
-            r = await c.get(f"{config.get_node_url('M1')}/api/v1/models")
-            r.raise_for_status()
-            models = [m["key"] for m in r.json().get("models", []) if m.get("loaded_instances")]
-            has_main = any("qwen3-30b" in m for m in models)
-            status["m1"] = f"OK ({len(models)} modeles)" if has_main else f"WARN (pas de qwen3-30b)"
-    except Exception:
+    m1 = snap.nodes.get("M1")
+    if m1 and m1.online:
+        has_main = any("qwen3-30b" in m for m in m1.loaded)
+        status["m1"] = f"OK ({len(m1.loaded)} modeles)" if has_main else f"WARN (pas de qwen3-30b)"
+    else:
         status["m1"] = "OFFLINE"
 
     # M2
-    try:
-        async with httpx.AsyncClient(timeout=3) as c:
-            r = await c.get(f"{config.get_node_url('M2')}/api/v1/models")
-            r.raise_for_status()
-            status["m2"] = "OK"
-    except Exception:
-        status["m2"] = "OFFLINE"
+    m2 = snap.nodes.get("M2")
+    status["m2"] = "OK" if m2 and m2.online else "OFFLINE"
 
     # Ollama
-    try:
-        ol = config.get_ollama_node("OL1")
-        if ol:
-            async with httpx.AsyncClient(timeout=3) as c:
-                r = await c.get(f"{ol.url}/api/tags")
-                r.raise_for_status()
-                status["ollama"] = "OK"
-    except Exception:
-        status["ollama"] = "OFFLINE"
+    ol = snap.nodes.get("OL1")
+    if ol is not None:
+        status["ollama"] = "OK" if ol.online else "OFFLINE"
 
     return status
 
@@ -630,6 +781,9 @@ def print_startup_report(report: dict[str, Any]) -> None:
     for key, val in report.items():
         if key in ("gpus", "m1_initial", "m1_final", "timestamp"):
             continue
+        if key == "timeline":
+            print(f"  [OK] Demarrage: {val['total_ms']}ms — chemin critique {' -> '.join(val['critical_path'])}")
+            continue
         if isinstance(val, dict):
             status = "OK" if val.get("ok") else "!!"
             summary = f"latence={val.get('latency_ms', '?')}ms" if "latency_ms" in val else str(val)
@@ -8,6 +8,8 @@ Flow:
 1. classify_task()  -> M1 classifie le type (code/analyse/trading/systeme/web/simple)
 2. decompose_task() -> Decompose en TaskUnit[] avec routage automatique
 3. Claude dispatche  -> Via Task (subagents) + lm_query/consensus (IAs directes)
+   ou CommanderEngine -> execution locale du DAG si toutes les cibles sont des
+   IAs directes (M1/M2/OL1); un agent SDK (ia-*) a des outils: toujours Claude
 4. verify_quality() -> ia-check valide (score 0-1)
 5. synthesize()     -> Reponse finale unifiee avec attribution
 """
@@ -18,6 +20,8 @@ import asyncio
 import time
 from dataclasses import dataclass, field
 
+from src.profiler import profiled
+
 
 # ══════════════════════════════════════════════════════════════════════════
 # DATA STRUCTURES
@@ -65,31 +69,25 @@ Reponds UNIQUEMENT avec le mot-cle (un seul mot)."""
 VALID_TYPES = {"code", "analyse", "trading", "systeme", "web", "simple"}
 
 
+@profiled("commander")
 async def classify_task(prompt: str) -> str:
-    """Classifie via M1 qwen3-30b (mode fast, <1s).
+    """Classifie via M1 qwen3-30b (mode fast, <1s), hedge vers M2 si lent.
 
     Reutilise _local_ia_analyze de orchestrator.py mais avec CLASSIFY_PROMPT.
     Fallback: heuristiques par mots-cles.
     """
     from src.config import config
-    from src.tools import _get_client
+    from src.tools import hedged_chat
 
-    node = config.get_node("M1")
-    if node:
+    route = config.hedge_routes.get("classify", ["M1"])
+    if route:
         try:
-            client = await _get_client()
-            r = await client.post(f"{node.url}/api/v1/chat", json={
-                "model": node.default_model,
-                "input": prompt,
-                "system_prompt": CLASSIFY_PROMPT,
-                "temperature": 0.1,
-                "max_output_tokens": 32,
-                "stream": False,
-                "store": False,
-            }, timeout=config.fast_timeout)
-            r.raise_for_status()
-            from src.tools import extract_lms_output
-            content = extract_lms_output(r.json()).strip().lower()
+            # Hedged: si M1 depasse son p90, duplicata vers M2 (premier arrive gagne)
+            _, content = await hedged_chat(
+                "classify", route, prompt, system=CLASSIFY_PROMPT,
+                max_tokens=32, temperature=0.1, timeout=config.fast_timeout,
+            )
+            content = content.strip().lower()
             # Strip thinking tags if present
             if content.startswith("<think>"):
                 think_end = content.find("</think>")
@@ -186,19 +184,34 @@ def _classify_heuristic(prompt: str) -> str:
 # DECOMPOSITION
 # ══════════════════════════════════════════════════════════════════════════
 
+def _thermal_status() -> dict:
+    """Etat thermique actuel + decision predictive de delestage M1."""
+    from src.cluster_startup import check_thermal_status
+    from src.thermal import get_thermal_router
+
+    thermal = check_thermal_status()
+    decision = get_thermal_router().evaluate()
+    thermal["shed_m1"] = decision.shed_m1
+    thermal["forecast_c"] = decision.forecast_c
+    thermal["reason"] = decision.reason
+    return thermal
+
+
 def _apply_thermal_rerouting(target: str, thermal_status: dict) -> str:
-    """Re-route une cible si M1 est en surchauffe thermique.
+    """Re-route une cible si M1 est (ou va etre) en surchauffe thermique.
 
-    - critical: M1 -> M2 (code) ou OL1 (web/simple) ou GEMINI (analyse)
+    - critical ou delestage predictif: M1 -> M2
     - warning: M1 reste, mais les taches code vont sur M2
     """
-    if thermal_status.get("status") == "critical" and target == "M1":
+    shed = thermal_status.get("status") == "critical" or thermal_status.get("shed_m1")
+    if shed and target == "M1":
         return "M2"  # Deporter vers M2
     if thermal_status.get("status") == "critical" and target == "ia-deep":
         return "ia-deep"  # Agent reste, mais il utilisera M2 via lm_query
     return target
 
 
+@profiled("commander")
 def decompose_task(prompt: str, classification: str) -> list[TaskUnit]:
     """Decompose en sous-taches avec routage automatique.
 
@@ -206,10 +219,14 @@ def decompose_task(prompt: str, classification: str) -> list[TaskUnit]:
     les agents et IAs a assigner. Applique le re-routage thermique si GPU surchauffe.
     """
     from src.config import config
-    from src.cluster_startup import check_thermal_status
 
-    # Check thermique GPU
-    thermal = check_thermal_status()
+    # Check thermique GPU (mesure + prevision)
+    thermal = _thermal_status()
+
+    # Mix de requetes pour le placement M1 (precharge qwen3-coder si le code domine)
+    if classification == "code":
+        from src.model_placement import get_scheduler
+        get_scheduler().record_role("coding_m1")
 
     routing = config.commander_routing.get(classification, [])
     if not routing:
@@ -301,6 +318,45 @@ def build_verification_prompt(tasks: list[TaskUnit]) -> str:
     )
 
 
+def parse_verification(text: str) -> dict | None:
+    """Parse la reponse JSON d'ia-check (tolere <think>, ```json et texte autour).
+
+    Retourne {"scores": {id: float}, "global": float, "issues": [str]} ou None.
+    """
+    import json
+
+    if not text:
+        return None
+    think_end = text.find("</think>")
+    if think_end != -1:
+        text = text[think_end + 8:]
+    start = text.find("{")
+    while start != -1:
+        try:
+            data, _ = json.JSONDecoder().raw_decode(text[start:])
+        except ValueError:
+            start = text.find("{", start + 1)
+            continue
+        if isinstance(data, dict) and ("scores" in data or "global" in data):
+            scores = {}
+            for k, v in (data.get("scores") or {}).items():
+                try:
+                    scores[str(k)] = max(0.0, min(1.0, float(v)))
+                except (TypeError, ValueError):
+                    continue
+            try:
+                global_score = float(data.get("global"))
+            except (TypeError, ValueError):
+                global_score = sum(scores.values()) / len(scores) if scores else 0.0
+            issues = data.get("issues") or []
+            if not isinstance(issues, list):
+                issues = [str(issues)]
+            return {"scores": scores, "global": max(0.0, min(1.0, global_score)),
+                    "issues": [str(i) for i in issues]}
+        start = text.find("{", start + 1)
+    return None
+
+
 # ══════════════════════════════════════════════════════════════════════════
 # SYNTHESIS
 # ══════════════════════════════════════════════════════════════════════════
@@ -326,13 +382,13 @@ def build_synthesis_prompt(tasks: list[TaskUnit], quality_score: float) -> str:
 
 def format_commander_header(classification: str, tasks: list[TaskUnit]) -> str:
     """Header d'affichage pour le mode commandant."""
-    from src.cluster_startup import check_thermal_status
-
     targets = [t.target for t in tasks]
-    thermal = check_thermal_status()
+    thermal = _thermal_status()
     thermal_tag = ""
     if thermal["status"] == "critical":
         thermal_tag = f" | THERMAL CRITICAL {thermal['max_temp']}C"
+    elif thermal.get("shed_m1"):
+        thermal_tag = f" | THERMAL PREDIT {thermal['forecast_c']:.0f}C (M1 deleste)"
     elif thermal["status"] == "warning":
         thermal_tag = f" | THERMAL WARN {thermal['max_temp']}C"
 
@@ -347,6 +403,7 @@ def format_commander_header(classification: str, tasks: list[TaskUnit]) -> str:
 # COMMANDER PROMPT BUILDER
 # ══════════════════════════════════════════════════════════════════════════
 
+@profiled("commander")
 def build_commander_enrichment(
     user_prompt: str,
     classification: str,
@@ -384,3 +441,261 @@ def build_commander_enrichment(
     )
 
     return "\n\n".join(parts)
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# ENGINE — Execution locale du plan (DAG asyncio)
+# ══════════════════════════════════════════════════════════════════════════
+
+QUALITY_THRESHOLD = 0.7
+
+
+def resolve_task_node(target: str) -> str | None:
+    """Noeud IA (M1/M2/OL1) qui execute une cible, ou None si non executable localement.
+
+    Seules les IAs directes tournent en local. Les agents SDK (ia-fast,
+    ia-deep, ia-check, ia-trading, ia-system, GEMINI) ont des outils
+    (Write/Edit/Bash, run_script, recherche web): un simple chat ne les
+    remplace pas, ils restent chez Claude.
+    """
+    from src.config import config
+    from src.thermal import m1_shed
+    if not (config.get_node(target) or config.get_ollama_node(target)):
+        return None
+    if target == "M1" and m1_shed():
+        return "M2"  # Delestage thermique
+    return target
+
+
+class CommanderEngine:
+    """Execute un plan de TaskUnit localement, en temps chemin critique.
+
+    - Ordonnancement topologique asyncio: les taches sans dependance partent
+      en parallele, une dependante demarre des que ses entrees sont pretes.
+    - Verification ia-check (JSON de build_verification_prompt), re-dispatch
+      des taches faibles (score < seuil) et de leurs dependantes,
+      au plus MAX_REDISPATCH_CYCLES fois.
+    - Synthese finale, CommanderResult complet (total_time_ms, agents_used).
+
+    `executor(task, context) -> str` est injectable (tests, autres backends).
+    """
+
+    def __init__(
+        self, executor=None, verifier_node: str = "M1", synth_node: str = "M1",
+        max_cycles: int = MAX_REDISPATCH_CYCLES, threshold: float = QUALITY_THRESHOLD,
+        verbose: bool = False,
+    ):
+        self.executor = executor or self._execute_on_node
+        self.verifier_node = verifier_node
+        self.synth_node = synth_node
+        self.max_cycles = max_cycles
+        self.threshold = threshold
+        self.verbose = verbose
+        self.agents_used: set[str] = set()
+        self.issues: list[str] = []
+
+    # ── Public API ──────────────────────────────────────────────────────
+
+    @staticmethod
+    def can_run_locally(tasks: list[TaskUnit]) -> bool:
+        """True only if every task targets a direct IA (no SDK agent)."""
+        return bool(tasks) and all(resolve_task_node(t.target) for t in tasks)
+
+    async def run(self, prompt: str) -> CommanderResult:
+        """classify -> decompose -> execute -> verify -> synthesize."""
+        classification = await classify_task(prompt)
+        tasks = decompose_task(prompt, classification)
+        return await self.run_plan(tasks)
+
+    async def run_plan(self, tasks: list[TaskUnit]) -> CommanderResult:
+        t0 = time.monotonic()
+        by_id = {t.id: t for t in tasks}
+        await self._execute_graph(tasks, by_id)
+
+        quality = 0.0
+        for cycle in range(self.max_cycles + 1):
+            verdict = await self._verify(tasks)
+            quality = verdict["global"] if verdict else self._fallback_quality(tasks)
+            weak = self._weak_tasks(tasks, verdict)
+            if not weak or cycle == self.max_cycles:
+                break
+            self._log(f"Cycle {cycle + 1}: re-dispatch {', '.join(sorted(weak))} (qualite {quality:.2f})")
+            rerun = self._with_dependents(weak, tasks)
+            for t in tasks:
+                if t.id in rerun:
+                    if t.id in weak:
+                        t.prompt = self._correction_prompt(t, verdict)
+                    t.status, t.result = "pending", None
+            await self._execute_graph([t for t in tasks if t.id in rerun], by_id)
+
+        synthesis = await self._synthesize(tasks, quality)
+        return CommanderResult(
+            tasks=tasks,
+            synthesis=synthesis,
+            quality_score=quality,
+            total_time_ms=int((time.monotonic() - t0) * 1000),
+            agents_used=sorted(self.agents_used),
+        )
+
+    # ── DAG scheduling ──────────────────────────────────────────────────
+
+    async def _execute_graph(self, tasks: list[TaskUnit], by_id: dict[str, TaskUnit]) -> None:
+        """Lance chaque tache des que toutes ses dependances sont terminees."""
+        pending = {t.id: t for t in tasks if t.status == "pending"}
+        running: dict[asyncio.Task, TaskUnit] = {}
+
+        def _deps_state(t: TaskUnit) -> str:
+            if any(d not in by_id for d in t.depends_on):
+                return "unresolved"  # Id inconnu: ne jamais lancer sans son amont
+            states = [by_id[d].status for d in t.depends_on]
+            if any(s == "failed" for s in states):
+                return "failed"
+            if all(s == "done" for s in states):
+                return "ready"
+            return "waiting"
+
+        while pending or running:
+            progressed = True
+            while progressed:  # Propage les echecs en chaine dans la meme passe
+                progressed = False
+                for tid in sorted(pending, key=lambda i: pending[i].priority):
+                    t = pending[tid]
+                    state = _deps_state(t)
+                    if state == "ready":
+                        t.status = "running"
+                        running[asyncio.create_task(self._run_task(t, by_id))] = t
+                    elif state == "failed":
+                        t.status, t.result = "failed", "Dependance en echec"
+                        progressed = True
+                    elif state == "unresolved":
+                        t.status, t.result = "failed", "Dependances irresolues"
+                        progressed = True
+                for t in list(pending.values()):
+                    if t.status != "pending":
+                        del pending[t.id]
+            if not running:
+                for t in pending.values():  # Cycle
+                    t.status, t.result = "failed", "Dependances irresolues"
+                break
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                running.pop(task)
+
+    async def _run_task(self, t: TaskUnit, by_id: dict[str, TaskUnit]) -> None:
+        context = "\n\n".join(
+            f"[{by_id[d].target}/{d}] {by_id[d].result}"
+            for d in t.depends_on if d in by_id and by_id[d].result
+        )
+        t0 = time.monotonic()
+        try:
+            t.result = await self.executor(t, context)
+            t.status = "done"
+            node = resolve_task_node(t.target)
+            self.agents_used.add(t.target if node in (None, t.target) else f"{t.target}/{node}")
+        except Exception as e:
+            t.result, t.status = f"ERREUR: {e}", "failed"
+        self._log(f"{t.id} [{t.target}] {t.status} en {int((time.monotonic() - t0) * 1000)}ms")
+
+    @staticmethod
+    def _with_dependents(ids: set[str], tasks: list[TaskUnit]) -> set[str]:
+        out = set(ids)
+        changed = True
+        while changed:
+            changed = False
+            for t in tasks:
+                if t.id not in out and any(d in out for d in t.depends_on):
+                    out.add(t.id)
+                    changed = True
+        return out
+
+    # ── Execution / verification / synthesis ────────────────────────────
+
+    async def _execute_on_node(self, t: TaskUnit, context: str) -> str:
+        from src.config import config
+        from src.tools import _node_chat
+
+        node = resolve_task_node(t.target)
+        if not node:
+            raise ValueError(f"Cible {t.target} non executable localement")
+        prompt = t.prompt
+        if context:
+            prompt = f"{prompt}\n\nResultats des taches precedentes:\n{context}"
+        content = await _node_chat(
+            node, prompt, max_tokens=config.max_tokens // 4,
+            timeout=config.inference_timeout, call_type="commander",
+        )
+        return _strip_think(content)
+
+    async def _verify(self, tasks: list[TaskUnit]) -> dict | None:
+        from src.config import config
+        from src.tools import _node_chat
+
+        if not any(t.status == "done" for t in tasks):
+            return None
+        try:
+            raw = await _node_chat(
+                self.verifier_node, build_verification_prompt(tasks),
+                max_tokens=512, temperature=0.1, timeout=config.inference_timeout,
+                call_type="commander_verify",
+            )
+        except Exception:
+            return None
+        self.agents_used.add(f"ia-check/{self.verifier_node}")
+        verdict = parse_verification(raw)
+        if verdict:
+            self.issues = verdict["issues"]
+            for t in tasks:
+                if t.id in verdict["scores"]:
+                    t.quality_score = verdict["scores"][t.id]
+        return verdict
+
+    def _weak_tasks(self, tasks: list[TaskUnit], verdict: dict | None) -> set[str]:
+        weak = {t.id for t in tasks if t.status == "failed" and resolve_task_node(t.target)}
+        if verdict:
+            weak |= {t.id for t in tasks if t.status == "done"
+                     and t.id in verdict["scores"] and verdict["scores"][t.id] < self.threshold}
+        return weak
+
+    @staticmethod
+    def _fallback_quality(tasks: list[TaskUnit]) -> float:
+        return sum(1 for t in tasks if t.status == "done") / max(len(tasks), 1)
+
+    @staticmethod
+    def _correction_prompt(t: TaskUnit, verdict: dict | None) -> str:
+        base = t.prompt.split("\n\nCORRECTION DEMANDEE", 1)[0]
+        score = verdict["scores"].get(t.id) if verdict else None
+        issues = "; ".join(verdict["issues"]) if verdict and verdict["issues"] else "resultat incomplet"
+        tag = f" (score {score:.2f})" if score is not None else ""
+        return f"{base}\n\nCORRECTION DEMANDEE{tag}: {issues}"
+
+    async def _synthesize(self, tasks: list[TaskUnit], quality: float) -> str:
+        from src.config import config
+        from src.tools import _node_chat
+
+        done = [t for t in tasks if t.status == "done" and t.result]
+        if not done:
+            return "Aucun resultat exploitable."
+        if len(done) == 1:
+            return done[0].result
+        try:
+            content = await _node_chat(
+                self.synth_node, build_synthesis_prompt(tasks, quality),
+                max_tokens=config.max_tokens // 4, timeout=config.inference_timeout,
+                call_type="commander",
+            )
+            return _strip_think(content)
+        except Exception:
+            return "\n\n---\n\n".join(f"[{t.target}] {t.result}" for t in done)
+
+    def _log(self, msg: str) -> None:
+        if self.verbose:
+            print(f"  [ENGINE] {msg}", flush=True)
+
+
+def _strip_think(content: str) -> str:
+    content = content.strip()
+    if content.startswith("<think>"):
+        think_end = content.find("</think>")
+        if think_end != -1:
+            content = content[think_end + 8:].strip()
+    return content
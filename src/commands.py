@@ -9,6 +9,8 @@ from difflib import SequenceMatcher
 from pathlib import Path
 from typing import Any
 
+from src.profiler import profiled
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # COMMAND DEFINITIONS
@@ -1493,6 +1495,10 @@ COMMANDS: list[JarvisCommand] = [
         "que me suggeres tu", "suggestions", "quoi faire",
         "propose quelque chose", "next actions",
     ], "list_commands", "suggestions"),
+    JarvisCommand("jarvis_profile", "jarvis", "Profiler les prochaines requetes", [
+        "jarvis profile", "profile", "profile jarvis", "lance le profilage",
+        "active le profilage", "profile les requetes", "lance le profileur",
+    ], "jarvis_profile", "arm"),
     # Brain / Apprentissage
     JarvisCommand("jarvis_brain_status", "jarvis", "Etat du cerveau JARVIS", [
         "etat du cerveau", "brain status", "cerveau jarvis",
@@ -2801,6 +2807,7 @@ def similarity(a: str, b: str) -> float:
     return max(seq_score, bow_score)
 
 
+@profiled("match")
 def match_command(voice_text: str, threshold: float = 0.55) -> tuple[JarvisCommand | None, dict[str, str], float]:
     """Match voice input to a pre-registered command.
 
@@ -83,6 +83,8 @@ class LMStudioNode:
     default_model: str = ""
     weight: float = 1.0
     use_cases: list[str] = field(default_factory=list)
+    api_key: str = ""  # Bearer token si LM Studio exige une authentification
+    parallel: int = 1  # Slots d'inference simultanes (lms load --parallel)
 
 
 @dataclass
@@ -94,6 +96,8 @@ class OllamaNode:
     default_model: str = "minimax-m2.5:cloud"
     weight: float = 1.0
     use_cases: list[str] = field(default_factory=list)
+    api_key: str = ""
+    parallel: int = field(default_factory=lambda: int(os.getenv("OLLAMA_NUM_PARALLEL", "1")))
 
 
 @dataclass
@@ -113,12 +117,14 @@ class JarvisConfig:
             default_model="qwen/qwen3-30b-a3b-2507", weight=1.5,
             use_cases=["Analyse technique", "Raisonnement", "Patterns complexes",
                        "Freeform", "Voice commands", "Auto-apprentissage"],
+            api_key=os.getenv("LM_STUDIO_1_KEY", ""), parallel=4,
         ),
         LMStudioNode(
             "M2", os.getenv("LM_STUDIO_2_URL", "http://192.168.1.26:1234"),
             "fast_inference", gpus=3, vram_gb=24,
             default_model="deepseek-coder-v2-lite-instruct", weight=1.0,
             use_cases=["Code generation", "Quick responses", "Trading signals"],
+            api_key=os.getenv("LM_STUDIO_2_KEY", ""), parallel=2,
         ),
     ])
 
@@ -133,6 +139,7 @@ class JarvisConfig:
             "cloud_inference",
             default_model=os.getenv("OLLAMA_DEFAULT_MODEL", "qwen3:1.7b"), weight=1.0,
             use_cases=["Recherche web", "Raisonnement cloud", "Resume", "Correction vocale"],
+            api_key=os.getenv("OLLAMA_API_KEY", ""),
         ),
     ])
 
@@ -216,6 +223,7 @@ class JarvisConfig:
     fast_timeout: float = 10.0        # Quick queries (voice, commands)
     warmup_timeout: float = 15.0      # Model warmup
     health_timeout: float = 3.0       # Health checks
+    cluster_monitor_interval: float = 5.0  # Sondes de sante en arriere-plan (src/cluster_monitor.py)
 
     # ── Auto-tune (adapts routing based on latency) ───────────────────────
     # Latency thresholds: if M1 > threshold, prefer M2 or OL1
@@ -223,10 +231,121 @@ class JarvisConfig:
     # Track last known latencies (updated by warmup/benchmark)
     _latency_cache: dict[str, int] = field(default_factory=dict)
 
+    # ── Circuit breaker (per node) ────────────────────────────────────────
+    breaker_failure_threshold: int = 3     # Echecs consecutifs avant ouverture
+    breaker_recovery_timeout: float = 15.0  # Secondes avant essai half-open
+    breaker_probe_interval: float = 5.0    # Periode des sondes en arriere-plan
+    breaker_trial_timeout: float = 60.0    # Essai half-open sans verdict: expire (nouvel essai permis)
+
+    # ── Request hedging (voice path: fast, classify, voice correction) ────
+    # Duplicata vers le noeud suivant si le primaire depasse son p90 observe
+    hedge_enabled: bool = field(default_factory=lambda: os.getenv("JARVIS_HEDGE", "true").lower() == "true")
+    hedge_default_delay_ms: int = 1500  # Delai avant hedge sans historique de latence
+    hedge_min_delay_ms: int = 150       # Plancher (evite de doubler les requetes rapides)
+    # Budget par type d'appel: fraction max de requetes dupliquees (0.10 = +10% de charge)
+    hedge_budgets: dict[str, float] = field(default_factory=lambda: {
+        "fast": 0.10,
+        "classify": 0.10,
+        "voice_correction": 0.15,
+    })
+    hedge_routes: dict[str, list[str]] = field(default_factory=lambda: {
+        "fast": ["M1", "M2", "OL1"],
+        "classify": ["M1", "M2"],
+        "voice_correction": ["OL1", "M1"],
+    })
+
+    # ── LM Studio sessions (KV-cache prefix reuse) ────────────────────────
+    # Prompts systemes statiques amorces une fois (store=True) puis reutilises
+    # via previous_response_id — voir src/lm_sessions.py
+    lm_sessions_enabled: bool = field(default_factory=lambda: os.getenv("JARVIS_LM_SESSIONS", "true").lower() == "true")
+    lm_session_ttl: float = 1800.0  # Re-amorce apres 30 min
+
+    # ── Knowledge retrieval (prompt M1 borne par budget) ──────────────────
+    knowledge_retrieval: bool = field(default_factory=lambda: os.getenv("JARVIS_KNOWLEDGE_RETRIEVAL", "true").lower() == "true")
+    knowledge_top_k: int = 12          # Commandes/outils/skills injectes max
+    knowledge_token_budget: int = 400  # Budget total (en-tete + contexte)
+
     # ── GPU Thermal thresholds (Celsius) ────────────────────────────────
     gpu_thermal_warning: int = 75    # Warning: preferer M2 pour code
     gpu_thermal_critical: int = 85   # Critique: deporter vers M2/OL1/GEMINI
 
+    # ── GPU telemetry (echantillonneur en arriere-plan) ─────────────────
+    gpu_telemetry_interval: float = 2.0   # Secondes entre deux echantillons
+    gpu_telemetry_history: int = 150      # Echantillons gardes par GPU (~5 min)
+    gpu_telemetry_max_age: float = 15.0   # Snapshot plus vieux = thermique inconnue
+
+    # ── Model placement (residence des modeles a la demande sur M1) ─────
+    placement_auto: bool = field(default_factory=lambda: os.getenv("JARVIS_PLACEMENT_AUTO", "false").lower() == "true")
+    placement_window_s: float = 900.0        # Fenetre de demande (decroissance exp.)
+    placement_preload_demand: float = 3.0    # Demande prevue declenchant un prechargement
+    placement_interval: float = 60.0         # Replanification en arriere-plan
+    placement_kv_overhead_gb: float = 1.5    # Cache KV + buffers par modele charge
+    placement_default_footprint_gb: float = 15.0
+
+    # ── Metrics (src/metrics.py, /metrics du dashboard) ─────────────────
+    metrics_flush_interval: float = 10.0  # Export data/metrics/<processus>.json si active (0 = jamais)
+    metrics_stale_s: float = 300.0        # Fichier plus vieux = processus arrete
+
+    # ── Ollama model availability (repli avant envoi) ───────────────────
+    model_cache_ttl_s: float = 300.0        # Relecture de /api/tags
+    model_unavailable_ttl_s: float = 600.0  # Duree d'un verdict 401/404 observe
+
+    # ── Keep-warm (pings contre les modeles decharges ou froids) ────────
+    keep_warm_enabled: bool = field(default_factory=lambda: os.getenv("JARVIS_KEEP_WARM", "true").lower() == "true")
+    keep_warm_interval: float = 60.0             # Secondes entre deux tours
+    keep_warm_budget_per_hour: int = 30          # Pings max par heure glissante
+    keep_warm_min_prob: float = 0.2              # P(requete avant expiration) minimale
+    keep_warm_busy_s: float = 30.0               # Noeud "occupe" apres une requete reelle
+    keep_warm_ollama_keep_alive_s: float = 900.0 # keep_alive fixe par un ping Ollama
+    keep_warm_lms_ttl_s: float = 3600.0          # TTL d'inactivite LM Studio (JIT)
+    keep_warm_timeout: float = 10.0
+
+    # ── Tracing (spans du pipeline vocal, data/traces.jsonl) ───────────
+    trace_enabled: bool = field(default_factory=lambda: os.getenv("JARVIS_TRACE", "true").lower() == "true")
+    trace_max_mb: float = 20.0      # Rotation en traces.1.jsonl au-dela
+    trace_report_window: int = 500  # Traces relues par le rapport
+
+    # ── Profiler (echantillonnage opt-in, "jarvis profile") ─────────────
+    profile_requests: int = 20          # Requetes profilees par armement
+    profile_interval_ms: float = 5.0    # Periode d'echantillonnage
+
+    # ── Streaming capture (VAD + transcription pendant la parole) ───────
+    voice_streaming: bool = field(default_factory=lambda: os.getenv("JARVIS_VOICE_STREAMING", "false").lower() == "true")
+    vad_silence_ms: float = 400.0         # Pause qui ferme un segment
+    vad_margin_db: float = 12.0           # Parole = plancher de bruit + N dB
+    stream_partial_interval: float = 0.8  # Hypothese partielle toutes les N s d'audio
+    stream_ring_s: float = 60.0           # Capacite de l'anneau audio
+    capture_always_on: bool = field(default_factory=lambda: os.getenv("JARVIS_CAPTURE_ALWAYS_ON", "true").lower() == "true")
+    capture_preroll_ms: float = 300.0     # Audio garde avant l'appui PTT
+    capture_ring_s: float = 45.0          # Anneau de la capture permanente (> enregistrement max)
+
+    # ── Speculative resolution (commande trouvee sur les partiels) ──────
+    speculative_enabled: bool = field(default_factory=lambda: os.getenv("JARVIS_SPECULATIVE", "true").lower() == "true")
+    speculative_min_score: float = 0.70  # Meme seuil que le match direct du pipeline
+
+    # ── Whisper pool (workers STT, src/whisper_pool.py) ─────────────────
+    whisper_workers: int = field(default_factory=lambda: int(os.getenv("JARVIS_WHISPER_WORKERS", "1")))
+    whisper_device: str = field(default_factory=lambda: os.getenv("WHISPER_DEVICE", "cuda"))
+    whisper_compute: str = field(default_factory=lambda: os.getenv("WHISPER_COMPUTE", "float16"))
+    whisper_batch_size: int = 8           # Clips en file transcrits ensemble par un worker
+    whisper_timeout: float = 30.0         # Requete sans reponse -> worker bloque, redemarre
+    whisper_health_interval: float = 5.0  # Periode des PING de sante
+
+    # ── TTS (synthetiseur persistant + cache de phrases, src/tts.py) ────
+    tts_backend: str = field(default_factory=lambda: os.getenv("JARVIS_TTS_BACKEND", "auto"))  # auto|sapi|null
+    tts_cache_mb: float = 50.0          # Taille max du cache WAV (eviction LRU)
+    tts_cache_max_chars: int = 120      # Phrases plus longues: rendues sans cache
+    tts_render_timeout: float = 30.0    # Rendu sans reponse -> hote SAPI relance
+    tts_pipeline_queue: int = 4         # Phrases d'avance entre generation et synthese
+    tts_min_sentence_chars: int = 20    # Fragments plus courts fusionnes avec la suite
+
+    # ── Thermal forecast (delestage predictif de M1) ────────────────────
+    thermal_forecast_horizon: float = 30.0  # Prevision a +N secondes
+    thermal_trend_window: float = 60.0      # Fenetre de la pente lineaire
+    thermal_ewma_alpha: float = 0.3         # Lissage de la temperature
+    thermal_hysteresis: int = 7             # Retour sur M1 sous critique - N
+    thermal_min_shed_s: float = 45.0        # Duree minimale de delestage
+
     # ── Trading config ─────────────────────────────────────────────────────
     exchange: str = "mexc"
     trading_mode: str = "futures"
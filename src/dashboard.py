@@ -17,7 +17,6 @@ import json
 import time
 from pathlib import Path
 
-import httpx
 from textual import on, work
 from textual.app import App, ComposeResult
 from textual.binding import Binding
@@ -37,6 +36,7 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from src.cluster_client import shared_client
 from src.config import config, JARVIS_VERSION
 from src.skills import load_skills, format_skills_list
 from src.brain import get_brain_status, format_brain_report
@@ -45,28 +45,24 @@ from src.brain import get_brain_status, format_brain_report
 # ── Helpers ─────────────────────────────────────────────────────────────────
 
 async def _fetch_cluster() -> list[dict]:
-    """Fetch cluster node status."""
+    """Cluster node status from the shared monitor (with circuit breaker state)."""
+    from src.circuit_breaker import get_breaker
+    from src.cluster_monitor import get_monitor
+    snap = await get_monitor().snapshot()
     results = []
-    async with httpx.AsyncClient(timeout=5) as c:
-        for node in config.lm_nodes:
-            entry = {
-                "name": node.name,
-                "role": node.role,
-                "url": node.url,
-                "gpus": node.gpus,
-                "vram": node.vram_gb,
-                "model": node.default_model,
-                "online": False,
-                "models_count": 0,
-            }
-            try:
-                r = await c.get(f"{node.url}/api/v1/models")
-                r.raise_for_status()
-                entry["online"] = True
-                entry["models_count"] = len([m for m in r.json().get("models", []) if m.get("loaded_instances")])
-            except Exception:
-                pass
-            results.append(entry)
+    for node in config.lm_nodes:
+        h = snap.nodes.get(node.name)
+        results.append({
+            "name": node.name,
+            "role": node.role,
+            "url": node.url,
+            "gpus": node.gpus,
+            "vram": node.vram_gb,
+            "model": node.default_model,
+            "online": bool(h and h.online),
+            "models_count": len(h.loaded) if h and h.online else 0,
+            "breaker": get_breaker(node.name).summary(),
+        })
     return results
 
 
@@ -280,6 +276,15 @@ class JarvisDashboard(App):
         self._log("Dashboard JARVIS demarre.")
         self.refresh_all()
         self.set_interval(30, self.refresh_all)
+        self.run_worker(self._watch_cluster())
+
+    async def _watch_cluster(self) -> None:
+        """Live cluster panel: redraw on every monitor snapshot (no extra probes)."""
+        from src.cluster_monitor import get_monitor
+        monitor = get_monitor()
+        monitor.start()
+        async for _snap in monitor.subscribe():
+            await self._refresh_cluster(quiet=True)
 
     def _log(self, text: str) -> None:
         """Add a line to the log panel."""
@@ -303,7 +308,7 @@ class JarvisDashboard(App):
         )
         self._log("Rafraichissement termine.")
 
-    async def _refresh_cluster(self) -> None:
+    async def _refresh_cluster(self, quiet: bool = False) -> None:
         """Refresh cluster panel."""
         try:
             nodes = await _fetch_cluster()
@@ -322,10 +327,12 @@ class JarvisDashboard(App):
                     f"    {n['gpus']} GPU, {n['vram']}GB VRAM\n"
                     f"    {n['model']}"
                     + (f" — {detail}" if detail else "")
+                    + f"\n    circuit: {n['breaker']}"
                 )
             content = "\n".join(lines)
             self.query_one("#cluster-content", Static).update(content)
-            self._log(f"Cluster: {online}/{len(nodes)} noeuds en ligne")
+            if not quiet:
+                self._log(f"Cluster: {online}/{len(nodes)} noeuds en ligne")
         except Exception as e:
             self.query_one("#cluster-content", Static).update(f"[red]Erreur: {e}[/red]")
 
@@ -488,7 +495,7 @@ class JarvisDashboard(App):
         try:
             node = config.lm_nodes[0]
             self._log(f"Envoi a {node.name} ({node.default_model})...")
-            async with httpx.AsyncClient(timeout=60) as c:
+            async with shared_client(timeout=60) as c:
                 r = await c.post(f"{node.url}/api/v1/chat", json={
                     "model": node.default_model,
                     "input": text,
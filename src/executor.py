@@ -11,10 +11,17 @@ from src.commands import (
 )
 from src.windows import run_powershell, open_application
 from src.config import SCRIPTS
+from src.metrics import timer
 
 
 async def execute_command(cmd: JarvisCommand, params: dict[str, str]) -> str:
     """Execute a matched command and return the result text."""
+    with timer("jarvis_command_duration_ms", "jarvis_command_calls_total",
+               action_type=cmd.action_type):
+        return await _execute_command(cmd, params)
+
+
+async def _execute_command(cmd: JarvisCommand, params: dict[str, str]) -> str:
 
     if cmd.action_type == "exit":
         return "__EXIT__"
@@ -25,6 +32,10 @@ async def execute_command(cmd: JarvisCommand, params: dict[str, str]) -> str:
     if cmd.action_type == "jarvis_repeat":
         return "__REPEAT__"
 
+    if cmd.action_type == "jarvis_profile":
+        from src.profiler import PROFILER
+        return PROFILER.arm()
+
     if cmd.action_type == "app_open":
         app_name = cmd.action
         if "{" in app_name and params:
@@ -384,7 +395,7 @@ async def process_voice_input(text: str) -> tuple[str, float]:
 
 async def correct_with_ia(text: str, node_url: str = "http://127.0.0.1:11434") -> str:
     """Use Ollama qwen3:1.7b (primary) or M1 fallback to correct voice transcription."""
-    import httpx
+    from src.cluster_client import shared_client
     from src.config import config
     prompt = (
         "Tu es un correcteur de texte francais specialise dans la correction "
@@ -397,7 +408,7 @@ async def correct_with_ia(text: str, node_url: str = "http://127.0.0.1:11434") -
     ol = config.get_ollama_node("OL1")
     if ol:
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
+            async with shared_client(timeout=5) as client:
                 resp = await client.post(
                     f"{ol.url}/api/chat",
                     json={
@@ -0,0 +1,347 @@
+"""JARVIS GPU Telemetry — Background sampler with a shared, versioned snapshot.
+
+Flow:
+  source (NVML | nvidia-smi --loop persistant | fake) -> thread d'echantillonnage
+  -> snapshot partage (version, timestamp, gpus) + historique glissant par GPU
+  -> latest() non bloquant | subscribe() async | history() pour les previsions
+
+Optimizations:
+- Aucun fork sur le chemin des requetes: un seul processus nvidia-smi persistant
+  (ou NVML en memoire), demarre une fois en arriere-plan
+- Lecture du snapshot sans verrou cote appelant (remplacement atomique)
+- Source factice injectable pour tester sans GPU
+"""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+from src.config import config
+
+
+SMI_QUERY = "index,name,memory.used,memory.total,utilization.gpu,temperature.gpu"
+
+
+@dataclass
+class TelemetrySnapshot:
+    version: int
+    timestamp: float
+    gpus: list[dict[str, Any]]
+    source: str
+
+    @property
+    def age_s(self) -> float:
+        return time.time() - self.timestamp
+
+
+def parse_smi_line(line: str) -> dict[str, Any] | None:
+    """Parse one `nvidia-smi --query-gpu=SMI_QUERY --format=csv,noheader,nounits` line."""
+    parts = [p.strip() for p in line.split(",")]
+    if len(parts) < 6 or not parts[0].isdigit():
+        return None
+    try:
+        used, total = int(parts[2]), int(parts[3])
+        util = int(parts[4]) if parts[4].isdigit() else 0
+    except ValueError:
+        return None
+    return _gpu_dict(int(parts[0]), parts[1], used, total, util, int(parts[5]) if parts[5].isdigit() else -1)
+
+
+def _gpu_dict(index: int, name: str, used: int, total: int, util: int, temp: int) -> dict[str, Any]:
+    return {
+        "index": index,
+        "name": name,
+        "vram_used_mb": used,
+        "vram_total_mb": total,
+        "gpu_util": util,
+        "temp_c": temp,
+        "vram_free_mb": total - used,
+        "vram_pct": round(used / max(total, 1) * 100, 1),
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SOURCES — Blocking iterators of GPU lists, one item per tick
+# ═══════════════════════════════════════════════════════════════════════════
+
+class TelemetrySource(ABC):
+    name = "base"
+
+    @abstractmethod
+    def ticks(self, interval: float) -> Iterator[list[dict[str, Any]]]:
+        """Yield one GPU list per tick until closed."""
+
+    def close(self) -> None:
+        pass
+
+
+class NvmlSource(TelemetrySource):
+    """NVML in-process sampling (pynvml / nvidia-ml-py)."""
+    name = "nvml"
+
+    def __init__(self):
+        import pynvml  # ImportError -> source indisponible
+        self._nvml = pynvml
+        pynvml.nvmlInit()
+        self._closed = False
+
+    def ticks(self, interval: float) -> Iterator[list[dict[str, Any]]]:
+        nv = self._nvml
+        while not self._closed:
+            gpus = []
+            for i in range(nv.nvmlDeviceGetCount()):
+                h = nv.nvmlDeviceGetHandleByIndex(i)
+                mem = nv.nvmlDeviceGetMemoryInfo(h)
+                name = nv.nvmlDeviceGetName(h)
+                if isinstance(name, bytes):
+                    name = name.decode("utf-8", "replace")
+                gpus.append(_gpu_dict(
+                    i, name, mem.used // (1024 * 1024), mem.total // (1024 * 1024),
+                    nv.nvmlDeviceGetUtilizationRates(h).gpu,
+                    nv.nvmlDeviceGetTemperature(h, nv.NVML_TEMPERATURE_GPU),
+                ))
+            yield gpus
+            time.sleep(interval)
+
+    def close(self) -> None:
+        self._closed = True
+        try:
+            self._nvml.nvmlShutdown()
+        except Exception:
+            pass
+
+
+class NvidiaSmiLoopSource(TelemetrySource):
+    """One persistent `nvidia-smi --loop-ms` process streaming CSV lines."""
+    name = "nvidia-smi"
+
+    def __init__(self, binary: str = "nvidia-smi"):
+        self.binary = binary
+        self._proc: subprocess.Popen | None = None
+
+    def ticks(self, interval: float) -> Iterator[list[dict[str, Any]]]:
+        flags = subprocess.CREATE_NO_WINDOW if hasattr(subprocess, "CREATE_NO_WINDOW") else 0
+        self._proc = subprocess.Popen(
+            [self.binary, f"--query-gpu={SMI_QUERY}", "--format=csv,noheader,nounits",
+             f"--loop-ms={int(interval * 1000)}"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            encoding="utf-8", errors="replace", creationflags=flags,
+        )
+        batch: list[dict[str, Any]] = []
+        expected: int | None = None  # Nombre de GPU par tick (appris au 1er tick)
+        for line in self._proc.stdout:
+            gpu = parse_smi_line(line)
+            if gpu is None:
+                continue
+            if batch and any(g["index"] == gpu["index"] for g in batch):
+                expected = expected or len(batch)
+                yield batch
+                batch = []
+            batch.append(gpu)
+            if expected and len(batch) == expected:
+                yield batch
+                batch = []
+
+    def close(self) -> None:
+        if self._proc and self._proc.poll() is None:
+            self._proc.terminate()
+
+
+class FakeSource(TelemetrySource):
+    """Scripted source for tests: a list of ticks or a function tick_number -> gpus."""
+    name = "fake"
+
+    def __init__(self, ticks: list[list[dict[str, Any]]] | Callable[[int], list[dict[str, Any]]],
+                 loop: bool = False):
+        self._ticks = ticks
+        self._loop = loop
+        self._closed = False
+
+    @staticmethod
+    def gpu(index: int = 0, temp: int = 60, util: int = 50, used: int = 4000,
+            total: int = 12288, name: str = "Fake GPU") -> dict[str, Any]:
+        return _gpu_dict(index, name, used, total, util, temp)
+
+    def ticks(self, interval: float) -> Iterator[list[dict[str, Any]]]:
+        n = 0
+        while not self._closed:
+            if callable(self._ticks):
+                yield self._ticks(n)
+            elif n < len(self._ticks) or self._loop:
+                yield self._ticks[n % len(self._ticks)]
+            else:
+                return
+            n += 1
+            time.sleep(interval)
+
+    def close(self) -> None:
+        self._closed = True
+
+
+def _default_source() -> TelemetrySource | None:
+    try:
+        return NvmlSource()
+    except Exception:
+        pass
+    if shutil.which("nvidia-smi"):
+        return NvidiaSmiLoopSource()
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVICE
+# ═══════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class GpuTelemetry:
+    source: TelemetrySource | None = None
+    interval: float = field(default_factory=lambda: config.gpu_telemetry_interval)
+    history_len: int = field(default_factory=lambda: config.gpu_telemetry_history)
+    _snapshot: TelemetrySnapshot | None = None
+    _history: dict[int, deque] = field(default_factory=dict)
+    _subscribers: list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = field(default_factory=list)
+    _thread: threading.Thread | None = None
+    _ready: threading.Event = field(default_factory=threading.Event)
+    _stopped: bool = False
+    _started_at: float = 0.0
+    _owns_source: bool = False  # Source par defaut (recreee a chaque demarrage)
+    error: str = ""
+
+    # ── Lifecycle ───────────────────────────────────────────────────────
+
+    def start(self) -> bool:
+        """Start sampling in a daemon thread. Returns False without a GPU source."""
+        if self._thread and self._thread.is_alive():
+            return True
+        if self._thread is not None and self.source is not None:
+            self.source.close()  # Source du run precedent (morte ou arretee)
+            if self._owns_source:
+                self.source = None  # Redemarrage: nouvelle source, jamais la fermee
+        if self.source is None:
+            self.source = _default_source()
+            self._owns_source = self.source is not None
+        if self.source is None:
+            self.error = "aucune source GPU (NVML/nvidia-smi)"
+            return False
+        self._stopped = False
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="gpu-telemetry", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self.source:
+            self.source.close()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self) -> None:
+        try:
+            for gpus in self.source.ticks(self.interval):
+                if self._stopped:
+                    break
+                self._publish(gpus)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._ready.set()  # Debloque wait_first meme en cas d'echec
+
+    def _publish(self, gpus: list[dict[str, Any]]) -> None:
+        now = time.time()
+        version = (self._snapshot.version + 1) if self._snapshot else 1
+        self._snapshot = TelemetrySnapshot(version, now, gpus, self.source.name)
+        for g in gpus:
+            h = self._history.get(g["index"])
+            if h is None:
+                h = self._history[g["index"]] = deque(maxlen=self.history_len)
+            h.append((now, g["temp_c"], g["gpu_util"], g["vram_pct"]))
+        self._ready.set()
+        for loop, queue in list(self._subscribers):
+            try:
+                loop.call_soon_threadsafe(_offer, queue, self._snapshot)
+            except RuntimeError:
+                self._subscribers.remove((loop, queue))  # Boucle fermee
+
+    # ── Read API ────────────────────────────────────────────────────────
+
+    def latest(self) -> TelemetrySnapshot | None:
+        """Most recent snapshot (non-blocking), None before the first tick."""
+        return self._snapshot
+
+    def gpus(self, max_age: float | None = None) -> list[dict[str, Any]]:
+        """GPU list from the latest snapshot; [] if missing or older than max_age."""
+        snap = self._snapshot
+        if snap is None:
+            return []
+        if max_age is not None and snap.age_s > max_age:
+            return []
+        return snap.gpus
+
+    def history(self, index: int) -> list[tuple[float, int, int, float]]:
+        """Rolling (timestamp, temp_c, gpu_util, vram_pct) samples for one GPU."""
+        return list(self._history.get(index, ()))
+
+    def wait_first(self, timeout: float = 3.0) -> TelemetrySnapshot | None:
+        """Block until the first snapshot (boot only, never on the request path)."""
+        self._ready.wait(timeout)
+        return self._snapshot
+
+    async def subscribe(self):
+        """Async iterator of snapshots; slow consumers only see the newest one."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        entry = (loop, queue)
+        self._subscribers.append(entry)
+        try:
+            if self._snapshot:
+                _offer(queue, self._snapshot)
+            while True:
+                yield await queue.get()
+        finally:
+            if entry in self._subscribers:
+                self._subscribers.remove(entry)
+
+
+def _offer(queue: asyncio.Queue, snap: TelemetrySnapshot) -> None:
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(snap)
+
+
+_TELEMETRY: GpuTelemetry | None = None
+
+
+def get_telemetry() -> GpuTelemetry:
+    """Process-wide telemetry service, started on first use."""
+    global _TELEMETRY
+    if _TELEMETRY is None:
+        _TELEMETRY = GpuTelemetry()
+    # (Re)demarrage au plus toutes les 30s: une source qui meurt ne doit pas
+    # transformer chaque requete en fork. Un stop() volontaire n'est jamais annule.
+    if not _TELEMETRY.running and not _TELEMETRY._stopped and (
+        not _TELEMETRY._started_at or time.monotonic() - _TELEMETRY._started_at > 30
+    ):
+        _TELEMETRY.start()
+    return _TELEMETRY
+
+
+def set_telemetry(telemetry: GpuTelemetry) -> None:
+    """Replace the process-wide service (tests, fake source)."""
+    global _TELEMETRY
+    if _TELEMETRY is not None:
+        _TELEMETRY.stop()
+    _TELEMETRY = telemetry
@@ -0,0 +1,357 @@
+"""JARVIS Keep-Warm — Keep the models the router will need resident and hot.
+
+Flow:
+  historique d'actions (data/action_history.json) + requetes reelles
+  -> profil d'activite par heure (requetes/h) x part de chaque (noeud, modele)
+  -> toutes les N s: modeles dont l'expiration approche ET probablement
+     demandes avant expiration -> ping minimal (Ollama: keep_alive sans
+     generation, LM Studio: 1 token) dans la limite du budget horaire
+  -> rapport: probabilite de demarrage a froid par modele + froids observes
+
+Optimizations:
+- Ollama: /api/generate sans prompt charge le modele et fixe keep_alive
+  (aucun token genere), un seul ping couvre keep_warm_ollama_keep_alive
+- Jamais de ping vers un noeud occupe par du trafic reel (il reste chaud
+  tout seul) ni vers un noeud hors ligne (snapshot du moniteur)
+- Recul exponentiel par noeud apres un echec, M1 ignore pendant un delestage
+  thermique, modeles non charges ignores (le chargement reste au placement)
+- Budget glissant par heure: les pings vont aux modeles ou un froid coute le plus
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from src.config import config
+
+
+OLLAMA_DEFAULT_KEEP_ALIVE_S = 300.0  # Ollama decharge apres 5 min sans requete
+COLD_START_S = {"lmstudio": 4.0, "ollama": 2.5}  # Cout d'un froid hors catalogue M1
+
+
+@dataclass
+class WarmTarget:
+    node: str
+    kind: str             # "lmstudio" | "ollama"
+    model: str
+    expires_at: float = 0.0   # 0 = etat inconnu
+    last_request: float = 0.0
+    last_warm: float = 0.0
+    requests: int = 0
+    cold_hits: int = 0
+    warms: int = 0
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.node, self.model
+
+
+def _kind(node: str) -> str | None:
+    if config.get_ollama_node(node):
+        return "ollama"
+    if config.get_node(node):
+        return "lmstudio"
+    return None
+
+
+def _ttl(kind: str) -> float:
+    return OLLAMA_DEFAULT_KEEP_ALIVE_S if kind == "ollama" else config.keep_warm_lms_ttl_s
+
+
+def cold_cost_s(target: WarmTarget) -> float:
+    """Seconds lost when `target` is requested cold."""
+    if target.node == "M1":
+        from src.model_placement import MODEL_FOOTPRINT_GB, cold_load_s
+        if target.model in MODEL_FOOTPRINT_GB:
+            return cold_load_s(target.model)
+    return COLD_START_S[target.kind]
+
+
+def history_timestamps() -> list[float]:
+    """Action timestamps from data/action_history.json (user activity)."""
+    from src.skills import HISTORY_FILE
+    try:
+        history = json.loads(HISTORY_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return []
+    return [float(h["timestamp"]) for h in history if isinstance(h, dict) and h.get("timestamp")]
+
+
+async def _ping(target: WarmTarget, keep_alive_s: float) -> bool:
+    """Cheapest request that keeps `target` loaded (never raises)."""
+    from src.cluster_client import shared_client
+    from src.cluster_startup import WARMUP_PROMPT
+
+    node = config.get_ollama_node(target.node) or config.get_node(target.node)
+    if node is None:
+        return False
+    try:
+        async with shared_client(timeout=config.keep_warm_timeout) as c:
+            if target.kind == "ollama":
+                r = await c.post(f"{node.url}/api/generate", json={
+                    "model": target.model, "keep_alive": f"{int(keep_alive_s)}s", "stream": False,
+                })
+            else:
+                r = await c.post(f"{node.url}/api/v1/chat", json={
+                    "model": target.model, "input": WARMUP_PROMPT, "temperature": 0.0,
+                    "max_output_tokens": 1, "stream": False, "store": False,
+                })
+            r.raise_for_status()
+        return True
+    except Exception:
+        return False
+
+
+class KeepWarmScheduler:
+    """Usage-driven keep-alive pings within an hourly budget."""
+
+    def __init__(self, pinger: Callable[[WarmTarget, float], Awaitable[bool]] | None = None,
+                 history: list[float] | None = None):
+        self.pinger = pinger or _ping
+        self.targets: dict[tuple[str, str], WarmTarget] = {}
+        self._history = history
+        self._hourly: list[float] | None = None
+        self._days = 1.0
+        self._recent: deque[float] = deque(maxlen=5000)  # Requetes reelles (tous modeles)
+        self._warm_log: deque[float] = deque(maxlen=1000)
+        self._node_busy_until: dict[str, float] = {}
+        self._backoff: dict[str, tuple[float, int]] = {}  # noeud -> (reprise, echecs)
+        self._task: asyncio.Task | None = None
+        self.stats = {"warms": 0, "failed": 0, "skipped_busy": 0, "skipped_budget": 0}
+        for node, model in self._defaults():
+            self._target(node, model)
+
+    @staticmethod
+    def _defaults() -> list[tuple[str, str]]:
+        out = [(n.name, n.default_model) for n in config.lm_nodes]
+        out += [(n.name, n.default_model) for n in config.ollama_nodes]
+        return out
+
+    def _target(self, node: str, model: str) -> WarmTarget | None:
+        key = (node, model)
+        if key not in self.targets:
+            kind = _kind(node)
+            if kind is None:
+                return None
+            self.targets[key] = WarmTarget(node, kind, model)
+        return self.targets[key]
+
+    # ── Usage ───────────────────────────────────────────────────────────
+
+    def record(self, node: str, model: str, now: float | None = None) -> None:
+        """Note a real request (it also keeps the model warm)."""
+        now = now or time.time()
+        t = self._target(node, model)
+        if t is None:
+            return
+        if t.expires_at and now > t.expires_at:
+            t.cold_hits += 1
+        t.requests += 1
+        t.last_request = now
+        t.expires_at = now + _ttl(t.kind)
+        self._recent.append(now)
+        self._node_busy_until[node] = now + config.keep_warm_busy_s
+        if self._hourly is not None:
+            self._hourly[time.localtime(now).tm_hour] += 1 / self._days
+        if config.keep_warm_enabled:
+            self._ensure_loop()
+
+    def mark_warm(self, node: str, model: str, now: float | None = None) -> None:
+        """Note a model warmed outside the scheduler (boot warmup)."""
+        now = now or time.time()
+        t = self._target(node, model)
+        if t is not None:
+            t.last_warm = now
+            t.expires_at = now + _ttl(t.kind)
+
+    def _profile(self) -> list[float]:
+        """Expected requests per hour, for each hour of the day."""
+        if self._hourly is None:
+            stamps = self._history if self._history is not None else history_timestamps()
+            stamps = list(stamps) + list(self._recent)
+            self._days = max((max(stamps) - min(stamps)) / 86400, 1.0) if stamps else 1.0
+            self._hourly = [0.0] * 24
+            for ts in stamps:
+                self._hourly[time.localtime(ts).tm_hour] += 1 / self._days
+        return self._hourly
+
+    def rate_per_hour(self, target: WarmTarget, now: float | None = None) -> float:
+        """Expected requests/h for `target` at this hour (activity x model share)."""
+        now = now or time.time()
+        activity = self._profile()[time.localtime(now).tm_hour]
+        total = sum(t.requests for t in self.targets.values())
+        if total:
+            share = target.requests / total
+        else:
+            # Pas encore de requetes: modeles par defaut a parts egales
+            share = 1 / max(len(self.targets), 1)
+        return activity * share
+
+    def p_request(self, target: WarmTarget, horizon_s: float, now: float | None = None) -> float:
+        """Probability of at least one request for `target` within horizon_s (Poisson)."""
+        return 1 - math.exp(-self.rate_per_hour(target, now) * horizon_s / 3600)
+
+    def p_cold(self, target: WarmTarget, now: float | None = None) -> float:
+        """Probability that the next request for `target` finds it cold.
+
+        = probability that no request arrives before the model expires.
+        """
+        now = now or time.time()
+        if not target.expires_at:
+            return 1.0
+        remaining = max(target.expires_at - now, 0.0)
+        rate = self.rate_per_hour(target, now)
+        if rate <= 0:
+            return 1.0
+        return math.exp(-rate * remaining / 3600)
+
+    # ── Decision ────────────────────────────────────────────────────────
+
+    def _budget_left(self, now: float) -> int:
+        while self._warm_log and now - self._warm_log[0] > 3600:
+            self._warm_log.popleft()
+        return config.keep_warm_budget_per_hour - len(self._warm_log)
+
+    def _eligible(self, t: WarmTarget, now: float, snap) -> str:
+        """'' if `t` may be pinged now, else the reason it is skipped."""
+        if now < self._node_busy_until.get(t.node, 0.0):
+            return "occupe"
+        if now < self._backoff.get(t.node, (0.0, 0))[0]:
+            return "recul"
+        if snap is not None:
+            h = snap.nodes.get(t.node)
+            if h is None or not h.online:
+                return "hors ligne"
+            if t.model not in h.loaded and t.model not in h.available:
+                return "absent"
+            if t.kind == "lmstudio" and t.model not in h.loaded:
+                return "non charge"
+        if t.node == "M1":
+            from src.thermal import m1_shed
+            if m1_shed():
+                return "delestage thermique"
+        return ""
+
+    def plan(self, now: float | None = None, snap=None) -> list[WarmTarget]:
+        """Targets to ping this tick, most valuable first, within the budget."""
+        now = now or time.time()
+        horizon = config.keep_warm_interval * 1.5
+        due = []
+        for t in self.targets.values():
+            if t.expires_at and t.expires_at - now > horizon:
+                continue  # Encore chaud au prochain tour
+            keep_for = config.keep_warm_ollama_keep_alive_s if t.kind == "ollama" else _ttl(t.kind)
+            p = self.p_request(t, keep_for, now)
+            if p < config.keep_warm_min_prob:
+                continue
+            reason = self._eligible(t, now, snap)
+            if reason:
+                if reason == "occupe":
+                    self.stats["skipped_busy"] += 1
+                continue
+            due.append((p * cold_cost_s(t), t))
+        due.sort(key=lambda x: -x[0])
+        budget = max(self._budget_left(now), 0)
+        self.stats["skipped_budget"] += max(len(due) - budget, 0)
+        return [t for _v, t in due[:budget]]
+
+    async def tick(self, now: float | None = None) -> list[tuple[WarmTarget, bool]]:
+        """One scheduling round: ping the planned targets concurrently."""
+        from src.cluster_monitor import get_monitor
+        now = now or time.time()
+        chosen = self.plan(now, get_monitor().latest())
+        keep_alive = config.keep_warm_ollama_keep_alive_s
+        results = await asyncio.gather(*(self.pinger(t, keep_alive) for t in chosen))
+        for t, ok in zip(chosen, results):
+            self._warm_log.append(now)
+            if ok:
+                t.warms += 1
+                t.last_warm = now
+                t.expires_at = now + (keep_alive if t.kind == "ollama" else _ttl(t.kind))
+                self._backoff.pop(t.node, None)
+                self.stats["warms"] += 1
+            else:
+                _until, fails = self._backoff.get(t.node, (0.0, 0))
+                delay = min(config.keep_warm_interval * 2 ** fails, 1800)
+                self._backoff[t.node] = (now + delay, fails + 1)
+                self.stats["failed"] += 1
+        return list(zip(chosen, results))
+
+    # ── Background loop ─────────────────────────────────────────────────
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(config.keep_warm_interval)
+            try:
+                await self.tick()
+            except Exception:
+                pass
+
+    def _ensure_loop(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._loop())
+
+    def start(self) -> bool:
+        """Start the periodic loop on the running event loop (idempotent)."""
+        self._ensure_loop()
+        return self._task is not None
+
+    # ── Report ──────────────────────────────────────────────────────────
+
+    def report(self, now: float | None = None) -> list[dict]:
+        now = now or time.time()
+        out = []
+        for t in sorted(self.targets.values(), key=lambda t: -t.requests):
+            out.append({
+                "node": t.node, "model": t.model, "requests": t.requests,
+                "rate_per_hour": round(self.rate_per_hour(t, now), 2),
+                "p_cold": round(self.p_cold(t, now), 3),
+                "warm_for_s": int(max(t.expires_at - now, 0)) if t.expires_at else None,
+                "cold_hits": t.cold_hits, "warms": t.warms,
+            })
+        return out
+
+
+def format_report(sched: KeepWarmScheduler) -> str:
+    """Keep-warm status: cold-start probability per model."""
+    now = time.time()
+    lines = [
+        f"Keep-warm ({'actif' if config.keep_warm_enabled else 'inactif'}): "
+        f"{sched.stats['warms']} pings, {sched.stats['failed']} echecs, "
+        f"budget {max(sched._budget_left(now), 0)}/{config.keep_warm_budget_per_hour} h"
+    ]
+    for r in sched.report(now):
+        warm = f"chaud {r['warm_for_s']}s" if r["warm_for_s"] else "froid/inconnu"
+        cold_rate = f", froids observes {r['cold_hits']}/{r['requests']}" if r["requests"] else ""
+        lines.append(
+            f"  {r['node']}/{r['model']}: P(froid)={r['p_cold']:.0%} | {warm} | "
+            f"{r['rate_per_hour']} req/h{cold_rate}"
+        )
+    return "\n".join(lines)
+
+
+_SCHEDULER: KeepWarmScheduler | None = None
+
+
+def get_keep_warm() -> KeepWarmScheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        _SCHEDULER = KeepWarmScheduler()
+    return _SCHEDULER
+
+
+def set_keep_warm(scheduler: KeepWarmScheduler) -> None:
+    """Replace the process-wide scheduler (tests, fake pinger)."""
+    global _SCHEDULER
+    _SCHEDULER = scheduler
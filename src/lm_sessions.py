@@ -0,0 +1,162 @@
+"""JARVIS LM Sessions — KV-cache prefix reuse via LM Studio stored responses.
+
+Flow:
+  1er appel (noeud, call_type): system_prompt + amorce, store=True -> response_id
+  appels suivants: previous_response_id=response_id, store=False
+    -> le prefixe systeme reste en cache KV, seul le message utilisateur est prefill
+  prompt systeme modifie (ex: data/jarvis_m1_prompt.txt regenere) -> empreinte
+    differente -> session reconstruite
+  session expiree cote serveur (4xx) -> invalidee, appel stateless, re-amorce au suivant
+
+Optimizations:
+- Une session par (noeud, call_type): analyze, classify, voice_correction...
+- Amorce unique protegee par verrou (pas de double prefill en parallele)
+- Prefill mesure par call_type et par mode (stateless vs session) pour comparer
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from src.config import config
+
+
+SESSION_PRIME = "Contexte charge. Reponds uniquement: OK."
+
+
+@dataclass
+class PrefixSession:
+    node: str
+    model: str
+    call_type: str
+    fingerprint: str
+    response_id: str
+    created_at: float
+    uses: int = 0
+
+
+_SESSIONS: dict[tuple[str, str], PrefixSession] = {}
+_LOCKS: dict[tuple[str, str], asyncio.Lock] = {}
+_UNSUPPORTED: set[str] = set()  # Noeuds sans response_id (LM Studio trop ancien)
+
+# call_type -> mode ("stateless" | "session") -> prefill (ms), 50 derniers
+_PREFILL: dict[str, dict[str, list[float]]] = {}
+
+
+def _fingerprint(model: str, system: str) -> str:
+    return hashlib.sha1(f"{model}\n{system}".encode("utf-8")).hexdigest()[:16]
+
+
+def record_prefill(call_type: str, mode: str, data: dict) -> None:
+    """Record prompt-processing time from an LM Studio or Ollama response."""
+    ms = None
+    stats = data.get("stats") or {}
+    if "time_to_first_token_seconds" in stats:
+        ms = float(stats["time_to_first_token_seconds"]) * 1000
+    elif "prompt_eval_duration" in data:  # Ollama: nanosecondes
+        ms = data["prompt_eval_duration"] / 1e6
+    if ms is None:
+        return
+    samples = _PREFILL.setdefault(call_type, {}).setdefault(mode, [])
+    samples.append(ms)
+    if len(samples) > 50:
+        del samples[:-50]
+
+
+def prefill_report() -> dict[str, dict]:
+    """Per call type: avg prefill per mode and the session speedup."""
+    out = {}
+    for call_type, modes in _PREFILL.items():
+        entry = {}
+        for mode, samples in modes.items():
+            if samples:
+                entry[mode] = {"n": len(samples), "avg_ms": round(sum(samples) / len(samples), 1)}
+        if "stateless" in entry and "session" in entry and entry["session"]["avg_ms"] > 0:
+            entry["speedup"] = round(entry["stateless"]["avg_ms"] / entry["session"]["avg_ms"], 2)
+        out[call_type] = entry
+    return out
+
+
+def invalidate_sessions(node: str | None = None) -> int:
+    """Drop cached sessions (all, or one node's). Returns how many were dropped."""
+    keys = [k for k in _SESSIONS if node is None or k[0] == node]
+    for k in keys:
+        del _SESSIONS[k]
+    return len(keys)
+
+
+async def _get_session(
+    node: str, url: str, model: str, call_type: str, system: str, timeout: float | None,
+) -> PrefixSession | None:
+    """Return a live session for this prefix, priming it if needed."""
+    from src.tools import _retry_request
+
+    key = (node, call_type)
+    fp = _fingerprint(model, system)
+    sess = _SESSIONS.get(key)
+    if sess and sess.fingerprint == fp and time.time() - sess.created_at < config.lm_session_ttl:
+        return sess
+    lock = _LOCKS.setdefault(key, asyncio.Lock())
+    async with lock:
+        sess = _SESSIONS.get(key)
+        if sess and sess.fingerprint == fp and time.time() - sess.created_at < config.lm_session_ttl:
+            return sess
+        r = await _retry_request("POST", url, json={
+            "model": model,
+            "input": SESSION_PRIME,
+            "system_prompt": system,
+            "temperature": 0.0,
+            "max_output_tokens": 8,
+            "stream": False,
+            "store": True,
+        }, max_retries=0, timeout=timeout)
+        data = r.json()
+        record_prefill(call_type, "stateless", data)  # L'amorce = prefill complet (reference "avant")
+        response_id = data.get("response_id")
+        if not response_id:
+            _UNSUPPORTED.add(node)
+            return None
+        sess = PrefixSession(node, model, call_type, fp, response_id, time.time())
+        _SESSIONS[key] = sess
+        return sess
+
+
+async def session_chat(
+    node: str, url: str, payload: dict, call_type: str, timeout: float | None = None,
+) -> dict:
+    """Send an LM Studio chat reusing the stored system prefix for call_type.
+
+    `payload` is a regular /api/v1/chat body with `system_prompt`. Falls back
+    to a stateless call if sessions are unsupported or the session expired.
+    """
+    from src.tools import _retry_request
+
+    system = payload.get("system_prompt", "")
+    if system and node not in _UNSUPPORTED:
+        try:
+            sess = await _get_session(node, url, payload["model"], call_type, system, timeout)
+        except httpx.HTTPStatusError:
+            sess = None
+        if sess:
+            body = {k: v for k, v in payload.items() if k != "system_prompt"}
+            body["previous_response_id"] = sess.response_id
+            body["store"] = False
+            try:
+                r = await _retry_request("POST", url, json=body, max_retries=0, timeout=timeout)
+                sess.uses += 1
+                data = r.json()
+                record_prefill(call_type, "session", data)
+                return data
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code >= 500:
+                    raise
+                _SESSIONS.pop((node, call_type), None)  # Session perdue (redemarrage LM Studio)
+    r = await _retry_request("POST", url, json=payload, max_retries=0, timeout=timeout)
+    data = r.json()
+    record_prefill(call_type, "stateless", data)
+    return data
@@ -1,4 +1,4 @@
-"""JARVIS MCP Server — Standalone stdio server (69 tools).
+"""JARVIS MCP Server — Standalone stdio server (70 tools).
 
 Run directly: python -m src.mcp_server
 Used by the Claude Agent SDK as an external subprocess MCP server.
@@ -19,7 +19,10 @@ from mcp.types import Tool, TextContent
 # ── Config import (inline to avoid circular deps) ──────────────────────────
 
 sys.path.insert(0, str(__import__("pathlib").Path(__file__).resolve().parent.parent))
+from src.cluster_client import shared_client
 from src.config import config, SCRIPTS, PATHS
+from src.metrics import REGISTRY, timer
+from src.profiler import profile
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -64,7 +67,7 @@ async def handle_lm_query(args: dict) -> list[TextContent]:
         return _error(f"Noeud inconnu: {args.get('node')}")
     model = args.get("model", node.default_model)
     try:
-        async with httpx.AsyncClient(timeout=120) as c:
+        async with shared_client(timeout=120) as c:
             r = await c.post(f"{node.url}/api/v1/chat", json={
                 "model": model,
                 "input": args["prompt"],
@@ -86,7 +89,7 @@ async def handle_lm_models(args: dict) -> list[TextContent]:
     if not url:
         return _error("Noeud inconnu")
     try:
-        async with httpx.AsyncClient(timeout=10) as c:
+        async with shared_client(timeout=10) as c:
             r = await c.get(f"{url}/api/v1/models")
             r.raise_for_status()
             models = [m["key"] for m in r.json().get("models", []) if m.get("loaded_instances")]
@@ -96,72 +99,39 @@ async def handle_lm_models(args: dict) -> list[TextContent]:
 
 
 async def handle_lm_cluster_status(args: dict) -> list[TextContent]:
-    results, online = [], 0
-    total_nodes = len(config.lm_nodes) + len(config.ollama_nodes)
-    async with httpx.AsyncClient(timeout=5) as c:
-        for n in config.lm_nodes:
-            try:
-                r = await c.get(f"{n.url}/api/v1/models")
-                r.raise_for_status()
-                cnt = len([m for m in r.json().get("models", []) if m.get("loaded_instances")])
-                results.append(f"  {n.name} ({n.role}): ONLINE — {cnt} modeles, {n.gpus} GPU, {n.vram_gb}GB VRAM")
-                online += 1
-            except Exception:
-                results.append(f"  {n.name} ({n.role}): OFFLINE")
-        for n in config.ollama_nodes:
-            try:
-                r = await c.get(f"{n.url}/api/tags")
-                r.raise_for_status()
-                cnt = len(r.json().get("models", []))
-                results.append(f"  {n.name} ({n.role}): ONLINE — {cnt} modeles [Ollama]")
-                online += 1
-            except Exception:
-                results.append(f"  {n.name} ({n.role}): OFFLINE [Ollama]")
-    header = f"Cluster: {online}/{total_nodes} noeuds en ligne"
+    from src.circuit_breaker import get_breaker
+    from src.cluster_monitor import get_monitor
+    snap = await get_monitor().snapshot()
+    results = []
+    for h in snap.nodes.values():
+        circuit = get_breaker(h.name).summary()
+        if h.kind == "ollama":
+            if h.online:
+                results.append(f"  {h.name} ({h.role}): ONLINE — {len(h.loaded)} modeles [Ollama] — circuit {circuit}")
+            else:
+                results.append(f"  {h.name} ({h.role}): OFFLINE [Ollama] — circuit {circuit}")
+            continue
+        n = config.get_node(h.name)
+        if h.online:
+            results.append(f"  {h.name} ({h.role}): ONLINE — {len(h.loaded)} modeles, {n.gpus} GPU, {n.vram_gb}GB VRAM — circuit {circuit}")
+        else:
+            results.append(f"  {h.name} ({h.role}): OFFLINE — circuit {circuit}")
+    header = f"Cluster: {snap.online}/{len(snap.nodes)} noeuds en ligne"
     return _text(f"{header}\n" + "\n".join(results))
 
 
 async def handle_consensus(args: dict) -> list[TextContent]:
+    from src.tools import format_consensus, quorum_consensus
     prompt = args["prompt"]
-    nodes = args.get("nodes", "M1,M2,M3").split(",")
-    responses = []
-    async with httpx.AsyncClient(timeout=60) as c:
-        for name in nodes:
-            name = name.strip()
-            # Check Ollama nodes first
-            ol_node = config.get_ollama_node(name)
-            if ol_node:
-                try:
-                    r = await c.post(f"{ol_node.url}/api/chat", json={
-                        "model": ol_node.default_model,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "stream": False, "think": False,
-                        "options": {"temperature": 0.3, "num_predict": 2048},
-                    })
-                    r.raise_for_status()
-                    text = r.json()["message"]["content"]
-                    responses.append(f"[{ol_node.name}/Ollama] {text}")
-                except Exception as e:
-                    responses.append(f"[{ol_node.name}/Ollama] ERREUR: {e}")
-                continue
-            # LM Studio nodes
-            node = config.get_node(name)
-            if not node:
-                continue
-            try:
-                r = await c.post(f"{node.url}/api/v1/chat", json={
-                    "model": node.default_model,
-                    "input": prompt,
-                    "temperature": 0.3, "max_output_tokens": 2048,
-                    "stream": False, "store": False,
-                })
-                r.raise_for_status()
-                from src.tools import extract_lms_output
-                text = extract_lms_output(r.json())
-                responses.append(f"[{node.name}] {text}")
-            except Exception as e:
-                responses.append(f"[{node.name}] ERREUR: {e}")
-    return _text(f"Consensus ({len(responses)} sources):\n" + "\n---\n".join(responses))
+    names = [n.strip() for n in args.get("nodes", "M1,M2,OL1").split(",") if n.strip()]
+    result = await quorum_consensus(
+        prompt, names,
+        quorum=int(args.get("quorum") or 0),
+        agreement=float(args.get("agreement") or 0.0),
+        deadline=float(args["deadline"]) if args.get("deadline") else None,
+        max_tokens=2048, temperature=0.3,
+    )
+    return _text(format_consensus(result))
 
 
 # ── Ollama handlers ─────────────────────────────────────────────────────
@@ -172,7 +142,7 @@ async def handle_ollama_query(args: dict) -> list[TextContent]:
         return _error("Noeud Ollama OL1 non configure")
     model = args.get("model", node.default_model)
     try:
-        async with httpx.AsyncClient(timeout=120) as c:
+        async with shared_client(timeout=120) as c:
             r = await c.post(f"{node.url}/api/chat", json={
                 "model": model,
                 "messages": [{"role": "user", "content": args["prompt"]}],
@@ -187,12 +157,26 @@ async def handle_ollama_query(args: dict) -> list[TextContent]:
         return _error(str(e))
 
 
+async def handle_lm_batch_query(args: dict) -> list[TextContent]:
+    from src.batch_query import batch_query, format_batch_report
+    from src.tools import _batch_source
+    nodes = [n.strip() for n in args.get("nodes", "").split(",") if n.strip()] or None
+    try:
+        report = await batch_query(
+            _batch_source(args), output=args.get("output") or None, nodes=nodes,
+            resume=args.get("resume", True), max_tokens=args.get("max_tokens") or None,
+        )
+    except (OSError, ValueError) as e:
+        return _error(f"Lot impossible: {e}")
+    return _text(format_batch_report(report))
+
+
 async def handle_ollama_models(args: dict) -> list[TextContent]:
     node = config.get_ollama_node("OL1")
     if not node:
         return _error("Noeud Ollama OL1 non configure")
     try:
-        async with httpx.AsyncClient(timeout=10) as c:
+        async with shared_client(timeout=10) as c:
             r = await c.get(f"{node.url}/api/tags")
             r.raise_for_status()
             models = [m["name"] for m in r.json().get("models", [])]
@@ -207,7 +191,7 @@ async def handle_ollama_pull(args: dict) -> list[TextContent]:
         return _error("Noeud Ollama OL1 non configure")
     model_name = args["model_name"]
     try:
-        async with httpx.AsyncClient(timeout=600) as c:
+        async with shared_client(timeout=600) as c:
             r = await c.post(f"{node.url}/api/pull", json={"name": model_name, "stream": False})
             r.raise_for_status()
             return _text(f"Modele '{model_name}' telecharge.")
@@ -220,7 +204,7 @@ async def handle_ollama_status(args: dict) -> list[TextContent]:
     if not node:
         return _error("Noeud Ollama OL1 non configure")
     try:
-        async with httpx.AsyncClient(timeout=5) as c:
+        async with shared_client(timeout=5) as c:
             r = await c.get(f"{node.url}/api/tags")
             r.raise_for_status()
             data = r.json()
@@ -629,11 +613,12 @@ async def handle_brain_learn(args: dict) -> list[TextContent]:
 # ═══════════════════════════════════════════════════════════════════════════
 
 TOOL_DEFINITIONS: list[tuple[str, str, dict, Any]] = [
-    # LM Studio (4)
+    # LM Studio (5)
     ("lm_query", "Interroger un noeud LM Studio.", {"prompt": "string", "node": "string", "model": "string"}, handle_lm_query),
     ("lm_models", "Lister les modeles charges sur un noeud.", {"node": "string"}, handle_lm_models),
     ("lm_cluster_status", "Sante de tous les noeuds du cluster (LM Studio + Ollama).", {}, handle_lm_cluster_status),
-    ("consensus", "Consensus multi-IA sur une question.", {"prompt": "string", "nodes": "string"}, handle_consensus),
+    ("consensus", "Consensus multi-IA avec arret anticipe (quorum k, seuil d'accord, deadline par noeud).", {"prompt": "string", "nodes": "string", "quorum": "number", "agreement": "number", "deadline": "number"}, handle_consensus),
+    ("lm_batch_query", "Requetes en lot sur le cluster (slots paralleles, reprise sur checkpoint JSONL).", {"prompts": "string", "file": "string", "nodes": "string", "output": "string", "resume": "boolean", "max_tokens": "number"}, handle_lm_batch_query),
     # Ollama Cloud (4)
     ("ollama_query", "Interroger Ollama (local ou cloud).", {"prompt": "string", "model": "string"}, handle_ollama_query),
     ("ollama_models", "Lister les modeles Ollama disponibles.", {}, handle_ollama_models),
@@ -770,13 +755,20 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     handler = HANDLERS.get(name)
     if not handler:
         return _error(f"Outil inconnu: {name}")
-    try:
-        return await handler(arguments)
-    except Exception as e:
-        return _error(f"{name}: {e}")
+    with timer("jarvis_tool_duration_ms", "jarvis_tool_calls_total", tool=name, server="mcp") as outcome, \
+            profile(f"mcp:{name}"):
+        try:
+            result = await handler(arguments)
+        except Exception as e:
+            outcome["status"] = "error"
+            return _error(f"{name}: {e}")
+        if result and result[0].text.startswith("ERREUR"):
+            outcome["status"] = "error"
+        return result
 
 
 async def main():
+    REGISTRY.enable_export()  # Serveur long: metriques lues par le dashboard
     async with stdio_server() as (read_stream, write_stream):
         await app.run(read_stream, write_stream, app.create_initialization_options())
 
@@ -0,0 +1,330 @@
+"""JARVIS Metrics — Counters, gauges and fixed-bucket histograms.
+
+Flow:
+  code instrumente -> REGISTRY.counter/gauge/histogram(nom).inc/set/observe(**labels)
+  -> snapshot JSON (lm_perf_metrics format=json, p50/p95/p99 par serie)
+  -> fichier data/metrics/<processus>.json toutes les N s (thread daemon),
+     seulement si le point d'entree l'active (enable_export: main.py
+     REPL/voix/hybride, serveur MCP) — jamais pour les tests et scripts
+  -> dashboard/server.py /metrics: texte Prometheus de tous les processus
+     (voix, MCP, orchestrateur...) avec un label proc
+
+Optimizations:
+- Histogrammes a buckets fixes: observe() = une recherche binaire + 3
+  additions sous verrou, memoire constante quel que soit le trafic
+- p95 calcule a la lecture (interpolation dans le bucket, comme
+  histogram_quantile de Prometheus), jamais sur le chemin chaud
+- Export fichier hors du chemin chaud (thread), ecriture atomique
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from src.config import config
+
+
+METRICS_DIR = Path(__file__).resolve().parent.parent / "data" / "metrics"
+
+# Millisecondes: du matching local (<5ms) a l'inference M1 longue (>60s)
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, lock: threading.Lock):
+        self.name = name
+        self.help = help
+        self._lock = lock
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, lock: threading.Lock):
+        super().__init__(name, help, lock)
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, value: float = 1.0, **labels: Any) -> None:
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def _series(self) -> list[dict]:
+        return [{"labels": dict(k), "value": v} for k, v in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, lock: threading.Lock,
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        super().__init__(name, help, lock)
+        self.buckets = tuple(sorted(buckets))
+        self._series_data: dict[LabelKey, list] = {}  # [counts par bucket (+Inf), sum, count]
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series_data.get(key)
+            if s is None:
+                s = self._series_data[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            s[0][i] += 1
+            s[1] += value
+            s[2] += 1
+
+    def _series(self) -> list[dict]:
+        return [
+            {"labels": dict(k), "counts": list(s[0]), "sum": s[1], "count": s[2]}
+            for k, s in self._series_data.items()
+        ]
+
+
+def quantile(buckets: tuple[float, ...] | list[float], counts: list[int], q: float) -> float:
+    """Quantile estimate from per-bucket counts (linear inside the bucket)."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for i, c in enumerate(counts):
+        if seen + c >= rank and c:
+            if i == len(buckets):
+                return float(buckets[-1])  # Bucket +Inf: borne connue la plus haute
+            lower = buckets[i - 1] if i else 0.0
+            return lower + (buckets[i] - lower) * (rank - seen) / c
+        seen += c
+    return float(buckets[-1])
+
+
+class Registry:
+    """Process-wide metric families, exported as JSON or Prometheus text."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+        self._flusher: threading.Thread | None = None
+
+    def _get(self, cls, name: str, help: str, **kwargs) -> Any:
+        m = self._metrics.get(name)
+        if m is None:
+            with self._lock:
+                m = self._metrics.get(name)
+                if m is None:
+                    m = self._metrics[name] = cls(name, help, self._lock, **kwargs)
+        return m
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str = "") -> Gauge:
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name: str, help: str = "",
+                  buckets: tuple[float, ...] = DEFAULT_BUCKETS_MS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    # ── Export ──────────────────────────────────────────────────────────
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-able copy of every metric (histograms carry their buckets)."""
+        with self._lock:
+            metrics = {}
+            for name, m in self._metrics.items():
+                entry: dict[str, Any] = {"type": m.kind, "help": m.help, "series": m._series()}
+                if isinstance(m, Histogram):
+                    entry["buckets"] = list(m.buckets)
+                metrics[name] = entry
+        return {"process": process_name(), "updated": time.time(), "metrics": metrics}
+
+    def render(self) -> str:
+        return render_prometheus([({}, self.snapshot())])
+
+    # ── File export (lu par le dashboard) ───────────────────────────────
+
+    def flush(self) -> None:
+        if not self._metrics:
+            return
+        try:
+            METRICS_DIR.mkdir(parents=True, exist_ok=True)
+            path = METRICS_DIR / f"{process_name()}.json"
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def enable_export(self) -> None:
+        """Export to data/metrics/ periodically and at exit (long-running processes only)."""
+        if self._flusher is not None or config.metrics_flush_interval <= 0:
+            return
+
+        def _run():
+            while True:
+                time.sleep(config.metrics_flush_interval)
+                self.flush()
+
+        self._flusher = threading.Thread(target=_run, name="metrics-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+
+
+REGISTRY = Registry()
+
+
+_PROCESS: str | None = None
+
+
+def process_name() -> str:
+    """`<script>-<pid>`: the series label and export file name of this process."""
+    global _PROCESS
+    if _PROCESS is None:
+        stem = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else ""
+        _PROCESS = f"{stem or 'python'}-{os.getpid()}"
+    return _PROCESS
+
+
+@contextmanager
+def timer(histogram: str, counter: str | None = None, **labels: Any) -> Iterator[dict]:
+    """Time a block into `histogram` (ms); count it in `counter` by status.
+
+    The yielded dict can override the status (e.g. a tool returning is_error).
+    """
+    outcome = {"status": "ok"}
+    t0 = time.perf_counter()
+    try:
+        yield outcome
+    except asyncio.CancelledError:
+        outcome["status"] = "cancelled"  # Perdant d'un hedge, deadline de consensus
+        raise
+    except BaseException:
+        outcome["status"] = "error"
+        raise
+    finally:
+        REGISTRY.histogram(histogram).observe((time.perf_counter() - t0) * 1000, **labels)
+        if counter:
+            REGISTRY.counter(counter).inc(status=outcome["status"], **labels)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# READERS — Prometheus text, p95 tables, other processes
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+def _num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def render_prometheus(snapshots: list[tuple[dict[str, str], dict[str, Any]]]) -> str:
+    """Prometheus text format for (extra labels, snapshot) pairs."""
+    families: dict[str, tuple[dict, list[tuple[dict, dict]]]] = {}
+    for extra, snap in snapshots:
+        for name, m in snap.get("metrics", {}).items():
+            entry = families.setdefault(name, (m, []))
+            for series in m["series"]:
+                entry[1].append(({**series["labels"], **extra}, series))
+    lines = []
+    for name, (meta, series_list) in sorted(families.items()):
+        if meta.get("help"):
+            lines.append(f"# HELP {name} {meta['help']}")
+        lines.append(f"# TYPE {name} {meta['type']}")
+        for labels, s in series_list:
+            if meta["type"] != "histogram":
+                lines.append(f"{name}{_fmt_labels(labels)} {_num(s['value'])}")
+                continue
+            cumulative = 0
+            for bound, c in zip(list(meta["buckets"]) + ["+Inf"], s["counts"]):
+                cumulative += c
+                le = bound if bound == "+Inf" else _num(bound)
+                lines.append(f"{name}_bucket{_fmt_labels({**labels, 'le': le})} {cumulative}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {_num(s['sum'])}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {s['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def latency_table(snap: dict[str, Any], name: str) -> list[dict[str, Any]]:
+    """Per-series count/avg/p50/p95/p99 of a histogram, slowest p95 first."""
+    m = snap.get("metrics", {}).get(name)
+    if not m or m["type"] != "histogram":
+        return []
+    rows = []
+    for s in m["series"]:
+        if not s["count"]:
+            continue
+        rows.append({
+            "labels": s["labels"], "count": s["count"],
+            "avg_ms": round(s["sum"] / s["count"], 1),
+            **{f"p{int(q * 100)}_ms": round(quantile(m["buckets"], s["counts"], q), 1)
+               for q in (0.5, 0.95, 0.99)},
+        })
+    rows.sort(key=lambda r: -r["p95_ms"])
+    return rows
+
+
+def json_report() -> dict[str, Any]:
+    """Snapshot with p50/p95/p99 added to each histogram series."""
+    snap = REGISTRY.snapshot()
+    for name, m in snap["metrics"].items():
+        if m["type"] == "histogram":
+            m["quantiles"] = latency_table(snap, name)
+    return snap
+
+
+def process_snapshots(max_age: float | None = None) -> list[tuple[dict[str, str], dict[str, Any]]]:
+    """Snapshots of every JARVIS process (own registry live, others from files)."""
+    max_age = config.metrics_stale_s if max_age is None else max_age
+    own = process_name()
+    out = [({"proc": own}, REGISTRY.snapshot())]
+    if not METRICS_DIR.exists():
+        return out
+    now = time.time()
+    for path in METRICS_DIR.glob("*.json"):
+        if path.stem == own:
+            continue
+        try:
+            age = now - path.stat().st_mtime
+            if age > 86400:
+                path.unlink(missing_ok=True)  # Processus mort depuis longtemps
+                continue
+            if age > max_age:
+                continue
+            snap = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        out.append(({"proc": path.stem}, snap))
+    return out
@@ -0,0 +1,164 @@
+"""JARVIS Model Availability — Which Ollama models can actually answer.
+
+Flow:
+  /api/tags (ou snapshot du moniteur si assez recent) -> modeles installes
+  + reponses observees: 404 -> modele absent, 401 -> cloud non authentifie
+  -> resolve(modele) -> modele demande OU repli (qwen3:1.7b) AVANT l'envoi
+  -> verdicts avec TTL: expires -> /api/tags relu, modele re-essaye
+
+Optimizations:
+- Plus d'aller-retour perdu par appel cloud quand le modele n'est pas
+  installe ou que `ollama signin` manque
+- Un 401 sur un modele :cloud vaut pour tous (la connexion est globale)
+- Rafraichissement unique partage: les 3 sous-agents paralleles attendent
+  la meme lecture de /api/tags au lieu d'en lancer 3
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+from src.config import config
+
+
+FALLBACK_MODEL = "qwen3:1.7b"
+REFRESH_BACKOFF_S = 30.0  # Apres un /api/tags en echec (OL1 hors ligne)
+_CLOUD_AUTH = "*:cloud"   # Verdict partage par tous les modeles cloud
+
+
+@dataclass
+class Verdict:
+    reason: str
+    expires_at: float
+
+
+def is_cloud(model: str) -> bool:
+    return model.endswith(":cloud") or model.endswith("-cloud")
+
+
+class ModelAvailability:
+    """TTL cache of installed Ollama models and observed 401/404 failures."""
+
+    def __init__(self, node: str = "OL1"):
+        self.node = node
+        self._installed: set[str] | None = None
+        self._tags_at = 0.0
+        self._failed_at = 0.0
+        self._verdicts: dict[str, Verdict] = {}
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+        self.stats = {"refreshes": 0, "fallbacks": 0, "avoided": 0}
+
+    # ── Sources ─────────────────────────────────────────────────────────
+
+    def update_tags(self, models: list[str], now: float | None = None) -> None:
+        """Installed model list (from /api/tags or a monitor probe)."""
+        self._installed = set(models)
+        self._tags_at = now or time.time()
+
+    def _tags_fresh(self, now: float) -> bool:
+        return self._installed is not None and now - self._tags_at <= config.model_cache_ttl_s
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Reload installed models if stale; concurrent callers share one request."""
+        now = time.time()
+        if not force and self._tags_fresh(now):
+            return True
+        # Le moniteur sonde deja /api/tags: on reprend son resultat s'il est frais
+        from src.cluster_monitor import get_monitor
+        snap = get_monitor().latest()
+        health = snap.nodes.get(self.node) if snap else None
+        if not force and health and health.online and snap.age_s <= config.model_cache_ttl_s:
+            self.update_tags(health.available, snap.timestamp)
+            return True
+        if not force and now - self._failed_at < REFRESH_BACKOFF_S:
+            return False
+
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        async with self._lock:
+            if self._tags_at > now or self._failed_at > now:
+                # Un autre appelant vient de rafraichir (ou d'echouer) pendant l'attente
+                return self._tags_at > now
+            node = config.get_ollama_node(self.node)
+            if node is None:
+                return False
+            from src.cluster_client import shared_client
+            try:
+                async with shared_client(timeout=config.health_timeout) as c:
+                    r = await c.get(f"{node.url}/api/tags")
+                    r.raise_for_status()
+                self.update_tags([m["name"] for m in r.json().get("models", []) if "name" in m])
+                self.stats["refreshes"] += 1
+                return True
+            except Exception:
+                self._failed_at = time.time()
+                return False
+
+    # ── Observations ────────────────────────────────────────────────────
+
+    def mark_failure(self, model: str, status_code: int) -> None:
+        """Record a 404 (not installed) or 401 (cloud not authenticated)."""
+        expires = time.time() + config.model_unavailable_ttl_s
+        if status_code == 401 and is_cloud(model):
+            self._verdicts[_CLOUD_AUTH] = Verdict("cloud non authentifie (ollama signin)", expires)
+        elif status_code in (401, 404):
+            self._verdicts[model] = Verdict(f"absent ({status_code})", expires)
+            if self._installed is not None:
+                self._installed.discard(model)
+
+    def mark_ok(self, model: str) -> None:
+        self._verdicts.pop(model, None)
+        if is_cloud(model):
+            self._verdicts.pop(_CLOUD_AUTH, None)
+
+    def invalidate(self, model: str | None = None) -> None:
+        """Forget verdicts (e.g. after `ollama pull` or `ollama signin`)."""
+        if model is None:
+            self._verdicts.clear()
+        else:
+            self.mark_ok(model)
+        self._tags_at = 0.0
+
+    # ── Resolution ──────────────────────────────────────────────────────
+
+    def unavailable_reason(self, model: str, now: float | None = None) -> str:
+        """Why `model` cannot answer right now ('' = available or unknown)."""
+        now = now or time.time()
+        for key in (model, _CLOUD_AUTH if is_cloud(model) else None):
+            v = self._verdicts.get(key) if key else None
+            if v and now < v.expires_at:
+                return v.reason
+            if v:
+                del self._verdicts[key]  # Expire: on re-essaiera le modele
+        if self._tags_fresh(now) and model not in self._installed:
+            return "non installe"
+        return ""
+
+    async def resolve(self, model: str, fallback: str = FALLBACK_MODEL) -> tuple[str, str]:
+        """(model to call, fallback reason or ''). Unknown state keeps `model`."""
+        if model == fallback:
+            return model, ""
+        await self.refresh()
+        reason = self.unavailable_reason(model)
+        if reason:
+            self.stats["avoided"] += 1
+            return fallback, reason
+        return model, ""
+
+    def summary(self) -> dict[str, str]:
+        now = time.time()
+        return {k: v.reason for k, v in self._verdicts.items() if now < v.expires_at}
+
+
+_AVAILABILITY: ModelAvailability | None = None
+
+
+def get_availability() -> ModelAvailability:
+    global _AVAILABILITY
+    if _AVAILABILITY is None:
+        _AVAILABILITY = ModelAvailability()
+    return _AVAILABILITY
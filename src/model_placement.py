@@ -0,0 +1,360 @@
+"""JARVIS Model Placement — VRAM-aware residency scheduler for M1 models.
+
+Flow:
+  requetes M1 (modele) -> demande glissante par modele (decroissance exp.)
+  plan(voulu) -> VRAM libre (telemetrie GPU, sinon catalogue) -> garde les
+  modeles requis, charge le voulu, evince les moins rentables (valeur / GB,
+  puis LRU), precharge les modeles a la demande dont l'usage est prevu
+  apply(plan) -> backend lms (CLI reel ou MockLmsBackend)
+
+Optimizations:
+- Plan pur et affichable (dry-run) avant toute operation lms
+- Valeur d'un modele = demande prevue x cout d'un chargement a froid:
+  on n'evince pas un modele cher a recharger qui sert encore
+- Prechargement seulement si la VRAM est libre (jamais d'eviction pour speculer
+  sur un modele moins demande)
+- Backend injectable: MockLmsBackend simule VRAM, durees et echecs
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from src.config import config
+
+
+# Poids sur disque / VRAM des modeles M1 (GB, quantization chargee)
+MODEL_FOOTPRINT_GB: dict[str, float] = {
+    "qwen/qwen3-30b-a3b-2507": 18.56,
+    "qwen/qwen3-coder-30b": 18.63,
+    "mistralai/devstral-small-2-2512": 15.21,
+    "openai/gpt-oss-20b": 12.11,
+    "text-embedding-nomic-embed-text-v1.5": 0.08,
+}
+
+LOAD_GB_PER_S = 1.2  # Debit observe d'un chargement lms (disque -> 6 GPU)
+
+
+def footprint_gb(model: str) -> float:
+    """VRAM needed by a model once loaded (weights + KV cache overhead)."""
+    return MODEL_FOOTPRINT_GB.get(model, config.placement_default_footprint_gb) + config.placement_kv_overhead_gb
+
+
+def cold_load_s(model: str) -> float:
+    """Estimated cold-load latency, the cost avoided by keeping it resident."""
+    return 5.0 + MODEL_FOOTPRINT_GB.get(model, config.placement_default_footprint_gb) / LOAD_GB_PER_S
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# BACKENDS — lms CLI and an in-memory mock
+# ═══════════════════════════════════════════════════════════════════════════
+
+class LmsBackend:
+    """Real backend: LM Studio `lms` CLI on M1 (blocking, run in a thread)."""
+    name = "lms"
+
+    def loaded(self) -> list[str]:
+        from src.cluster_startup import _lms_ps_ids
+        return _lms_ps_ids()
+
+    def load(self, model: str, gpu: str = "max", context: int = 16384, parallel: int = 2) -> bool:
+        from src.cluster_startup import _lms_load
+        return _lms_load(model, gpu, context, parallel)
+
+    def unload(self, model: str) -> bool:
+        from src.cluster_startup import _lms_unload
+        return _lms_unload(model)
+
+    def free_vram_gb(self) -> float | None:
+        """Free VRAM on M1 from the GPU sampler, None if unknown."""
+        from src.gpu_telemetry import get_telemetry
+        gpus = get_telemetry().gpus(max_age=config.gpu_telemetry_max_age)
+        if not gpus:
+            return None
+        return sum(g["vram_free_mb"] for g in gpus) / 1024
+
+
+class MockLmsBackend(LmsBackend):
+    """Simulated M1 for tests and dry runs: VRAM accounting + operation log."""
+    name = "mock"
+
+    def __init__(self, capacity_gb: float = 46.0, loaded: list[str] | None = None,
+                 load_time_s: float = 0.0, fail: set[str] | None = None):
+        self.capacity_gb = capacity_gb
+        self._loaded = list(loaded or [])
+        self.load_time_s = load_time_s
+        self.fail = set(fail or ())
+        self.ops: list[tuple[str, str]] = []
+
+    def loaded(self) -> list[str]:
+        return list(self._loaded)
+
+    def used_gb(self) -> float:
+        return sum(footprint_gb(m) for m in self._loaded)
+
+    def free_vram_gb(self) -> float | None:
+        return self.capacity_gb - self.used_gb()
+
+    def load(self, model: str, gpu: str = "max", context: int = 16384, parallel: int = 2) -> bool:
+        self.ops.append(("load", model))
+        if self.load_time_s:
+            time.sleep(self.load_time_s)
+        if model in self.fail or footprint_gb(model) > self.free_vram_gb() + 1e-6:
+            return False
+        if model not in self._loaded:
+            self._loaded.append(model)
+        return True
+
+    def unload(self, model: str) -> bool:
+        self.ops.append(("unload", model))
+        if model in self._loaded:
+            self._loaded.remove(model)
+        return True
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PLANNER
+# ═══════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class PlacementPlan:
+    wanted: str | None
+    loads: list[str] = field(default_factory=list)
+    unloads: list[str] = field(default_factory=list)
+    keep: list[str] = field(default_factory=list)
+    free_before_gb: float = 0.0
+    free_after_gb: float = 0.0
+    reasons: list[str] = field(default_factory=list)
+    feasible: bool = True
+
+    @property
+    def empty(self) -> bool:
+        return not self.loads and not self.unloads
+
+
+class PlacementScheduler:
+    """Decide which on-demand M1 models stay resident."""
+
+    def __init__(self, backend: LmsBackend | None = None, capacity_gb: float | None = None):
+        from src.cluster_startup import M1_AVAILABLE, M1_BLACKLIST, M1_REQUIRED
+        self.backend = backend or LmsBackend()
+        m1 = config.get_node("M1")
+        self.capacity_gb = capacity_gb or (getattr(self.backend, "capacity_gb", None)
+                                           or (m1.vram_gb if m1 else 46))
+        self.required = set(M1_REQUIRED)
+        self.on_demand = set(M1_AVAILABLE)
+        self.blacklist = set(M1_BLACKLIST)
+        self.last_used: dict[str, float] = {}
+        self._requests: deque[tuple[float, str]] = deque(maxlen=2000)
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.stats = {"loads": 0, "unloads": 0, "preloads": 0, "failed": 0}
+
+    # ── Demand ──────────────────────────────────────────────────────────
+
+    def record_use(self, model: str, now: float | None = None) -> None:
+        """Note one request for `model` (M1)."""
+        now = now or time.time()
+        self.last_used[model] = now
+        self._requests.append((now, model))
+        if config.placement_auto:
+            self._ensure_loop()
+
+    def record_role(self, role: str) -> None:
+        """Note a request for a `config.models` role (e.g. coding_m1)."""
+        model = config.models.get(role)
+        if model:
+            self.record_use(model)
+
+    def demand(self, model: str, now: float | None = None) -> float:
+        """Decayed request count (half-life = placement_window_s / 2)."""
+        now = now or time.time()
+        half_life = config.placement_window_s / 2
+        return sum(
+            math.exp(-math.log(2) * (now - ts) / half_life)
+            for ts, m in self._requests
+            if m == model and now - ts <= config.placement_window_s
+        )
+
+    def request_mix(self) -> dict[str, float]:
+        """Decayed demand per `config.models` role."""
+        return {role: round(self.demand(model), 2) for role, model in config.models.items()}
+
+    def value(self, model: str, now: float | None = None) -> float:
+        """Seconds of cold load avoided per GB by keeping `model` resident."""
+        return self.demand(model, now) * cold_load_s(model) / max(footprint_gb(model), 0.1)
+
+    # ── Planning ────────────────────────────────────────────────────────
+
+    def _free_gb(self, loaded: list[str]) -> float:
+        measured = self.backend.free_vram_gb()
+        estimated = self.capacity_gb - sum(footprint_gb(m) for m in loaded)
+        # Telemetrie: la VRAM reelle inclut les autres processus GPU
+        return min(measured, estimated) if measured is not None else estimated
+
+    def plan(self, wanted: str | None = None, now: float | None = None) -> PlacementPlan:
+        """Dry-run placement: what to unload/load, without touching M1."""
+        now = now or time.time()
+        loaded = [m for m in self.backend.loaded() if m in self.required or m in self.on_demand
+                  or m in self.blacklist]
+        free = self._free_gb(loaded)
+        plan = PlacementPlan(wanted, free_before_gb=round(free, 2))
+
+        for m in loaded:
+            if m in self.blacklist:
+                plan.unloads.append(m)
+                free += footprint_gb(m)
+                plan.reasons.append(f"{m}: liste noire")
+        resident = [m for m in loaded if m not in plan.unloads]
+
+        def evict_for(need: float, protect: str, min_value: float | None) -> bool:
+            nonlocal free
+            victims = sorted(
+                (m for m in resident if m not in self.required and m != protect and m not in plan.unloads),
+                key=lambda m: (self.value(m, now), self.last_used.get(m, 0.0)),
+            )
+            chosen, gain = [], free
+            for v in victims:
+                if gain >= need:
+                    break
+                if min_value is not None and self.value(v, now) >= min_value:
+                    return False  # Evincer couterait plus que charger ne rapporte
+                chosen.append(v)
+                gain += footprint_gb(v)
+            if gain < need:
+                return False
+            for v in chosen:
+                plan.unloads.append(v)
+                free += footprint_gb(v)
+                plan.reasons.append(
+                    f"{v}: evince (valeur {self.value(v, now):.1f}s/GB, "
+                    f"inactif {now - self.last_used.get(v, 0.0):.0f}s)" if v in self.last_used
+                    else f"{v}: evince (jamais utilise)"
+                )
+            return True
+
+        if wanted:
+            if wanted in self.blacklist:
+                plan.feasible = False
+                plan.reasons.append(f"{wanted}: liste noire, jamais charge")
+            elif wanted not in self.required and wanted not in self.on_demand:
+                plan.feasible = False
+                plan.reasons.append(f"{wanted}: hors catalogue M1")
+            elif wanted in resident:
+                plan.reasons.append(f"{wanted}: deja charge")
+            elif evict_for(footprint_gb(wanted), wanted, None):
+                plan.loads.append(wanted)
+                free -= footprint_gb(wanted)
+                plan.reasons.append(f"{wanted}: charge ({footprint_gb(wanted):.1f}GB)")
+            else:
+                plan.feasible = False
+                plan.reasons.append(f"{wanted}: VRAM insuffisante meme apres eviction")
+
+        # Prechargement: modeles a la demande dont l'usage est prevu
+        candidates = sorted(
+            (m for m in self.on_demand
+             if m not in resident and m not in plan.loads and m not in self.blacklist
+             and self.demand(m, now) >= config.placement_preload_demand),
+            key=lambda m: self.value(m, now), reverse=True,
+        )
+        for m in candidates:
+            if footprint_gb(m) <= free:
+                plan.loads.append(m)
+                free -= footprint_gb(m)
+                plan.reasons.append(f"{m}: prechargement (demande {self.demand(m, now):.1f})")
+            elif evict_for(footprint_gb(m), m, self.value(m, now)):
+                plan.loads.append(m)
+                free -= footprint_gb(m)
+                plan.reasons.append(f"{m}: prechargement, remplace un modele moins rentable")
+
+        plan.keep = [m for m in resident if m not in plan.unloads]
+        plan.free_after_gb = round(free, 2)
+        return plan
+
+    # ── Execution ───────────────────────────────────────────────────────
+
+    async def apply(self, plan: PlacementPlan, gpu: str = "max", context: int = 16384,
+                    parallel: int = 2) -> dict[str, bool]:
+        """Run a plan: unloads first, then loads (one lms operation at a time)."""
+        results: dict[str, bool] = {}
+        async with self._lock:
+            for m in plan.unloads:
+                ok = await asyncio.to_thread(self.backend.unload, m)
+                results[f"unload:{m}"] = ok
+                self.stats["unloads"] += ok
+            for m in plan.loads:
+                ok = await asyncio.to_thread(self.backend.load, m, gpu, context, parallel)
+                results[f"load:{m}"] = ok
+                if ok:
+                    self.stats["loads"] += 1
+                    if m != plan.wanted:
+                        self.stats["preloads"] += 1
+                else:
+                    self.stats["failed"] += 1
+        return results
+
+    async def ensure(self, model: str, **load_opts) -> tuple[PlacementPlan, dict[str, bool]]:
+        """Make `model` resident, evicting as planned."""
+        self.record_use(model)
+        plan = await asyncio.to_thread(self.plan, wanted=model)  # `lms ps`: jamais sur la boucle
+        if not plan.feasible:
+            return plan, {}
+        return plan, await self.apply(plan, **load_opts)
+
+    # ── Background preloading ───────────────────────────────────────────
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(config.placement_interval)
+            try:
+                plan = await asyncio.to_thread(self.plan)
+                if not plan.empty:
+                    await self.apply(plan)
+            except Exception:
+                pass
+
+    def _ensure_loop(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._loop())
+
+
+def format_plan(plan: PlacementPlan) -> str:
+    """Human-readable plan (dry-run output)."""
+    lines = [f"Placement M1{' pour ' + plan.wanted if plan.wanted else ''}"
+             f"{'' if plan.feasible else ' — IMPOSSIBLE'}:"]
+    lines.append(f"  VRAM libre: {plan.free_before_gb:.1f}GB -> {plan.free_after_gb:.1f}GB")
+    if plan.unloads:
+        lines.append(f"  Decharger: {', '.join(plan.unloads)}")
+    if plan.loads:
+        lines.append(f"  Charger: {', '.join(plan.loads)}")
+    if plan.keep:
+        lines.append(f"  Garder: {', '.join(plan.keep)}")
+    if plan.empty and plan.feasible:
+        lines.append("  Aucune operation")
+    lines.extend(f"  - {r}" for r in plan.reasons)
+    return "\n".join(lines)
+
+
+_SCHEDULER: PlacementScheduler | None = None
+
+
+def get_scheduler() -> PlacementScheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        _SCHEDULER = PlacementScheduler()
+    return _SCHEDULER
+
+
+def set_scheduler(scheduler: PlacementScheduler) -> None:
+    """Replace the process-wide scheduler (tests, MockLmsBackend)."""
+    global _SCHEDULER
+    _SCHEDULER = scheduler
@@ -39,12 +39,13 @@ Reponds TOUJOURS en francais. Sois concis — tes sorties alimentent un pipeline
 
 ## Tools MCP Jarvis (83 outils — prefixe mcp__jarvis__)
 
-### IA & Cluster LM Studio (4)
+### IA & Cluster LM Studio (5)
 lm_query — Interroger LM Studio. Args: prompt, node, model, mode (fast/deep/default)
+lm_batch_query — Lot de prompts sur tout le cluster (prompts ou file JSONL, output reprenable)
 lm_models, lm_cluster_status, consensus
 
 ### LM Studio Model Management (7)
-lm_load_model — Charger un modele sur M1 (on-demand)
+lm_load_model — Charger un modele sur M1 (on-demand, placement VRAM; dry_run=true pour le plan)
 lm_unload_model — Decharger un modele
 lm_switch_coder — Basculer en mode code (qwen3-coder-30b)
 lm_switch_dev — Basculer en mode dev (devstral)
@@ -356,9 +357,10 @@ async def run_commander(cwd: str | None = None) -> None:
 
     Claude recoit le COMMANDER_PROMPT et DOIT utiliser Task + lm_query +
     consensus pour dispatcher le travail. Il ne traite RIEN lui-meme.
+    Les plans dont toutes les cibles sont des IAs directes (M1/M2/OL1)
+    sont executes localement par CommanderEngine; des qu'un agent SDK
+    (ia-*, avec outils) est cible, Claude dispatche.
     """
-    from src.commander import classify_task, decompose_task, build_commander_enrichment, format_commander_header
-
     options = build_options(cwd)
     options.system_prompt = COMMANDER_PROMPT
 
@@ -380,53 +382,86 @@ async def run_commander(cwd: str | None = None) -> None:
             if user_input.strip().lower() == "status":
                 user_input = "Use lm_cluster_status and report results."
 
-            # Step 1: Classify via M1 (fast, <1s)
-            _safe_print("[COMMANDANT] Classification en cours...", flush=True)
-            classification = await classify_task(user_input)
-            _safe_print(f"[COMMANDANT] Type: {classification}", flush=True)
+            await _commander_turn(client, user_input)
 
-            # Step 2: Decompose into TaskUnits
-            tasks = decompose_task(user_input, classification)
-            header = format_commander_header(classification, tasks)
-            _safe_print(header, flush=True)
+    _safe_print("\n[JARVIS] Session commandant terminee.")
 
-            # Step 3: Build enriched prompt for Claude
-            enriched = build_commander_enrichment(user_input, classification, tasks)
 
-            # Step 4: Send to Claude — it will dispatch via Task/lm_query/consensus
-            await client.query(enriched)
+async def _commander_turn(client, user_input: str) -> None:
+    """One commander request: classify, decompose, then local DAG or Claude."""
+    from src.commander import (
+        QUALITY_THRESHOLD, CommanderEngine, build_commander_enrichment,
+        classify_task, decompose_task, format_commander_header,
+    )
 
-            async for message in client.receive_response():
-                if isinstance(message, AssistantMessage):
-                    for block in message.content:
-                        if isinstance(block, TextBlock):
-                            _safe_print(block.text, end="", flush=True)
-                        elif isinstance(block, ToolUseBlock):
-                            _safe_print(f"\n  [DISPATCH] {block.name}", flush=True)
-                if isinstance(message, ResultMessage):
-                    if message.total_cost_usd:
-                        _safe_print(f"\n  [$] {message.total_cost_usd:.4f} USD | "
-                                    f"Turns: {message.num_turns}", flush=True)
+    # Step 1: Classify via M1 (fast, <1s)
+    _safe_print("[COMMANDANT] Classification en cours...", flush=True)
+    classification = await classify_task(user_input)
+    _safe_print(f"[COMMANDANT] Type: {classification}", flush=True)
 
-    _safe_print("\n[JARVIS] Session commandant terminee.")
+    # Step 2: Decompose into TaskUnits
+    tasks = decompose_task(user_input, classification)
+    header = format_commander_header(classification, tasks)
+    _safe_print(header, flush=True)
+
+    # Step 3a: Plan 100% IAs locales -> execution DAG locale (temps chemin critique)
+    pre_analysis = None
+    if CommanderEngine.can_run_locally(tasks):
+        engine = CommanderEngine(verbose=True)
+        result = await engine.run_plan(tasks)
+        _safe_print(
+            f"[COMMANDANT] Execution locale: {result.total_time_ms}ms | "
+            f"qualite {result.quality_score:.2f} | {', '.join(result.agents_used)}",
+            flush=True,
+        )
+        if result.quality_score >= QUALITY_THRESHOLD:
+            _safe_print(result.synthesis, flush=True)
+            return
+        # Qualite insuffisante apres re-dispatch: Claude reprend avec les resultats
+        pre_analysis = f"Execution locale insuffisante ({result.quality_score:.2f}): {result.synthesis[:1500]}"
+
+    # Step 3b: Build enriched prompt for Claude
+    enriched = build_commander_enrichment(user_input, classification, tasks, pre_analysis)
+
+    # Step 4: Send to Claude — it will dispatch via Task/lm_query/consensus
+    await client.query(enriched)
+
+    async for message in client.receive_response():
+        if isinstance(message, AssistantMessage):
+            for block in message.content:
+                if isinstance(block, TextBlock):
+                    _safe_print(block.text, end="", flush=True)
+                elif isinstance(block, ToolUseBlock):
+                    _safe_print(f"\n  [DISPATCH] {block.name}", flush=True)
+        if isinstance(message, ResultMessage):
+            if message.total_cost_usd:
+                _safe_print(f"\n  [$] {message.total_cost_usd:.4f} USD | "
+                            f"Turns: {message.num_turns}", flush=True)
 
 
 _KNOWLEDGE_CACHE: str | None = None
+_KNOWLEDGE_MTIME: float = 0.0
 
 
 def _load_knowledge() -> str:
     """Load the compact M1 knowledge prompt (~2.3KB, cached in memory).
 
     Loads from data/jarvis_m1_prompt.txt (generated by gen_compact_prompt.py).
+    Reloaded when the file changes, which also rebuilds the M1 prefix session.
     Falls back to a minimal inline summary if the file is missing.
     """
-    global _KNOWLEDGE_CACHE
-    if _KNOWLEDGE_CACHE is not None:
-        return _KNOWLEDGE_CACHE
-
+    global _KNOWLEDGE_CACHE, _KNOWLEDGE_MTIME
     from pathlib import Path
     prompt_path = Path(__file__).resolve().parent.parent / "data" / "jarvis_m1_prompt.txt"
-    if prompt_path.exists():
+    try:
+        mtime = prompt_path.stat().st_mtime
+    except OSError:
+        mtime = 0.0
+    if _KNOWLEDGE_CACHE is not None and mtime == _KNOWLEDGE_MTIME:
+        return _KNOWLEDGE_CACHE
+
+    _KNOWLEDGE_MTIME = mtime
+    if mtime:
         _KNOWLEDGE_CACHE = prompt_path.read_text(encoding="utf-8")
     else:
         # Fallback: generate minimal summary from code
@@ -453,62 +488,63 @@ async def _local_ia_analyze(query: str, timeout: float = 10.0) -> str | None:
 
     Uses qwen3-30b (MoE 3B actifs, ctx 32K, 6 GPU, 46GB VRAM, flash attention).
     Timeout 10s — prompt compact + flash attention = inference rapide.
-    Retry once on transient error. Falls back to Ollama if M1 offline.
+    Retry once on transient error. Falls back to Ollama if M1 offline
+    (immediately when M1's circuit breaker is open). The static header is
+    kept resident on M1 through a stored session (src/lm_sessions.py); only
+    the top-k relevant commands/tools/skills travel with each query
+    (src/prompt_retrieval.py).
     """
-    from src.tools import _get_client
+    from src.circuit_breaker import CircuitOpenError
+    from src.tools import _node_chat
 
     system_msg = _load_knowledge()
-    messages = [
-        {"role": "system", "content": system_msg},
-        {"role": "user", "content": query},
-    ]
+    if config.knowledge_retrieval:
+        # Prompt borne: en-tete statique + top-k commandes/outils/skills pertinents
+        from src.prompt_retrieval import build_prompt
+        retrieved = build_prompt(query, full_prompt=system_msg)
+        system_msg = retrieved.system
+        if retrieved.context:
+            query = f"{retrieved.context}\n\nDemande: {query}"
 
     # Try LM Studio M1 first (qwen3-30b, 6 GPU, 46GB VRAM)
-    node = config.get_node("M1")
-    if node:
+    if config.get_node("M1"):
         for attempt in range(2):
             try:
-                client = await _get_client()
-                r = await client.post(f"{node.url}/api/v1/chat", json={
-                    "model": node.default_model,
-                    "input": query,
-                    "system_prompt": system_msg,
-                    "temperature": 0.2,
-                    "max_output_tokens": config.fast_max_tokens,
-                    "stream": False,
-                    "store": False,
-                }, timeout=timeout)
-                r.raise_for_status()
-                from src.tools import extract_lms_output
-                content = extract_lms_output(r.json()).strip()
+                content = (await _node_chat(
+                    "M1", query, system=system_msg, max_tokens=config.fast_max_tokens,
+                    temperature=0.2, timeout=timeout, call_type="analyze",
+                )).strip()
                 # Remove thinking tags if present (qwen3 sometimes wraps in <think>)
                 if content.startswith("<think>"):
                     think_end = content.find("</think>")
                     if think_end != -1:
                         content = content[think_end + 8:].strip()
                 return content
+            except CircuitOpenError:
+                break
             except Exception:
                 if attempt == 0:
                     await asyncio.sleep(0.5)
 
     # Fallback: Ollama (native API with think:false for speed)
-    ol = config.get_ollama_node("OL1")
-    if ol:
+    if config.get_ollama_node("OL1"):
         try:
-            client = await _get_client()
-            r = await client.post(f"{ol.url}/api/chat", json={
-                "model": ol.default_model,
-                "messages": messages,
-                "stream": False, "think": False,
-                "options": {"temperature": 0.3, "num_predict": config.fast_max_tokens},
-            }, timeout=timeout)
-            r.raise_for_status()
-            return r.json()["message"]["content"].strip()
+            content = await _node_chat(
+                "OL1", query, system=system_msg, max_tokens=config.fast_max_tokens,
+                temperature=0.3, timeout=timeout, call_type="analyze",
+            )
+            return content.strip()
         except Exception:
             pass
     return None
 
 
+def _trace_path(utterance: Any, path: str) -> None:
+    """Tag the utterance trace with the branch that answered it."""
+    if utterance is not None:
+        utterance.set(path=path)
+
+
 async def run_voice(cwd: str | None = None) -> None:
     """Voice-First mode with pre-registered commands and IA fallback.
 
@@ -518,13 +554,15 @@ async def run_voice(cwd: str | None = None) -> None:
     3. Match against pre-registered commands (fuzzy matching)
     4. If match found → execute directly (fast path)
     5. If no match → send to Claude orchestrator (IA path)
-    6. Speak the response (Windows SAPI TTS)
+    6. Speak the response sentence by sentence while it streams (PTT = barge-in)
     """
-    from src.voice import listen_voice, speak_text, HAS_KEYBOARD, PTT_KEY, check_microphone, start_whisper, stop_whisper
+    from src.voice import listen_voice, speak_text, open_speech, HAS_KEYBOARD, PTT_KEY, check_microphone, start_whisper, stop_whisper
     from src.commands import correct_voice_text, match_command, format_commands_help
     from src.executor import execute_command, execute_skill, process_voice_input, correct_with_ia
     from src.voice_correction import full_correction_pipeline, VoiceSession, format_suggestions
     from src.skills import find_skill, load_skills, format_skills_list, suggest_next_actions, log_action
+    from src.tracing import span, start_trace, end_trace
+    from src.speculative import SpeculativeResolver
 
     options = build_options(cwd)
     session = VoiceSession()
@@ -556,16 +594,27 @@ async def run_voice(cwd: str | None = None) -> None:
     else:
         await speak_text(f"JARVIS actif en mode hybride. {len(skills)} skills. Tape tes commandes.")
 
+    utterance = None
     async with ClaudeSDKClient(options=options) as client:
         while True:
+            end_trace(utterance)  # Enonce precedent termine (toutes les branches)
+            utterance = start_trace("utterance", mode="voice")
             print("\n[JARVIS] Ecoute...", flush=True)
-            raw_text = await listen_voice(timeout=15.0, use_ptt=True)
+            # Commande resolue sur les partiels (mode streaming), jamais si confirm
+            resolver = SpeculativeResolver() if config.speculative_enabled else None
+            raw_text = await listen_voice(timeout=15.0, use_ptt=True, speculation=resolver)
 
             if not raw_text:
+                if utterance:
+                    utterance.drop()
                 continue
 
             print(f"[VOICE RAW] {raw_text}", flush=True)
             session.last_raw = raw_text
+            if utterance:
+                utterance.set(text=raw_text)
+                if resolver and resolver.outcome:
+                    utterance.set(speculation=resolver.outcome)
 
             # ── Wake word + conversational detection ──────────────────────
             # Regex handles all Whisper punctuation: "Jarvis, ...", "Jarvis! ..."
@@ -584,7 +633,8 @@ async def run_voice(cwd: str | None = None) -> None:
             )
 
             stripped = raw_text.strip().lower()
-            m = _JARVIS_RE.match(stripped)
+            with span("wake_word"):
+                m = _JARVIS_RE.match(stripped)
 
             if m:
                 after = stripped[m.end():].strip().rstrip("?!.,;:")
@@ -615,7 +665,9 @@ async def run_voice(cwd: str | None = None) -> None:
                 cmd, params = pending_confirm
                 pending_confirm = None
                 if session.is_confirmation(raw_text):
-                    result = await execute_command(cmd, params)
+                    _trace_path(utterance, "confirm")
+                    with span("execute", command=cmd.name):
+                        result = await execute_command(cmd, params)
                     print(f"[EXEC] {result}", flush=True)
                     await speak_text(result if not result.startswith("__") else "OK")
                     continue
@@ -631,13 +683,18 @@ async def run_voice(cwd: str | None = None) -> None:
                     pending_confirm = (sel, {})
                     await speak_text(f"Confirme: {sel.description}? Dis oui ou non.")
                     continue
-                result = await execute_command(sel, {})
+                _trace_path(utterance, "suggestion")
+                with span("execute", command=sel.name):
+                    result = await execute_command(sel, {})
                 if not result.startswith("__"):
                     await speak_text(result)
                 continue
 
-            # Full correction pipeline
-            cr = await full_correction_pipeline(raw_text)
+            # Full correction pipeline (skipped when the partials already confirmed the command)
+            if resolver and resolver.confirmed:
+                cr = resolver.pipeline_result(raw_text)
+            else:
+                cr = await full_correction_pipeline(raw_text)
             print(f"[PIPELINE] method={cr['method']} confidence={cr['confidence']:.2f}", flush=True)
             if cr["corrected"] != raw_text.lower().strip():
                 print(f"[CORRECTED] {cr['corrected']}", flush=True)
@@ -668,8 +725,12 @@ async def run_voice(cwd: str | None = None) -> None:
 
             # Check for skill match BEFORE command execution (only if pipeline found a command-like input)
             intent_text = cr["intent"] or cr["corrected"] or raw_text
-            skill, skill_score = find_skill(intent_text)
+            with span("skill_lookup") as sp:
+                skill, skill_score = find_skill(intent_text)
+                if sp and skill:
+                    sp.set(skill=skill.name, score=round(skill_score, 2))
             if skill and skill_score >= 0.72:
+                _trace_path(utterance, "skill")
                 print(f"[SKILL] {skill.name} (score={skill_score:.2f}, {len(skill.steps)} etapes)", flush=True)
                 session.add_to_history(intent_text)
 
@@ -689,22 +750,24 @@ async def run_voice(cwd: str | None = None) -> None:
                     ) + ". Execute chaque etape avec les outils MCP et resume les resultats."
                 )
                 print(f"[SKILL PROMPT] {skill_prompt[:100]}...", flush=True)
-                await client.query(skill_prompt)
-                rp = []
-                async for msg in client.receive_response():
-                    if isinstance(msg, AssistantMessage):
-                        for b in msg.content:
-                            if isinstance(b, TextBlock):
-                                rp.append(b.text)
-                                print(b.text, end="", flush=True)
-                            elif isinstance(b, ToolUseBlock):
-                                print(f"\n  [TOOL] {b.name}", flush=True)
-                    if isinstance(msg, ResultMessage):
-                        if msg.total_cost_usd:
-                            print(f"\n  [$] {msg.total_cost_usd:.4f} USD", flush=True)
+                async with open_speech(on_cancel=client.interrupt, kind="claude") as speech:
+                    with span("claude", kind="skill"):
+                        await client.query(skill_prompt)
+                        rp = []
+                        async for msg in client.receive_response():
+                            if isinstance(msg, AssistantMessage):
+                                for b in msg.content:
+                                    if isinstance(b, TextBlock):
+                                        rp.append(b.text)
+                                        print(b.text, end="", flush=True)
+                                        await speech.feed(b.text, flush=True)
+                                    elif isinstance(b, ToolUseBlock):
+                                        print(f"\n  [TOOL] {b.name}", flush=True)
+                            if isinstance(msg, ResultMessage):
+                                if msg.total_cost_usd:
+                                    print(f"\n  [$] {msg.total_cost_usd:.4f} USD", flush=True)
                 fr = "".join(rp).strip()
                 if fr:
-                    await speak_text(fr[:500])
                     log_action(f"skill:{skill.name}", fr[:200], True)
 
                 # Suggest next actions
@@ -722,7 +785,9 @@ async def run_voice(cwd: str | None = None) -> None:
                     await speak_text(f"Confirme: {cmd.description}? Dis oui ou non.")
                     continue
 
-                result = await execute_command(cmd, params)
+                _trace_path(utterance, "command")
+                with span("execute", command=cmd.name):
+                    result = await execute_command(cmd, params)
 
                 if result == "__EXIT__":
                     await speak_text("Session terminee.")
@@ -730,17 +795,17 @@ async def run_voice(cwd: str | None = None) -> None:
                 elif result.startswith("__TOOL__"):
                     tool_action = result[len("__TOOL__"):]
                     prompt = f"Utilise l'outil mcp__jarvis__{tool_action} et rapporte le resultat en francais."
-                    await client.query(prompt)
-                    rp = []
-                    async for msg in client.receive_response():
-                        if isinstance(msg, AssistantMessage):
-                            for b in msg.content:
-                                if isinstance(b, TextBlock):
-                                    rp.append(b.text)
-                                    print(b.text, end="", flush=True)
-                    fr = "".join(rp).strip()
-                    if fr:
-                        await speak_text(fr[:500])
+                    async with open_speech(on_cancel=client.interrupt, kind="claude") as speech:
+                        with span("claude", kind="tool"):
+                            await client.query(prompt)
+                            rp = []
+                            async for msg in client.receive_response():
+                                if isinstance(msg, AssistantMessage):
+                                    for b in msg.content:
+                                        if isinstance(b, TextBlock):
+                                            rp.append(b.text)
+                                            print(b.text, end="", flush=True)
+                                            await speech.feed(b.text, flush=True)
                 elif not result.startswith("__"):
                     print(f"[EXEC] {result}", flush=True)
                     await speak_text(result)
@@ -761,11 +826,13 @@ async def run_voice(cwd: str | None = None) -> None:
             # No match → MODE COMMANDANT (M1 pre-analyse + Claude dispatche)
             freeform = cr["intent"] or cr["corrected"] or raw_text
             session.add_to_history(freeform)
+            _trace_path(utterance, "commander")
 
             try:
                 # Step 1: Ask local IA (M1/qwen3-30b) for analysis
                 print(f"[FREEFORM] → IA locale (M1): {freeform}", flush=True)
-                local_response = await _local_ia_analyze(freeform)
+                with span("local_ia"):
+                    local_response = await _local_ia_analyze(freeform)
 
                 if local_response:
                     print(f"[LOCAL IA] {local_response[:200]}", flush=True)
@@ -778,7 +845,8 @@ async def run_voice(cwd: str | None = None) -> None:
 
                     if not needs_tools:
                         # Local IA answered directly — no need for Claude
-                        await speak_text(local_response[:500])
+                        _trace_path(utterance, "local_ia")
+                        await speak_text(local_response, kind="local_ia")
                         continue
 
                     # Step 2: Commander pattern — Claude dispatche aux agents/IAs
@@ -800,26 +868,27 @@ async def run_voice(cwd: str | None = None) -> None:
                     )
                     print(f"[FREEFORM] → Claude COMMANDANT (direct): {freeform}", flush=True)
 
-                await client.query(enriched)
-                rp = []
-                async for msg in client.receive_response():
-                    if isinstance(msg, AssistantMessage):
-                        for b in msg.content:
-                            if isinstance(b, TextBlock):
-                                rp.append(b.text)
-                                print(b.text, end="", flush=True)
-                            elif isinstance(b, ToolUseBlock):
-                                print(f"\n  [DISPATCH] {b.name}", flush=True)
-                    if isinstance(msg, ResultMessage):
-                        if msg.total_cost_usd:
-                            print(f"\n  [$] {msg.total_cost_usd:.4f} USD", flush=True)
-                fr = "".join(rp).strip()
-                if fr:
-                    await speak_text(fr[:500])
+                async with open_speech(on_cancel=client.interrupt, kind="claude") as speech:
+                    with span("claude", kind="commander"):
+                        await client.query(enriched)
+                        rp = []
+                        async for msg in client.receive_response():
+                            if isinstance(msg, AssistantMessage):
+                                for b in msg.content:
+                                    if isinstance(b, TextBlock):
+                                        rp.append(b.text)
+                                        print(b.text, end="", flush=True)
+                                        await speech.feed(b.text, flush=True)
+                                    elif isinstance(b, ToolUseBlock):
+                                        print(f"\n  [DISPATCH] {b.name}", flush=True)
+                            if isinstance(msg, ResultMessage):
+                                if msg.total_cost_usd:
+                                    print(f"\n  [$] {msg.total_cost_usd:.4f} USD", flush=True)
             except Exception as e:
                 print(f"\n  [ERREUR FREEFORM] {e}", flush=True)
                 await speak_text("Desole, une erreur s'est produite. Repete ta demande.")
 
+    end_trace(utterance)
     stop_whisper()
     _safe_print("\n[JARVIS] Session vocale terminee.")
 
@@ -834,6 +903,7 @@ async def run_hybrid(cwd: str | None = None) -> None:
     from src.executor import execute_command
     from src.voice_correction import full_correction_pipeline, VoiceSession, format_suggestions
     from src.skills import find_skill, load_skills, format_skills_list, suggest_next_actions, log_action
+    from src.tracing import span, start_trace, end_trace
 
     options = build_options(cwd)
     session = VoiceSession()
@@ -846,8 +916,11 @@ async def run_hybrid(cwd: str | None = None) -> None:
     _safe_print(f"83 outils MCP | {len(skills)} skills | {n_cmds} commandes")
     _safe_print("Tape tes commandes comme si tu parlais. 'exit' pour quitter.\n")
 
+    utterance = None
     async with ClaudeSDKClient(options=options) as client:
         while True:
+            end_trace(utterance)
+            utterance = None
             try:
                 raw_text = input("\n[JARVIS] > ")
             except (EOFError, KeyboardInterrupt):
@@ -858,13 +931,16 @@ async def run_hybrid(cwd: str | None = None) -> None:
 
             raw_text = raw_text.strip()
             session.last_raw = raw_text
+            utterance = start_trace("utterance", mode="hybrid", text=raw_text)
 
             # Handle pending confirmation
             if pending_confirm is not None:
                 cmd, params = pending_confirm
                 pending_confirm = None
                 if session.is_confirmation(raw_text):
-                    result = await execute_command(cmd, params)
+                    _trace_path(utterance, "confirm")
+                    with span("execute", command=cmd.name):
+                        result = await execute_command(cmd, params)
                     _safe_print(f"[EXEC] {result}")
                     continue
                 elif session.is_denial(raw_text):
@@ -896,8 +972,12 @@ async def run_hybrid(cwd: str | None = None) -> None:
 
             # Check for skill match
             intent_text = cr["intent"] or cr["corrected"] or raw_text
-            skill, skill_score = find_skill(intent_text)
+            with span("skill_lookup") as sp:
+                skill, skill_score = find_skill(intent_text)
+                if sp and skill:
+                    sp.set(skill=skill.name, score=round(skill_score, 2))
             if skill and skill_score >= 0.72:
+                _trace_path(utterance, "skill")
                 _safe_print(f"[SKILL] {skill.name} (score={skill_score:.2f}, {len(skill.steps)} etapes)")
                 session.add_to_history(intent_text)
 
@@ -914,19 +994,20 @@ async def run_hybrid(cwd: str | None = None) -> None:
                         for i, s in enumerate(skill.steps)
                     ) + ". Execute chaque etape avec les outils MCP et resume les resultats."
                 )
-                await client.query(skill_prompt)
-                rp = []
-                async for msg in client.receive_response():
-                    if isinstance(msg, AssistantMessage):
-                        for b in msg.content:
-                            if isinstance(b, TextBlock):
-                                rp.append(b.text)
-                                _safe_print(b.text, end="", flush=True)
-                            elif isinstance(b, ToolUseBlock):
-                                _safe_print(f"\n  [TOOL] {b.name}", flush=True)
-                    if isinstance(msg, ResultMessage):
-                        if msg.total_cost_usd:
-                            _safe_print(f"\n  [$] {msg.total_cost_usd:.4f} USD", flush=True)
+                with span("claude", kind="skill"):
+                    await client.query(skill_prompt)
+                    rp = []
+                    async for msg in client.receive_response():
+                        if isinstance(msg, AssistantMessage):
+                            for b in msg.content:
+                                if isinstance(b, TextBlock):
+                                    rp.append(b.text)
+                                    _safe_print(b.text, end="", flush=True)
+                                elif isinstance(b, ToolUseBlock):
+                                    _safe_print(f"\n  [TOOL] {b.name}", flush=True)
+                        if isinstance(msg, ResultMessage):
+                            if msg.total_cost_usd:
+                                _safe_print(f"\n  [$] {msg.total_cost_usd:.4f} USD", flush=True)
                 fr = "".join(rp).strip()
                 if fr:
                     log_action(f"skill:{skill.name}", fr[:200], True)
@@ -944,7 +1025,9 @@ async def run_hybrid(cwd: str | None = None) -> None:
                     _safe_print(f"Confirme: {cmd.description}? (oui/non)")
                     continue
 
-                result = await execute_command(cmd, params)
+                _trace_path(utterance, "command")
+                with span("execute", command=cmd.name):
+                    result = await execute_command(cmd, params)
 
                 if result == "__EXIT__":
                     _safe_print("Session terminee.")
@@ -952,14 +1035,15 @@ async def run_hybrid(cwd: str | None = None) -> None:
                 elif result.startswith("__TOOL__"):
                     tool_action = result[len("__TOOL__"):]
                     prompt = f"Utilise l'outil mcp__jarvis__{tool_action} et rapporte le resultat en francais."
-                    await client.query(prompt)
-                    rp = []
-                    async for msg in client.receive_response():
-                        if isinstance(msg, AssistantMessage):
-                            for b in msg.content:
-                                if isinstance(b, TextBlock):
-                                    rp.append(b.text)
-                                    _safe_print(b.text, end="", flush=True)
+                    with span("claude", kind="tool"):
+                        await client.query(prompt)
+                        rp = []
+                        async for msg in client.receive_response():
+                            if isinstance(msg, AssistantMessage):
+                                for b in msg.content:
+                                    if isinstance(b, TextBlock):
+                                        rp.append(b.text)
+                                        _safe_print(b.text, end="", flush=True)
                     fr = "".join(rp).strip()
                 elif not result.startswith("__"):
                     _safe_print(f"[EXEC] {result}")
@@ -979,15 +1063,18 @@ async def run_hybrid(cwd: str | None = None) -> None:
             from src.commander import classify_task as _classify, decompose_task as _decompose, build_commander_enrichment as _enrich, format_commander_header as _header
             freeform = cr["intent"] or cr["corrected"] or raw_text
             session.add_to_history(freeform)
+            _trace_path(utterance, "commander")
 
             # Commander pipeline: classify -> decompose -> enrich
             _safe_print(f"[FREEFORM] -> Commandant: {freeform}")
-            _cls = await _classify(freeform)
-            _tasks = _decompose(freeform, _cls)
+            with span("commander_prep"):
+                _cls = await _classify(freeform)
+                _tasks = _decompose(freeform, _cls)
             _safe_print(_header(_cls, _tasks), flush=True)
 
             # Pre-analyse M1
-            local_response = await _local_ia_analyze(freeform)
+            with span("local_ia"):
+                local_response = await _local_ia_analyze(freeform)
             if local_response:
                 _safe_print(f"[LOCAL IA] {local_response[:200]}", flush=True)
                 # Reponse directe si pas d'outil necessaire
@@ -996,22 +1083,25 @@ async def run_hybrid(cwd: str | None = None) -> None:
                     "powershell", "script", "fichier", "dossier", "trading", "cluster",
                 ])
                 if not needs_tools:
+                    _trace_path(utterance, "local_ia")
                     _safe_print(f"[LOCAL] {local_response}")
                     continue
 
             enriched = _enrich(freeform, _cls, _tasks, pre_analysis=local_response)
-            await client.query(enriched)
-            rp = []
-            async for msg in client.receive_response():
-                if isinstance(msg, AssistantMessage):
-                    for b in msg.content:
-                        if isinstance(b, TextBlock):
-                            rp.append(b.text)
-                            _safe_print(b.text, end="", flush=True)
-                        elif isinstance(b, ToolUseBlock):
-                            _safe_print(f"\n  [DISPATCH] {b.name}", flush=True)
-                if isinstance(msg, ResultMessage):
-                    if msg.total_cost_usd:
-                        _safe_print(f"\n  [$] {msg.total_cost_usd:.4f} USD", flush=True)
+            with span("claude", kind="commander"):
+                await client.query(enriched)
+                rp = []
+                async for msg in client.receive_response():
+                    if isinstance(msg, AssistantMessage):
+                        for b in msg.content:
+                            if isinstance(b, TextBlock):
+                                rp.append(b.text)
+                                _safe_print(b.text, end="", flush=True)
+                            elif isinstance(b, ToolUseBlock):
+                                _safe_print(f"\n  [DISPATCH] {b.name}", flush=True)
+                    if isinstance(msg, ResultMessage):
+                        if msg.total_cost_usd:
+                            _safe_print(f"\n  [$] {msg.total_cost_usd:.4f} USD", flush=True)
 
+    end_trace(utterance)
     _safe_print("\n[JARVIS] Session hybride terminee.")
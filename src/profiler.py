@@ -0,0 +1,248 @@
+"""JARVIS Profiler — Opt-in sampling profiler around the hot paths.
+
+Flow:
+  JARVIS_PROFILE=N (demarrage) ou commande vocale "jarvis profile"
+  -> arm(N): un thread echantillonne sys._current_frames() toutes les N ms
+  -> seuls les threads dans une region profile("correction"/"match"/
+     "mcp:<outil>"/"commander") sont echantillonnes
+  -> apres N requetes (regions les plus externes de chaque tache/thread
+     terminees, suivies par ContextVar: coroutines entrelacees OK): piles
+     repliees ecrites dans data/profiles/profile_<date>.folded
+     (flamegraph.pl, speedscope, inferno: directement lisibles)
+
+Optimizations:
+- Desarme: profile() renvoie un nullcontext partage, @profiled teste un
+  entier puis appelle la fonction: aucune allocation, aucun thread
+- Echantillonnage (pas de sys.setprofile): le code profile tourne a
+  vitesse normale, le cout est dans le thread echantillonneur
+- Echantillons sur selectors.select (boucle asyncio en attente reseau)
+  comptes a part: le flamegraph ne montre que le CPU
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from src.config import config
+
+
+PROFILES_DIR = Path(__file__).resolve().parent.parent / "data" / "profiles"
+
+# Feuilles de pile = thread en attente, pas du CPU
+_IDLE_LEAVES = {"select", "poll", "wait"}
+_NULL = nullcontext()
+# Region la plus externe de la tache (ou du thread) courante: une par requete
+_OUTER: ContextVar[str | None] = ContextVar("jarvis_profile_region", default=None)
+
+
+class SamplingProfiler:
+    """Samples the stacks of threads inside profiled regions for N requests."""
+
+    def __init__(self):
+        self.remaining = 0  # Requetes restantes (0 = desarme)
+        self.requests = 0
+        self.samples = 0
+        self.idle = 0
+        self.last_dump: Path | None = None
+        self._stacks: Counter[str] = Counter()
+        self._active: dict[int, list[str]] = {}  # ident du thread -> regions ouvertes (echantillonnage)
+        self._labels: dict[Any, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started = 0.0
+
+    # ── Armement ────────────────────────────────────────────────────────
+
+    def arm(self, requests: int | None = None) -> str:
+        """Profile the next `requests` hot-path requests; returns a status line."""
+        n = requests or config.profile_requests
+        with self._lock:
+            if self.remaining:
+                self.remaining = n
+                return f"Profilage deja actif, prolonge a {n} requetes."
+            self.remaining = n
+            self.requests = self.samples = self.idle = 0
+            self._stacks.clear()
+            self._started = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="jarvis-profiler", daemon=True)
+        self._thread.start()
+        return f"Profilage actif pour {n} requetes. Resultat dans {PROFILES_DIR.name}."
+
+    def disarm(self) -> Path | None:
+        """Stop sampling now and write what was collected."""
+        with self._lock:
+            self.remaining = 0
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=2)
+        return self.last_dump
+
+    # ── Regions ─────────────────────────────────────────────────────────
+
+    def enter(self, name: str) -> Token | None:
+        """Open a region; returns a token only for the outermost one of the task."""
+        token = _OUTER.set(name) if _OUTER.get() is None else None
+        with self._lock:
+            self._active.setdefault(threading.get_ident(), []).append(name)
+        return token
+
+    def exit(self, name: str, token: Token | None = None) -> None:
+        ident = threading.get_ident()
+        done = False
+        with self._lock:
+            regions = self._active.get(ident)
+            if regions and name in regions:
+                regions.reverse()
+                regions.remove(name)  # Derniere occurrence: taches entrelacees sur le thread
+                regions.reverse()
+                if not regions:
+                    del self._active[ident]
+            if token is not None and self.remaining:
+                self.requests += 1
+                self.remaining -= 1
+                done = self.remaining == 0
+        if token is not None:
+            try:
+                _OUTER.reset(token)
+            except ValueError:
+                _OUTER.set(None)  # Sortie dans un autre contexte (generateur async)
+        if done:
+            self._stop.set()  # L'echantillonneur ecrit le fichier, hors chemin chaud
+
+    @contextmanager
+    def region(self, name: str) -> Iterator[None]:
+        token = self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit(name, token)
+
+    # ── Echantillonnage ─────────────────────────────────────────────────
+
+    def _label(self, code: Any) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (
+                f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+            ).replace(";", ",")
+        return label
+
+    def _sample(self) -> None:
+        with self._lock:
+            active = {ident: regions[0] for ident, regions in self._active.items() if regions}
+        if not active:
+            return
+        frames = sys._current_frames()
+        for ident, region in active.items():
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            self.samples += 1
+            if frame.f_code.co_name in _IDLE_LEAVES:
+                self.idle += 1
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(f"[{region}]")
+            self._stacks[";".join(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        interval = max(config.profile_interval_ms, 0.5) / 1000
+        while not self._stop.wait(interval):
+            self._sample()
+        with self._lock:
+            self.remaining = 0
+        path = self.dump()
+        if path:
+            print(f"  [PROFILE] {self.requests} requetes, {self.samples} echantillons -> {path}", flush=True)
+
+    # ── Sortie ──────────────────────────────────────────────────────────
+
+    def dump(self, path: Path | None = None) -> Path | None:
+        """Write collapsed stacks (`frame;frame;frame count` per line)."""
+        if not self._stacks:
+            return None
+        path = path or PROFILES_DIR / f"profile_{time.strftime('%Y%m%d_%H%M%S', time.localtime(self._started))}.folded"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("w", encoding="utf-8") as f:
+                for stack, count in self._stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        except OSError:
+            return None
+        self.last_dump = path
+        return path
+
+    def top(self, limit: int = 10) -> list[tuple[str, int, float]]:
+        """Hottest leaf functions: (label, self samples, share of CPU samples)."""
+        leaves: Counter[str] = Counter()
+        for stack, count in self._stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [(label, n, n / total) for label, n in leaves.most_common(limit)]
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "armed": bool(self.remaining),
+            "remaining": self.remaining,
+            "requests": self.requests,
+            "samples": self.samples,
+            "idle": self.idle,
+            "last_dump": str(self.last_dump) if self.last_dump else None,
+        }
+
+
+PROFILER = SamplingProfiler()
+
+
+def profile(name: str) -> Any:
+    """Context manager marking a hot-path region (no-op unless armed)."""
+    if not PROFILER.remaining:
+        return _NULL
+    return PROFILER.region(name)
+
+
+def profiled(name: str) -> Callable[[Callable], Callable]:
+    """Decorator form of profile() for sync and async functions."""
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not PROFILER.remaining:
+                    return await fn(*args, **kwargs)
+                with PROFILER.region(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.remaining:
+                return fn(*args, **kwargs)
+            with PROFILER.region(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _arm_from_env() -> None:
+    value = os.getenv("JARVIS_PROFILE", "")
+    if value.isdigit() and int(value) > 0:
+        PROFILER.arm(int(value))
+
+
+_arm_from_env()
@@ -0,0 +1,190 @@
+"""JARVIS Prompt Retrieval — Token-budgeted knowledge prompt for M1.
+
+Flow:
+  requete vocale -> index BM25 local (COMMANDS + TOOL_DEFINITIONS + skills)
+  -> top-k lignes pertinentes dans le budget de tokens
+  -> system = en-tete statique (constant, reutilise en cache KV)
+  -> input  = lignes pertinentes + demande
+
+Optimizations:
+- Taille du prompt constante quelle que soit la taille du catalogue
+- L'en-tete ne depend pas du catalogue: la session M1 n'est jamais re-amorcee
+- Index reconstruit seulement si COMMANDS ou data/skills.json changent
+- Statistiques de tokens economises par requete (vs prompt complet)
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+
+from src.config import config, JARVIS_VERSION
+
+
+STATIC_HEADER = "\n".join([
+    f"JARVIS v{JARVIS_VERSION} | Cluster M1+M2+OL1",
+    "Tu es le cerveau local de JARVIS. Analyse les demandes vocales et identifie l'action.",
+    "Chaque message contient les commandes, outils et skills les plus pertinents pour la demande.",
+    "Si la demande correspond a une commande, reponds: ACTION=nom_commande",
+    "Si besoin d'un outil systeme: OUTIL=nom_outil(args)",
+    "Sinon reponds directement en francais, concis (2-3 phrases).",
+])
+
+
+@dataclass
+class KnowledgeDoc:
+    kind: str        # "cmd" | "outil" | "skill"
+    name: str
+    line: str        # Ligne injectee dans le prompt
+    terms: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class RetrievedPrompt:
+    system: str
+    context: str
+    items: list[str]
+    tokens: int          # Tokens estimes (en-tete + contexte)
+    full_tokens: int     # Tokens du prompt complet remplace
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 chars/token for French + identifiers)."""
+    return max(1, len(text) // 4)
+
+
+def _tokenize(text: str) -> list[str]:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    words = re.findall(r"[a-z0-9]+", text.replace("_", " "))
+    return [w[:-1] if len(w) > 3 and w.endswith("s") else w for w in words if len(w) > 1]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# INDEX — BM25 over commands, MCP tools and skills
+# ═══════════════════════════════════════════════════════════════════════════
+
+_INDEX: list[KnowledgeDoc] = []
+_IDF: dict[str, float] = {}
+_AVG_LEN: float = 1.0
+_INDEX_SIGNATURE: tuple = ()
+_STATS = {"requests": 0, "tokens_used": 0, "tokens_full": 0}
+
+
+def _collect_docs() -> list[KnowledgeDoc]:
+    from src.commands import COMMANDS
+    docs = []
+    for c in COMMANDS:
+        triggers = " | ".join(c.triggers[:2])
+        docs.append(KnowledgeDoc(
+            "cmd", c.name, f"cmd {c.name} = {triggers}",
+            Counter(_tokenize(f"{c.name} {c.category} {c.description} {' '.join(c.triggers)}")),
+        ))
+    try:
+        from src.mcp_server import TOOL_DEFINITIONS
+        for name, desc, _schema, _handler in TOOL_DEFINITIONS:
+            docs.append(KnowledgeDoc(
+                "outil", name, f"outil {name}: {desc}",
+                Counter(_tokenize(f"{name} {desc}")),
+            ))
+    except Exception:
+        pass  # Serveur MCP indisponible: commandes + skills seulement
+    try:
+        from src.skills import load_skills
+        for s in load_skills():
+            docs.append(KnowledgeDoc(
+                "skill", s.name, f"skill {s.name}: {s.description}",
+                Counter(_tokenize(f"{s.name} {s.description} {' '.join(s.triggers)}")),
+            ))
+    except Exception:
+        pass
+    return docs
+
+
+def _signature() -> tuple:
+    from src.commands import COMMANDS
+    from src.skills import SKILLS_FILE
+    try:
+        skills_mtime = SKILLS_FILE.stat().st_mtime
+    except OSError:
+        skills_mtime = 0.0
+    return (len(COMMANDS), skills_mtime)
+
+
+def _ensure_index() -> None:
+    global _INDEX, _IDF, _AVG_LEN, _INDEX_SIGNATURE
+    sig = _signature()
+    if _INDEX and sig == _INDEX_SIGNATURE:
+        return
+    docs = _collect_docs()
+    df: Counter = Counter()
+    for d in docs:
+        df.update(d.terms.keys())
+    n = max(len(docs), 1)
+    _IDF = {t: math.log(1 + (n - f + 0.5) / (f + 0.5)) for t, f in df.items()}
+    _AVG_LEN = sum(sum(d.terms.values()) for d in docs) / n
+    _INDEX = docs
+    _INDEX_SIGNATURE = sig
+
+
+def search(query: str, k: int = 10) -> list[tuple[KnowledgeDoc, float]]:
+    """Top-k documents for a query (BM25, k1=1.2, b=0.75)."""
+    _ensure_index()
+    q_terms = set(_tokenize(query))
+    if not q_terms:
+        return []
+    scored = []
+    for d in _INDEX:
+        length = sum(d.terms.values())
+        score = 0.0
+        for t in q_terms:
+            tf = d.terms.get(t, 0)
+            if tf:
+                score += _IDF[t] * tf * 2.2 / (tf + 1.2 * (0.25 + 0.75 * length / _AVG_LEN))
+        if score > 0:
+            scored.append((d, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:k]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PROMPT BUILDER
+# ═══════════════════════════════════════════════════════════════════════════
+
+def build_prompt(query: str, full_prompt: str = "") -> RetrievedPrompt:
+    """Build a token-budgeted prompt for `query`.
+
+    `full_prompt` is the catalogue prompt being replaced (for savings stats).
+    """
+    budget = config.knowledge_token_budget - estimate_tokens(STATIC_HEADER)
+    items, used = [], 0
+    for doc, _score in search(query, config.knowledge_top_k):
+        cost = estimate_tokens(doc.line) + 1
+        if used + cost > budget:
+            continue
+        items.append(doc.line)
+        used += cost
+    context = "Pertinent:\n" + "\n".join(items) if items else ""
+    tokens = estimate_tokens(STATIC_HEADER) + (estimate_tokens(context) if context else 0)
+    full_tokens = estimate_tokens(full_prompt) if full_prompt else tokens
+    _STATS["requests"] += 1
+    _STATS["tokens_used"] += tokens
+    _STATS["tokens_full"] += full_tokens
+    return RetrievedPrompt(STATIC_HEADER, context, items, tokens, full_tokens)
+
+
+def retrieval_stats() -> dict:
+    """Cumulative prompt-size stats since startup."""
+    n = max(_STATS["requests"], 1)
+    saved = _STATS["tokens_full"] - _STATS["tokens_used"]
+    return {
+        "requests": _STATS["requests"],
+        "avg_tokens": round(_STATS["tokens_used"] / n),
+        "avg_full_tokens": round(_STATS["tokens_full"] / n),
+        "tokens_saved": saved,
+        "avg_saved_per_request": round(saved / n),
+        "index_size": len(_INDEX),
+    }
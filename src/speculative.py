@@ -0,0 +1,216 @@
+"""JARVIS Speculative Resolver — Resolve commands on partial transcripts.
+
+Flow:
+  StreamingTranscriber -> on_partial("ouvre chr") -> on_partial("ouvre chrome")
+  -> matching local (normalisation + corrections + intention + match_command,
+     sans IA) sur chaque hypothese partielle
+  -> commande candidate -> prefetch en arriere-plan: hote PowerShell
+     rechauffe, APP_PATHS/SITE_ALIASES resolus, DNS du site pre-resolu
+  -> transcription finale: commit SEULEMENT si le matching local donne la
+     meme commande avec les memes parametres
+     -> listen_voice saute l'analyse LM, run_voice saute la correction IA
+  -> commandes cmd.confirm: jamais validees par speculation (flux normal
+     avec confirmation vocale)
+
+Optimizations:
+- Fin de parole -> execution sans aller-retour IA (Ollama + LM Studio)
+  quand le dernier partiel avait deja trouve la commande
+- Prefetch une seule fois par (commande, parametres), hors du thread STT
+- replay(): sequences de transcriptions enregistrees rejouees sans audio
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import shutil
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+from urllib.parse import urlparse
+
+from src.commands import APP_PATHS, SITE_ALIASES, JarvisCommand, correct_voice_text, match_command
+from src.config import config
+
+
+_WAKE_RE = re.compile(r'^((?:hey |ok |dis |bonjour |salut )?jarvis)[,.:;!?\s]*', re.IGNORECASE)
+
+# Types d'action executes via un powershell.exe lance a la demande
+_POWERSHELL_ACTIONS = {"app_open", "ms_settings", "hotkey", "browser", "powershell"}
+
+
+@dataclass
+class Speculation:
+    command: JarvisCommand
+    params: dict[str, str]
+    score: float
+    text: str                 # Hypothese (ou texte final) qui l'a produite
+    target: str = ""          # Chemin d'application ou URL resolu par le prefetch
+    at: float = field(default_factory=time.monotonic)
+
+
+def local_match(text: str) -> tuple[JarvisCommand | None, dict[str, str], float, str]:
+    """Local (no IA) steps of full_correction_pipeline: (cmd, params, score, intent)."""
+    from src.voice_correction import IMPLICIT_COMMANDS, extract_action_intent, normalize_text
+    cleaned = normalize_text(_WAKE_RE.sub("", text.strip()))
+    cleaned = IMPLICIT_COMMANDS.get(cleaned.strip(), cleaned)
+    intent = extract_action_intent(correct_voice_text(cleaned))
+    if not intent:
+        return None, {}, 0.0, ""
+    cmd, params, score = match_command(intent)
+    return cmd, params, score, intent
+
+
+def _fill(template: str, params: dict[str, str]) -> str:
+    for k, v in params.items():
+        template = template.replace(f"{{{k}}}", v)
+    return template
+
+
+def prefetch_command(cmd: JarvisCommand, params: dict[str, str]) -> str:
+    """Warm what executing `cmd` will need; returns the resolved target."""
+    target = ""
+    if cmd.action_type == "app_open":
+        name = _fill(cmd.action, params)
+        target = APP_PATHS.get(name.lower(), name)
+        if Path(target).is_absolute():
+            Path(target).exists()  # Metadonnees du binaire en cache disque
+        else:
+            target = shutil.which(target) or target
+    elif cmd.action_type == "browser":
+        action = _fill(cmd.action, params)
+        if action.startswith("navigate:"):
+            target = SITE_ALIASES.get(action[len("navigate:"):].lower(), action[len("navigate:"):])
+            if not target.startswith("http"):
+                target = f"https://{target}"
+        elif action.startswith("search:"):
+            target = "https://www.google.com/search"
+        host = urlparse(target).hostname if target else None
+        if host:
+            try:
+                socket.getaddrinfo(host, 443)  # Cache DNS du systeme pour le navigateur
+            except OSError:
+                pass
+    if cmd.action_type in _POWERSHELL_ACTIONS:
+        from src.windows import warm_powershell
+        warm_powershell()
+    return target
+
+
+class SpeculativeResolver:
+    """Tracks the command matched by partial transcripts; one per utterance."""
+
+    def __init__(
+        self,
+        matcher: Callable[[str], tuple[JarvisCommand | None, dict[str, str], float, str]] = local_match,
+        prefetch: Callable[[JarvisCommand, dict[str, str]], str] | None = prefetch_command,
+        min_score: float | None = None,
+        background: bool = True,
+    ):
+        self.matcher = matcher
+        self.prefetch = prefetch
+        self.min_score = config.speculative_min_score if min_score is None else min_score
+        self.background = background
+        self.candidate: Speculation | None = None
+        self.confirmed: Speculation | None = None
+        self.outcome = ""  # "", hit, miss, confirm_required
+        self._prefetched: set[tuple] = set()
+        self._lock = threading.Lock()
+        self.stats = {"partials": 0, "prefetches": 0}
+
+    # ── Partiels (thread STT) ───────────────────────────────────────────
+
+    def on_partial(self, text: str) -> None:
+        self.stats["partials"] += 1
+        cmd, params, score, intent = self.matcher(text)
+        if cmd is None or score < self.min_score:
+            return  # Partiel incomplet: on garde le dernier candidat
+        spec = Speculation(cmd, params, score, intent)
+        key = (cmd.name, tuple(sorted(params.items())))
+        with self._lock:
+            self.candidate = spec
+            if key in self._prefetched or self.prefetch is None:
+                return
+            self._prefetched.add(key)
+            self.stats["prefetches"] += 1
+        if self.background:
+            threading.Thread(target=self._prefetch, args=(spec,), name="jarvis-prefetch",
+                             daemon=True).start()
+        else:
+            self._prefetch(spec)
+
+    def _prefetch(self, spec: Speculation) -> None:
+        try:
+            spec.target = self.prefetch(spec.command, spec.params) or ""
+        except Exception:
+            pass
+
+    # ── Transcription finale ────────────────────────────────────────────
+
+    def commit(self, final_text: str) -> Speculation | None:
+        """Confirm the candidate against the final transcript (None = normal flow)."""
+        with self._lock:
+            spec = self.candidate
+        if spec is None:
+            return None
+        cmd, params, score, intent = self.matcher(final_text)
+        if cmd is None or score < self.min_score or cmd.name != spec.command.name or params != spec.params:
+            self.outcome = "miss"
+            return None
+        if cmd.confirm:
+            self.outcome = "confirm_required"  # Jamais d'execution speculative
+            return None
+        self.outcome = "hit"
+        self.confirmed = Speculation(cmd, params, score, intent, spec.target, spec.at)
+        return self.confirmed
+
+    def pipeline_result(self, raw_text: str) -> dict[str, Any]:
+        """The confirmed command shaped like full_correction_pipeline()'s result."""
+        spec = self.confirmed
+        return {
+            "raw": raw_text,
+            "cleaned": spec.text,
+            "corrected": spec.text,
+            "intent": spec.text,
+            "command": spec.command,
+            "params": spec.params,
+            "confidence": spec.score,
+            "suggestions": [],
+            "method": "speculative",
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REPLAY — sequences de transcriptions enregistrees
+# ═══════════════════════════════════════════════════════════════════════════
+
+def replay(partials: Iterable[str], final: str, **kwargs: Any) -> dict[str, Any]:
+    """Run one recorded (partials, final) sequence through a resolver."""
+    kwargs.setdefault("background", False)
+    resolver = SpeculativeResolver(**kwargs)
+    for p in partials:
+        resolver.on_partial(p)
+    spec = resolver.commit(final)
+    candidate = resolver.candidate
+    return {
+        "final": final,
+        "candidate": candidate.command.name if candidate else None,
+        "command": spec.command.name if spec else None,
+        "params": spec.params if spec else {},
+        "outcome": resolver.outcome,
+        **resolver.stats,
+    }
+
+
+def replay_file(path: str | Path, **kwargs: Any) -> list[dict[str, Any]]:
+    """Replay a JSONL file of {"partials": [...], "final": "..."} lines."""
+    results = []
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                results.append(replay(entry.get("partials", []), entry["final"], **kwargs))
+    return results
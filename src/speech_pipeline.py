@@ -0,0 +1,256 @@
+"""JARVIS Speech Pipeline — Sentence-level TTS overlapped with generation.
+
+Flow:
+  flux du modele (blocs Claude, reponse IA locale) -> feed(chunk)
+  -> SentenceSplitter: phrases completes (markdown et blocs de code retires)
+  -> file bornee -> tache de rendu (TTSEngine.render, thread)
+  -> file bornee -> tache de lecture (TTSEngine.play, thread)
+  => la phrase 1 est lue pendant que la phrase 2 est rendue et que le
+     modele genere la suite
+  barge-in (PTT presse pendant la lecture): lecture coupee, files videes,
+  generation amont interrompue (on_cancel, ex. client.interrupt)
+
+Optimizations:
+- Time-to-first-audio = premiere phrase + son rendu, plus la reponse entiere
+- Files bornees: un modele plus rapide que la synthese attend (pas de
+  backlog de WAV), la synthese ne prend jamais plus de N phrases d'avance
+- Plus de troncature a 500 caracteres: la reponse complete est lue,
+  interruptible a tout moment
+- Mesures: jarvis_tts_first_audio_ms / jarvis_tts_first_sentence_ms
+- Une phrase dont le rendu ou la lecture echoue est sautee; un etage
+  mort ne bloque jamais feed()/close() sur une file pleine
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from src.config import config
+from src.metrics import REGISTRY
+from src.tts import TTSEngine
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…;:])\s+|\n+")
+_MD_PREFIX = re.compile(r"^\s*(?:#{1,6}\s+|[-*•>]\s+|\d+[.)]\s+)")
+_MD_INLINE = re.compile(r"\*\*|__|`|\|")
+_FENCE = "```"
+
+
+def spoken(text: str) -> str:
+    """A markdown line as it should be read aloud."""
+    return " ".join(_MD_INLINE.sub(" ", _MD_PREFIX.sub("", text)).split())
+
+
+class SentenceSplitter:
+    """Incremental splitter: feed() returns the sentences completed so far.
+
+    Fragments shorter than `min_chars` are merged with the next sentence
+    so the synthesizer never gets a lone "OK." between two long phrases.
+    """
+
+    def __init__(self, min_chars: int | None = None):
+        self.min_chars = config.tts_min_sentence_chars if min_chars is None else min_chars
+        self._buf = ""
+        self._pending = ""
+        self._in_code = False
+
+    def feed(self, chunk: str, flush: bool = False) -> list[str]:
+        """`flush`: the chunk ends a block (message), its tail is a sentence too."""
+        self._buf += chunk
+        out: list[str] = []
+        while True:
+            if self._in_code:
+                end = self._buf.find(_FENCE)
+                if end < 0:
+                    self._buf = self._buf[-(len(_FENCE) - 1):]  # Cloture peut-etre coupee
+                    break
+                self._buf = self._buf[end + len(_FENCE):]
+                self._in_code = False
+                continue
+            fence = self._buf.find(_FENCE)
+            text = self._buf if fence < 0 else self._buf[:fence]
+            m = _SENTENCE_END.search(text)
+            if m:
+                out += self._emit(text[:m.start()])
+                self._buf = self._buf[m.end():]
+                continue
+            if fence < 0:
+                break
+            out += self._emit(text, force=True)  # Code non lu: la phrase s'arrete la
+            self._buf = self._buf[fence + len(_FENCE):]
+            self._in_code = True
+        if flush:
+            out += self.flush()
+        return out
+
+    def _emit(self, sentence: str, force: bool = False) -> list[str]:
+        sentence = spoken(sentence)
+        if sentence:
+            self._pending = f"{self._pending} {sentence}".strip()
+        if self._pending and (force or len(self._pending) >= self.min_chars):
+            done, self._pending = self._pending, ""
+            return [done]
+        return []
+
+    def flush(self) -> list[str]:
+        rest = "" if self._in_code else self._buf
+        self._buf = ""
+        return self._emit(rest, force=True)
+
+
+@dataclass
+class SpeechStats:
+    sentences: int = 0
+    rendered: int = 0               # Phrases synthetisees (pretes a etre lues)
+    failed: int = 0                 # Phrases sautees (echec du rendu ou de la lecture)
+    chars: int = 0
+    first_sentence_ms: float = 0.0  # Debut -> premiere phrase complete du modele
+    first_audio_ms: float = 0.0     # Debut -> debut de lecture de la premiere phrase
+    total_ms: float = 0.0
+    cancelled: bool = False
+
+
+class SpeechPipeline:
+    """Split → render → play, three stages joined by bounded asyncio queues.
+
+    Must be created inside a running event loop. `barge_in()` (loop
+    thread) or `barge_in_threadsafe()` (keyboard hook thread) stops it.
+    """
+
+    def __init__(self, engine: TTSEngine, voice: str = "fr-FR",
+                 on_cancel: Callable[[], Awaitable[None]] | None = None,
+                 kind: str = "speak", t0: float | None = None, queue_size: int | None = None):
+        self.engine = engine
+        self.voice = voice
+        self.on_cancel = on_cancel
+        self.kind = kind
+        self.t0 = t0 or time.perf_counter()
+        self.splitter = SentenceSplitter()
+        self.stats = SpeechStats()
+        self.cancelled = False
+        self._cancel = threading.Event()  # Lu par le thread de lecture
+        self._on_cancel_task: asyncio.Future | None = None
+        self._loop = asyncio.get_running_loop()
+        self._render_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size or config.tts_pipeline_queue)
+        self._play_q: asyncio.Queue = asyncio.Queue(maxsize=2)
+        self._tasks = [
+            asyncio.create_task(self._render_loop()),
+            asyncio.create_task(self._play_loop()),
+        ]
+
+    def _ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000
+
+    # ── Entree (generation) ─────────────────────────────────────────────
+
+    async def feed(self, chunk: str, flush: bool = False) -> None:
+        """Queue the sentences completed by `chunk` (waits if synthesis lags)."""
+        if self.cancelled:
+            return
+        for sentence in self.splitter.feed(chunk, flush):
+            if self.cancelled:
+                return
+            if not self.stats.sentences:
+                self.stats.first_sentence_ms = self._ms()
+            self.stats.sentences += 1
+            self.stats.chars += len(sentence)
+            if not await self._put(self._render_q, sentence, self._tasks[0]):
+                return
+
+    async def say(self, text: str) -> None:
+        await self.feed(text, flush=True)
+
+    # ── Etages ──────────────────────────────────────────────────────────
+
+    @staticmethod
+    async def _put(queue: asyncio.Queue, item, consumer: asyncio.Task) -> bool:
+        """Queue `item` unless the consumer stage has died (False: dropped)."""
+        if consumer.done():
+            return False
+        put = asyncio.ensure_future(queue.put(item))
+        await asyncio.wait({put, consumer}, return_when=asyncio.FIRST_COMPLETED)
+        if put.done():
+            return True
+        put.cancel()
+        return False
+
+    async def _render_loop(self) -> None:
+        while True:
+            sentence = await self._render_q.get()
+            if sentence is None:
+                await self._put(self._play_q, None, self._tasks[1])
+                return
+            if self.cancelled:
+                continue
+            try:
+                path, cached = await asyncio.to_thread(self.engine.render, sentence, self.voice)
+            except Exception:
+                path, cached = None, False
+            if path is None:
+                self.stats.failed += 1  # Phrase sautee, la suite continue
+                continue
+            self.stats.rendered += 1
+            if not await self._put(self._play_q, (path, cached), self._tasks[1]) and not cached:
+                Path(path).unlink(missing_ok=True)
+
+    async def _play_loop(self) -> None:
+        while True:
+            item = await self._play_q.get()
+            if item is None:
+                return
+            path, cached = item
+            try:
+                if not self.cancelled:
+                    if not self.stats.first_audio_ms:
+                        self.stats.first_audio_ms = self._ms()
+                    await asyncio.to_thread(self.engine.play, path, self._cancel)
+            except Exception:
+                self.stats.failed += 1  # Peripherique audio indisponible: phrase suivante
+            finally:
+                if not cached:
+                    Path(path).unlink(missing_ok=True)
+
+    # ── Barge-in ────────────────────────────────────────────────────────
+
+    def barge_in(self) -> None:
+        """Stop playback, drop queued sentences and interrupt the generation."""
+        if self.cancelled:
+            return
+        self.cancelled = True
+        self.stats.cancelled = True
+        self._cancel.set()
+        REGISTRY.counter("jarvis_tts_barge_in_total").inc(kind=self.kind)
+        if self.on_cancel is not None:
+            self._on_cancel_task = asyncio.ensure_future(self.on_cancel())
+            self._on_cancel_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def barge_in_threadsafe(self) -> None:
+        self._loop.call_soon_threadsafe(self.barge_in)
+
+    # ── Fin ─────────────────────────────────────────────────────────────
+
+    async def close(self) -> SpeechStats:
+        """Flush the last sentence, wait until everything is spoken (or on_cancel done)."""
+        for sentence in ([] if self.cancelled else self.splitter.flush()):
+            self.stats.sentences += 1
+            self.stats.chars += len(sentence)
+            if not self.stats.first_sentence_ms:
+                self.stats.first_sentence_ms = self._ms()
+            await self._put(self._render_q, sentence, self._tasks[0])
+        await self._put(self._render_q, None, self._tasks[0])
+        await asyncio.gather(self._tasks[0], return_exceptions=True)
+        await self._put(self._play_q, None, self._tasks[1])  # Etage de rendu mort: fin quand meme
+        await asyncio.gather(self._tasks[1], return_exceptions=True)
+        if self._on_cancel_task is not None:  # Generation amont bien interrompue avant de rendre la main
+            await asyncio.gather(self._on_cancel_task, return_exceptions=True)
+        self.stats.total_ms = self._ms()
+        if self.stats.first_audio_ms:
+            REGISTRY.histogram("jarvis_tts_first_audio_ms").observe(self.stats.first_audio_ms, kind=self.kind)
+            REGISTRY.histogram("jarvis_tts_first_sentence_ms").observe(self.stats.first_sentence_ms, kind=self.kind)
+        return self.stats
@@ -61,28 +61,21 @@ def _launch_dashboard() -> None:
 
 
 def _quick_cluster_status() -> None:
-    """Show cluster status in a notification."""
-    import asyncio
-    import httpx
+    """Show cluster status in a notification (shared monitor snapshot)."""
+    from src.cluster_monitor import get_monitor
     from src.config import config
 
-    async def _check():
-        results = []
-        async with httpx.AsyncClient(timeout=5) as c:
-            for node in config.lm_nodes:
-                try:
-                    r = await c.get(f"{node.url}/api/v1/models")
-                    r.raise_for_status()
-                    cnt = len([m for m in r.json().get("models", []) if m.get("loaded_instances")])
-                    results.append(f"{node.name}: OK ({cnt} modeles)")
-                except Exception:
-                    results.append(f"{node.name}: OFFLINE")
-        return "\n".join(results)
-
     try:
-        loop = asyncio.new_event_loop()
-        text = loop.run_until_complete(_check())
-        loop.close()
+        monitor = get_monitor()
+        monitor.start_thread()  # Sondes en arriere-plan, partagees entre clics
+        snap = monitor.wait_first(timeout=config.health_timeout + 2)
+        if snap is None:
+            raise RuntimeError("aucun snapshot cluster")
+        results = []
+        for node in config.lm_nodes:
+            h = snap.nodes.get(node.name)
+            results.append(f"{node.name}: OK ({len(h.loaded)} modeles)" if h and h.online else f"{node.name}: OFFLINE")
+        text = "\n".join(results)
         # Show via Windows notification
         from src.windows import notify_windows
         notify_windows("JARVIS Cluster", text)
@@ -0,0 +1,178 @@
+"""JARVIS Thermal — Predictive thermal routing from the GPU telemetry series.
+
+Flow:
+  historique GPU (gpu_telemetry) -> EWMA de la temperature + pente lineaire
+  -> prevision a +horizon secondes (max sur les GPU de M1)
+  -> delestage M1 AVANT le seuil critique (actuel OU prevu >= critique)
+  -> retour sur M1 avec hysteresis (actuel ET prevu < critique - marge,
+     apres une duree minimale de delestage)
+
+Optimizations:
+- Decision calculee sur le snapshot partage: aucun appel nvidia-smi
+- Cache par version de snapshot (une seule prevision par echantillon)
+- Hysteresis + duree minimale: pas de va-et-vient autour du seuil
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+
+from src.config import config
+
+
+MIN_SAMPLES = 5  # ~10s d'historique a l'intervalle par defaut
+
+
+@dataclass
+class GpuForecast:
+    index: int
+    temp_c: int            # Derniere mesure
+    smoothed_c: float      # EWMA
+    slope_c_per_s: float   # Pente lineaire sur la fenetre
+    forecast_c: float      # Prevision a +horizon
+    samples: int
+
+
+@dataclass
+class ThermalDecision:
+    shed_m1: bool
+    status: str            # "normal" | "warning" | "critical" | "unknown"
+    max_temp: int
+    forecast_c: float
+    slope_c_per_s: float
+    reason: str
+    gpus: list[GpuForecast] = field(default_factory=list)
+
+
+def forecast_series(
+    samples: list[tuple[float, int, int, float]], horizon: float,
+    window: float, alpha: float,
+) -> tuple[float, float, float] | None:
+    """(smoothed, slope, forecast) from (ts, temp, util, vram_pct) samples.
+
+    EWMA smooths sensor noise; the slope is a least-squares fit over the
+    last `window` seconds. Needs MIN_SAMPLES samples with a valid temperature
+    (fewer would let a single noisy reading trigger a shed).
+    """
+    pts = [(ts, temp) for ts, temp, _u, _v in samples if temp >= 0]
+    if len(pts) < MIN_SAMPLES:
+        return None
+    smoothed = float(pts[0][1])
+    for _ts, temp in pts[1:]:
+        smoothed = alpha * temp + (1 - alpha) * smoothed
+    recent = [p for p in pts if p[0] >= pts[-1][0] - window]
+    if len(recent) < MIN_SAMPLES:
+        recent = pts[-MIN_SAMPLES:]
+    n = len(recent)
+    mean_t = sum(p[0] for p in recent) / n
+    mean_y = sum(p[1] for p in recent) / n
+    var = sum((p[0] - mean_t) ** 2 for p in recent)
+    slope = sum((p[0] - mean_t) * (p[1] - mean_y) for p in recent) / var if var > 0 else 0.0
+    return smoothed, slope, smoothed + slope * horizon
+
+
+class ThermalRouter:
+    """Shed/restore decision for M1 with hysteresis."""
+
+    def __init__(self, telemetry=None):
+        self._telemetry = telemetry
+        self.shedding = False
+        self.shed_since = 0.0
+        self.transitions = 0
+        self._cached: tuple[int, ThermalDecision] | None = None
+
+    def _source(self):
+        if self._telemetry is None:
+            from src.gpu_telemetry import get_telemetry
+            return get_telemetry()
+        return self._telemetry
+
+    def evaluate(self) -> ThermalDecision:
+        """Current decision (recomputed once per telemetry snapshot)."""
+        tel = self._source()
+        snap = tel.latest()
+        if snap is None or snap.age_s > config.gpu_telemetry_max_age:
+            # Pas de donnees fraiches: on garde la decision courante
+            return ThermalDecision(self.shedding, "unknown", -1, -1.0, 0.0,
+                                   "telemetrie indisponible")
+        if self._cached and self._cached[0] == snap.version:
+            return self._cached[1]
+
+        forecasts = []
+        for g in snap.gpus:
+            fc = forecast_series(
+                tel.history(g["index"]), config.thermal_forecast_horizon,
+                config.thermal_trend_window, config.thermal_ewma_alpha,
+            )
+            if fc:
+                forecasts.append(GpuForecast(g["index"], g["temp_c"], round(fc[0], 1),
+                                             round(fc[1], 3), round(fc[2], 1), len(tel.history(g["index"]))))
+            elif g["temp_c"] >= 0:
+                forecasts.append(GpuForecast(g["index"], g["temp_c"], float(g["temp_c"]),
+                                             0.0, float(g["temp_c"]), 1))
+        if not forecasts:
+            return ThermalDecision(self.shedding, "unknown", -1, -1.0, 0.0, "aucune temperature")
+
+        max_temp = max(f.temp_c for f in forecasts)
+        hottest = max(forecasts, key=lambda f: f.forecast_c)
+        critical = config.gpu_thermal_critical
+        release = critical - config.thermal_hysteresis
+        now = time.monotonic()
+
+        if not self.shedding:
+            if max_temp >= critical:
+                self._set(True, now)
+                reason = f"GPU {max_temp}C >= {critical}C"
+            elif hottest.forecast_c >= critical:
+                self._set(True, now)
+                reason = (f"GPU{hottest.index} prevu {hottest.forecast_c:.0f}C "
+                          f"dans {config.thermal_forecast_horizon:.0f}s")
+            else:
+                reason = ""
+        else:
+            cooled = max_temp < release and hottest.forecast_c < release
+            if cooled and now - self.shed_since >= config.thermal_min_shed_s:
+                self._set(False, now)
+                reason = f"refroidi ({max_temp}C, prevu {hottest.forecast_c:.0f}C)"
+            else:
+                reason = f"delestage M1 (retour sous {release}C)"
+
+        if max_temp >= critical:
+            status = "critical"
+        elif (self.shedding or max_temp >= config.gpu_thermal_warning
+              or hottest.forecast_c >= config.gpu_thermal_warning):
+            status = "warning"
+        else:
+            status = "normal"
+        decision = ThermalDecision(self.shedding, status, max_temp, hottest.forecast_c,
+                                   hottest.slope_c_per_s, reason, forecasts)
+        self._cached = (snap.version, decision)
+        return decision
+
+    def _set(self, shedding: bool, now: float) -> None:
+        self.shedding = shedding
+        self.shed_since = now
+        self.transitions += 1
+
+
+_ROUTER: ThermalRouter | None = None
+
+
+def get_thermal_router() -> ThermalRouter:
+    global _ROUTER
+    if _ROUTER is None:
+        _ROUTER = ThermalRouter()
+    return _ROUTER
+
+
+def m1_shed() -> bool:
+    """True while M1 should be avoided (hot now or forecast to be)."""
+    return get_thermal_router().evaluate().shed_m1
+
+
+def prefer_cool(route: list[str]) -> list[str]:
+    """Move M1 to the end of a route while it is being shed."""
+    if "M1" not in route or not m1_shed():
+        return route
+    return [n for n in route if n != "M1"] + ["M1"]
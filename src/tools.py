@@ -12,15 +12,37 @@ Optimizations:
 from __future__ import annotations
 
 import asyncio
+import functools
+import json
 import subprocess
 import sys
 import time
 from typing import Any
 
 import httpx
-from claude_agent_sdk import tool, create_sdk_mcp_server
+from claude_agent_sdk import create_sdk_mcp_server, tool as _sdk_tool
 
+from src.circuit_breaker import (
+    CLOSED, HALF_OPEN, CircuitOpenError, get_breaker, is_breaker_failure, node_for_url,
+)
 from src.config import config, SCRIPTS, PATHS
+from src.metrics import REGISTRY, json_report, latency_table, timer
+from src.profiler import profile
+
+
+def tool(name: str, description: str, input_schema: dict):
+    """SDK @tool with per-call metrics (src/metrics.py) and profiling (src/profiler.py)."""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def timed(args: dict[str, Any]) -> dict[str, Any]:
+            with timer("jarvis_tool_duration_ms", "jarvis_tool_calls_total",
+                       tool=name, server="sdk") as outcome, profile(f"mcp:{name}"):
+                result = await handler(args)
+                if isinstance(result, dict) and result.get("is_error"):
+                    outcome["status"] = "error"
+                return result
+        return _sdk_tool(name, description, input_schema)(timed)
+    return decorator
 
 
 def extract_lms_output(data: dict) -> str:
@@ -39,63 +61,68 @@ def extract_lms_output(data: dict) -> str:
 # CONNECTION POOL — Shared async client for all LM Studio/Ollama calls
 # ═══════════════════════════════════════════════════════════════════════════
 
-_HTTP_POOL: httpx.AsyncClient | None = None
-_POOL_LOCK = asyncio.Lock()
-
-
 async def _get_client() -> httpx.AsyncClient:
-    """Get or create the shared httpx client with connection pooling."""
-    global _HTTP_POOL
-    if _HTTP_POOL is None or _HTTP_POOL.is_closed:
-        async with _POOL_LOCK:
-            if _HTTP_POOL is None or _HTTP_POOL.is_closed:
-                _HTTP_POOL = httpx.AsyncClient(
-                    timeout=httpx.Timeout(
-                        connect=config.connect_timeout,
-                        read=config.inference_timeout,
-                        write=10.0,
-                        pool=5.0,
-                    ),
-                    limits=httpx.Limits(
-                        max_connections=20,
-                        max_keepalive_connections=10,
-                        keepalive_expiry=300,
-                    ),
-                )
-    return _HTTP_POOL
+    """Shared pooled client (src/cluster_client.py): keep-alive, node auth."""
+    from src.cluster_client import get_async_client
+    return await get_async_client()
 
 
 async def _retry_request(
     method: str, url: str, json: dict | None = None,
     max_retries: int = 2, timeout: float | None = None,
 ) -> httpx.Response:
-    """Execute HTTP request with retry and exponential backoff."""
-    client = await _get_client()
-    last_error = None
-    for attempt in range(max_retries + 1):
-        try:
-            kwargs: dict[str, Any] = {"url": url}
-            if json:
-                kwargs["json"] = json
-            if timeout:
-                kwargs["timeout"] = timeout
-            if method == "GET":
-                r = await client.get(**kwargs)
-            else:
-                r = await client.post(**kwargs)
-            r.raise_for_status()
-            return r
-        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
-            last_error = e
-            if attempt < max_retries:
-                await asyncio.sleep(0.5 * (2 ** attempt))
-        except httpx.HTTPStatusError:
-            raise
-        except Exception as e:
-            last_error = e
-            if attempt < max_retries:
-                await asyncio.sleep(0.5 * (2 ** attempt))
-    raise last_error or ConnectionError("Request failed")
+    """Execute HTTP request with retry and exponential backoff.
+
+    Guarded by the node's circuit breaker: an open circuit fails fast with
+    CircuitOpenError, and retries stop as soon as the circuit trips. A
+    half-open trial cancelled before its verdict is handed back to the breaker.
+    """
+    node = node_for_url(url)
+    breaker = get_breaker(node) if node else None
+    if breaker and not breaker.allow():
+        REGISTRY.counter("jarvis_http_requests_total").inc(node=node, status="circuit_open")
+        raise CircuitOpenError(node)
+    trial = breaker is not None and breaker.state == HALF_OPEN
+    try:
+        client = await _get_client()
+        last_error = None
+        with timer("jarvis_http_request_duration_ms", "jarvis_http_requests_total", node=node or "autre"):
+            for attempt in range(max_retries + 1):
+                if attempt:
+                    REGISTRY.counter("jarvis_http_retries_total").inc(node=node or "autre")
+                try:
+                    kwargs: dict[str, Any] = {"url": url}
+                    if json:
+                        kwargs["json"] = json
+                    if timeout:
+                        kwargs["timeout"] = timeout
+                    if method == "GET":
+                        r = await client.get(**kwargs)
+                    else:
+                        r = await client.post(**kwargs)
+                    r.raise_for_status()
+                    if breaker:
+                        breaker.record_success()
+                    return r
+                except httpx.HTTPStatusError as e:
+                    if breaker:
+                        if is_breaker_failure(e):
+                            breaker.record_failure(str(e))
+                        else:
+                            breaker.record_success()  # Le noeud repond, l'erreur vient de la requete
+                    raise
+                except Exception as e:
+                    last_error = e
+                    if breaker:
+                        breaker.record_failure(str(e))
+                        if breaker.state != CLOSED:
+                            break  # Circuit ouvert: inutile d'insister, route suivante
+                    if attempt < max_retries:
+                        await asyncio.sleep(0.5 * (2 ** attempt))
+            raise last_error or ConnectionError("Request failed")
+    finally:
+        if trial:
+            breaker.release_trial()  # Essai annule (hedge perdant, timeout): pas de verdict
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -115,6 +142,212 @@ def _track_latency(node: str, latency_ms: float) -> None:
         _METRICS[node] = _METRICS[node][-20:]
     # Update config auto-tune cache
     config.update_latency(node, int(latency_ms))
+    REGISTRY.gauge("jarvis_node_latency_ms", "Derniere latence d'inference par noeud").set(latency_ms, node=node)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# NODE CHAT — One call shape for LM Studio and Ollama nodes
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _chat_request(
+    name: str, prompt: str, system: str | None = None, model: str | None = None,
+    max_tokens: int | None = None, temperature: float | None = None,
+) -> tuple[str, dict] | None:
+    """Build (url, payload) for a chat call on node `name`, or None if unknown."""
+    max_tokens = max_tokens or config.max_tokens
+    temperature = config.temperature if temperature is None else temperature
+    ol = config.get_ollama_node(name)
+    if ol:
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        return f"{ol.url}/api/chat", {
+            "model": model or ol.default_model,
+            "messages": messages,
+            "stream": False, "think": False,
+            "options": {"temperature": temperature, "num_predict": max_tokens},
+        }
+    node = config.get_node(name)
+    if node:
+        payload = {
+            "model": model or node.default_model,
+            "input": prompt,
+            "temperature": temperature,
+            "max_output_tokens": max_tokens,
+            "stream": False,
+            "store": False,
+        }
+        if system:
+            payload["system_prompt"] = system
+        return f"{node.url}/api/v1/chat", payload
+    return None
+
+
+async def _node_chat(
+    name: str, prompt: str, system: str | None = None, model: str | None = None,
+    max_tokens: int | None = None, temperature: float | None = None,
+    timeout: float | None = None, call_type: str | None = None,
+) -> str:
+    """Single chat call on one node (no retry — breakers and hedging handle that).
+
+    With a call_type and a system prompt, LM Studio nodes reuse a stored
+    session so the static prefix stays in the KV cache (src/lm_sessions.py).
+    """
+    req = _chat_request(name, prompt, system, model, max_tokens, temperature)
+    if req is None:
+        raise ValueError(f"Noeud inconnu: {name}")
+    url, payload = req
+    if name == "M1":
+        from src.model_placement import get_scheduler
+        get_scheduler().record_use(payload["model"])
+    from src.keep_warm import get_keep_warm
+    get_keep_warm().record(name, payload["model"])
+    t0 = time.monotonic()
+    if call_type and system and config.lm_sessions_enabled and config.get_node(name):
+        # Prefixe systeme statique: reutilise la session LM Studio (cache KV)
+        from src.lm_sessions import session_chat
+        data = await session_chat(name, url, payload, call_type, timeout=timeout)
+    else:
+        r = await _retry_request("POST", url, json=payload, max_retries=0, timeout=timeout)
+        data = r.json()
+        if call_type:
+            from src.lm_sessions import record_prefill
+            record_prefill(call_type, "stateless", data)
+    latency = (time.monotonic() - t0) * 1000
+    _track_latency(name, latency)
+    if call_type:
+        _track_call_latency(call_type, name, latency)
+    if "message" in data:
+        return data["message"]["content"]
+    return extract_lms_output(data)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# HEDGED REQUESTS — Duplicate slow voice-path calls to the next node
+# ═══════════════════════════════════════════════════════════════════════════
+
+_CALL_METRICS: dict[str, list[float]] = {}    # "call_type:node" -> latences (ms)
+_HEDGE_STATS: dict[str, dict[str, int]] = {}  # call_type -> calls/hedges/hedge_wins
+
+
+def _track_call_latency(call_type: str, node: str, latency_ms: float) -> None:
+    key = f"{call_type}:{node}"
+    samples = _CALL_METRICS.setdefault(key, [])
+    samples.append(latency_ms)
+    if len(samples) > 50:
+        del samples[:-50]
+
+
+def _latency_percentile(call_type: str, node: str, q: float = 0.9) -> float | None:
+    """Observed latency percentile (ms) for a call type on a node.
+
+    Uses per-call-type samples when there are enough, else the node's
+    global samples. Returns None below 5 samples.
+    """
+    samples = _CALL_METRICS.get(f"{call_type}:{node}", [])
+    if len(samples) < 5:
+        samples = _METRICS.get(node, [])
+    if len(samples) < 5:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _hedge_allowed(call_type: str) -> bool:
+    """Budget check: hedges must stay under hedge_budgets[call_type] of calls."""
+    budget = config.hedge_budgets.get(call_type, 0.0)
+    st = _HEDGE_STATS.setdefault(call_type, {"calls": 0, "hedges": 0, "hedge_wins": 0})
+    return budget > 0 and (st["hedges"] + 1) <= budget * max(st["calls"], 1)
+
+
+async def hedged_chat(
+    call_type: str, route: list[str], prompt: str, system: str | None = None,
+    models: dict[str, str] | None = None, max_tokens: int | None = None,
+    temperature: float | None = None, timeout: float | None = None,
+) -> tuple[str, str]:
+    """Chat with hedging: returns (node_name, content).
+
+    The primary (first available node of `route`) is sent immediately.
+    If it hasn't answered by its observed p90 — and the call type's hedge
+    budget allows — a duplicate goes to the next closed-circuit node. First
+    answer wins, the loser is cancelled. A primary that fails outright fails
+    over to the next node without counting against the budget.
+    """
+    from src.circuit_breaker import is_available
+    from src.thermal import prefer_cool
+
+    route = prefer_cool(route)  # M1 en dernier s'il chauffe (ou va chauffer)
+    candidates = [n for n in route if is_available(n)] or list(route)
+    if not candidates:
+        raise ValueError("Route vide")
+    models = models or {}
+    st = _HEDGE_STATS.setdefault(call_type, {"calls": 0, "hedges": 0, "hedge_wins": 0})
+    st["calls"] += 1
+
+    def _launch(name: str) -> asyncio.Task:
+        return asyncio.create_task(_node_chat(
+            name, prompt, system=system, model=models.get(name),
+            max_tokens=max_tokens, temperature=temperature,
+            timeout=timeout, call_type=call_type,
+        ))
+
+    pending: dict[asyncio.Task, str] = {}
+    queue = list(candidates)
+    primary = queue.pop(0)
+    pending[_launch(primary)] = primary
+    hedged = False
+    last_error: BaseException | None = None
+    try:
+        while pending:
+            delay = None
+            if config.hedge_enabled and not hedged and queue:
+                p90 = _latency_percentile(call_type, primary)
+                delay = max(p90 if p90 is not None else config.hedge_default_delay_ms,
+                            config.hedge_min_delay_ms) / 1000
+            done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Primary trop lent: duplicata vers le noeud suivant si le budget le permet
+                hedged = True
+                # Jamais de duplicata vers un noeud semi-ouvert: le perdant annule
+                # consommerait l'unique essai de retablissement
+                name = next((n for n in queue if get_breaker(n).state == CLOSED), None)
+                if name and _hedge_allowed(call_type):
+                    st["hedges"] += 1
+                    queue.remove(name)
+                    pending[_launch(name)] = name
+                continue
+            for task in done:
+                name = pending.pop(task)
+                if task.exception() is None:
+                    if name != primary and hedged:
+                        st["hedge_wins"] += 1
+                    return name, task.result()
+                last_error = task.exception()
+            if not pending and queue:
+                # Echec franc: bascule immediate (pas un hedge)
+                primary = queue.pop(0)
+                pending[_launch(primary)] = primary
+    finally:
+        for task in pending:
+            task.cancel()
+    raise last_error or ConnectionError("Aucun noeud n'a repondu")
+
+
+def hedge_stats() -> dict[str, dict]:
+    """Per call type: calls, hedges, hedge wins, hedge rate, p90 per node."""
+    out = {}
+    for call_type, st in _HEDGE_STATS.items():
+        p90s = {}
+        for key, samples in _CALL_METRICS.items():
+            ct, node = key.split(":", 1)
+            if ct == call_type and samples:
+                p90s[node] = int(_latency_percentile(call_type, node) or max(samples))
+        out[call_type] = {
+            **st,
+            "rate": round(st["hedges"] / max(st["calls"], 1), 3),
+            "budget": config.hedge_budgets.get(call_type, 0.0),
+            "p90_ms": p90s,
+        }
+    return out
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -138,6 +371,26 @@ async def lm_query(args: dict[str, Any]) -> dict[str, Any]:
     timeout = config.get_timeout(mode)
     temp = 0.2 if mode == "fast" else config.temperature
 
+    if mode == "fast" and config.hedge_enabled:
+        # Voice path: hedging vers le noeud suivant si le primaire traine
+        route = [node.name] + [n for n in config.hedge_routes.get("fast", []) if n != node.name]
+        try:
+            t0 = time.monotonic()
+            winner, content = await hedged_chat(
+                "fast", route, prompt, models={node.name: model},
+                max_tokens=max_tokens, temperature=temp, timeout=timeout,
+            )
+            latency = int((time.monotonic() - t0) * 1000)
+            tag = f"{winner}/{model}" if winner == node.name else f"{winner} (hedge)"
+            return _text(f"[{tag}] {content}\n--- {latency}ms")
+        except Exception as e:
+            return _error(f"Erreur mode fast ({', '.join(route)}): {e}")
+
+    if node.name == "M1":
+        from src.model_placement import get_scheduler
+        get_scheduler().record_use(model)
+    from src.keep_warm import get_keep_warm
+    get_keep_warm().record(node.name, model)
     try:
         t0 = time.monotonic()
         r = await _retry_request("POST", f"{node.url}/api/v1/chat", json={
@@ -157,6 +410,8 @@ async def lm_query(args: dict[str, Any]) -> dict[str, Any]:
             f"[{node.name}/{model}] {content}\n"
             f"--- {int(latency)}ms | {usage.get('total_output_tokens', '?')} tokens"
         )
+    except CircuitOpenError:
+        return _error(f"Noeud {node.name} indisponible (circuit ouvert: {get_breaker(node.name).summary()})")
     except httpx.ConnectError:
         return _error(f"Noeud {node.name} hors ligne ({node.url})")
     except httpx.ReadTimeout:
@@ -178,101 +433,213 @@ async def lm_models(args: dict[str, Any]) -> dict[str, Any]:
         return _error(str(e))
 
 
+_PROBES_TRACKED: dict[str, float] = {}  # noeud -> checked_at de la derniere sonde comptee
+
+
 @tool("lm_cluster_status", "Sante de tous les noeuds du cluster (LM Studio + Ollama) avec metriques.", {})
 async def lm_cluster_status(args: dict[str, Any]) -> dict[str, Any]:
-    results, online = [], 0
-    total_nodes = len(config.lm_nodes) + len(config.ollama_nodes)
-    total_models = 0
-    client = await _get_client()
-
-    for n in config.lm_nodes:
-        try:
-            t0 = time.monotonic()
-            r = await client.get(f"{n.url}/api/v1/models", timeout=config.health_timeout)
-            r.raise_for_status()
-            latency = int((time.monotonic() - t0) * 1000)
-            models = [m["key"] for m in r.json().get("models", []) if m.get("loaded_instances")]
-            cnt = len(models)
-            total_models += cnt
-            online += 1
-            _track_latency(n.name, latency)
-            avg = int(sum(_METRICS.get(n.name, [latency])) / max(len(_METRICS.get(n.name, [1])), 1))
+    from src.cluster_monitor import get_monitor
+    snap = await get_monitor().snapshot()
+    results = []
+    for h in snap.nodes.values():
+        breaker = get_breaker(h.name)
+        if h.kind == "ollama":
+            if h.online:
+                results.append(
+                    f"  [OK] {h.name} ({h.role}) — {len(h.loaded)} modeles — {h.latency_ms}ms [Ollama] — circuit {breaker.summary()}\n"
+                    f"       Modeles: {', '.join(h.loaded)}"
+                )
+            else:
+                results.append(f"  [--] {h.name} ({h.role}) — hors ligne [Ollama] — circuit {breaker.summary()}")
+            continue
+        n = config.get_node(h.name)
+        if h.online:
+            if _PROBES_TRACKED.get(h.name) != h.checked_at:
+                _PROBES_TRACKED[h.name] = h.checked_at  # Snapshot en cache: une sonde = un echantillon
+                _track_latency(h.name, h.latency_ms)
+            avg = int(sum(_METRICS.get(h.name, [h.latency_ms])) / max(len(_METRICS.get(h.name, [1])), 1))
             results.append(
-                f"  [OK] {n.name} ({n.role}) — {n.gpus} GPU, {n.vram_gb}GB — "
-                f"{cnt} modeles — {latency}ms (avg {avg}ms)\n"
-                f"       Modeles: {', '.join(models)}"
+                f"  [OK] {h.name} ({h.role}) — {n.gpus} GPU, {n.vram_gb}GB — "
+                f"{len(h.loaded)} modeles — {h.latency_ms}ms (avg {avg}ms) — circuit {breaker.summary()}\n"
+                f"       Modeles: {', '.join(h.loaded)}"
             )
-        except Exception:
-            results.append(f"  [--] {n.name} ({n.role}) — hors ligne")
+        else:
+            results.append(f"  [--] {h.name} ({h.role}) — hors ligne — circuit {breaker.summary()}")
+
+    return _text(
+        f"Cluster: {snap.online}/{len(snap.nodes)} en ligne, {snap.total_models} modeles "
+        f"(snapshot v{snap.version}, {snap.age_s:.0f}s)\n"
+        + "\n".join(results)
+    )
+
+
+# ── Quorum consensus ────────────────────────────────────────────────────
+
+def _agreement(a: str, b: str) -> float:
+    """Word-level similarity between two answers (0.0 to 1.0)."""
+    from difflib import SequenceMatcher
+    wa, wb = a.lower().split(), b.lower().split()
+    if not wa or not wb:
+        return 0.0
+    return SequenceMatcher(None, wa, wb, autojunk=False).ratio()
 
-    for n in config.ollama_nodes:
+
+async def iter_consensus(
+    prompt: str, names: list[str], deadline: float | None = None,
+    max_tokens: int | None = None, temperature: float | None = None,
+):
+    """Query nodes in parallel and yield answers as they arrive.
+
+    Yields dicts {node, content, error, latency_ms}. Each node is bounded by
+    `deadline` seconds (else config.inference_timeout). Closing the generator
+    cancels the stragglers and waits for them, so their half-open trials
+    are handed back to the breakers before it returns.
+    """
+    per_node = deadline or config.inference_timeout
+    t0 = time.monotonic()
+
+    async def _one(name: str) -> dict:
         try:
-            t0 = time.monotonic()
-            r = await client.get(f"{n.url}/api/tags", timeout=config.health_timeout)
-            r.raise_for_status()
-            latency = int((time.monotonic() - t0) * 1000)
-            models = [m["name"] for m in r.json().get("models", [])]
-            cnt = len(models)
-            total_models += cnt
-            online += 1
-            results.append(
-                f"  [OK] {n.name} ({n.role}) — {cnt} modeles — {latency}ms [Ollama]\n"
-                f"       Modeles: {', '.join(models)}"
+            content = await asyncio.wait_for(
+                _node_chat(name, prompt, max_tokens=max_tokens, temperature=temperature, timeout=per_node),
+                timeout=per_node,
             )
-        except Exception:
-            results.append(f"  [--] {n.name} ({n.role}) — hors ligne [Ollama]")
+            return {"node": name, "content": content, "error": None}
+        except asyncio.TimeoutError:
+            return {"node": name, "content": None, "error": f"deadline {per_node:.0f}s depassee"}
+        except Exception as e:
+            return {"node": name, "content": None, "error": str(e) or type(e).__name__}
 
-    return _text(
-        f"Cluster: {online}/{total_nodes} en ligne, {total_models} modeles\n"
-        + "\n".join(results)
+    tasks = [asyncio.create_task(_one(n)) for n in names]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            res = await fut
+            res["latency_ms"] = int((time.monotonic() - t0) * 1000)
+            yield res
+    finally:
+        for t in tasks:
+            t.cancel()
+        # Attendre l'annulation: les essais half-open sont rendus avant le retour
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def quorum_consensus(
+    prompt: str, names: list[str], quorum: int = 0, agreement: float = 0.0,
+    deadline: float | None = None, max_tokens: int | None = None,
+    temperature: float | None = None, on_answer=None,
+) -> dict:
+    """Consensus with early termination.
+
+    Modes (combinables, le premier atteint gagne):
+    - quorum=k: stop as soon as k nodes have answered successfully
+    - agreement=t: stop as soon as two answers agree with similarity >= t
+    Without either, waits for every node (legacy behaviour).
+    Returns {answers (arrival order), scores, stop_reason, cancelled, elapsed_ms}.
+    """
+    answers: list[dict] = []
+    stop_reason = "tous"
+    t0 = time.monotonic()
+    gen = iter_consensus(prompt, names, deadline, max_tokens, temperature)
+    try:
+        async for res in gen:
+            answers.append(res)
+            if on_answer:
+                on_answer(res)
+            ok = [a for a in answers if a["content"] is not None]
+            if quorum and len(ok) >= quorum:
+                stop_reason = f"quorum {quorum}/{len(names)}"
+                break
+            if agreement and res["content"] is not None and any(
+                _agreement(res["content"], a["content"]) >= agreement for a in ok if a is not res
+            ):
+                stop_reason = f"accord >= {agreement:.2f}"
+                break
+    finally:
+        await gen.aclose()
+
+    ok = [a for a in answers if a["content"] is not None]
+    scores = {}
+    for a in ok:
+        others = [_agreement(a["content"], b["content"]) for b in ok if b is not a]
+        scores[a["node"]] = round(sum(others) / len(others), 3) if others else None
+    answered = {a["node"] for a in answers}
+    return {
+        "answers": answers,
+        "scores": scores,
+        "stop_reason": stop_reason,
+        "cancelled": [n for n in names if n not in answered],
+        "elapsed_ms": int((time.monotonic() - t0) * 1000),
+    }
+
+
+def format_consensus(result: dict) -> str:
+    """Render a quorum_consensus result (answers in arrival order)."""
+    header = (
+        f"Consensus ({result['stop_reason']}, {result['elapsed_ms']}ms)"
+        + (f" — annules: {', '.join(result['cancelled'])}" if result["cancelled"] else "")
+        + ":"
     )
+    lines = []
+    for a in result["answers"]:
+        if a["content"] is None:
+            lines.append(f"[{a['node']}] +{a['latency_ms']}ms ERREUR: {a['error']}")
+            continue
+        score = result["scores"].get(a["node"])
+        accord = f" accord={score:.2f}" if score is not None else ""
+        lines.append(f"[{a['node']}] +{a['latency_ms']}ms{accord}\n{a['content']}")
+    return header + "\n\n" + "\n\n---\n\n".join(lines)
 
 
-@tool("consensus", "Consensus multi-noeuds IA. Args: prompt, nodes (M1,M2,OL1).", {"prompt": str, "nodes": str})
+@tool(
+    "consensus",
+    "Consensus multi-noeuds IA avec arret anticipe. Args: prompt, nodes (M1,M2,OL1), "
+    "quorum (k reponses suffisent, 0=toutes), agreement (seuil de similarite 0-1), deadline (secondes par noeud).",
+    {"prompt": str, "nodes": str, "quorum": int, "agreement": float, "deadline": float},
+)
 async def consensus(args: dict[str, Any]) -> dict[str, Any]:
     prompt = args["prompt"]
-    names = [n.strip() for n in args.get("nodes", "M1,OL1").split(",")]
-    responses = []
-    client = await _get_client()
-
-    async def _query_node(name: str) -> str:
-        ol_node = config.get_ollama_node(name)
-        if ol_node:
-            try:
-                r = await client.post(f"{ol_node.url}/api/chat", json={
-                    "model": ol_node.default_model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "stream": False, "think": False,
-                    "options": {"temperature": config.temperature, "num_predict": config.max_tokens},
-                }, timeout=config.inference_timeout)
-                r.raise_for_status()
-                return f"[{name}/{ol_node.default_model}] {r.json()['message']['content']}"
-            except Exception as e:
-                return f"[{name}/Ollama] ERREUR: {e}"
+    names = [n.strip() for n in args.get("nodes", "M1,OL1").split(",") if n.strip()]
+    result = await quorum_consensus(
+        prompt, names,
+        quorum=int(args.get("quorum") or 0),
+        agreement=float(args.get("agreement") or 0.0),
+        deadline=float(args["deadline"]) if args.get("deadline") else None,
+    )
+    return _text(format_consensus(result))
 
-        node = config.get_node(name)
-        if not node:
-            return f"[{name}] ERREUR: inconnu"
-        try:
-            r = await client.post(f"{node.url}/api/v1/chat", json={
-                "model": node.default_model,
-                "input": prompt,
-                "temperature": config.temperature,
-                "max_output_tokens": config.max_tokens,
-                "stream": False,
-                "store": False,
-            }, timeout=config.inference_timeout)
-            r.raise_for_status()
-            return f"[{name}/{node.default_model}] {extract_lms_output(r.json())}"
-        except Exception as e:
-            return f"[{name}] ERREUR: {e}"
 
-    # Run all queries in parallel
-    results = await asyncio.gather(*[_query_node(n) for n in names], return_exceptions=True)
-    for r in results:
-        responses.append(str(r) if isinstance(r, Exception) else r)
+def _batch_source(args: dict[str, Any]) -> list[Any] | str:
+    """Prompts of a batch call: `file` path, or `prompts` as a JSON list / one per line."""
+    if args.get("file"):
+        return args["file"]
+    raw = args.get("prompts", "")
+    try:
+        prompts = json.loads(raw)
+        if isinstance(prompts, list):
+            return prompts
+    except (TypeError, ValueError):
+        pass
+    return [line for line in str(raw).splitlines() if line.strip()]
 
-    return _text("Consensus:\n\n" + "\n\n---\n\n".join(responses))
+
+@tool(
+    "lm_batch_query",
+    "Requetes en lot sur le cluster (slots paralleles par noeud, reprise sur checkpoint). "
+    "Args: prompts (liste JSON ou un par ligne) ou file (JSONL/texte), nodes (ex: M1,M2,OL1), "
+    "output (JSONL de sortie, reprise si existant), resume, max_tokens.",
+    {"prompts": str, "file": str, "nodes": str, "output": str, "resume": bool, "max_tokens": int},
+)
+async def lm_batch_query(args: dict[str, Any]) -> dict[str, Any]:
+    from src.batch_query import batch_query, format_batch_report
+    nodes = [n.strip() for n in args.get("nodes", "").split(",") if n.strip()] or None
+    try:
+        report = await batch_query(
+            _batch_source(args), output=args.get("output") or None, nodes=nodes,
+            resume=args.get("resume", True), max_tokens=args.get("max_tokens") or None,
+        )
+    except (OSError, ValueError) as e:
+        return _error(f"Lot impossible: {e}")
+    return _text(format_batch_report(report))
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -282,16 +649,23 @@ async def consensus(args: dict[str, Any]) -> dict[str, Any]:
 LMS_CLI = r"C:\Users\franc\.lmstudio\bin\lms.exe"
 
 
-@tool("lm_load_model", "Charger un modele sur M1. Args: model, context, parallel.", {"model": str, "context": int, "parallel": int})
+@tool("lm_load_model", "Charger un modele sur M1 (placement VRAM, eviction LRU). Args: model, context, parallel, dry_run (plan sans rien charger).", {"model": str, "context": int, "parallel": int, "dry_run": bool})
 async def lm_load_model(args: dict[str, Any]) -> dict[str, Any]:
     from src.cluster_startup import load_model_on_demand
+    from src.model_placement import format_plan, get_scheduler
     model = args["model"]
+    if args.get("dry_run"):
+        sched = get_scheduler()
+        plan = await asyncio.to_thread(sched.plan, model)
+        return _text(format_plan(plan))
     context = args.get("context", 16384)
     parallel = args.get("parallel", 2)
     result = await load_model_on_demand(model, context=context, parallel=parallel)
     if result["ok"]:
         bench = result.get("bench", {})
-        return _text(f"Modele {model} charge — {bench.get('latency_ms', '?')}ms warmup")
+        plan = result.get("plan")
+        evicted = f" (decharges: {', '.join(plan.unloads)})" if plan and plan.unloads else ""
+        return _text(f"Modele {model} charge — {bench.get('latency_ms', '?')}ms warmup{evicted}")
     return _error(f"Echec chargement {model}: {result.get('status', '?')}")
 
 
@@ -319,8 +693,11 @@ async def lm_switch_dev(args: dict[str, Any]) -> dict[str, Any]:
 
 @tool("lm_gpu_stats", "Statistiques GPU detaillees (VRAM, utilisation, temperature).", {})
 async def lm_gpu_stats(args: dict[str, Any]) -> dict[str, Any]:
-    from src.cluster_startup import _get_gpu_stats
-    gpus = _get_gpu_stats()
+    from src.gpu_telemetry import get_telemetry
+    gpus = get_telemetry().gpus(max_age=config.gpu_telemetry_max_age)
+    if not gpus:
+        from src.cluster_startup import _get_gpu_stats
+        gpus = await asyncio.to_thread(_get_gpu_stats)  # Sampler indisponible: one-shot hors boucle
     if not gpus:
         return _error("nvidia-smi non disponible")
     lines = []
@@ -330,6 +707,12 @@ async def lm_gpu_stats(args: dict[str, Any]) -> dict[str, Any]:
     for g in gpus:
         bar = "#" * int(g["vram_pct"] / 5) + "." * (20 - int(g["vram_pct"] / 5))
         lines.append(f"GPU{g['index']} {g['name']} [{bar}] {g['vram_used_mb']}MB/{g['vram_total_mb']}MB ({g['vram_pct']}%) | util={g['gpu_util']}%")
+    from src.thermal import get_thermal_router
+    decision = get_thermal_router().evaluate()
+    if decision.status != "unknown":
+        trend = f"{decision.slope_c_per_s * 60:+.1f}C/min"
+        lines.append(f"\nThermique: {decision.max_temp}C, prevu {decision.forecast_c:.0f}C ({trend})"
+                     f"{' | M1 DELESTE' if decision.shed_m1 else ''}")
     return _text("\n".join(lines))
 
 
@@ -355,9 +738,13 @@ async def lm_benchmark(args: dict[str, Any]) -> dict[str, Any]:
     return _text("Benchmark:\n" + "\n".join(results))
 
 
-@tool("lm_perf_metrics", "Metriques de performance du cluster (latences moyennes, requetes).", {})
+@tool("lm_perf_metrics", "Metriques de performance du cluster (latences, p95 par outil). Args: format (text/json).", {"format": str})
 async def lm_perf_metrics(args: dict[str, Any]) -> dict[str, Any]:
-    if not _METRICS:
+    if args.get("format") == "json":
+        return _text(json.dumps(json_report(), ensure_ascii=False))
+    snap = REGISTRY.snapshot()
+    tools_p95 = latency_table(snap, "jarvis_tool_duration_ms")
+    if not _METRICS and not tools_p95:
         return _text("Aucune metrique collectee. Lance lm_benchmark d'abord.")
     lines = ["Metriques de performance:"]
     for node, latencies in _METRICS.items():
@@ -365,6 +752,72 @@ async def lm_perf_metrics(args: dict[str, Any]) -> dict[str, Any]:
         mn = int(min(latencies))
         mx = int(max(latencies))
         lines.append(f"  {node}: avg={avg}ms min={mn}ms max={mx}ms ({len(latencies)} requetes)")
+    for title, name, label in (
+        ("Outils (p95 le plus lent d'abord)", "jarvis_tool_duration_ms", "tool"),
+        ("HTTP cluster par noeud", "jarvis_http_request_duration_ms", "node"),
+        ("Etapes de correction vocale", "jarvis_correction_stage_ms", "stage"),
+    ):
+        rows = tools_p95 if name == "jarvis_tool_duration_ms" else latency_table(snap, name)
+        if rows:
+            lines.append(f"{title}:")
+            for r in rows[:10]:
+                lines.append(
+                    f"  {r['labels'].get(label, '?')}: p50={r['p50_ms']}ms p95={r['p95_ms']}ms "
+                    f"p99={r['p99_ms']}ms avg={r['avg_ms']}ms (n={r['count']})"
+                )
+    from src.prompt_retrieval import retrieval_stats
+    rs = retrieval_stats()
+    if rs["requests"]:
+        lines.append(
+            f"Prompt M1 (retrieval): {rs['avg_tokens']} tokens/req vs {rs['avg_full_tokens']} complet — "
+            f"{rs['avg_saved_per_request']} economises/req ({rs['tokens_saved']} total, index {rs['index_size']})"
+        )
+    from src.lm_sessions import prefill_report
+    prefill = prefill_report()
+    if prefill:
+        lines.append("Prefill par type d'appel (stateless -> session):")
+        for call_type, modes in prefill.items():
+            parts = [f"{m}={v['avg_ms']}ms (n={v['n']})" for m, v in modes.items() if m != "speedup"]
+            speedup = f" | x{modes['speedup']}" if "speedup" in modes else ""
+            lines.append(f"  {call_type}: {', '.join(parts)}{speedup}")
+    hedges = hedge_stats()
+    if hedges:
+        lines.append("Hedging (voice path):")
+        for call_type, st in hedges.items():
+            p90 = ", ".join(f"{n}={ms}ms" for n, ms in st["p90_ms"].items())
+            lines.append(
+                f"  {call_type}: {st['hedges']}/{st['calls']} dupliquees ({st['rate']:.0%}, budget {st['budget']:.0%}), "
+                f"{st['hedge_wins']} gagnees par le hedge | p90 {p90 or '-'}"
+            )
+    from src.model_placement import get_scheduler
+    sched = get_scheduler()
+    mix = {role: d for role, d in sched.request_mix().items() if d > 0}
+    if mix or any(sched.stats.values()):
+        lines.append(
+            "Placement M1: " + ", ".join(f"{r}={d}" for r, d in mix.items())
+            + f" | {sched.stats['loads']} chargements ({sched.stats['preloads']} precharges), "
+            f"{sched.stats['unloads']} evictions"
+        )
+    from src.keep_warm import format_report, get_keep_warm
+    lines.append(format_report(get_keep_warm()))
+    from src.model_availability import get_availability
+    avail = get_availability()
+    if avail.stats["fallbacks"] or avail.summary():
+        down = ", ".join(f"{m} ({why})" for m, why in avail.summary().items())
+        lines.append(
+            f"Ollama disponibilite: {avail.stats['fallbacks']} replis "
+            f"({avail.stats['avoided']} sans aller-retour perdu), {avail.stats['refreshes']} lectures /api/tags"
+            + (f" | indisponibles: {down}" if down else "")
+        )
+    from src.cluster_client import HTTP2, reuse_stats
+    reuse = reuse_stats()
+    if reuse:
+        lines.append(f"Connexions cluster ({'HTTP/2' if HTTP2 else 'HTTP/1.1'} keep-alive):")
+        for host, st in reuse.items():
+            lines.append(
+                f"  {host}: {st['requests']} requetes / {st['connections']} connexions TCP "
+                f"(reutilisation {st['reuse_rate']:.0%})"
+            )
     return _text("\n".join(lines))
 
 
@@ -378,6 +831,8 @@ async def ollama_query(args: dict[str, Any]) -> dict[str, Any]:
     if not node:
         return _error("Noeud Ollama OL1 non configure")
     model = args.get("model", node.default_model)
+    from src.keep_warm import get_keep_warm
+    get_keep_warm().record(node.name, model)
     try:
         t0 = time.monotonic()
         r = await _retry_request("POST", f"{node.url}/api/chat", json={
@@ -402,6 +857,8 @@ async def ollama_models(args: dict[str, Any]) -> dict[str, Any]:
     try:
         r = await _retry_request("GET", f"{node.url}/api/tags", timeout=config.health_timeout)
         models = [m["name"] for m in r.json().get("models", [])]
+        from src.model_availability import get_availability
+        get_availability().update_tags(models)
         return _text(f"Modeles Ollama: {', '.join(models) if models else 'aucun'}")
     except Exception as e:
         return _error(f"Erreur Ollama: {e}")
@@ -417,6 +874,8 @@ async def ollama_pull(args: dict[str, Any]) -> dict[str, Any]:
         client = await _get_client()
         r = await client.post(f"{node.url}/api/pull", json={"name": model_name, "stream": False}, timeout=600)
         r.raise_for_status()
+        from src.model_availability import get_availability
+        get_availability().invalidate(model_name)
         return _text(f"Modele '{model_name}' telecharge avec succes.")
     except Exception as e:
         return _error(f"Erreur pull Ollama: {e}")
@@ -455,9 +914,12 @@ async def _ollama_cloud_query(
 ) -> str:
     """Query an Ollama cloud model with fallback to local qwen3:1.7b.
 
-    If the cloud model returns 404/401 (not installed or not authenticated),
-    falls back to the local qwen3:1.7b model automatically.
+    Models known to be unavailable (not in /api/tags, or a recent 404/401)
+    go straight to qwen3:1.7b. A fresh 404/401 is recorded so the next
+    calls — including parallel sub-agents — skip the failed round trip.
     """
+    from src.model_availability import FALLBACK_MODEL, get_availability
+
     node = config.get_ollama_node("OL1")
     if not node:
         raise ConnectionError("Ollama OL1 non configure")
@@ -466,10 +928,9 @@ async def _ollama_cloud_query(
         messages.append({"role": "system", "content": system})
     messages.append({"role": "user", "content": prompt})
 
-    # Try cloud model first
-    try:
+    async def _chat(name: str) -> str:
         r = await _retry_request("POST", f"{node.url}/api/chat", json={
-            "model": model, "messages": messages,
+            "model": name, "messages": messages,
             "stream": False, "think": False,
             "options": {"temperature": 0.3, "num_predict": config.max_tokens},
         }, timeout=timeout)
@@ -478,19 +939,23 @@ async def _ollama_cloud_query(
         if not content and msg.get("thinking"):
             content = msg["thinking"]
         return content
+
+    availability = get_availability()
+    resolved, _reason = await availability.resolve(model)
+    if resolved != model:
+        availability.stats["fallbacks"] += 1
+        return f"[FALLBACK {resolved}] {await _chat(resolved)}"
+
+    # Try cloud model first
+    try:
+        content = await _chat(model)
+        availability.mark_ok(model)
+        return content
     except httpx.HTTPStatusError as e:
-        if e.response.status_code in (404, 401) and model != "qwen3:1.7b":
-            # Fallback to local model
-            r = await _retry_request("POST", f"{node.url}/api/chat", json={
-                "model": "qwen3:1.7b", "messages": messages,
-                "stream": False, "think": False,
-                "options": {"temperature": 0.3, "num_predict": config.max_tokens},
-            }, timeout=timeout)
-            msg = r.json()["message"]
-            content = msg.get("content", "")
-            if not content and msg.get("thinking"):
-                content = msg["thinking"]
-            return f"[FALLBACK qwen3:1.7b] {content}"
+        if e.response.status_code in (404, 401) and model != FALLBACK_MODEL:
+            availability.mark_failure(model, e.response.status_code)
+            availability.stats["fallbacks"] += 1
+            return f"[FALLBACK {FALLBACK_MODEL}] {await _chat(FALLBACK_MODEL)}"
         raise
 
 
@@ -1006,8 +1471,8 @@ jarvis_server = create_sdk_mcp_server(
     name="jarvis",
     version="3.2.0",
     tools=[
-        # LM Studio (4)
-        lm_query, lm_models, lm_cluster_status, consensus,
+        # LM Studio (5)
+        lm_query, lm_models, lm_cluster_status, consensus, lm_batch_query,
         # LM Studio Model Management (7)
         lm_load_model, lm_unload_model, lm_switch_coder, lm_switch_dev,
         lm_gpu_stats, lm_benchmark, lm_perf_metrics,
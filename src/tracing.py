@@ -0,0 +1,284 @@
+"""JARVIS Tracing — Nested spans for the voice pipeline, one trace per utterance.
+
+Flow:
+  run_voice/run_hybrid: start_trace("utterance") par enonce
+  -> span("record"), span("whisper"), span("correction.ia")... imbriques
+     via une ContextVar (suit les await, les taches et asyncio.to_thread)
+  -> end_trace(): l'arbre complet ecrit en une ligne de data/traces.jsonl
+  -> trace_report(): latence par etape (p50/p95/part du total) et
+     enonces les plus lents recents (python main.py --trace)
+
+Optimizations:
+- Un span = un objet + deux perf_counter(): aucun I/O avant la fin de
+  l'enonce, une seule ecriture JSONL par trace
+- Latence de reponse mesuree depuis la fin de l'enregistrement: l'attente
+  de la touche PTT n'entre pas dans le classement des enonces lents
+- JARVIS_TRACE=false: span() ne cree plus rien (cout d'un test)
+- Hors d'une trace (start_trace), span() ne cree rien non plus: seuls les
+  enonces sont persistes (pas de racines parasites des tests, de
+  train_voice.py ou du TTS au demarrage dans le rapport)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from src.config import config
+
+
+TRACES_FILE = Path(__file__).resolve().parent.parent / "data" / "traces.jsonl"
+
+# Etapes "temps utilisateur" exclues de la latence de reponse
+IDLE_SPANS = ("ptt_wait", "record")
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    parent: Span | None = None
+    attrs: dict[str, Any] = field(default_factory=dict)
+    start: float = field(default_factory=time.time)
+    status: str = "ok"
+    children: list[Span] = field(default_factory=list)
+    duration_ms: float = 0.0
+    dropped: bool = False
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+    _token: Token | None = field(default=None, repr=False)
+
+    def set(self, **attrs: Any) -> Span:
+        self.attrs.update(attrs)
+        return self
+
+    def drop(self) -> None:
+        """Do not persist this trace (e.g. empty recording)."""
+        self.dropped = True
+
+    def _finish(self) -> None:
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000
+
+    def to_dict(self) -> dict[str, Any]:
+        d: dict[str, Any] = {
+            "name": self.name,
+            "start": round(self.start, 3),
+            "ms": round(self.duration_ms, 1),
+        }
+        if self.status != "ok":
+            d["status"] = self.status
+        if self.attrs:
+            d["attrs"] = self.attrs
+        if self.children:
+            d["children"] = [c.to_dict() for c in self.children]
+        return d
+
+
+_CURRENT: ContextVar[Span | None] = ContextVar("jarvis_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _CURRENT.get()
+
+
+def _open(name: str, attrs: dict[str, Any]) -> Span:
+    parent = _CURRENT.get()
+    trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+    s = Span(name, trace_id, parent, attrs)
+    s._token = _CURRENT.set(s)
+    return s
+
+
+def _close(s: Span) -> None:
+    s._finish()
+    if s._token is not None:
+        try:
+            _CURRENT.reset(s._token)
+        except ValueError:
+            _CURRENT.set(s.parent)  # Ferme depuis un autre contexte
+        s._token = None
+    if s.parent is not None:
+        s.parent.children.append(s)
+    elif not s.dropped:
+        _write(s)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span | None]:
+    """Time a block as a child of the current span (no-op outside a trace).
+
+    Usable in sync and async code; exceptions mark the span as error.
+    Only start_trace() opens roots, so only utterances reach traces.jsonl.
+    """
+    if not config.trace_enabled or _CURRENT.get() is None:
+        yield None
+        return
+    s = _open(name, attrs)
+    try:
+        yield s
+    except asyncio.CancelledError:
+        s.status = "cancelled"
+        raise
+    except BaseException as e:
+        s.status = "error"
+        s.attrs["error"] = str(e)[:200] or type(e).__name__
+        raise
+    finally:
+        _close(s)
+
+
+def start_trace(name: str, **attrs: Any) -> Span | None:
+    """Open a root span spanning loop iterations (close with end_trace)."""
+    if not config.trace_enabled:
+        return None
+    _CURRENT.set(None)
+    return _open(name, attrs)
+
+
+def end_trace(root: Span | None) -> None:
+    """Close a root span from start_trace and persist it (None = no-op)."""
+    if root is not None and root._token is not None:
+        _close(root)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINK — JSONL, une ligne par trace
+# ═══════════════════════════════════════════════════════════════════════════
+
+def response_ms(root: dict[str, Any]) -> float:
+    """Latency after the user stopped talking (root minus PTT wait/recording)."""
+    end = root["start"] + root["ms"] / 1000
+    idle_end = max((c["start"] + c["ms"] / 1000 for c in root.get("children", [])
+                    if c["name"] in IDLE_SPANS), default=None)
+    if idle_end is None:
+        return root["ms"]
+    return max(end - idle_end, 0.0) * 1000
+
+
+def _write(root: Span) -> None:
+    entry = {"trace_id": root.trace_id, **root.to_dict()}
+    entry["response_ms"] = round(response_ms(entry), 1)
+    try:
+        TRACES_FILE.parent.mkdir(parents=True, exist_ok=True)
+        if TRACES_FILE.exists() and TRACES_FILE.stat().st_size > config.trace_max_mb * 1024 * 1024:
+            os.replace(TRACES_FILE, TRACES_FILE.with_suffix(".1.jsonl"))
+        with TRACES_FILE.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+    except OSError:
+        pass
+
+
+def load_traces(limit: int | None = None, path: Path | None = None) -> list[dict[str, Any]]:
+    """Most recent traces (oldest first), at most `limit`."""
+    path = path or TRACES_FILE
+    limit = limit or config.trace_report_window
+    if not path.exists():
+        return []
+    recent: deque[str] = deque(maxlen=limit)
+    with path.open(encoding="utf-8") as f:
+        recent.extend(f)
+    traces = []
+    for line in recent:
+        try:
+            traces.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue  # Ligne partielle (processus tue pendant l'ecriture)
+    return traces
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REPORT — latence par etape, enonces les plus lents
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _walk(node: dict[str, Any], depth: int = 0) -> Iterator[tuple[int, dict[str, Any]]]:
+    for c in node.get("children", []):
+        yield depth, c
+        yield from _walk(c, depth + 1)
+
+
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def trace_report(traces: list[dict[str, Any]] | None = None, slowest: int = 5) -> dict[str, Any]:
+    """Per-stage latency breakdown and the slowest recent utterances."""
+    traces = load_traces() if traces is None else traces
+    per_stage: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for t in traces:
+        for _, s in _walk(t):
+            per_stage.setdefault(s["name"], []).append(s["ms"])
+            if s.get("status") == "error":
+                errors[s["name"]] = errors.get(s["name"], 0) + 1
+    total_response = sum(t.get("response_ms", t["ms"]) for t in traces) or 1.0
+    stages = []
+    for name, values in per_stage.items():
+        stages.append({
+            "stage": name,
+            "count": len(values),
+            "avg_ms": round(sum(values) / len(values), 1),
+            "p50_ms": round(_pct(values, 0.5), 1),
+            "p95_ms": round(_pct(values, 0.95), 1),
+            # Etapes imbriquees: la part d'un parent inclut celle de ses enfants
+            "share": round(sum(values) / total_response, 3) if name not in IDLE_SPANS else None,
+            "errors": errors.get(name, 0),
+        })
+    stages.sort(key=lambda s: -s["p95_ms"])
+    responses = [t.get("response_ms", t["ms"]) for t in traces]
+    slow = sorted(traces, key=lambda t: -t.get("response_ms", t["ms"]))[:slowest]
+    return {
+        "traces": len(traces),
+        "response_p50_ms": round(_pct(responses, 0.5), 1),
+        "response_p95_ms": round(_pct(responses, 0.95), 1),
+        "stages": stages,
+        "slowest": [
+            {
+                "trace_id": t["trace_id"],
+                "when": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t["start"])),
+                "response_ms": t.get("response_ms", t["ms"]),
+                "text": t.get("attrs", {}).get("text", ""),
+                "path": t.get("attrs", {}).get("path", ""),
+                "spans": [(d, s["name"], s["ms"]) for d, s in _walk(t)
+                          if s["name"] not in IDLE_SPANS],
+            }
+            for t in slow
+        ],
+    }
+
+
+def format_trace_report(report: dict[str, Any]) -> str:
+    """Text rendering of trace_report()."""
+    if not report["traces"]:
+        return f"Aucune trace ({TRACES_FILE})"
+    lines = [
+        f"Traces: {report['traces']} enonces | reponse p50 {report['response_p50_ms']:.0f}ms"
+        f" p95 {report['response_p95_ms']:.0f}ms",
+        "",
+        f"  {'Etape':<24} {'n':>5} {'moy':>8} {'p50':>8} {'p95':>8} {'part':>6}",
+    ]
+    for s in report["stages"]:
+        share = f"{s['share']:.0%}" if s["share"] is not None else "-"
+        err = f"  ({s['errors']} err)" if s["errors"] else ""
+        lines.append(
+            f"  {s['stage']:<24} {s['count']:>5} {s['avg_ms']:>7.0f}ms {s['p50_ms']:>7.0f}ms"
+            f" {s['p95_ms']:>7.0f}ms {share:>6}{err}"
+        )
+    lines.append("")
+    lines.append("Enonces les plus lents:")
+    for t in report["slowest"]:
+        path = f" [{t['path']}]" if t["path"] else ""
+        lines.append(f"  {t['when']}  {t['response_ms']:.0f}ms{path}  \"{t['text'][:60]}\"")
+        for depth, name, ms in t["spans"]:
+            lines.append(f"      {'  ' * depth}{name:<{24 - 2 * depth}} {ms:>7.0f}ms")
+    return "\n".join(lines)
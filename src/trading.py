@@ -6,12 +6,11 @@ executes via ccxt on MEXC Futures, records trades, notifies Telegram.
 
 from __future__ import annotations
 
-import json
 import sqlite3
-import urllib.request
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
+from src.cluster_client import shared_sync_client
 from src.config import config
 
 
@@ -81,8 +80,10 @@ def get_current_price(symbol: str) -> float | None:
     mexc_sym = _symbol_to_mexc_api(symbol)
     try:
         url = f"https://contract.mexc.com/api/v1/contract/ticker?symbol={mexc_sym}"
-        req = urllib.request.urlopen(url, timeout=10)
-        data = json.loads(req.read())
+        with shared_sync_client(timeout=10) as c:
+            r = c.get(url)
+            r.raise_for_status()
+            data = r.json()
         return float(data["data"]["lastPrice"])
     except Exception:
         return None
@@ -387,16 +388,12 @@ def send_telegram(message: str) -> bool:
     if not config.telegram_token or not config.telegram_chat:
         return False
     try:
-        body = json.dumps({
-            "chat_id": config.telegram_chat,
-            "text": message,
-        }).encode()
-        req = urllib.request.Request(
-            f"https://api.telegram.org/bot{config.telegram_token}/sendMessage",
-            data=body,
-            headers={"Content-Type": "application/json"},
-        )
-        urllib.request.urlopen(req, timeout=10)
+        with shared_sync_client(timeout=10) as c:
+            r = c.post(
+                f"https://api.telegram.org/bot{config.telegram_token}/sendMessage",
+                json={"chat_id": config.telegram_chat, "text": message},
+            )
+            r.raise_for_status()
         return True
     except Exception:
         return False
@@ -0,0 +1,396 @@
+"""JARVIS TTS — Persistent synthesizer, disk phrase cache, pluggable backends.
+
+Flow:
+  speak("Commande annulee.", "fr-FR")
+  -> nettoyage du texte -> cle (backend, voix, texte)
+  -> cache disque (data/tts_cache/<sha1>.wav) present: lecture directe
+  -> sinon backend.render(texte, voix, chemin):
+     - sapi: UN processus PowerShell persistant (System.Speech charge et
+       synthetiseur construit une seule fois), commandes JSON sur stdin,
+       rendu en WAV, reponse OK/ERR sur stdout
+     - null: WAV silencieux proportionnel au texte (Linux, tests)
+  -> phrase courte: WAV garde dans le cache (eviction LRU par taille)
+  -> lecture du WAV (sounddevice), interruptible via stop_playback()
+
+Optimizations:
+- Plus de .ps1 temporaire ni de powershell.exe + Add-Type par reponse:
+  le cout de demarrage est paye une fois, en arriere-plan au lancement
+- Confirmations et phrases d'etat ("OK", "Commande annulee.") rendues une
+  fois puis rejouees depuis le disque (COMMON_PHRASES pre-rendues)
+- Cache LRU sur disque: mtime = dernier acces, eviction des plus anciens
+  au-dela de tts_cache_mb
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+
+from src.config import config
+from src.metrics import REGISTRY, timer
+
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "tts_cache"
+
+# Phrases pre-rendues au demarrage (confirmations et etats du mode vocal)
+COMMON_PHRASES = [
+    "OK", "Commande annulee.", "Oui, dis-moi?", "Session terminee.",
+    "Quelle est ta question ou action?", "Dis-moi, quelle est ta question?",
+    "Desole, une erreur s'est produite. Repete ta demande.",
+]
+
+_SAPI_HOST = r'''
+$ErrorActionPreference = "Stop"
+[Console]::InputEncoding = [Text.Encoding]::UTF8
+[Console]::OutputEncoding = [Text.Encoding]::UTF8
+Add-Type -AssemblyName System.Speech
+$synth = New-Object System.Speech.Synthesis.SpeechSynthesizer
+$current = ""
+[Console]::Out.WriteLine("SAPI_READY")
+[Console]::Out.Flush()
+while ($null -ne ($line = [Console]::In.ReadLine())) {
+    if ($line -eq "QUIT") { break }
+    try {
+        $cmd = $line | ConvertFrom-Json
+        if ($cmd.voice -ne $current) {
+            $synth.SelectVoiceByHints("NotSet", 0, 0, [System.Globalization.CultureInfo]::GetCultureInfo($cmd.voice))
+            $current = $cmd.voice
+        }
+        $synth.SetOutputToWaveFile($cmd.path)
+        $synth.Speak([string]$cmd.text)
+        $synth.SetOutputToNull()
+        [Console]::Out.WriteLine("OK")
+    } catch {
+        $synth.SetOutputToNull()
+        [Console]::Out.WriteLine("ERR " + ($_.Exception.Message -replace "\s+", " "))
+    }
+    [Console]::Out.Flush()
+}
+'''
+
+
+def clean_text(text: str) -> str:
+    """Text as spoken: no markdown emphasis, single line."""
+    return " ".join(text.replace("**", "").replace('"', "'").split())
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# BACKENDS — render(texte, voix, chemin WAV) -> bool
+# ═══════════════════════════════════════════════════════════════════════════
+
+class TTSBackend(ABC):
+    name = "base"
+
+    def start(self) -> bool:
+        return True
+
+    @abstractmethod
+    def render(self, text: str, voice: str, path: Path) -> bool:
+        """Synthesize `text` into the WAV file `path`; False on failure."""
+
+    def play(self, path: Path, cancel: threading.Event) -> bool:
+        """Play a WAV file; returns False if interrupted by `cancel`."""
+        import sounddevice as sd
+        with wave.open(str(path), "rb") as wf:
+            rate = wf.getframerate()
+            audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2")
+            if wf.getnchannels() > 1:
+                audio = audio.reshape(-1, wf.getnchannels())
+        if not len(audio):
+            return True
+        sd.play(audio, rate)
+        end = time.monotonic() + len(audio) / rate + 0.5
+        while time.monotonic() < end:
+            if cancel.wait(0.02):
+                sd.stop()
+                return False
+            stream = sd.get_stream()
+            if stream is None or not stream.active:
+                break
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class SapiHostBackend(TTSBackend):
+    """One persistent PowerShell process hosting a System.Speech synthesizer."""
+    name = "sapi"
+
+    def __init__(self, timeout: float | None = None):
+        self.timeout = timeout or config.tts_render_timeout
+        self._proc: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        with self._lock:
+            return self._ensure_started()
+
+    def _ensure_started(self) -> bool:
+        if self._proc and self._proc.poll() is None:
+            return True
+        script = Path(tempfile.gettempdir()) / "jarvis_sapi_host.ps1"
+        try:
+            if not script.exists() or script.read_text(encoding="utf-8") != _SAPI_HOST:
+                script.write_text(_SAPI_HOST, encoding="utf-8")
+            flags = subprocess.CREATE_NO_WINDOW if hasattr(subprocess, "CREATE_NO_WINDOW") else 0
+            self._proc = subprocess.Popen(
+                ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass",
+                 "-File", str(script)],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                encoding="utf-8", errors="replace", bufsize=1, creationflags=flags,
+            )
+            if self._proc.stdout.readline().strip() != "SAPI_READY":
+                self._proc.kill()
+                return False
+            return True
+        except Exception as e:
+            print(f"  [TTS] SAPI host indisponible: {e}", flush=True)
+            return False
+
+    def render(self, text: str, voice: str, path: Path) -> bool:
+        with self._lock:
+            if not self._ensure_started():
+                return False
+            try:
+                # ensure_ascii: le texte passe en \uXXXX, aucun souci d'encodage console
+                self._proc.stdin.write(json.dumps({"text": text, "voice": voice, "path": str(path)}) + "\n")
+                self._proc.stdin.flush()
+                reply = _readline(self._proc, self.timeout)
+            except Exception:
+                reply = None
+            if reply is None:
+                self._proc.kill()  # Bloque ou mort: relance a la prochaine phrase
+                return False
+            return reply.startswith("OK")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._proc and self._proc.poll() is None:
+                try:
+                    self._proc.stdin.write("QUIT\n")
+                    self._proc.stdin.flush()
+                    self._proc.wait(timeout=5)
+                except Exception:
+                    self._proc.kill()
+
+
+def _readline(proc: subprocess.Popen, timeout: float) -> str | None:
+    """stdout line with a deadline (None on timeout or EOF)."""
+    result: list[str] = []
+    t = threading.Thread(target=lambda: result.append(proc.stdout.readline()), daemon=True)
+    t.start()
+    t.join(timeout)
+    return result[0].strip() if result and result[0] else None
+
+
+class NullBackend(TTSBackend):
+    """Offline backend: silent WAVs sized like speech, optional real-time playback."""
+    name = "null"
+
+    def __init__(self, ms_per_char: float = 60.0, realtime: bool = False, rate: int = 16000):
+        self.ms_per_char = ms_per_char
+        self.realtime = realtime
+        self.rate = rate
+        self.rendered: list[str] = []
+        self.played: list[Path] = []
+
+    def render(self, text: str, voice: str, path: Path) -> bool:
+        n = int(self.rate * len(text) * self.ms_per_char / 1000)
+        with wave.open(str(path), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.rate)
+            wf.writeframes(np.zeros(n, dtype=np.int16).tobytes())
+        self.rendered.append(text)
+        return True
+
+    def play(self, path: Path, cancel: threading.Event) -> bool:
+        self.played.append(path)
+        if not self.realtime:
+            return not cancel.is_set()
+        with wave.open(str(path), "rb") as wf:
+            duration = wf.getnframes() / wf.getframerate()
+        return not cancel.wait(duration)
+
+
+def _default_backend() -> TTSBackend:
+    name = config.tts_backend
+    if name == "auto":
+        name = "sapi" if sys.platform == "win32" else "null"
+    return SapiHostBackend() if name == "sapi" else NullBackend()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CACHE — WAV rendus, LRU sur disque
+# ═══════════════════════════════════════════════════════════════════════════
+
+class PhraseCache:
+    """Rendered phrases keyed by (backend, voice, text); LRU by file mtime."""
+
+    def __init__(self, directory: Path = CACHE_DIR, max_mb: float | None = None):
+        self.dir = directory
+        self.max_bytes = int((config.tts_cache_mb if max_mb is None else max_mb) * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._index: dict[str, tuple[int, float]] | None = None  # nom -> (taille, dernier acces)
+
+    @staticmethod
+    def key(backend: str, voice: str, text: str) -> str:
+        return hashlib.sha1(f"{backend}\x00{voice}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _load(self) -> dict[str, tuple[int, float]]:
+        if self._index is None:
+            self._index = {}
+            if self.dir.exists():
+                for p in self.dir.glob("*.wav"):
+                    st = p.stat()
+                    self._index[p.name] = (st.st_size, st.st_mtime)
+        return self._index
+
+    def get(self, key: str) -> Path | None:
+        path = self.dir / f"{key}.wav"
+        with self._lock:
+            index = self._load()
+            if path.name not in index or not path.exists():
+                index.pop(path.name, None)
+                return None
+            now = time.time()
+            index[path.name] = (index[path.name][0], now)
+        try:
+            os.utime(path, (now, now))  # LRU persistant entre deux sessions
+        except OSError:
+            pass
+        return path
+
+    def put(self, key: str, rendered: Path) -> Path:
+        """Move a freshly rendered WAV into the cache, evicting the oldest entries."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self.dir / f"{key}.wav"
+        os.replace(rendered, path)
+        with self._lock:
+            index = self._load()
+            index[path.name] = (path.stat().st_size, time.time())
+            total = sum(size for size, _ in index.values())
+            for name, (size, _) in sorted(index.items(), key=lambda kv: kv[1][1]):
+                if total <= self.max_bytes or name == path.name:
+                    break
+                (self.dir / name).unlink(missing_ok=True)
+                del index[name]
+                total -= size
+        return path
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(size for size, _ in self._load().values())
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ENGINE
+# ═══════════════════════════════════════════════════════════════════════════
+
+class TTSEngine:
+    """Backend + phrase cache + interruptible playback (one utterance at a time)."""
+
+    def __init__(self, backend: TTSBackend | None = None, cache: PhraseCache | None = None):
+        self.backend = backend or _default_backend()
+        self.cache = cache if cache is not None else PhraseCache()
+        self._play_lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._started = False
+
+    def start(self, prewarm: bool = True) -> None:
+        """Launch the backend (and pre-render COMMON_PHRASES) in the background."""
+        if self._started:
+            return
+        self._started = True
+
+        def _run():
+            if self.backend.start() and prewarm:
+                for phrase in COMMON_PHRASES:
+                    self.render(phrase, "fr-FR")
+
+        threading.Thread(target=_run, name="tts-start", daemon=True).start()
+
+    def render(self, text: str, voice: str = "fr-FR") -> tuple[Path | None, bool]:
+        """WAV for `text`: (path, cached). Uncached paths are temporary."""
+        text = clean_text(text)
+        if not text:
+            return None, False
+        cacheable = len(text) <= config.tts_cache_max_chars
+        key = PhraseCache.key(self.backend.name, voice, text)
+        if cacheable:
+            path = self.cache.get(key)
+            if path is not None:
+                REGISTRY.counter("jarvis_tts_cache_total").inc(result="hit")
+                return path, True
+        fd, tmp = tempfile.mkstemp(suffix=".wav", prefix="jarvis_tts_")
+        os.close(fd)
+        tmp_path = Path(tmp)
+        with timer("jarvis_tts_render_ms", backend=self.backend.name) as outcome:
+            ok = self.backend.render(text, voice, tmp_path)
+            if not ok:
+                outcome["status"] = "error"
+        if not ok:
+            tmp_path.unlink(missing_ok=True)
+            return None, False
+        if cacheable:
+            REGISTRY.counter("jarvis_tts_cache_total").inc(result="miss")
+            return self.cache.put(key, tmp_path), True
+        return tmp_path, False
+
+    def play(self, path: Path, cancel: threading.Event | None = None) -> bool:
+        """Play one WAV (serialized); `cancel` defaults to stop_playback()'s event."""
+        cancel = cancel or self._cancel
+        with self._play_lock:
+            if cancel.is_set():
+                return False
+            try:
+                return self.backend.play(path, cancel)
+            except Exception:
+                return False
+
+    def speak(self, text: str, voice: str = "fr-FR") -> bool:
+        """Render (or fetch) then play; blocking."""
+        self._cancel.clear()
+        path, cached = self.render(text, voice)
+        if path is None:
+            return False
+        try:
+            return self.play(path)
+        finally:
+            if not cached:
+                path.unlink(missing_ok=True)
+
+    async def speak_async(self, text: str, voice: str = "fr-FR") -> bool:
+        return await asyncio.to_thread(self.speak, text, voice)
+
+    def stop_playback(self) -> None:
+        """Interrupt the current playback (barge-in)."""
+        self._cancel.set()
+
+    def close(self) -> None:
+        self.stop_playback()
+        self.backend.close()
+
+
+_ENGINE: TTSEngine | None = None
+
+
+def get_tts() -> TTSEngine:
+    """Process-wide TTS engine (backend from config.tts_backend)."""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = TTSEngine()
+    return _ENGINE
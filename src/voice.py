@@ -1,25 +1,42 @@
 """JARVIS Voice Interface — Persistent Whisper + LM Studio analysis + TTS.
 
 Flow:
-1. Ctrl press → record audio (sounddevice)
-2. Ctrl release → transcribe via persistent faster-whisper worker (CUDA)
+1. Ctrl press → record audio (sounddevice, mic always open into a ring:
+   the recording starts capture_preroll_ms before the key press)
+2. Ctrl release → transcribe via the Whisper pool (faster-whisper, CUDA),
+   PCM int16 sent over the pipe (no temp WAV; path mode kept as fallback)
+   or, with JARVIS_VOICE_STREAMING, VAD segments transcribed while speaking
 3. LM Studio (M1/M2) analyzes intent → proposes corrected command
 4. User validates → JARVIS executes
+5. Response spoken by the TTS engine (src/tts.py: persistent SAPI host,
+   cached phrases)
 """
 
 from __future__ import annotations
 
 import asyncio
+import os
 import subprocess
 import sys
 import tempfile
 import threading
+import time
 import wave
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable
 
 import numpy as np
 import sounddevice as sd
 
+from src.audio_stream import FRAME_MS, AlwaysOnCapture, MicSource, StreamingTranscriber
+from src.config import config
+from src.speculative import SpeculativeResolver
+from src.speech_pipeline import SpeechPipeline
+from src.tracing import span
+from src.tts import get_tts
+from src.whisper_pool import WhisperPool
+
 try:
     import keyboard as kb
     HAS_KEYBOARD = True
@@ -37,6 +54,7 @@ CHANNELS = 1
 # Whisper worker config
 SYSTEM_PYTHON = Path("C:/Users/franc/AppData/Local/Programs/Python/Python312/python.exe")
 WHISPER_WORKER_SCRIPT = Path(__file__).parent / "whisper_worker.py"
+WHISPER_PROTOCOL = os.getenv("JARVIS_WHISPER_PROTOCOL", "pcm")  # "wav" = ancien mode fichier
 
 # LM Studio config for voice correction (M1 fallback, primary is Ollama qwen3:1.7b)
 LM_STUDIO_URL = "http://10.5.0.2:1234/api/v1/chat"
@@ -103,22 +121,27 @@ HAS_MICROPHONE = check_microphone()
 class WhisperWorker:
     """Manages a persistent faster-whisper subprocess (model loaded once)."""
 
-    def __init__(self):
+    def __init__(self, python: Path = SYSTEM_PYTHON, script: Path = WHISPER_WORKER_SCRIPT,
+                 protocol: str = WHISPER_PROTOCOL):
         self._process: subprocess.Popen | None = None
         self._lock = threading.Lock()
         self._ready = False
+        self.python = python
+        self.script = script
+        self.protocol = protocol
+        self.supports_pcm = False  # Annonce par le worker (proto=pcm)
 
     def start(self) -> bool:
         """Start the whisper worker process. Returns True when model is loaded."""
         if self._process and self._process.poll() is None:
             return self._ready
 
-        if not SYSTEM_PYTHON.exists() or not WHISPER_WORKER_SCRIPT.exists():
+        if not self.python.exists() or not self.script.exists():
             return False
 
         try:
             self._process = subprocess.Popen(
-                [str(SYSTEM_PYTHON), str(WHISPER_WORKER_SCRIPT)],
+                [str(self.python), str(self.script)],
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
@@ -130,6 +153,8 @@ class WhisperWorker:
             line1 = self._process.stdout.readline().strip()
             if "WHISPER_READY" in line1:
                 print(f"  [WHISPER] {line1}", flush=True)
+                protocols = next((t[6:].split(",") for t in line1.split() if t.startswith("proto=")), [])
+                self.supports_pcm = "pcm" in protocols
             # Wait for WHISPER_LOADED
             line2 = self._process.stdout.readline().strip()
             if "WHISPER_LOADED" in line2:
@@ -140,12 +165,17 @@ class WhisperWorker:
             print(f"  [WHISPER] Failed to start: {e}", flush=True)
             return False
 
+    def _ensure_process(self) -> bool:
+        """(Re)start the worker if needed. Caller holds self._lock."""
+        if not self._process or self._process.poll() is not None:
+            return self.start()
+        return True
+
     def transcribe(self, wav_path: str) -> str | None:
         """Send a WAV path to the worker and get transcription back."""
         with self._lock:
-            if not self._process or self._process.poll() is not None:
-                if not self.start():
-                    return None
+            if not self._ensure_process():
+                return None
 
             try:
                 self._process.stdin.write(wav_path + "\n")
@@ -157,6 +187,46 @@ class WhisperWorker:
                 self._ready = False
                 return None
 
+    def transcribe_pcm(self, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> str | None:
+        """Send int16 mono samples as a PCM frame (no file, no decoding)."""
+        with self._lock:
+            if not self._ensure_process():
+                return None
+            return self._send_pcm(audio, sample_rate)
+
+    def _send_pcm(self, audio: np.ndarray, sample_rate: int) -> str | None:
+        """One PCM request/response on the running worker. Caller holds self._lock."""
+        payload = np.ascontiguousarray(audio, dtype="<i2").tobytes()
+        try:
+            stdin = self._process.stdin
+            stdin.flush()  # Rien en attente cote texte avant la trame binaire
+            stdin.buffer.write(f"PCM {len(payload)} {sample_rate}\n".encode("ascii"))
+            stdin.buffer.write(payload)
+            stdin.buffer.flush()
+            result = self._process.stdout.readline().strip()
+            return result if result else None
+        except Exception as e:
+            print(f"  [WHISPER] Error: {e}", flush=True)
+            self._ready = False
+            return None
+
+    def transcribe_audio(self, audio: np.ndarray) -> str | None:
+        """Transcribe recorded samples: PCM frame if supported, else temp WAV path."""
+        if self.protocol == "pcm":
+            with self._lock:  # Demarrage + choix du protocole + envoi: atomiques
+                if self._ensure_process() and self.supports_pcm:
+                    with span("whisper", mode="pcm"):
+                        return self._send_pcm(audio, SAMPLE_RATE)
+        with span("wav_save"):
+            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+                wav_path = tmp.name
+            _save_wav(audio, wav_path)
+        try:
+            with span("whisper", mode="wav"):
+                return self.transcribe(wav_path)
+        finally:
+            Path(wav_path).unlink(missing_ok=True)
+
     def stop(self):
         """Shutdown the worker."""
         if self._process and self._process.poll() is None:
@@ -169,8 +239,18 @@ class WhisperWorker:
         self._ready = False
 
 
-# Global worker instance
-_whisper_worker = WhisperWorker()
+# Global STT backend: worker pool (tagged PCM requests), single worker in WAV mode
+_whisper: WhisperPool | WhisperWorker = (
+    WhisperWorker() if WHISPER_PROTOCOL == "wav"
+    else WhisperPool(python=SYSTEM_PYTHON, script=WHISPER_WORKER_SCRIPT)
+)
+
+
+async def transcribe_clips(clips: list[np.ndarray]) -> list[str | None]:
+    """Transcribe several int16 recordings (pool: in flight together, batched)."""
+    if isinstance(_whisper, WhisperPool):
+        return await _whisper.transcribe_many_async(clips)
+    return [await asyncio.to_thread(_whisper.transcribe_audio, clip) for clip in clips]
 
 
 # ── LM Studio voice correction ───────────────────────────────────────────
@@ -180,7 +260,7 @@ async def analyze_with_lm(raw_text: str) -> dict:
 
     Returns: {"corrected": str, "intent": str, "confidence": float}
     """
-    import httpx
+    from src.cluster_client import shared_client
 
     prompt = (
         f"Transcription vocale brute: \"{raw_text}\"\n\n"
@@ -192,7 +272,7 @@ async def analyze_with_lm(raw_text: str) -> dict:
     )
 
     try:
-        async with httpx.AsyncClient(timeout=8.0) as client:
+        async with shared_client(timeout=8.0) as client:
             resp = await client.post(LM_STUDIO_URL, json={
                 "model": LM_CORRECTION_MODEL,
                 "input": prompt,
@@ -241,39 +321,89 @@ async def wait_for_ptt(key: str = PTT_KEY, timeout: float = 30.0) -> bool:
         kb.unhook(hook)
 
 
-def _record_while_key_held(key: str = PTT_KEY, max_duration: float = 30.0) -> np.ndarray | None:
-    """Record audio while the PTT key is held down."""
-    frames: list[np.ndarray] = []
-    stop_event = threading.Event()
+_capture: AlwaysOnCapture | None = None
+
+
+def get_capture() -> AlwaysOnCapture | None:
+    """Microphone capture running into the preroll ring (started on first use)."""
+    global _capture
+    if _capture is None or not _capture.running:
+        device = get_cached_input_device()
+        if device is None:
+            return None
+        capture = AlwaysOnCapture(MicSource(device))
+        if not capture.start():
+            return None
+        _capture = capture
+    return _capture
+
+
+def _release_capture() -> None:
+    """Close the mic between recordings unless capture is always on."""
+    global _capture
+    if _capture is not None and not config.capture_always_on:
+        _capture.stop()
+        _capture = None
+
 
+def _ptt_release_event(key: str) -> tuple[threading.Event, object]:
+    stop_event = threading.Event()
+    hook = None
     if HAS_KEYBOARD:
         def on_release(e):
             if e.name == key:
                 stop_event.set()
         hook = kb.on_release(on_release)
-    else:
-        hook = None
+    return stop_event, hook
 
-    def audio_callback(indata, frame_count, time_info, status):
-        if not stop_event.is_set():
-            frames.append(indata.copy())
 
-    device = get_cached_input_device()
-    if device is None:
+def _record_while_key_held(key: str = PTT_KEY, max_duration: float = 30.0) -> np.ndarray | None:
+    """Record audio while the PTT key is held down, preroll included."""
+    capture = get_capture()
+    if capture is None:
         return None
-
+    stop_event, hook = _ptt_release_event(key)
     try:
-        with sd.InputStream(device=device, samplerate=SAMPLE_RATE, channels=CHANNELS,
-                            dtype='int16', callback=audio_callback,
-                            blocksize=1024):
-            stop_event.wait(timeout=max_duration)
+        audio = capture.record(stop_event, max_duration)
     finally:
         if hook is not None:
             kb.unhook(hook)
+        _release_capture()
+    return audio if len(audio) else None
 
-    if not frames:
+
+def _stream_while_key_held(key: str = PTT_KEY, max_duration: float = 30.0,
+                           on_partial: Callable[[str], None] | None = None) -> StreamingTranscriber | None:
+    """Stream audio into the VAD transcriber while the PTT key is held.
+
+    Returns the transcriber; its finish() yields the final text.
+    """
+    capture = get_capture()
+    if capture is None:
         return None
-    return np.concatenate(frames, axis=0)
+    stop_event, hook = _ptt_release_event(key)
+
+    transcriber = StreamingTranscriber(_whisper.transcribe_audio, on_partial=on_partial)
+    pos = capture.mark()  # Preroll d'abord, puis l'audio live par tranches
+    deadline = time.monotonic() + max_duration
+    try:
+        while True:
+            stopped = stop_event.wait(timeout=FRAME_MS / 1000)
+            end = capture.position
+            if end > pos:
+                transcriber.feed(capture.read(pos, end))
+                pos = end
+            if stopped or time.monotonic() >= deadline:
+                break
+    finally:
+        if hook is not None:
+            kb.unhook(hook)
+        _release_capture()
+    return transcriber
+
+
+def _print_partial(text: str) -> None:
+    print(f"  [PARTIEL] {text}", flush=True)
 
 
 def _save_wav(audio: np.ndarray, path: str) -> None:
@@ -287,9 +417,15 @@ def _save_wav(audio: np.ndarray, path: str) -> None:
 
 # ── Main listen function ─────────────────────────────────────────────────
 
-async def listen_voice(timeout: float = 15.0, keyboard_fallback: bool = True, use_ptt: bool = False) -> str | None:
+async def listen_voice(timeout: float = 15.0, keyboard_fallback: bool = True, use_ptt: bool = False,
+                       on_partial: Callable[[str], None] | None = None,
+                       speculation: SpeculativeResolver | None = None) -> str | None:
     """Record voice → Whisper transcribe → LM Studio analyze.
 
+    With config.voice_streaming, audio is segmented and transcribed while
+    the key is held; `on_partial` receives each partial hypothesis. A
+    `speculation` resolver also sees the partials; when it confirms its
+    command on the final transcript, the LM analysis is skipped.
     Returns the analyzed/corrected text, or None.
     """
     if not check_microphone():
@@ -301,33 +437,57 @@ async def listen_voice(timeout: float = 15.0, keyboard_fallback: bool = True, us
                 return None
         return None
 
+    # Capture already running while waiting: the PTT window starts with preroll
+    if config.capture_always_on:
+        await asyncio.to_thread(get_capture)
+
     # PTT: wait for Ctrl press
     if use_ptt and HAS_KEYBOARD:
         print(f"  [Maintiens {PTT_KEY.upper()} pour parler...]", flush=True)
-        pressed = await wait_for_ptt(timeout=30.0)
+        with span("ptt_wait"):
+            pressed = await wait_for_ptt(timeout=30.0)
         if not pressed:
             return None
         print("  [Enregistrement... relache CTRL]", flush=True)
 
-    # Record while key held
-    audio = await asyncio.to_thread(_record_while_key_held, PTT_KEY, timeout)
-
-    if audio is None or len(audio) < SAMPLE_RATE * 0.3:
-        return None
+    if config.voice_streaming:
+        # Stream while key held: segments transcribed during speech
+        partial = on_partial or _print_partial
+        if speculation is not None:
+            def partial(text: str, _show=partial) -> None:
+                _show(text)
+                speculation.on_partial(text)
+        with span("record"):
+            transcriber = await asyncio.to_thread(
+                _stream_while_key_held, PTT_KEY, timeout, partial,
+            )
+        if transcriber is None:
+            return None
+        with span("whisper", mode="stream") as sp:
+            text = await asyncio.to_thread(transcriber.finish)
+            st = transcriber.stats
+            if sp:
+                sp.set(audio_s=round(st.audio_s, 2), segments=st.segments, partials=st.partials)
+        print(f"  [Stream {st.audio_s:.1f}s — {st.segments} segments, "
+              f"texte final {st.finish_ms:.0f}ms apres relache]", flush=True)
+    else:
+        # Record while key held
+        with span("record") as sp:
+            audio = await asyncio.to_thread(_record_while_key_held, PTT_KEY, timeout)
+            if sp and audio is not None:
+                sp.set(audio_s=round(len(audio) / SAMPLE_RATE, 2))
 
-    duration = len(audio) / SAMPLE_RATE
-    print(f"  [Enregistre {duration:.1f}s — transcription Whisper...]", flush=True)
+        if audio is None or len(audio) < SAMPLE_RATE * 0.3:
+            return None
 
-    # Save WAV
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-        wav_path = tmp.name
-    _save_wav(audio, wav_path)
+        duration = len(audio) / SAMPLE_RATE
+        print(f"  [Enregistre {duration:.1f}s — transcription Whisper...]", flush=True)
 
-    # Transcribe via persistent worker
-    try:
-        text = await asyncio.to_thread(_whisper_worker.transcribe, wav_path)
-    finally:
-        Path(wav_path).unlink(missing_ok=True)
+        # Transcribe via the worker pool (PCM over the pipe, WAV path fallback)
+        if isinstance(_whisper, WhisperPool):
+            text = await _whisper.transcribe_async(audio)
+        else:
+            text = await asyncio.to_thread(_whisper.transcribe_audio, audio)
 
     if not text:
         print("  [Pas de parole detectee]", flush=True)
@@ -335,9 +495,15 @@ async def listen_voice(timeout: float = 15.0, keyboard_fallback: bool = True, us
 
     print(f"  [STT] {text}", flush=True)
 
+    if speculation is not None and speculation.commit(text):
+        spec = speculation.confirmed
+        print(f"  [SPECULATIF] {spec.command.name} confirme ({spec.score:.2f}) — analyse IA sautee", flush=True)
+        return text
+
     # LM Studio analysis/correction
     print(f"  [Analyse IA...]", flush=True)
-    analysis = await analyze_with_lm(text)
+    with span("stt_analyze"):
+        analysis = await analyze_with_lm(text)
     corrected = analysis["intent"]
     confidence = analysis["confidence"]
 
@@ -349,51 +515,66 @@ async def listen_voice(timeout: float = 15.0, keyboard_fallback: bool = True, us
 
 # ── TTS ───────────────────────────────────────────────────────────────────
 
-async def speak_text(text: str, voice: str = "fr-FR") -> bool:
-    """Synthesize speech via Windows SAPI (PowerShell)."""
-    if not text or not text.strip():
-        return False
-
-    clean = text.replace('"', "'").replace("\n", " ").replace("**", "")
-    if len(clean) > 500:
-        clean = clean[:497] + "..."
+@asynccontextmanager
+async def open_speech(on_cancel: Callable[[], Awaitable[None]] | None = None, kind: str = "speak",
+                      voice: str = "fr-FR") -> AsyncIterator[SpeechPipeline]:
+    """Sentence-pipelined speech: feed() model output, spoken as it arrives.
 
-    ps_path = None
-    try:
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.ps1', delete=False, encoding='utf-8') as f:
-            f.write(
-                'Add-Type -AssemblyName System.Speech\n'
-                '$synth = New-Object System.Speech.Synthesis.SpeechSynthesizer\n'
-                f'$synth.SelectVoiceByHints("NotSet", 0, 0, '
-                f'[System.Globalization.CultureInfo]::GetCultureInfo("{voice}"))\n'
-                f'$synth.Speak("{clean}")\n'
-            )
-            ps_path = f.name
-
-        result = await asyncio.to_thread(
-            lambda: subprocess.run(
-                ["powershell", "-ExecutionPolicy", "Bypass", "-File", ps_path],
-                capture_output=True, text=True, timeout=30,
-            )
-        )
-        return result.returncode == 0
-    except Exception:
+    Pressing PTT while it runs is a barge-in: playback stops and
+    `on_cancel` (e.g. the Claude client's interrupt) stops the generation.
+    Leaving the block waits until the last sentence has been spoken.
+    """
+    speech = SpeechPipeline(get_tts(), voice, on_cancel=on_cancel, kind=kind)
+    hook = None
+    if HAS_KEYBOARD:
+        def on_press(e):
+            if e.name == PTT_KEY:
+                speech.barge_in_threadsafe()
+        hook = kb.on_press(on_press)
+    with span("tts", kind=kind) as sp:
+        try:
+            yield speech
+        except BaseException:
+            speech.barge_in()
+            raise
+        finally:
+            try:
+                st = await speech.close()
+            finally:
+                if hook is not None:
+                    kb.unhook(hook)
+            if sp:
+                sp.set(sentences=st.sentences, chars=st.chars, first_audio_ms=round(st.first_audio_ms, 1),
+                       cancelled=st.cancelled)
+    if st.cancelled:
+        print("  [BARGE-IN] lecture interrompue", flush=True)
+
+
+async def speak_text(text: str, voice: str = "fr-FR", kind: str = "speak") -> bool:
+    """Speak via the TTS engine, sentence by sentence (persistent SAPI host, cached phrases)."""
+    if not text or not text.strip():
         return False
-    finally:
-        if ps_path:
-            Path(ps_path).unlink(missing_ok=True)
+    async with open_speech(kind=kind, voice=voice) as speech:
+        await speech.say(text)
+    return speech.stats.rendered > 0 and not speech.stats.cancelled
 
 
 # ── Startup / Shutdown ────────────────────────────────────────────────────
 
 def start_whisper() -> bool:
-    """Start the persistent Whisper worker (call at JARVIS startup)."""
-    return _whisper_worker.start()
+    """Start the persistent Whisper workers and the TTS host (call at JARVIS startup)."""
+    get_tts().start()
+    return _whisper.start()
 
 
 def stop_whisper():
-    """Stop the Whisper worker (call at JARVIS shutdown)."""
-    _whisper_worker.stop()
+    """Stop the Whisper workers, the TTS host and the mic capture (call at JARVIS shutdown)."""
+    global _capture
+    _whisper.stop()
+    get_tts().close()
+    if _capture is not None:
+        _capture.stop()
+        _capture = None
 
 
 async def voice_loop(callback) -> None:
@@ -8,8 +8,9 @@ from __future__ import annotations
 
 import re
 import unicodedata
+from contextlib import contextmanager
 from difflib import SequenceMatcher, get_close_matches
-from typing import Any
+from typing import Any, Iterator
 
 from src.commands import (
     COMMANDS, JarvisCommand, VOICE_CORRECTIONS,
@@ -419,6 +420,15 @@ def format_suggestions(suggestions: list[tuple[JarvisCommand, float]]) -> str:
 # FULL CORRECTION PIPELINE
 # ═══════════════════════════════════════════════════════════════════════════
 
+@contextmanager
+def _stage(name: str) -> Iterator[None]:
+    """Time one correction stage (jarvis_correction_stage_ms{stage=...} + span)."""
+    from src.metrics import timer
+    from src.tracing import span
+    with span(f"correction.{name}"), timer("jarvis_correction_stage_ms", stage=name):
+        yield
+
+
 async def full_correction_pipeline(
     raw_text: str,
     use_ia: bool = True,
@@ -427,6 +437,9 @@ async def full_correction_pipeline(
 ) -> dict[str, Any]:
     """Complete voice correction pipeline.
 
+    Each stage is timed (jarvis_correction_stage_ms, correction.* spans)
+    and the matching method counted (jarvis_correction_method_total).
+
     Returns dict with:
     - raw: original text
     - cleaned: after local cleaning
@@ -438,6 +451,21 @@ async def full_correction_pipeline(
     - suggestions: alternative commands if low confidence
     - method: how the match was found
     """
+    from src.metrics import REGISTRY, timer
+    from src.profiler import profile
+    from src.tracing import span
+    with span("correction") as sp, timer("jarvis_correction_stage_ms", stage="total"), \
+            profile("correction"):
+        result = await _correction_pipeline(raw_text, use_ia, ia_url, ia_model)
+        if sp:
+            sp.set(method=result["method"], confidence=round(result["confidence"], 2))
+    REGISTRY.counter("jarvis_correction_method_total").inc(method=result["method"])
+    return result
+
+
+async def _correction_pipeline(
+    raw_text: str, use_ia: bool, ia_url: str, ia_model: str,
+) -> dict[str, Any]:
     result: dict[str, Any] = {
         "raw": raw_text,
         "cleaned": "",
@@ -451,24 +479,26 @@ async def full_correction_pipeline(
     }
 
     # Step 1: Basic normalization
-    cleaned = normalize_text(raw_text)
-    result["cleaned"] = cleaned
+    with _stage("local"):
+        cleaned = normalize_text(raw_text)
+        result["cleaned"] = cleaned
 
-    # Step 2: Check implicit single-word commands
-    single = cleaned.strip()
-    if single in IMPLICIT_COMMANDS:
-        cleaned = IMPLICIT_COMMANDS[single]
-        result["method"] = "implicit"
+        # Step 2: Check implicit single-word commands
+        single = cleaned.strip()
+        if single in IMPLICIT_COMMANDS:
+            cleaned = IMPLICIT_COMMANDS[single]
+            result["method"] = "implicit"
 
-    # Step 3: Apply local voice corrections dictionary
-    corrected = correct_voice_text(cleaned)
-    result["corrected"] = corrected
+        # Step 3: Apply local voice corrections dictionary
+        corrected = correct_voice_text(cleaned)
+        result["corrected"] = corrected
 
     # Step 4: IA correction EARLY — let LM Studio fix transcription errors FIRST
     ia_corrected = None
     if use_ia:
         try:
-            ia_corrected = await _ia_correct(corrected, ia_url, ia_model)
+            with _stage("ia"):
+                ia_corrected = await _ia_correct(corrected, ia_url, ia_model)
             if ia_corrected and ia_corrected.lower().strip() != corrected.lower().strip():
                 result["corrected"] = ia_corrected
                 corrected = ia_corrected
@@ -476,12 +506,14 @@ async def full_correction_pipeline(
             pass
 
     # Step 5: Extract action intent (remove fillers, normalize verbs)
-    intent = extract_action_intent(corrected)
+    with _stage("intent"):
+        intent = extract_action_intent(corrected)
     result["intent"] = intent
 
     # Step 6: Try exact/fuzzy match with commands
     from src.commands import match_command
-    cmd, params, score = match_command(intent)
+    with _stage("match"):
+        cmd, params, score = match_command(intent)
 
     if cmd and score >= 0.70:
         result["command"] = cmd
@@ -493,13 +525,14 @@ async def full_correction_pipeline(
     # Step 7: Try phonetic matching
     best_phon_cmd = None
     best_phon_score = 0.0
-    for c in COMMANDS:
-        for trigger in c.triggers:
-            clean_trigger = normalize_text(trigger.replace("{", "").replace("}", ""))
-            ps = phonetic_similarity(intent, clean_trigger)
-            if ps > best_phon_score:
-                best_phon_score = ps
-                best_phon_cmd = c
+    with _stage("phonetic"):
+        for c in COMMANDS:
+            for trigger in c.triggers:
+                clean_trigger = normalize_text(trigger.replace("{", "").replace("}", ""))
+                ps = phonetic_similarity(intent, clean_trigger)
+                if ps > best_phon_score:
+                    best_phon_score = ps
+                    best_phon_cmd = c
 
     if best_phon_cmd and best_phon_score >= 0.70:
         result["command"] = best_phon_cmd
@@ -512,7 +545,8 @@ async def full_correction_pipeline(
     if ia_corrected:
         ia_intent = extract_action_intent(ia_corrected)
         if ia_intent != intent:
-            cmd3, params3, score3 = match_command(ia_intent)
+            with _stage("ia_rematch"):
+                cmd3, params3, score3 = match_command(ia_intent)
             if cmd3 and score3 >= 0.55:
                 result["command"] = cmd3
                 result["params"] = params3
@@ -521,7 +555,8 @@ async def full_correction_pipeline(
                 return result
 
     # Step 9: Get suggestions
-    suggestions = get_suggestions(intent)
+    with _stage("suggestions"):
+        suggestions = get_suggestions(intent)
     result["suggestions"] = suggestions
 
     if suggestions and suggestions[0][1] >= 0.55:
@@ -537,61 +572,44 @@ async def full_correction_pipeline(
     return result
 
 
+# Prompt statique (prefixe reutilise en cache KV, voir src/lm_sessions.py)
+_IA_CORRECT_SYSTEM = (
+    "Tu es le correcteur ORTHOGRAPHIQUE de JARVIS.\n"
+    "REGLE ABSOLUE: corrige UNIQUEMENT les fautes d'orthographe et de grammaire.\n"
+    "NE CHANGE JAMAIS le sens, NE RAJOUTE JAMAIS de mots, NE MODIFIE PAS l'intention.\n"
+    "Exemples:\n"
+    "- 'ouvre moa les chart mexc' → 'ouvre moi les charts mexc'\n"
+    "- 'ferm tout les fenaitre' → 'ferme toutes les fenetres'\n"
+    "- 'statu du clusteur' → 'statut du cluster'\n"
+    "- 'repete' → 'repete'\n"
+    "- 'ouvre youtube' → 'ouvre youtube'\n"
+    "- 'mets youtube' → 'mets youtube'\n"
+    "- 'kel heurre il ait' → 'quelle heure il est'\n"
+    "Reponds UNIQUEMENT avec le texte corrige, RIEN d'autre. Pas de /no_think."
+)
+
+
 async def _ia_correct(text: str, url: str, model: str) -> str:
     """Use Ollama qwen3:1.7b (fast, 1.36 GB) to correct voice transcription.
 
     Primary: Ollama qwen3:1.7b (lightweight, always loaded, <1s)
     Fallback: LM Studio M1/qwen3-30b (heavier but more accurate)
+    Nodes with an open circuit breaker are skipped without waiting, and a
+    slow primary is hedged to the fallback (see tools.hedged_chat).
     """
-    import httpx
     from src.config import config
-    prompt = (
-        "Tu es le correcteur ORTHOGRAPHIQUE de JARVIS.\n"
-        "REGLE ABSOLUE: corrige UNIQUEMENT les fautes d'orthographe et de grammaire.\n"
-        "NE CHANGE JAMAIS le sens, NE RAJOUTE JAMAIS de mots, NE MODIFIE PAS l'intention.\n"
-        "Exemples:\n"
-        "- 'ouvre moa les chart mexc' → 'ouvre moi les charts mexc'\n"
-        "- 'ferm tout les fenaitre' → 'ferme toutes les fenetres'\n"
-        "- 'statu du clusteur' → 'statut du cluster'\n"
-        "- 'repete' → 'repete'\n"
-        "- 'ouvre youtube' → 'ouvre youtube'\n"
-        "- 'mets youtube' → 'mets youtube'\n"
-        "- 'kel heurre il ait' → 'quelle heure il est'\n"
-        "Reponds UNIQUEMENT avec le texte corrige, RIEN d'autre. Pas de /no_think.\n\n"
-        f"Texte: {text}"
-    )
-    messages = [{"role": "user", "content": prompt}]
-    # Primary: Ollama qwen3:1.7b (fast, lightweight, always available)
-    ol = config.get_ollama_node("OL1")
-    if ol:
-        try:
-            async with httpx.AsyncClient(timeout=5) as c:
-                r = await c.post(
-                    f"{ol.url}/api/chat",
-                    json={
-                        "model": model, "messages": messages,
-                        "stream": False, "think": False,
-                        "options": {"temperature": 0.1, "num_predict": 200},
-                    },
-                )
-                r.raise_for_status()
-                return r.json()["message"]["content"].strip()
-        except Exception:
-            pass
-    # Fallback: LM Studio M1 (qwen3-30b — heavier but accurate)
-    node = config.get_node("M1")
-    if node:
-        try:
-            async with httpx.AsyncClient(timeout=5) as c:
-                r = await c.post(
-                    f"{node.url}/api/v1/chat",
-                    json={"model": node.default_model, "input": text, "system_prompt": messages[0]["content"] if messages and messages[0]["role"] == "system" else "", "temperature": 0.1, "max_output_tokens": 200, "stream": False, "store": False},
-                )
-                r.raise_for_status()
-                from src.tools import extract_lms_output
-                return extract_lms_output(r.json()).strip()
-        except Exception:
-            pass
+    from src.tools import hedged_chat
+    prompt = f"Texte: {text}"
+    # Hedged: OL1 d'abord, duplicata vers M1 si OL1 depasse son p90 (premier arrive gagne)
+    route = config.hedge_routes.get("voice_correction", ["OL1", "M1"])
+    try:
+        _, content = await hedged_chat(
+            "voice_correction", route, prompt, system=_IA_CORRECT_SYSTEM, models={"OL1": model},
+            max_tokens=200, temperature=0.1, timeout=5,
+        )
+        return content.strip()
+    except Exception:
+        pass
     return text
 
 
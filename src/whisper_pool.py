@@ -0,0 +1,361 @@
+"""JARVIS Whisper Pool — Several STT workers, tagged requests, self-healing.
+
+Flow:
+  transcribe_audio / transcribe_async / transcribe_many(clips)
+  -> requete taguee (REQ <id> PCM ...) envoyee au worker le moins charge
+  -> plusieurs requetes en vol par worker: les clips en file cote worker
+     sont transcrits en un seul appel batch (BatchedInferencePipeline)
+  -> thread lecteur par worker: RES <id> <texte> -> Future de la requete
+  -> moniteur: PING periodique, aucun RES depuis whisper_timeout alors que
+     des requetes sont en vol (attente en file exclue) ou process mort -> worker tue puis relance, requetes en vol renvoyees
+     a un autre worker (une fois)
+
+Optimizations:
+- Un clip lent ne bloque plus les autres: N workers (JARVIS_WHISPER_WORKERS)
+  et pipelining sur chaque pipe (plus de verrou global par requete)
+- Batch des clips en file: train_voice.py --wav transcrit un dossier en
+  quelques appels au lieu d'un aller-retour par fichier
+- API async (Future enveloppee), sans thread bloque par requete en attente
+- CPU int8 (WHISPER_DEVICE=cpu WHISPER_COMPUTE=int8) pour les tests
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import itertools
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+from src.config import config
+from src.metrics import REGISTRY
+from src.tracing import span
+
+
+WORKER_SCRIPT = Path(__file__).parent / "whisper_worker.py"
+PCM_RATE = 16000
+PING_TIMEOUT = 2.0
+MAX_ATTEMPTS = 2  # Envoi initial + un renvoi apres crash du worker
+
+
+@dataclass
+class _Request:
+    id: str
+    payload: bytes
+    rate: int
+    future: concurrent.futures.Future = field(default_factory=concurrent.futures.Future)
+    attempts: int = 0
+    sent_at: float = 0.0
+
+
+def _resolve(fut: concurrent.futures.Future, text: str | None) -> None:
+    try:
+        fut.set_result(text)
+    except concurrent.futures.InvalidStateError:
+        pass  # Deja annulee (timeout de l'appelant)
+
+
+class _PoolWorker:
+    """One whisper_worker.py process speaking the tagged protocol."""
+
+    def __init__(self, index: int, python: Path, script: Path, env: dict[str, str],
+                 on_exit: Callable[[_PoolWorker, list[_Request]], None]):
+        self.index = index
+        self.python = python
+        self.script = script
+        self.env = env
+        self.on_exit = on_exit
+        self.process: subprocess.Popen | None = None
+        self.pending: dict[str, _Request] = {}
+        self.ready = False
+        self.restarts = -1  # Le premier demarrage n'est pas un redemarrage
+        self.info = ""
+        self.last_progress = 0.0  # Dernier RES (ou passage de inactif a occupe)
+        self._write_lock = threading.Lock()
+        self._pong = threading.Event()
+
+    @property
+    def alive(self) -> bool:
+        return self.ready and self.process is not None and self.process.poll() is None
+
+    def start(self) -> bool:
+        if not self.python.exists() or not self.script.exists():
+            return False
+        try:
+            self.process = subprocess.Popen(
+                [str(self.python), str(self.script)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                env=self.env,
+            )
+            line1 = self.process.stdout.readline().decode("utf-8", errors="replace").strip()
+            protocols = next((tok[6:].split(",") for tok in line1.split() if tok.startswith("proto=")), [])
+            line2 = self.process.stdout.readline().decode("utf-8", errors="replace").strip()
+            if "req" not in protocols or "WHISPER_LOADED" not in line2:
+                self.process.kill()
+                return False
+        except Exception as e:
+            print(f"  [WHISPER:{self.index}] Failed to start: {e}", flush=True)
+            return False
+        self.info = line2.removeprefix("WHISPER_LOADED ").strip()
+        self.last_progress = time.monotonic()
+        self.ready = True
+        self.restarts += 1
+        threading.Thread(target=self._read_loop, args=(self.process,),
+                         name=f"whisper-reader-{self.index}", daemon=True).start()
+        return True
+
+    def send(self, req: _Request) -> None:
+        with self._write_lock:
+            req.attempts += 1
+            req.sent_at = time.monotonic()
+            if not self.pending:
+                self.last_progress = req.sent_at  # Inactif jusqu'ici: l'horloge part maintenant
+            self.pending[req.id] = req
+            try:
+                stdin = self.process.stdin
+                stdin.write(f"REQ {req.id} PCM {len(req.payload)} {req.rate}\n".encode("ascii"))
+                stdin.write(req.payload)
+                stdin.flush()
+            except Exception:
+                self.pending.pop(req.id, None)
+                raise
+
+    def ping(self, timeout: float = PING_TIMEOUT) -> bool:
+        self._pong.clear()
+        try:
+            with self._write_lock:
+                self.process.stdin.write(b"PING\n")
+                self.process.stdin.flush()
+        except Exception:
+            return False
+        return self._pong.wait(timeout)
+
+    def stalled_for(self) -> float:
+        """Seconds without any RES while requests are in flight (0 when idle).
+
+        Time spent queued behind other clips is not a hang: under batch
+        load the worker keeps answering, so the clock keeps resetting.
+        """
+        if not self.pending:
+            return 0.0
+        return time.monotonic() - self.last_progress
+
+    def _read_loop(self, process: subprocess.Popen) -> None:
+        for raw in iter(process.stdout.readline, b""):
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            if line.startswith("RES "):
+                _, req_id, *text = line.split(" ", 2)
+                req = self.pending.pop(req_id, None)
+                self.last_progress = time.monotonic()
+                if req is not None:
+                    REGISTRY.histogram("jarvis_whisper_duration_ms").observe(
+                        (time.monotonic() - req.sent_at) * 1000, worker=self.index)
+                    _resolve(req.future, (text[0].strip() if text else "") or None)
+            elif line.startswith("PONG"):
+                self._pong.set()
+        # EOF: process termine ou tue
+        self.ready = False
+        with self._write_lock:
+            orphans = list(self.pending.values())
+            self.pending.clear()
+        self.on_exit(self, orphans)
+
+    def kill(self) -> None:
+        self.ready = False
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+
+    def stop(self) -> None:
+        self.ready = False
+        if self.process and self.process.poll() is None:
+            try:
+                with self._write_lock:
+                    self.process.stdin.write(b"QUIT\n")
+                    self.process.stdin.flush()
+                self.process.wait(timeout=5)
+            except Exception:
+                self.process.kill()
+
+
+class WhisperPool:
+    """N persistent Whisper workers behind one thread-safe and async API."""
+
+    def __init__(self, workers: int | None = None, python: Path | None = None,
+                 script: Path = WORKER_SCRIPT, env: dict[str, str] | None = None,
+                 batch_size: int | None = None):
+        self.size = max(1, workers or config.whisper_workers)
+        self.batch_size = max(1, batch_size or config.whisper_batch_size)
+        self.python = python or Path(sys.executable)
+        self.script = script
+        self.env = {
+            **os.environ,
+            "WHISPER_DEVICE": config.whisper_device,
+            "WHISPER_COMPUTE": config.whisper_compute,
+            "WHISPER_BATCH": str(self.batch_size),
+            **(env or {}),
+        }
+        self.workers: list[_PoolWorker] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._backlog: list[_Request] = []  # Orphelins en attente d'un worker vivant
+        self._wake = threading.Event()
+        self._monitor: threading.Thread | None = None
+        self._closing = False
+
+    # ── Cycle de vie ────────────────────────────────────────────────────
+
+    def start(self) -> bool:
+        """Start every worker (models load in parallel). True if any is up."""
+        with self._lock:
+            if not self.workers:
+                self.workers = [_PoolWorker(i, self.python, self.script, self.env, self._on_worker_exit)
+                                for i in range(self.size)]
+            self._closing = False
+            down = [w for w in self.workers if not w.alive]
+            threads = [threading.Thread(target=w.start, daemon=True) for w in down]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            for w in down:
+                if w.alive:
+                    print(f"  [WHISPER:{w.index}] {w.info}", flush=True)
+            if self._monitor is None and config.whisper_health_interval > 0:
+                self._monitor = threading.Thread(target=self._monitor_loop, name="whisper-monitor", daemon=True)
+                self._monitor.start()
+        return any(w.alive for w in self.workers)
+
+    def stop(self) -> None:
+        self._closing = True
+        self._wake.set()
+        for w in self.workers:
+            w.stop()
+        with self._lock:
+            backlog, self._backlog = self._backlog, []
+        for req in backlog:
+            _resolve(req.future, None)
+
+    # ── Envoi ───────────────────────────────────────────────────────────
+
+    def submit(self, audio: np.ndarray, sample_rate: int = PCM_RATE) -> concurrent.futures.Future:
+        """Queue one clip; the Future yields its text (None if empty or lost)."""
+        payload = np.ascontiguousarray(audio, dtype="<i2").tobytes()
+        req = _Request(str(next(self._ids)), payload, sample_rate)
+        if not any(w.alive for w in self.workers) and not self._closing:
+            self.start()
+        self._dispatch(req)
+        return req.future
+
+    def _dispatch(self, req: _Request) -> None:
+        if req.future.done():
+            return
+        for _ in range(len(self.workers)):
+            alive = [w for w in self.workers if w.alive]
+            if not alive:
+                break
+            worker = min(alive, key=lambda w: len(w.pending))
+            try:
+                worker.send(req)
+                return
+            except Exception:
+                worker.kill()  # Pipe casse: le moniteur relance
+                self._wake.set()
+        if self._closing or req.attempts >= MAX_ATTEMPTS:
+            _resolve(req.future, None)
+            return
+        with self._lock:
+            self._backlog.append(req)
+        self._wake.set()
+
+    def _on_worker_exit(self, worker: _PoolWorker, orphans: list[_Request]) -> None:
+        if not self._closing:
+            print(f"  [WHISPER:{worker.index}] worker arrete ({len(orphans)} requetes en vol)", flush=True)
+        for req in orphans:
+            if req.attempts >= MAX_ATTEMPTS or self._closing:
+                _resolve(req.future, None)
+            else:
+                self._dispatch(req)
+        self._wake.set()
+
+    # ── Sante ───────────────────────────────────────────────────────────
+
+    def _monitor_loop(self) -> None:
+        while not self._closing:
+            self._wake.wait(config.whisper_health_interval)
+            self._wake.clear()
+            if self._closing:
+                break
+            self.check_health()
+
+    def check_health(self) -> None:
+        """Restart dead workers, kill hung ones, then flush the backlog."""
+        for w in self.workers:
+            if w.alive:
+                if w.stalled_for() > config.whisper_timeout or not w.ping():
+                    print(f"  [WHISPER:{w.index}] worker bloque, redemarrage", flush=True)
+                    w.kill()  # Le lecteur voit EOF et renvoie les requetes en vol
+                continue
+            if w.process is not None and w.process.poll() is None:
+                continue  # Tue a l'instant, EOF pas encore traite
+            if w.start():
+                REGISTRY.counter("jarvis_whisper_restarts_total").inc(worker=w.index)
+                print(f"  [WHISPER:{w.index}] redemarre ({w.info})", flush=True)
+        with self._lock:
+            backlog, self._backlog = self._backlog, []
+        for req in backlog:
+            self._dispatch(req)
+
+    def status(self) -> list[dict[str, Any]]:
+        return [{"worker": w.index, "alive": w.alive, "pending": len(w.pending),
+                 "restarts": max(w.restarts, 0), "info": w.info} for w in self.workers]
+
+    # ── API ─────────────────────────────────────────────────────────────
+
+    def transcribe_audio(self, audio: np.ndarray, timeout: float | None = None) -> str | None:
+        """Blocking transcription of int16 mono samples."""
+        with span("whisper", mode="pool"):
+            fut = self.submit(audio)
+            try:
+                return fut.result(timeout or config.whisper_timeout * MAX_ATTEMPTS)
+            except concurrent.futures.TimeoutError:
+                fut.cancel()
+                return None
+
+    async def transcribe_async(self, audio: np.ndarray, timeout: float | None = None) -> str | None:
+        with span("whisper", mode="pool"):
+            fut = await asyncio.to_thread(self.submit, audio)
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(fut),
+                                              timeout or config.whisper_timeout * MAX_ATTEMPTS)
+            except asyncio.TimeoutError:
+                return None
+
+    def transcribe_many(self, clips: list[np.ndarray], timeout: float | None = None) -> list[str | None]:
+        """All clips in flight at once (batched by the workers), results in order."""
+        futures = [self.submit(c) for c in clips]
+        # Un lot de batch_size clips par worker et par tour, chaque tour borne par whisper_timeout
+        rounds = math.ceil(len(clips) / (self.size * self.batch_size)) or 1
+        deadline = time.monotonic() + (timeout or config.whisper_timeout * MAX_ATTEMPTS * rounds)
+        results = []
+        for fut in futures:
+            try:
+                results.append(fut.result(max(0.0, deadline - time.monotonic())))
+            except concurrent.futures.TimeoutError:
+                fut.cancel()
+                results.append(None)
+        return results
+
+    async def transcribe_many_async(self, clips: list[np.ndarray],
+                                    timeout: float | None = None) -> list[str | None]:
+        return await asyncio.to_thread(self.transcribe_many, clips, timeout)
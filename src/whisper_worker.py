@@ -1,16 +1,31 @@
 """Persistent Whisper Worker — loads model once, transcribes fast via stdin/stdout.
 
-Protocol (line-based):
+Protocol (line-based, stdin read as bytes):
   IN:  /path/to/audio.wav
   OUT: transcribed text (or empty line on error)
+  IN:  PCM <nbytes> <sample_rate>\\n followed by <nbytes> of int16 LE mono
+  OUT: transcribed text (no temp file, no WAV decoding)
+  IN:  REQ <id> <path>  |  REQ <id> PCM <nbytes> <sample_rate>\n<payload>
+  OUT: RES <id> <text>  (tagged: several requests in flight, WhisperPool)
+  IN:  PING
+  OUT: PONG <queued>  (answered by the reader thread, even mid-inference)
   IN:  QUIT
   (process exits)
 
+WHISPER_READY announces proto=pcm,req so older clients keep sending paths.
+Tagged clips queued together are transcribed in one batch (faster-whisper
+BatchedInferencePipeline, WHISPER_BATCH clips max) when available.
+WHISPER_DRY_RUN=1 skips the model (protocol benchmark, bench_whisper.py);
+WHISPER_DRY_RUN_MS adds a fake inference delay per call (pool tests).
+
 Uses faster-whisper with CUDA for ~4x speedup over openai-whisper.
 """
 
 import sys
 import os
+import queue
+import threading
+import time
 import warnings
 
 # Suppress noisy warnings
@@ -21,62 +36,230 @@ os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 if sys.platform == "win32":
     sys.stdout.reconfigure(encoding="utf-8", errors="replace")
     sys.stderr.reconfigure(encoding="utf-8", errors="replace")
-    sys.stdin.reconfigure(encoding="utf-8", errors="replace")
 
+PCM_RATE = 16000  # faster-whisper attend du 16 kHz mono
+BATCH_CLIP_S = 30.0  # Fenetre Whisper: un clip plus long est transcrit seul
+BATCH_GAP_S = 1.0    # Silence entre deux clips concatenes
+
+
+class _Segment:
+    def __init__(self, text, start=0.0, end=0.0):
+        self.text = text
+        self.start = start
+        self.end = end
+
+
+class _DryRunModel:
+    """Stand-in for the protocol benchmark: decodes input like the model, no inference."""
+
+    def __init__(self, delay_ms=0.0):
+        self.delay = delay_ms / 1000
+
+    def transcribe(self, audio, clip_timestamps=None, **kwargs):
+        if isinstance(audio, str):
+            audio = _decode_wav(audio)
+        if self.delay:
+            time.sleep(self.delay)
+        if clip_timestamps:
+            return [_Segment(f"{round((c['end'] - c['start']) * PCM_RATE)} echantillons", c["start"], c["end"])
+                    for c in clip_timestamps], None
+        return [_Segment(f"{len(audio)} echantillons")], None
+
+
+def _decode_wav(path):
+    try:
+        from faster_whisper.audio import decode_audio
+        return decode_audio(path, sampling_rate=PCM_RATE)
+    except ImportError:
+        import wave
+        import numpy as np
+        with wave.open(path, "rb") as wf:
+            data = wf.readframes(wf.getnframes())
+        return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def _read_exact(stream, n):
+    """Read exactly n bytes (pipe reads can return short)."""
+    chunks = []
+    while n > 0:
+        chunk = stream.read(n)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+def _pcm_to_float(payload):
+    """int16 LE bytes -> float32 [-1, 1] (one vectorized pass, no decoder)."""
+    import numpy as np
+    audio = np.frombuffer(payload, dtype="<i2").astype(np.float32)
+    audio *= 1.0 / 32768.0
+    return audio
+
+
+# Hallucination filter
+HALLUCINATIONS = {
+    ".", "..", "...", "merci.", "sous-titres", "sous-titrage",
+    "merci d'avoir regarde", "merci de votre attention",
+    "sous-titres realises par la communaute d'amara.org",
+    "merci", "ok", "bye",
+}
+
+_out_lock = threading.Lock()
+
+
+def _emit(line):
+    with _out_lock:
+        print(line, flush=True)
+
+
+def _clean(text):
+    text = text.strip()
+    return "" if text.lower() in HALLUCINATIONS or len(text) < 2 else text
 
-def main():
-    from faster_whisper import WhisperModel
 
+def _reader(stdin, requests):
+    """Parse stdin frames into (req_id, source); req_id None = untagged (legacy)."""
+    for raw in iter(stdin.readline, b""):
+        line = raw.decode("utf-8", errors="replace").strip()
+        if not line:
+            continue
+        if line.upper() == "QUIT":
+            break
+        if line == "PING":
+            _emit(f"PONG {requests.qsize()}")
+            continue
+        req_id = None
+        if line.startswith("REQ "):
+            _, req_id, line = line.split(" ", 2)
+        if line.startswith("PCM "):
+            _, nbytes, rate = line.split()
+            payload = _read_exact(stdin, int(nbytes))
+            if len(payload) < int(nbytes):
+                break  # Parent ferme au milieu d'une trame
+            if int(rate) != PCM_RATE:
+                requests.put((req_id, ValueError(f"sample rate {rate} != {PCM_RATE}")))
+                continue
+            requests.put((req_id, _pcm_to_float(payload)))
+        else:
+            requests.put((req_id, line))
+    requests.put(None)
+
+
+def _transcribe_one(model, source, language):
+    segments, info = model.transcribe(
+        source,
+        language=language,
+        beam_size=5,
+        vad_filter=True,
+        vad_parameters=dict(min_silence_duration_ms=500),
+    )
+    return _clean(" ".join(seg.text.strip() for seg in segments))
+
+
+def _transcribe_batch(batched, clips, language):
+    """Several clips in one batched call: concatenated, one clip_timestamp each."""
+    import numpy as np
+    gap = np.zeros(int(BATCH_GAP_S * PCM_RATE), dtype=np.float32)
+    parts, spans, pos = [], [], 0.0
+    for clip in clips:
+        parts += [clip, gap]
+        spans.append({"start": pos, "end": pos + len(clip) / PCM_RATE})
+        pos += (len(clip) + len(gap)) / PCM_RATE
+    segments, info = batched.transcribe(
+        np.concatenate(parts),
+        language=language,
+        beam_size=5,
+        vad_filter=False,
+        clip_timestamps=spans,
+        batch_size=len(clips),
+    )
+    texts = [[] for _ in clips]
+    for seg in segments:
+        mid = (seg.start + seg.end) / 2
+        i = next((k for k, s in enumerate(spans) if mid < s["end"] + BATCH_GAP_S / 2), len(spans) - 1)
+        texts[i].append(seg.text.strip())
+    return [_clean(" ".join(t)) for t in texts]
+
+
+def _reply(req_id, text):
+    _emit(text if req_id is None else f"RES {req_id} {text}")
+
+
+def main():
     model_size = os.environ.get("WHISPER_MODEL", "large-v3-turbo")
     device = os.environ.get("WHISPER_DEVICE", "cuda")
     compute = os.environ.get("WHISPER_COMPUTE", "float16")
     language = os.environ.get("WHISPER_LANG", "fr")
+    dry_run = os.environ.get("WHISPER_DRY_RUN") == "1"
+    batch_max = int(os.environ.get("WHISPER_BATCH", "8"))
 
-    print(f"WHISPER_READY model={model_size} device={device}", flush=True)
+    print(f"WHISPER_READY model={model_size} device={device} proto=pcm,req", flush=True)
 
-    try:
-        model = WhisperModel(model_size, device=device, compute_type=compute)
-    except Exception:
-        # Fallback to CPU if CUDA fails
-        device = "cpu"
-        compute = "int8"
-        model = WhisperModel(model_size, device=device, compute_type=compute)
-
-    print(f"WHISPER_LOADED device={device} compute={compute}", flush=True)
-
-    # Hallucination filter
-    HALLUCINATIONS = {
-        ".", "..", "...", "merci.", "sous-titres", "sous-titrage",
-        "merci d'avoir regarde", "merci de votre attention",
-        "sous-titres realises par la communaute d'amara.org",
-        "merci", "ok", "bye",
-    }
-
-    for line in sys.stdin:
-        path = line.strip()
-        if not path:
-            continue
-        if path.upper() == "QUIT":
+    batched = None
+    if dry_run:
+        model, device, compute = _DryRunModel(float(os.environ.get("WHISPER_DRY_RUN_MS", "0"))), "none", "dry-run"
+        batched = model
+    else:
+        from faster_whisper import WhisperModel
+        try:
+            model = WhisperModel(model_size, device=device, compute_type=compute)
+        except Exception:
+            # Fallback to CPU if CUDA fails
+            device = "cpu"
+            compute = "int8"
+            model = WhisperModel(model_size, device=device, compute_type=compute)
+        try:
+            from faster_whisper import BatchedInferencePipeline
+            batched = BatchedInferencePipeline(model=model)
+        except ImportError:
+            pass  # faster-whisper < 1.1: clips transcrits un par un
+
+    print(f"WHISPER_LOADED device={device} compute={compute} batch={batch_max if batched else 1}", flush=True)
+
+    requests = queue.Queue()
+    threading.Thread(target=_reader, args=(sys.stdin.buffer, requests), daemon=True).start()
+
+    while True:
+        item = requests.get()
+        if item is None:
             break
+        pending = [item]
+        # Clips tagues deja en file: un seul appel batch
+        while batched and item[0] is not None and len(pending) < batch_max:
+            try:
+                nxt = requests.get_nowait()
+            except queue.Empty:
+                break
+            if nxt is None:
+                requests.put(None)
+                break
+            pending.append(nxt)
 
-        try:
-            segments, info = model.transcribe(
-                path,
-                language=language,
-                beam_size=5,
-                vad_filter=True,
-                vad_parameters=dict(min_silence_duration_ms=500),
-            )
-            text = " ".join(seg.text.strip() for seg in segments).strip()
-
-            # Filter hallucinations
-            if text.lower() in HALLUCINATIONS or len(text) < 2:
-                print("", flush=True)
-            else:
-                print(text, flush=True)
-        except Exception as e:
-            print("", flush=True)
-            print(f"WHISPER_ERROR: {e}", file=sys.stderr, flush=True)
+        for req_id, source in pending:
+            if isinstance(source, Exception):
+                _reply(req_id, "")
+                print(f"WHISPER_ERROR: {source}", file=sys.stderr, flush=True)
+        pending = [(r, s) for r, s in pending if not isinstance(s, Exception)]
+        clips = [(r, s) for r, s in pending
+                 if r is not None and not isinstance(s, str) and len(s) <= BATCH_CLIP_S * PCM_RATE]
+
+        if len(clips) > 1:
+            try:
+                for (req_id, _), text in zip(clips, _transcribe_batch(batched, [s for _, s in clips], language)):
+                    _reply(req_id, text)
+                batched_ids = {id(s) for _, s in clips}
+                pending = [(r, s) for r, s in pending if id(s) not in batched_ids]
+            except Exception as e:
+                print(f"WHISPER_ERROR: batch: {e}", file=sys.stderr, flush=True)
+
+        for req_id, source in pending:
+            try:
+                _reply(req_id, _transcribe_one(model, source, language))
+            except Exception as e:
+                _reply(req_id, "")
+                print(f"WHISPER_ERROR: {e}", file=sys.stderr, flush=True)
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ from __future__ import annotations
 
 import json
 import subprocess
+import time
 from typing import Any
 
 
@@ -17,6 +18,15 @@ from typing import Any
 
 def run_powershell(command: str, timeout: int = 60) -> dict[str, Any]:
     """Execute a PowerShell command and return structured output."""
+    from src.metrics import timer
+    with timer("jarvis_powershell_duration_ms", "jarvis_powershell_calls_total") as outcome:
+        result = _run_powershell(command, timeout)
+        if not result["success"]:
+            outcome["status"] = "timeout" if result["stderr"] == "Timeout" else "error"
+        return result
+
+
+def _run_powershell(command: str, timeout: int) -> dict[str, Any]:
     try:
         result = subprocess.run(
             ["powershell", "-NoProfile", "-NonInteractive", "-Command", command],
@@ -34,6 +44,24 @@ def run_powershell(command: str, timeout: int = 60) -> dict[str, Any]:
         return {"success": False, "stdout": "", "stderr": str(e), "exit_code": -1}
 
 
+PS_WARM_INTERVAL = 60.0  # Un lancement a vide suffit par minute
+_ps_warmed_at = 0.0
+
+
+def warm_powershell() -> bool:
+    """Launch a no-op PowerShell so the next real call starts from a warm cache.
+
+    Each run_powershell() spawns powershell.exe; the first spawn after idle
+    pays disk and .NET loading. Called speculatively (src/speculative.py).
+    """
+    global _ps_warmed_at
+    now = time.monotonic()
+    if now - _ps_warmed_at < PS_WARM_INTERVAL:
+        return False
+    _ps_warmed_at = now
+    return _run_powershell("$null", timeout=10)["success"]
+
+
 def _ps(cmd: str, timeout: int = 15) -> str:
     """Quick PowerShell command, returns stdout or error string."""
     r = run_powershell(cmd, timeout)
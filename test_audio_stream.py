@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Test du streaming audio (src/audio_stream.py) sans micro ni Whisper.
+
+Sources simulees (ArraySource, WAV temporaire) avec tonalites et silences
+synthetiques, `transcribe` factice: segmentation VAD, partiels identiques
+en rejeu rapide et temps reel, anneau circulaire et preroll de la capture
+permanente.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+from src.audio_stream import (  # noqa: E402
+    SAMPLE_RATE, AlwaysOnCapture, ArraySource, RingBuffer, StreamingTranscriber,
+    transcribe_wav_stream,
+)
+
+
+def _tone(seconds: float, freq: float = 440.0, amplitude: int = 8000) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+
+
+# Deux "mots": 1.0 s et 0.8 s de tonalite separes par 1 s de silence (> vad_silence_ms)
+UTTERANCE = np.concatenate([_silence(0.5), _tone(1.0), _silence(1.0), _tone(0.8), _silence(0.6)])
+
+
+class _FakeSTT:
+    """Returns one numbered word per call and records the clip lengths (s)."""
+
+    def __init__(self):
+        self.clips: list[float] = []
+
+    def __call__(self, audio: np.ndarray) -> str:
+        self.clips.append(len(audio) / SAMPLE_RATE)
+        return f"mot{len(self.clips)}"
+
+
+def _check(ok: bool, description: str) -> bool:
+    print(f"  [{'PASS' if ok else 'FAIL'}] {description}")
+    return ok
+
+
+def _stream(realtime: bool) -> tuple[str, StreamingTranscriber, list[str]]:
+    partials: list[str] = []
+    transcriber = StreamingTranscriber(_FakeSTT(), on_partial=partials.append,
+                                       partial_interval=0.3, skip_behind=realtime)
+    source = ArraySource(UTTERANCE, realtime=realtime)
+    source.start(transcriber.feed)
+    source.wait()
+    return transcriber.finish(), transcriber, partials
+
+
+def test_vad_segments():
+    """Two tone bursts -> two segments, each transcribed once with its pad."""
+    print("\n=== TEST 1: segmentation VAD (ArraySource) ===")
+    text, transcriber, partials = _stream(realtime=False)
+    st = transcriber.stats
+    segment_clips = [transcriber.transcribe.clips[i] for i in (4, 9)]  # Apres 4 partiels chacun
+    ok = _check(st.segments == 2, f"{st.segments} segments")
+    ok &= _check(text == "mot5 mot10", f"texte final = segments fermes ({text!r})")
+    ok &= _check(1.0 <= segment_clips[0] <= 1.4 and 0.8 <= segment_clips[1] <= 1.2,
+                 f"duree des segments {segment_clips[0]:.2f}s / {segment_clips[1]:.2f}s (parole + marges)")
+    ok &= _check(abs(st.audio_s - len(UTTERANCE) / SAMPLE_RATE) < 0.01, f"audio {st.audio_s:.2f}s")
+    ok &= _check(partials[-1].startswith("mot5 "), "partiels du 2e segment prefixes par le 1er")
+    assert ok
+
+
+def test_partials_replay_matches_realtime():
+    """Partials depend on audio time only: fast replay == real time."""
+    print("\n=== TEST 2: partiels rejeu rapide vs temps reel ===")
+    _, fast, fast_partials = _stream(realtime=False)
+    _, live, live_partials = _stream(realtime=True)
+    ok = _check(fast.stats.partials == 8, f"{fast.stats.partials} partiels en rejeu rapide")
+    ok &= _check(fast_partials == live_partials, f"{live.stats.partials} partiels en temps reel, identiques")
+    assert ok
+
+
+def test_wav_stream():
+    """transcribe_wav_stream: same pipeline from a WAV file."""
+    print("\n=== TEST 3: transcribe_wav_stream (WAV temporaire) ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "enonce.wav"
+        with wave.open(str(path), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(SAMPLE_RATE)
+            wf.writeframes(UTTERANCE.tobytes())
+        partials: list[str] = []
+        text, st = transcribe_wav_stream(path, _FakeSTT(), on_partial=partials.append)
+    ok = _check(st.segments == 2 and len(text.split()) == 2, f"{st.segments} segments, texte {text!r}")
+    ok &= _check(st.partials == len(partials) > 0, f"{st.partials} partiels")
+    assert ok
+
+
+def test_ring_wraparound():
+    """Absolute positions survive wraparound; old samples are clamped away."""
+    print("\n=== TEST 4: RingBuffer (debordement circulaire) ===")
+    ring = RingBuffer(10)
+    data = np.arange(1, 26, dtype=np.int16)
+    ring.write(data[:7])
+    ring.write(data[7:13])  # Chevauche la fin du tampon
+    ok = _check(ring.total == 13 and ring.oldest() == 3, f"total {ring.total}, plus ancien {ring.oldest()}")
+    ok &= _check(np.array_equal(ring.read(3, 13), data[3:13]), "lecture a cheval sur la fin")
+    ok &= _check(np.array_equal(ring.read(0, 5), data[3:5]), "debut ecrase: lecture bornee a l'anneau")
+    ring.write(data[13:25])  # Bloc plus grand que l'anneau
+    ok &= _check(np.array_equal(ring.latest(10), data[15:25]), "bloc > capacite: les 10 derniers gardes")
+    assert ok
+
+
+def test_capture_preroll():
+    """Always-on capture: a recording starts preroll_ms before the request."""
+    print("\n=== TEST 5: capture permanente, preroll 300 ms ===")
+    audio = (np.arange(int(2.5 * SAMPLE_RATE)) % 30000).astype(np.int16)
+    capture = AlwaysOnCapture(ArraySource(audio), ring_s=1.0, preroll_ms=300)
+    capture.start()
+    capture.source.wait()
+    start = capture.mark()
+    window = capture.read(start)
+    ok = _check(len(window) == int(0.3 * SAMPLE_RATE), f"fenetre {len(window) / SAMPLE_RATE * 1000:.0f} ms")
+    ok &= _check(np.array_equal(window, audio[-len(window):]), "preroll = derniers echantillons captures")
+    ok &= _check(np.array_equal(capture.read(capture.ring.oldest()), audio[-SAMPLE_RATE:]),
+                 "anneau de 1 s apres 2.5 s de capture (debordement)")
+    capture.stop()
+
+    live = AlwaysOnCapture(ArraySource(_tone(0.5), realtime=True, hold=True), preroll_ms=300)
+    live.start()
+    time.sleep(0.5)
+    stop = threading.Event()
+    threading.Timer(0.2, stop.set).start()
+    recording = live.record(stop, max_duration=2.0)
+    live.stop()
+    ok &= _check(0.45 <= len(recording) / SAMPLE_RATE <= 0.7,
+                 f"enregistrement {len(recording) / SAMPLE_RATE:.2f}s = preroll + 0.2 s en direct")
+    assert ok
+
+
+if __name__ == "__main__":
+    print("Testing JARVIS audio stream...")
+    failed = 0
+    for test in (test_vad_segments, test_partials_replay_matches_realtime, test_wav_stream,
+                 test_ring_wraparound, test_capture_preroll):
+        try:
+            test()
+        except AssertionError:
+            failed += 1
+    print(f"\n=== All tests completed ({failed} en echec) ===")
+    sys.exit(1 if failed else 0)
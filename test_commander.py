@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Test du mode commandant: execution locale reservee aux IAs directes.
+
+Un plan qui cible un agent SDK (ia-fast, ia-deep, ia-check, ia-trading:
+outils Write/Edit/Bash, run_script...) doit toujours partir chez Claude;
+seul un plan 100% M1/M2/OL1 est servi par le DAG local. Client Claude
+et classification simules, aucun noeud contacte.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+from src import commander  # noqa: E402
+from src.orchestrator import _commander_turn  # noqa: E402
+
+
+class _FakeClient:
+    """Records what would be sent to Claude."""
+
+    def __init__(self):
+        self.queries: list[str] = []
+
+    async def query(self, prompt: str) -> None:
+        self.queries.append(prompt)
+
+    async def receive_response(self):
+        return
+        yield
+
+
+def _check(ok: bool, description: str) -> bool:
+    print(f"  [{'PASS' if ok else 'FAIL'}] {description}")
+    return ok
+
+
+async def _turn(classification: str, prompt: str) -> tuple[_FakeClient, list[list[str]]]:
+    """Run one commander turn with a fixed classification; returns (client, local plans)."""
+    local_runs: list[list[str]] = []
+
+    async def classify(_prompt: str) -> str:
+        return classification
+
+    async def run_plan(self, tasks):
+        local_runs.append([t.target for t in tasks])
+        return commander.CommanderResult(tasks, "synthese locale", 0.95, 1, ["M1"])
+
+    saved = (commander.classify_task, commander._thermal_status, commander.CommanderEngine.run_plan)
+    commander.classify_task = classify
+    commander._thermal_status = lambda: {"status": "ok"}
+    commander.CommanderEngine.run_plan = run_plan
+    try:
+        client = _FakeClient()
+        await _commander_turn(client, prompt)
+    finally:
+        commander.classify_task, commander._thermal_status, commander.CommanderEngine.run_plan = saved
+    return client, local_runs
+
+
+def test_agent_targets_stay_with_claude():
+    """Only direct IAs resolve to a local node."""
+    print("\n=== TEST 1: resolve_task_node ===")
+    ok = True
+    for agent in ("ia-fast", "ia-deep", "ia-check", "ia-trading", "ia-system", "GEMINI"):
+        ok &= _check(commander.resolve_task_node(agent) is None, f"{agent}: agent SDK, pas de noeud local")
+    ok &= _check(commander.resolve_task_node("OL1") == "OL1", "OL1: IA directe")
+    assert ok
+
+
+def test_code_plan_reaches_claude():
+    """'Modifie le code X' must be dispatched by Claude (ia-fast edits files)."""
+    print("\n=== TEST 2: plan code -> Claude ===")
+    client, local_runs = asyncio.run(_turn("code", "Modifie le code de src/voice.py"))
+    ok = _check(not local_runs, "aucune execution locale")
+    ok &= _check(len(client.queries) == 1, "requete envoyee a Claude")
+    ok &= _check(bool(client.queries) and "ia-fast" in client.queries[0], "plan de dispatch avec ia-fast")
+    assert ok
+
+
+def test_trading_plan_reaches_claude():
+    """Trading needs the scanners (run_script), not an M1 guess."""
+    print("\n=== TEST 3: plan trading -> Claude ===")
+    client, local_runs = asyncio.run(_turn("trading", "Scanne le marche BTC"))
+    ok = _check(not local_runs and len(client.queries) == 1, "ia-trading dispatche par Claude")
+    assert ok
+
+
+def test_direct_ia_plan_runs_locally():
+    """A 'simple' plan (M1 responder) is answered by the local DAG."""
+    print("\n=== TEST 4: plan simple -> DAG local ===")
+    client, local_runs = asyncio.run(_turn("simple", "Quelle heure est-il a Tokyo ?"))
+    ok = _check(local_runs == [["M1"]], "execution locale sur M1")
+    ok &= _check(not client.queries, "Claude non sollicite (qualite >= seuil)")
+    assert ok
+
+
+if __name__ == "__main__":
+    print("Testing JARVIS commander routing...")
+    failed = 0
+    for test in (test_agent_targets_stay_with_claude, test_code_plan_reaches_claude,
+                 test_trading_plan_reaches_claude, test_direct_ia_plan_runs_locally):
+        try:
+            test()
+        except AssertionError:
+            failed += 1
+    print(f"\n=== All tests completed ({failed} en echec) ===")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Test du resolveur speculatif sur des sequences de transcriptions enregistrees.
+
+Rejoue data/speculative_replay.jsonl (partiels + transcription finale, sans
+audio ni Whisper): hit, miss, confirm_required et absence de candidat.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+from src.speculative import replay, replay_file  # noqa: E402
+
+FIXTURE = ROOT / "data" / "speculative_replay.jsonl"
+
+
+def _check(ok: bool, description: str) -> bool:
+    print(f"  [{'PASS' if ok else 'FAIL'}] {description}")
+    return ok
+
+
+def test_replay_fixture():
+    """Each recorded sequence ends with its expected outcome and command."""
+    print("\n=== TEST 1: replay_file (sequences enregistrees) ===")
+    entries = [json.loads(line) for line in FIXTURE.read_text(encoding="utf-8").splitlines() if line.strip()]
+    results = replay_file(FIXTURE, prefetch=None)
+    ok = _check(len(results) == len(entries), f"{len(results)} sequences rejouees")
+    for entry, res in zip(entries, results):
+        ok &= _check(
+            res["outcome"] == entry["expected"] and res["command"] == entry["command"],
+            f"{entry['partials']} -> {entry['final']!r}: {res['outcome'] or 'aucun candidat'} "
+            f"(commande {res['command']})",
+        )
+    assert ok
+
+
+def test_hit_miss_confirm():
+    """The three commit outcomes, with the prefetch hook recording its calls."""
+    print("\n=== TEST 2: hit / miss / confirm_required ===")
+    prefetched = []
+
+    def prefetch(cmd, params):
+        prefetched.append(cmd.name)
+        return f"cible:{cmd.name}"
+
+    hit = replay(["ouvre chr", "ouvre chrome"], "ouvre chrome", prefetch=prefetch)
+    ok = _check(hit["outcome"] == "hit" and hit["command"] == "ouvrir_chrome", "hit: commande confirmee")
+    ok &= _check(prefetched == ["ouvrir_chrome"], "hit: une seule prelecture pour deux partiels identiques")
+
+    miss = replay(["ouvre chrome"], "ouvre firefox", prefetch=None)
+    ok &= _check(miss["outcome"] == "miss" and miss["command"] is None,
+                 f"miss: candidat {miss['candidate']} rejete par la finale")
+
+    confirm = replay(["verrouille le pc"], "verrouille le pc", prefetch=None)
+    ok &= _check(confirm["outcome"] == "confirm_required" and confirm["command"] is None,
+                 "confirm_required: jamais execute speculativement")
+    assert ok
+
+
+if __name__ == "__main__":
+    print("Testing JARVIS speculative resolver...")
+    failed = 0
+    for test in (test_replay_fixture, test_hit_miss_confirm):
+        try:
+            test()
+        except AssertionError:
+            failed += 1
+    print(f"\n=== All tests completed ({failed} en echec) ===")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Test du pipeline vocal phrase par phrase (src/speech_pipeline.py).
+
+TTSEngine(NullBackend(realtime=True)) avec un cache de phrases dans un
+repertoire temporaire (jamais data/tts_cache): decoupage (blocs de code,
+fragments courts), ordre de lecture, premier audio avant la fin, phrase
+en echec sautee et barge-in avec interruption de la generation.
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+from src.speech_pipeline import SentenceSplitter, SpeechPipeline  # noqa: E402
+from src.tts import NullBackend, PhraseCache, TTSEngine  # noqa: E402
+
+SENTENCES = [
+    "Le premier noeud est en ligne et repond.",
+    "Le second noeud termine son chargement.",
+    "La file de taches est vide pour le moment.",
+]
+
+
+class _FailingBackend(NullBackend):
+    """NullBackend whose render raises for sentences containing `poison`."""
+
+    def __init__(self, poison: str, **kwargs):
+        super().__init__(**kwargs)
+        self.poison = poison
+
+    def render(self, text: str, voice: str, path: Path) -> bool:
+        if self.poison in text:
+            raise RuntimeError("synthese impossible")
+        return super().render(text, voice, path)
+
+
+def _check(ok: bool, description: str) -> bool:
+    print(f"  [{'PASS' if ok else 'FAIL'}] {description}")
+    return ok
+
+
+def _engine(tmp: str, backend: NullBackend | None = None) -> TTSEngine:
+    # 5 ms par caractere: ~0.2 s de lecture reelle par phrase
+    return TTSEngine(backend or NullBackend(ms_per_char=5.0, realtime=True), PhraseCache(Path(tmp)))
+
+
+def _spoken_order(engine: TTSEngine) -> list[str]:
+    """Sentences in playback order (cached WAV path -> rendered text)."""
+    by_path = {engine.cache.dir / f"{PhraseCache.key('null', 'fr-FR', text)}.wav": text
+               for text in engine.backend.rendered}
+    return [by_path.get(Path(p), "?") for p in engine.backend.played]
+
+
+def test_splitter():
+    """Code fences are never read; short fragments join the next sentence."""
+    print("\n=== TEST 1: SentenceSplitter (code, fragments courts) ===")
+    splitter = SentenceSplitter(min_chars=20)
+    out = splitter.feed("OK. Voici la fonction demandee:\n```python\nprint('secret')\n``")
+    out += splitter.feed("`\nOui. Bien sur. Elle affiche un message. Fin")
+    out += splitter.flush()
+    ok = _check(not any("secret" in s or "```" in s for s in out), "bloc de code ignore (cloture coupee entre deux blocs)")
+    ok &= _check(out[0] == "OK. Voici la fonction demandee:", f"fragment court fusionne: {out[0]!r}")
+    ok &= _check(out[1] == "Oui. Bien sur. Elle affiche un message.", f"fragments courts fusionnes: {out[1]!r}")
+    ok &= _check(out[2:] == ["Fin"], "dernier fragment lu au flush")
+    ok &= _check(SentenceSplitter(min_chars=0).feed("## **Titre**\n- point un") == ["Titre"],
+                 "markdown retire, phrase incomplete gardee")
+    assert ok
+
+
+def test_order_and_first_audio():
+    """Sentences are spoken in order; the first one starts before the end."""
+    print("\n=== TEST 2: ordre de lecture et premier audio ===")
+
+    async def run(engine: TTSEngine):
+        speech = SpeechPipeline(engine, t0=time.perf_counter())
+        for sentence in SENTENCES:
+            for i in range(0, len(sentence), 7):  # Flux par petits blocs, comme le modele
+                await speech.feed(sentence[i:i + 7])
+            await speech.feed(" ")
+        return await speech.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _engine(tmp)
+        stats = asyncio.run(run(engine))
+        order = _spoken_order(engine)
+        cached = len(list(Path(tmp).glob("*.wav")))
+    ok = _check(order == SENTENCES, "phrases lues dans l'ordre de generation")
+    ok &= _check(stats.sentences == stats.rendered == 3 and not stats.failed, f"{stats.rendered}/3 rendues")
+    ok &= _check(0 < stats.first_audio_ms < stats.total_ms,
+                 f"premier audio {stats.first_audio_ms:.0f} ms < total {stats.total_ms:.0f} ms")
+    ok &= _check(cached == 3, "WAV dans le cache temporaire")
+    assert ok
+
+
+def test_render_failure_skips_sentence():
+    """A render exception drops that sentence only."""
+    print("\n=== TEST 3: echec de rendu -> phrase sautee ===")
+
+    async def run(engine: TTSEngine):
+        speech = SpeechPipeline(engine)
+        await asyncio.wait_for(speech.say(" ".join(SENTENCES)), 5)
+        return await asyncio.wait_for(speech.close(), 5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _engine(tmp, _FailingBackend("second", ms_per_char=5.0, realtime=True))
+        stats = asyncio.run(run(engine))
+        order = _spoken_order(engine)
+    ok = _check(stats.failed == 1 and stats.rendered == 2, f"{stats.failed} echec, {stats.rendered} rendues")
+    ok &= _check(order == [SENTENCES[0], SENTENCES[2]], "la suite est lue sans blocage")
+    assert ok
+
+
+def test_barge_in():
+    """barge_in stops playback, drops the rest and awaits on_cancel."""
+    print("\n=== TEST 4: barge-in ===")
+    interrupted: list[str] = []
+
+    async def on_cancel():
+        await asyncio.sleep(0.1)  # ex. client.interrupt()
+        interrupted.append("generation")
+
+    async def run(engine: TTSEngine):
+        speech = SpeechPipeline(engine, on_cancel=on_cancel)
+        generation = asyncio.create_task(speech.say(" ".join(SENTENCES * 3)))  # Bloque par les files bornees
+        while not engine.backend.played:
+            await asyncio.sleep(0.01)
+        t = time.perf_counter()
+        speech.barge_in()
+        await generation
+        stats = await speech.close()
+        return stats, (time.perf_counter() - t) * 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 20 ms par caractere: ~0.8 s par phrase, la premiere est coupee en cours
+        engine = _engine(tmp, NullBackend(ms_per_char=20.0, realtime=True))
+        stats, stop_ms = asyncio.run(run(engine))
+    ok = _check(stats.cancelled and len(engine.backend.played) == 1,
+                f"lecture coupee apres {len(engine.backend.played)}/{stats.sentences} phrases")
+    ok &= _check(stop_ms < 600, f"arret en {stop_ms:.0f} ms (phrase en cours interrompue)")
+    ok &= _check(interrupted == ["generation"], "on_cancel attendu avant la fin de close()")
+    assert ok
+
+
+if __name__ == "__main__":
+    print("Testing JARVIS speech pipeline...")
+    failed = 0
+    for test in (test_splitter, test_order_and_first_audio, test_render_failure_skips_sentence, test_barge_in):
+        try:
+            test()
+        except AssertionError:
+            failed += 1
+    print(f"\n=== All tests completed ({failed} en echec) ===")
+    sys.exit(1 if failed else 0)
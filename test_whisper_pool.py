@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Test du pool Whisper (src/whisper_pool.py) avec le worker en dry-run.
+
+Workers reels (whisper_worker.py, protocole tague REQ/RES) lances sur CPU
+int8 sans modele: WHISPER_DRY_RUN=1 repond "<n> echantillons" apres
+WHISPER_DRY_RUN_MS. Couvre le routage par ID, le crash avec renvoi des
+requetes en vol et le watchdog (file d'attente != blocage).
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+from src.config import config  # noqa: E402
+from src.whisper_pool import WhisperPool  # noqa: E402
+
+
+def _pool(workers: int, delay_ms: int, batch: int) -> WhisperPool:
+    return WhisperPool(workers=workers, batch_size=batch, env={
+        "WHISPER_DRY_RUN": "1",
+        "WHISPER_DRY_RUN_MS": str(delay_ms),
+        "WHISPER_DEVICE": "cpu",
+        "WHISPER_COMPUTE": "int8",
+    })
+
+
+def _clip(n: int) -> np.ndarray:
+    return np.zeros(n, dtype=np.int16)
+
+
+def _check(ok: bool, description: str) -> bool:
+    print(f"  [{'PASS' if ok else 'FAIL'}] {description}")
+    return ok
+
+
+class _Settings:
+    """Temporarily override config fields (no monitor thread by default)."""
+
+    def __init__(self, **values):
+        self.values = {"whisper_health_interval": 0.0, **values}
+        self.saved = {}
+
+    def __enter__(self):
+        for key, value in self.values.items():
+            self.saved[key] = getattr(config, key)
+            setattr(config, key, value)
+
+    def __exit__(self, *exc):
+        for key, value in self.saved.items():
+            setattr(config, key, value)
+
+
+def test_request_routing():
+    """Many clips in flight on two workers: every answer reaches its caller."""
+    print("\n=== TEST 1: routage par ID (2 workers, batch 4) ===")
+    with _Settings():
+        pool = _pool(workers=2, delay_ms=30, batch=4)
+        try:
+            ok = _check(pool.start(), "workers demarres (dry-run, cpu int8)")
+            sizes = [1000 + 37 * i for i in range(12)]
+            results = pool.transcribe_many([_clip(n) for n in sizes])
+            ok &= _check(results == [f"{n} echantillons" for n in sizes], "transcribe_many: resultats dans l'ordre")
+
+            threaded: dict[int, str | None] = {}
+            threads = [threading.Thread(target=lambda n=n: threaded.__setitem__(n, pool.transcribe_audio(_clip(n))))
+                       for n in (2001, 2002, 2003, 2004, 2005)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            ok &= _check(all(threaded[n] == f"{n} echantillons" for n in threaded), "appels concurrents: pas de melange")
+            ok &= _check(all(s["pending"] == 0 for s in pool.status()), "aucune requete orpheline")
+        finally:
+            pool.stop()
+    assert ok
+
+
+def test_crash_requeue():
+    """A worker killed mid-request: its clips are resent, then it restarts."""
+    print("\n=== TEST 2: crash d'un worker, renvoi des requetes en vol ===")
+    with _Settings():
+        pool = _pool(workers=2, delay_ms=400, batch=1)
+        try:
+            pool.start()
+            sizes = [3001, 3002, 3003, 3004]
+            futures = [pool.submit(_clip(n)) for n in sizes]
+            time.sleep(0.1)
+            victim = max(pool.workers, key=lambda w: len(w.pending))
+            in_flight = len(victim.pending)
+            victim.process.kill()
+            results = [f.result(10) for f in futures]
+            ok = _check(in_flight > 0, f"worker {victim.index} tue avec {in_flight} requetes en vol")
+            ok &= _check(results == [f"{n} echantillons" for n in sizes], "requetes renvoyees a un worker vivant")
+            victim.process.wait(5)
+            pool.check_health()
+            ok &= _check(victim.alive and pool.status()[victim.index]["restarts"] == 1, "worker relance par check_health")
+            ok &= _check(pool.transcribe_audio(_clip(3005)) == "3005 echantillons", "pool operationnel apres relance")
+        finally:
+            pool.stop()
+    assert ok
+
+
+def test_watchdog_queue_is_not_a_hang():
+    """Clips waiting behind others must not trip the hang watchdog."""
+    print("\n=== TEST 3: watchdog sous charge (file > whisper_timeout) ===")
+    with _Settings(whisper_timeout=0.6):
+        pool = _pool(workers=1, delay_ms=200, batch=1)
+        stop = threading.Event()
+
+        def monitor():
+            while not stop.wait(0.05):
+                pool.check_health()
+
+        try:
+            pool.start()
+            checker = threading.Thread(target=monitor, daemon=True)
+            checker.start()
+            sizes = [4001 + i for i in range(8)]  # ~1.6 s de file pour un timeout de 0.6 s
+            results = pool.transcribe_many([_clip(n) for n in sizes])
+            stop.set()
+            checker.join()
+            ok = _check(results == [f"{n} echantillons" for n in sizes], "tous les clips transcrits")
+            ok &= _check(pool.status()[0]["restarts"] == 0, "aucun redemarrage (le worker progresse)")
+        finally:
+            stop.set()
+            pool.stop()
+    assert ok
+
+
+def test_watchdog_kills_hung_worker():
+    """No RES for whisper_timeout with a request in flight: kill and restart."""
+    print("\n=== TEST 4: watchdog sur worker bloque ===")
+    with _Settings(whisper_timeout=0.5):
+        pool = _pool(workers=1, delay_ms=30000, batch=1)
+        try:
+            pool.start()
+            worker = pool.workers[0]
+            fut = pool.submit(_clip(5001))
+            time.sleep(0.2)
+            pool.check_health()
+            ok = _check(worker.alive, "pas tue avant whisper_timeout")
+            time.sleep(0.5)
+            pool.check_health()
+            worker.process.wait(5)
+            deadline = time.monotonic() + 5
+            while worker.pending and time.monotonic() < deadline:
+                time.sleep(0.05)
+            pool.check_health()  # Relance + renvoi du backlog
+            ok &= _check(worker.alive and pool.status()[0]["restarts"] == 1, "worker bloque tue puis relance")
+        finally:
+            pool.stop()
+        ok &= _check(fut.result(5) is None, "requete perdue resolue (None), pas d'attente infinie")
+    assert ok
+
+
+if __name__ == "__main__":
+    print("Testing JARVIS Whisper pool (dry-run, CPU int8)...")
+    failed = 0
+    for test in (test_request_routing, test_crash_requeue,
+                 test_watchdog_queue_is_not_a_hang, test_watchdog_kills_hung_worker):
+        try:
+            test()
+        except AssertionError:
+            failed += 1
+    print(f"\n=== All tests completed ({failed} en echec) ===")
+    sys.exit(1 if failed else 0)
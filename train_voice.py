@@ -4,6 +4,7 @@ Modes:
   python train_voice.py              Mode interactif (tape des phrases)
   python train_voice.py --batch      Phrases de test auto-generees
   python train_voice.py --voice      Entrainement par voix reelle (Ctrl PTT)
+  python train_voice.py --wav DIR    Enregistrements WAV 16 kHz transcrits en lot (pool Whisper)
 
 Pour chaque phrase:
 1. Pipeline complet: nettoyage → correction → phonetique → fuzzy match → IA
@@ -325,10 +326,67 @@ async def train_voice() -> None:
     print(f"\n  Total: {stats['total']} | Corrects: {stats['correct']} | Corriges: {stats['corrected']}")
 
 
+async def train_wav(folder: str) -> None:
+    """WAV batch — every recording of a folder sent to the Whisper pool at once."""
+    from pathlib import Path
+    from src.audio_stream import WavSource
+    from src.voice import start_whisper, stop_whisper, transcribe_clips
+
+    files = sorted(Path(folder).glob("*.wav"))
+    if not files:
+        print(f"[ERREUR] Aucun fichier .wav dans {folder}")
+        return
+
+    init_db()
+    print("=" * 60)
+    print("  JARVIS VOICE TRAINING — Mode WAV")
+    print(f"  {len(files)} enregistrements")
+    print("=" * 60)
+
+    clips = []
+    for f in files:
+        try:
+            clips.append(WavSource(f).audio)
+        except (ValueError, OSError) as e:
+            print(f"  [IGNORE] {e}")
+            clips.append(None)
+
+    print("[WHISPER] Chargement du modele...")
+    if not start_whisper():
+        print("[ERREUR] Whisper indisponible")
+        return
+    try:
+        t0 = time.time()
+        texts = await transcribe_clips([c for c in clips if c is not None])
+        stt_ms = (time.time() - t0) * 1000
+    finally:
+        stop_whisper()
+
+    it = iter(texts)
+    matched = 0
+    for i, (f, clip) in enumerate(zip(files, clips), 1):
+        text = next(it) if clip is not None else None
+        if not text:
+            print(f"  [{i:3d}/{len(files)}] VIDE   {'---':25s} ← {f.name}")
+            continue
+        cr = await full_correction_pipeline(text, use_ia=False)
+        cmd, conf = cr['command'], cr['confidence']
+        status = "OK" if cmd and conf >= 0.65 else ("LOW" if cmd and conf >= 0.4 else "MISS")
+        matched += status == "OK"
+        print(f"  [{i:3d}/{len(files)}] {status:6s} {conf:.0%} {(cmd.name if cmd else '---'):25s} ← {f.name}: {text}")
+
+    print("\n" + "=" * 60)
+    print(f"  Transcription: {stt_ms:.0f}ms pour {len(texts)} fichiers | Matches: {matched}/{len(files)}")
+    print("=" * 60)
+
+
 async def main():
     args = sys.argv[1:]
     if "--batch" in args:
         await train_batch()
+    elif "--wav" in args:
+        idx = args.index("--wav")
+        await train_wav(args[idx + 1] if idx + 1 < len(args) else ".")
     elif "--voice" in args:
         await train_voice()
     else: